@@ -0,0 +1,16 @@
+-- Idempotent, ordered writes for ai_predictions (prediction_writer.py)
+-- pick_fingerprint: sha1 of game date | game_id | bet_type | prop_market_type | normalized
+-- pick text (game date: event_time's date, else the day the pick was generated),
+-- so re-running a pick generator upserts with ignore-duplicates instead of inserting twice.
+-- display_order: position of the pick within its save batch (the generators' UI order),
+-- since rows of one bulk insert share the same insert time.
+
+ALTER TABLE ai_predictions
+ADD COLUMN IF NOT EXISTS pick_fingerprint TEXT;
+
+ALTER TABLE ai_predictions
+ADD COLUMN IF NOT EXISTS display_order INTEGER;
+
+-- Existing rows keep a NULL fingerprint (NULLs never conflict)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_ai_predictions_pick_fingerprint
+ON ai_predictions(pick_fingerprint);
@@ -0,0 +1,76 @@
+-- Natural key for bulk stat backfills (stat_writer.py)
+-- game_date: the game's date (stats->>game_date, date part), stat_source: the feed the
+-- row came from (nba_api, balldontlie, mlb_statsapi, espn, nhl_api, sportsdata),
+-- game_key: the feed's game id (stats->>external_game_id), else event_id, else the game
+-- date, with ':<stats->>type>' appended for split rows (batting / pitching).
+-- The backfills upsert on (player_id, game_key, stat_source), so both games of a
+-- doubleheader and the batting / pitching rows of one game stay separate rows.
+-- Rows written by other ingesters (plain inserts) leave game_key NULL and never conflict.
+
+ALTER TABLE player_game_stats
+ADD COLUMN IF NOT EXISTS game_date DATE;
+
+ALTER TABLE player_game_stats
+ADD COLUMN IF NOT EXISTS stat_source TEXT;
+
+ALTER TABLE player_game_stats
+ADD COLUMN IF NOT EXISTS game_key TEXT;
+
+UPDATE player_game_stats
+SET game_date = LEFT(stats->>'game_date', 10)::date
+WHERE game_date IS NULL
+  AND stats->>'game_date' ~ '^\d{4}-\d{2}-\d{2}';
+
+-- Rows written before stat_source existed: the feed recorded in the stats JSON, else the
+-- backfill feed of the player's sport (STAT_SOURCES in scripts/backfill_free_apis_2025.py)
+UPDATE player_game_stats pgs
+SET stat_source = COALESCE(
+    NULLIF(pgs.stats->>'stat_source', ''),
+    CASE p.sport
+        WHEN 'NBA' THEN 'nba_api'
+        WHEN 'NFL' THEN 'espn'
+        WHEN 'NHL' THEN 'nhl_api'
+        WHEN 'MLB' THEN 'mlb_statsapi'
+    END
+)
+FROM players p
+WHERE p.id = pgs.player_id
+  AND pgs.stat_source IS NULL;
+
+-- Rows that identify their game (feed game id or event): same rule as stat_writer.game_key_of
+UPDATE player_game_stats
+SET game_key = COALESCE(NULLIF(stats->>'external_game_id', ''), event_id::text)
+               || COALESCE(':' || NULLIF(stats->>'type', ''), '')
+WHERE game_key IS NULL
+  AND (NULLIF(stats->>'external_game_id', '') IS NOT NULL OR event_id IS NOT NULL);
+
+-- Rows known only by date are keyed on it only when nothing else of that player, date,
+-- source and type shares it; an ambiguous pair (e.g. a doubleheader) stays unkeyed
+UPDATE player_game_stats pgs
+SET game_key = pgs.game_date::text || COALESCE(':' || NULLIF(pgs.stats->>'type', ''), '')
+WHERE pgs.game_key IS NULL
+  AND pgs.game_date IS NOT NULL
+  AND pgs.stat_source IS NOT NULL
+  AND NOT EXISTS (
+      SELECT 1
+      FROM player_game_stats other
+      WHERE other.id <> pgs.id
+        AND other.player_id = pgs.player_id
+        AND other.game_date = pgs.game_date
+        AND other.stat_source = pgs.stat_source
+        AND COALESCE(other.stats->>'type', '') = COALESCE(pgs.stats->>'type', '')
+  );
+
+-- True duplicates only (same player, game and source, e.g. a re-run backfill): keep the newest
+DELETE FROM player_game_stats older
+USING player_game_stats newer
+WHERE older.player_id = newer.player_id
+  AND older.game_key = newer.game_key
+  AND older.stat_source = newer.stat_source
+  AND (older.created_at, older.id::text) < (newer.created_at, newer.id::text);
+
+-- Earlier versions of this migration keyed on (player_id, game_date[, stat_source])
+DROP INDEX IF EXISTS idx_player_game_stats_natural_key;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_player_game_stats_natural_key
+ON player_game_stats(player_id, game_key, stat_source);
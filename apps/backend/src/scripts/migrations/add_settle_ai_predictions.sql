@@ -0,0 +1,25 @@
+-- Bulk settlement writes for check_bet_results.py
+-- settle_ai_predictions(updates): one UPDATE for a chunk of settled predictions, given as
+-- a JSON array of {id, status, metadata, updated_at}. metadata holds only the keys the
+-- settler adds (result / actual_value) and is merged into the stored metadata, so no
+-- other column or metadata key is rewritten from the settler's snapshot.
+-- jsonb_populate_recordset types each field like the ai_predictions column it fills.
+
+CREATE OR REPLACE FUNCTION settle_ai_predictions(updates JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    settled INTEGER;
+BEGIN
+    UPDATE ai_predictions p
+    SET status = u.status,
+        metadata = COALESCE(p.metadata, '{}'::JSONB) || COALESCE(u.metadata, '{}'::JSONB),
+        updated_at = u.updated_at
+    FROM jsonb_populate_recordset(NULL::ai_predictions, updates) u
+    WHERE p.id = u.id;
+
+    GET DIAGNOSTICS settled = ROW_COUNT;
+    RETURN settled;
+END;
+$$;
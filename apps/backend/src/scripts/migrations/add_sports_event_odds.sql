@@ -0,0 +1,110 @@
+-- Normalized odds rows exploded from sports_events.metadata.full_data.bookmakers
+-- One row per (event, bookmaker, market, side), written by a trigger whenever an
+-- event's metadata changes, so readers (odds_snapshot.py) select only the markets
+-- they need instead of the full TheOdds JSON blob of every game.
+-- side: 'home' / 'away' when the outcome names a team of the event, otherwise the
+-- lower-cased outcome name ('over', 'under', 'draw', ...). When a game's JSON repeats a
+-- (bookmaker, market, side), the first one in document order is kept, like
+-- odds_snapshot.explode_bookmakers.
+
+CREATE TABLE IF NOT EXISTS sports_event_odds (
+    event_id UUID NOT NULL REFERENCES sports_events(id) ON DELETE CASCADE,
+    bookmaker TEXT NOT NULL,
+    market TEXT NOT NULL,
+    side TEXT NOT NULL,
+    point NUMERIC,
+    price INTEGER NOT NULL,
+    fetched_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (event_id, market, bookmaker, side)
+);
+
+CREATE INDEX IF NOT EXISTS idx_sports_event_odds_market
+ON sports_event_odds(market, event_id);
+
+CREATE OR REPLACE FUNCTION explode_event_odds(p_event_id UUID, p_home_team TEXT, p_away_team TEXT, p_metadata JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    bookmakers JSONB := p_metadata #> '{full_data,bookmakers}';
+    stored INTEGER;
+BEGIN
+    DELETE FROM sports_event_odds WHERE event_id = p_event_id;
+    IF jsonb_typeof(bookmakers) IS DISTINCT FROM 'array' THEN
+        RETURN 0;
+    END IF;
+
+    INSERT INTO sports_event_odds (event_id, bookmaker, market, side, point, price, fetched_at)
+    SELECT DISTINCT ON (b.value->>'key', m.value->>'key', s.side)
+        p_event_id,
+        b.value->>'key',
+        m.value->>'key',
+        s.side,
+        (o.value->>'point')::NUMERIC,
+        ROUND((o.value->>'price')::NUMERIC)::INTEGER,
+        COALESCE((m.value->>'last_update')::TIMESTAMPTZ, (b.value->>'last_update')::TIMESTAMPTZ, NOW())
+    FROM jsonb_array_elements(bookmakers) WITH ORDINALITY b
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(b.value->'markets') = 'array' THEN b.value->'markets' ELSE '[]'::JSONB END
+    ) WITH ORDINALITY m
+    CROSS JOIN LATERAL jsonb_array_elements(
+        CASE WHEN jsonb_typeof(m.value->'outcomes') = 'array' THEN m.value->'outcomes' ELSE '[]'::JSONB END
+    ) WITH ORDINALITY o
+    CROSS JOIN LATERAL (
+        SELECT CASE
+            WHEN o.value->>'name' = p_home_team THEN 'home'
+            WHEN o.value->>'name' = p_away_team THEN 'away'
+            ELSE LOWER(o.value->>'name')
+        END AS side
+    ) s
+    WHERE b.value->>'key' IS NOT NULL
+      AND m.value->>'key' IS NOT NULL
+      AND o.value->>'name' IS NOT NULL
+      AND o.value->>'price' IS NOT NULL
+    ORDER BY b.value->>'key', m.value->>'key', s.side, b.ordinality, m.ordinality, o.ordinality;
+
+    GET DIAGNOSTICS stored = ROW_COUNT;
+    RETURN stored;
+END;
+$$;
+
+-- Runs as the table owner: sports_event_odds only has a read policy, and writers of
+-- sports_events (anon / authenticated keys included) must not fail on the odds rows
+CREATE OR REPLACE FUNCTION sync_sports_event_odds()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.metadata IS NOT DISTINCT FROM NEW.metadata
+       AND OLD.home_team IS NOT DISTINCT FROM NEW.home_team
+       AND OLD.away_team IS NOT DISTINCT FROM NEW.away_team THEN
+        RETURN NEW;
+    END IF;
+    PERFORM explode_event_odds(NEW.id, NEW.home_team, NEW.away_team, NEW.metadata);
+    RETURN NEW;
+END;
+$$;
+
+-- Only the trigger (and this migration) rewrite odds rows
+REVOKE EXECUTE ON FUNCTION explode_event_odds(UUID, TEXT, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION sync_sports_event_odds() FROM PUBLIC, anon, authenticated;
+
+DROP TRIGGER IF EXISTS trg_sync_sports_event_odds ON sports_events;
+CREATE TRIGGER trg_sync_sports_event_odds
+AFTER INSERT OR UPDATE ON sports_events
+FOR EACH ROW EXECUTE FUNCTION sync_sports_event_odds();
+
+-- Odds are public market data; the insights generator reads them with the anon key
+ALTER TABLE sports_event_odds ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Odds are readable by everyone" ON sports_event_odds;
+CREATE POLICY "Odds are readable by everyone"
+ON sports_event_odds FOR SELECT
+USING (true);
+
+-- Backfill every event that already carries bookmaker odds
+SELECT explode_event_odds(id, home_team, away_team, metadata)
+FROM sports_events
+WHERE metadata #> '{full_data,bookmakers}' IS NOT NULL;
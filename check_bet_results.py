@@ -3,16 +3,31 @@
 Bet Result Checker for ParleyApp
 Automatically checks if predictions won or lost using StatMuse and TheOdds API
 No AI needed - just data fetching and comparison logic
+
+Team bets are settled per scoreboard, not per bet: pending predictions are grouped by
+sport (TheOdds) or (sport, local game date) (ESPN), each scoreboard is fetched once,
+concurrently, into a ScoreboardIndex of completed games by matchup of team ids
+(team_registry), and every bet is settled against it. Status updates are written in bulk at the end.
+
+Player props are settled from the ingested player_game_stats / player_recent_stats
+rows (prop_settlement.PropStatsLookup); only props missing there are asked of the
+StatMuse server, in /query-batch requests. The summary reports results per source.
 """
 
 import os
+import re
 import sys
 import requests
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from collections import Counter
+from game_slate import local_game_date
+from prop_settlement import PropStatsLookup, prop_game_dates
+from team_registry import TeamRegistry, get_team_registry, normalize_team
 
 # Load environment variables
 load_dotenv()
@@ -37,6 +52,100 @@ SPORT_MAP = {
     "NBA": "basketball_nba"
 }
 
+# ESPN API endpoints by sport
+ESPN_MAP = {
+    "MLB": "baseball/mlb",
+    "NBA": "basketball/nba",
+    "WNBA": "basketball/wnba",
+    "NFL": "football/nfl",
+    "CFB": "football/college-football"
+}
+
+TEAM_BETS = ("moneyline", "spread", "total")
+SOURCE_STATMUSE = "statmuse"
+STATMUSE_BATCH_SIZE = 50  # statmuse_api_server MAX_BATCH_SIZE
+STATMUSE_SPORTS = {"MLB", "NHL", "NBA", "NFL", "CFB", "NCAAF", "WNBA"}
+SCOREBOARD_WORKERS = int(os.getenv("SCOREBOARD_FETCH_WORKERS", "8"))
+RESULT_WRITE_BATCH_SIZE = int(os.getenv("RESULT_WRITE_BATCH_SIZE", "100"))
+# A scoreboard game settles a bet only if it started within this window of the bet's event_time
+MATCH_WINDOW = timedelta(hours=36)
+
+_MATCHUP_SEPARATOR = re.compile(r"\s+(?:@|vs\.?|at|v)\s+", re.IGNORECASE)
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class ScoreboardIndex:
+    """Completed games by (sport, matchup of team ids); repeated matchups (series) are
+    told apart by start time. Only exact registry aliases are trusted for settlement;
+    other names key by normalized name."""
+
+    def __init__(self, registry: Optional[TeamRegistry] = None):
+        self.registry = registry or get_team_registry()
+        self._games: Dict[Tuple[str, FrozenSet[str]], List[Tuple[Optional[datetime], Dict]]] = {}
+        self._by_sport: Dict[str, List[Tuple[str, str, Optional[datetime], Dict]]] = {}
+
+    def add(self, sport: str, result: Dict, start_time: Optional[str]):
+        home, away = normalize_team(result["home_team"]), normalize_team(result["away_team"])
+        started = parse_time(start_time)
+        key = (sport, frozenset((self._team_key(sport, result["home_team"]), self._team_key(sport, result["away_team"]))))
+        if any(existing_start == started for existing_start, _ in self._games.get(key, [])):
+            return  # same game from an overlapping scoreboard
+        self._games.setdefault(key, []).append((started, result))
+        self._by_sport.setdefault(sport, []).append((home, away, started, result))
+
+    def __len__(self) -> int:
+        return sum(len(games) for games in self._games.values())
+
+    def find(self, sport: str, teams: str, event_time: Optional[str]) -> Optional[Dict]:
+        """Result of the completed game for a "Away @ Home" matchup string, if any"""
+        event_start = parse_time(event_time)
+        raw_names = [name for name in _MATCHUP_SEPARATOR.split(teams or "") if name.strip()]
+        names = [normalize_team(name) for name in raw_names]
+        candidates = []
+        resolved = False
+        if len(names) == 2:
+            team_ids = [self.registry.resolve(name, sport, exact=True) for name in raw_names]
+            resolved = all(team_ids)
+            keys = [team_id or name for team_id, name in zip(team_ids, names)]
+            candidates = self._games.get((sport, frozenset(keys)), [])
+        if not candidates and not resolved:
+            # Partial team names ("Yankees @ Red Sox"): containment either way, as before
+            wanted = normalize_team(teams)
+            candidates = [
+                (started, result) for home, away, started, result in self._by_sport.get(sport, [])
+                if (len(names) == 2 and all(self._team_matches(name, (home, away)) for name in names))
+                or f"{away} {home}" in wanted or wanted in f"{away} {home}"
+            ]
+        return self._closest(candidates, event_start)
+
+    def _team_key(self, sport: str, name: str) -> str:
+        return self.registry.resolve(name, sport, exact=True) or normalize_team(name)
+
+    @staticmethod
+    def _team_matches(name: str, teams: Tuple[str, str]) -> bool:
+        return any(name in team or team in name for team in teams)
+
+    @staticmethod
+    def _closest(candidates: List[Tuple[Optional[datetime], Dict]], event_start: Optional[datetime]) -> Optional[Dict]:
+        if not candidates:
+            return None
+        if event_start is None:
+            return candidates[0][1]
+        timed = [(abs(started - event_start), result) for started, result in candidates if started is not None]
+        if not timed:
+            return candidates[0][1]
+        gap, result = min(timed, key=lambda item: item[0])
+        return result if gap <= MATCH_WINDOW else None
+
 class BetResultChecker:
     """Main class for checking bet results"""
     
@@ -46,6 +155,10 @@ class BetResultChecker:
         self.lost_count = 0
         self.error_count = 0
         self.skipped_count = 0
+        self.request_count = 0
+        self.source_counts: Counter = Counter()
+        self.session = requests.Session()
+        self._pending_updates: List[Dict] = []
     
     def check_pending_bets(self, hours_ago: int = None, silent_skip: bool = True) -> Dict:
         """
@@ -68,8 +181,15 @@ class BetResultChecker:
         
         self.silent_skip = silent_skip
         
+        team_bets = [pred for pred in predictions if pred.get("bet_type") in TEAM_BETS]
+        scoreboard = self._load_scoreboards(team_bets) if team_bets else ScoreboardIndex()
+        props = [pred for pred in predictions if pred.get("bet_type") == "player_prop"]
+        prop_results = self._load_prop_results(props) if props else {}
+        
         for pred in predictions:
-            self._check_single_bet(pred)
+            self._check_single_bet(pred, scoreboard, prop_results)
+        
+        self._flush_results()
         
         # Print summary
         self._print_summary()
@@ -79,18 +199,74 @@ class BetResultChecker:
             "won": self.won_count,
             "lost": self.lost_count,
             "skipped": self.skipped_count,
-            "errors": self.error_count
+            "errors": self.error_count,
+            "sources": dict(self.source_counts)
         }
     
-    def _check_single_bet(self, prediction: Dict):
+    def _load_scoreboards(self, team_bets: List[Dict]) -> ScoreboardIndex:
+        """Fetch every scoreboard the team bets need once, concurrently"""
+        if THEODDS_API_KEY:
+            # /scores covers the last 3 days of a sport in one response
+            groups = sorted({(bet["sport"], None) for bet in team_bets})
+        else:
+            groups = sorted({
+                (bet["sport"], local_game_date(bet["event_time"]).strftime("%Y%m%d"))
+                for bet in team_bets if bet.get("event_time") and bet["sport"] in ESPN_MAP
+            })
+        
+        index = ScoreboardIndex(get_team_registry(supabase))
+        self.request_count += len(groups)
+        with ThreadPoolExecutor(max_workers=max(1, min(SCOREBOARD_WORKERS, len(groups) or 1))) as pool:
+            results = pool.map(lambda group: (group[0], self._fetch_scoreboard(*group)), groups)
+            for sport, games in results:
+                for result, start_time in games:
+                    index.add(sport, result, start_time)
+        
+        print(f"📡 Loaded {len(index)} completed games from {len(groups)} scoreboards for {len(team_bets)} team bets\n")
+        return index
+    
+    def _fetch_scoreboard(self, sport: str, date: Optional[str]) -> List[Tuple[Dict, Optional[str]]]:
+        try:
+            if date is None:
+                return self._fetch_theodds_scores(sport)
+            return self._fetch_espn_scoreboard(sport, date)
+        except Exception as e:
+            print(f"    Error fetching {sport} scoreboard{' for ' + date if date else ''}: {str(e)}")
+            return []
+    
+    def _load_prop_results(self, props: List[Dict]) -> Dict[str, Tuple[float, str]]:
+        """Actual values for player props: ingested stats tables first, StatMuse for misses"""
+        try:
+            results = PropStatsLookup(supabase).lookup(props)
+        except Exception as e:
+            print(f"    ⚠️  Local stats lookup failed ({str(e)}), using StatMuse for all props")
+            results = {}
+        
+        misses = [
+            prop for prop in props
+            if prop["id"] not in results and self._prop_has_data(prop) and prop.get("event_time")
+        ]
+        if misses:
+            for prediction_id, value in self._get_player_stats_from_statmuse(misses).items():
+                results[prediction_id] = (value, SOURCE_STATMUSE)
+        
+        print(f"📚 Found results for {len(results)}/{len(props)} player props\n")
+        return results
+    
+    @staticmethod
+    def _prop_has_data(prediction: Dict) -> bool:
+        metadata = prediction.get("metadata") or {}
+        return all([metadata.get("player_name"), prediction.get("prop_market_type"), metadata.get("line")])
+    
+    def _check_single_bet(self, prediction: Dict, scoreboard: ScoreboardIndex, prop_results: Dict):
         """Check a single bet result"""
         try:
             bet_type = prediction.get("bet_type")
             
             if bet_type == "player_prop":
-                self._check_player_prop(prediction)
-            elif bet_type in ["moneyline", "spread", "total"]:
-                self._check_team_bet(prediction)
+                self._check_player_prop(prediction, prop_results)
+            elif bet_type in TEAM_BETS:
+                self._check_team_bet(prediction, scoreboard)
             else:
                 print(f"⚠️  Unknown bet type: {bet_type}")
                 self.error_count += 1
@@ -99,39 +275,28 @@ class BetResultChecker:
             print(f"❌ Error checking bet {prediction.get('id')}: {str(e)}")
             self.error_count += 1
     
-    def _check_player_prop(self, prediction: Dict):
-        """Check player prop bet using StatMuse"""
+    def _check_player_prop(self, prediction: Dict, prop_results: Dict):
+        """Check player prop bet against the looked-up actual value"""
         
         try:
             # Extract player and stat from metadata
             metadata = prediction.get("metadata", {})
             player_name = metadata.get("player_name")
-            prop_type = prediction.get("prop_market_type")
             line = metadata.get("line")
             recommendation = metadata.get("recommendation", "").upper()
             
-            if not all([player_name, prop_type, line]):
+            if not self._prop_has_data(prediction):
                 if not self.silent_skip:
                     print(f"🏃 Checking player prop: {prediction['pick']}")
                     print(f"  ⚠️  Missing data - skipping")
                 self.skipped_count += 1
                 return
             
-            # Get game date from event_time
-            event_date = prediction["event_time"].split("T")[0]
-            
-            # Query StatMuse for actual result
-            actual_value = self._get_player_stat_from_statmuse(
-                player_name, 
-                prop_type, 
-                prediction["sport"],
-                event_date
-            )
-            
-            if actual_value is None:
+            if prediction["id"] not in prop_results:
                 # Game not finished yet - silently skip
                 self.skipped_count += 1
                 return
+            actual_value, source = prop_results[prediction["id"]]
             
             # Only print if we have a result
             print(f"🏃 Checking player prop: {prediction['pick']}")
@@ -139,29 +304,26 @@ class BetResultChecker:
             # Determine if bet won
             won = self._evaluate_prop_result(actual_value, line, recommendation)
             
-            # Update database
-            self._update_bet_result(
-                prediction["id"],
-                "won" if won else "lost",
-                actual_value
-            )
+            # Queue database update
+            self._queue_result(prediction, "won" if won else "lost", actual_value)
             
             # Update counters
             self.checked_count += 1
+            self.source_counts[source] += 1
             if won:
                 self.won_count += 1
-                print(f"  ✅ WON - {player_name} had {actual_value} (line: {line})")
+                print(f"  ✅ WON - {player_name} had {actual_value} (line: {line}, via {source})")
             else:
                 self.lost_count += 1
-                print(f"  ❌ LOST - {player_name} had {actual_value} (line: {line})")
+                print(f"  ❌ LOST - {player_name} had {actual_value} (line: {line}, via {source})")
         
         except Exception as e:
             if not self.silent_skip:
                 print(f"🏃 Checking player prop: {prediction['pick']}")
                 print(f"  ❌ Error: {str(e)}")
     
-    def _check_team_bet(self, prediction: Dict):
-        """Check team bet (moneyline/spread/total) using TheOdds API or ESPN"""
+    def _check_team_bet(self, prediction: Dict, scoreboard: ScoreboardIndex):
+        """Check team bet (moneyline/spread/total) against the loaded scoreboards"""
         
         try:
             # Parse teams from match_teams
@@ -170,11 +332,7 @@ class BetResultChecker:
             metadata = prediction.get("metadata", {})
             
             # Get game result
-            game_result = self._get_game_result(
-                prediction["sport"],
-                teams,
-                prediction["event_time"]
-            )
+            game_result = scoreboard.find(prediction["sport"], teams, prediction.get("event_time"))
             
             if not game_result:
                 # Game not finished yet - silently skip
@@ -192,12 +350,8 @@ class BetResultChecker:
                 game_result
             )
             
-            # Update database
-            self._update_bet_result(
-                prediction["id"],
-                "won" if won else "lost",
-                game_result
-            )
+            # Queue database update
+            self._queue_result(prediction, "won" if won else "lost", game_result)
             
             # Update counters
             self.checked_count += 1
@@ -213,180 +367,122 @@ class BetResultChecker:
                 print(f"🏈 Checking team bet: {prediction['pick']}")
                 print(f"  ❌ Error: {str(e)}")
     
-    def _get_player_stat_from_statmuse(
-        self, 
-        player_name: str, 
-        prop_type: str, 
-        sport: str,
-        game_date: str
-    ) -> Optional[float]:
-        """Query StatMuse for player's actual performance"""
-        try:
-            # Map prop type to StatMuse query
-            stat_queries = {
-                "Pass Yards O/U": f"how many passing yards did {player_name} have on {game_date}",
-                "Hits O/U": f"how many hits did {player_name} have on {game_date}",
-                "Pass TDs O/U": f"how many passing touchdowns did {player_name} have on {game_date}",
-                "Rush Yards O/U": f"how many rushing yards did {player_name} have on {game_date}",
-                "Points O/U": f"how many points did {player_name} score on {game_date}",
-                "Rebounds O/U": f"how many rebounds did {player_name} have on {game_date}",
-                "Assists O/U": f"how many assists did {player_name} have on {game_date}",
-                "Strikeouts O/U": f"how many strikeouts did {player_name} have on {game_date}",
-                "Home Runs O/U": f"how many home runs did {player_name} hit on {game_date}",
-            }
-            
-            query = stat_queries.get(prop_type, f"{player_name} {prop_type} {game_date}")
-            
-            # Query StatMuse
-            response = requests.post(
-                f"{STATMUSE_URL}/query",
-                json={"query": query, "sport": sport.lower()},
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                return None
-            
-            result = response.json()
-            
-            # Parse the numerical answer from StatMuse response
-            answer = result.get("answer", "")
-            
-            # Extract number from answer (e.g., "285" from "Noah Fifita had 285 passing yards")
-            import re
-            numbers = re.findall(r'\d+\.?\d*', answer)
-            
-            if numbers:
-                return float(numbers[0])
-            
-            return None
-        
-        except Exception as e:
-            print(f"    StatMuse error: {str(e)}")
-            return None
+    def _statmuse_query(self, player_name: str, prop_type: str, game_date: str) -> str:
+        """Map prop type to StatMuse query"""
+        stat_queries = {
+            "Pass Yards O/U": f"how many passing yards did {player_name} have on {game_date}",
+            "Hits O/U": f"how many hits did {player_name} have on {game_date}",
+            "Pass TDs O/U": f"how many passing touchdowns did {player_name} have on {game_date}",
+            "Rush Yards O/U": f"how many rushing yards did {player_name} have on {game_date}",
+            "Points O/U": f"how many points did {player_name} score on {game_date}",
+            "Rebounds O/U": f"how many rebounds did {player_name} have on {game_date}",
+            "Assists O/U": f"how many assists did {player_name} have on {game_date}",
+            "Strikeouts O/U": f"how many strikeouts did {player_name} have on {game_date}",
+            "Home Runs O/U": f"how many home runs did {player_name} hit on {game_date}",
+        }
+        return stat_queries.get(prop_type, f"{player_name} {prop_type} {game_date}")
     
-    def _get_game_result(
-        self, 
-        sport: str, 
-        teams: str, 
-        event_time: str
-    ) -> Optional[Dict]:
-        """Get final game score from TheOdds API or ESPN"""
-        try:
-            # Try TheOdds API first if available
-            if THEODDS_API_KEY:
-                return self._get_result_from_theodds(sport, teams, event_time)
-            
-            # Fallback to ESPN API (free)
-            return self._get_result_from_espn(sport, teams, event_time)
+    def _get_player_stats_from_statmuse(self, props: List[Dict]) -> Dict[str, float]:
+        """Fallback: actual values from StatMuse, through the server's /query-batch endpoint"""
+        items = [
+            (prop["id"], {
+                "query": self._statmuse_query(
+                    prop["metadata"]["player_name"], prop["prop_market_type"], prop_game_dates(prop["event_time"])[0]
+                ),
+                "sport": str(prop.get("sport", "")).upper()
+            })
+            for prop in props if str(prop.get("sport", "")).upper() in STATMUSE_SPORTS
+        ]
         
-        except Exception as e:
-            print(f"    Error fetching game result: {str(e)}")
-            return None
-    
-    def _get_result_from_theodds(
-        self, 
-        sport: str, 
-        teams: str, 
-        event_time: str
-    ) -> Optional[Dict]:
-        """Fetch result from TheOdds API scores endpoint"""
-        try:
-            sport_key = SPORT_MAP.get(sport, sport.lower())
-            
-            response = requests.get(
-                f"{THEODDS_BASE_URL}/sports/{sport_key}/scores/",
-                params={
-                    "apiKey": THEODDS_API_KEY,
-                    "daysFrom": 3
-                },
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                return None
-            
-            games = response.json()
-            
-            # Find matching game by teams
-            for game in games:
-                if game.get("completed") and teams in f"{game.get('home_team')} @ {game.get('away_team')}":
-                    scores = game.get("scores", [])
-                    if len(scores) >= 2:
-                        return {
-                            "home_team": game.get("home_team"),
-                            "away_team": game.get("away_team"),
-                            "home_score": scores[0].get("score"),
-                            "away_score": scores[1].get("score"),
-                            "completed": True
-                        }
-            
-            return None
+        values = {}
+        for start in range(0, len(items), STATMUSE_BATCH_SIZE):
+            chunk = items[start:start + STATMUSE_BATCH_SIZE]
+            try:
+                response = self.session.post(
+                    f"{STATMUSE_URL}/query-batch",
+                    json={"queries": [query for _, query in chunk]},
+                    timeout=120
+                )
+                if response.status_code != 200:
+                    print(f"    StatMuse batch error: HTTP {response.status_code}")
+                    continue
+                
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    item = json.loads(line)
+                    if item.get("type") != "result" or not item.get("result", {}).get("success"):
+                        continue
+                    # Parse the numerical answer from StatMuse response
+                    # (e.g., "285" from "Noah Fifita had 285 passing yards")
+                    numbers = re.findall(r'\d+\.?\d*', item["result"].get("answer", "") or "")
+                    if numbers:
+                        values[chunk[item["index"]][0]] = float(numbers[0])
+            except Exception as e:
+                print(f"    StatMuse error: {str(e)}")
         
-        except Exception:
-            return None
+        print(f"🔎 StatMuse settled {len(values)}/{len(props)} props missing from local stats")
+        return values
     
-    def _get_result_from_espn(
-        self, 
-        sport: str, 
-        teams: str, 
-        event_time: str
-    ) -> Optional[Dict]:
-        """Fallback: Fetch result from ESPN API (free)"""
-        # ESPN API endpoints by sport
-        espn_map = {
-            "MLB": "baseball/mlb",
-            "NBA": "basketball/nba",
-            "WNBA": "basketball/wnba",
-            "NFL": "football/nfl",
-            "CFB": "football/college-football"
-        }
+    def _fetch_theodds_scores(self, sport: str) -> List[Tuple[Dict, Optional[str]]]:
+        """Completed games of the last 3 days from TheOdds API scores endpoint"""
+        sport_key = SPORT_MAP.get(sport, sport.lower())
         
-        espn_sport = espn_map.get(sport)
-        if not espn_sport:
-            return None
+        response = self.session.get(
+            f"{THEODDS_BASE_URL}/sports/{sport_key}/scores/",
+            params={
+                "apiKey": THEODDS_API_KEY,
+                "daysFrom": 3
+            },
+            timeout=10
+        )
         
-        try:
-            # Get date from event_time
-            date = event_time.split("T")[0].replace("-", "")
-            
-            response = requests.get(
-                f"https://site.api.espn.com/apis/site/v2/sports/{espn_sport}/scoreboard",
-                params={"dates": date},
-                timeout=10
-            )
-            
-            if response.status_code != 200:
-                return None
-            
-            data = response.json()
-            events = data.get("events", [])
-            
-            # Find matching game
-            for event in events:
-                competition = event.get("competitions", [{}])[0]
-                competitors = competition.get("competitors", [])
-                
-                if len(competitors) >= 2:
-                    home = competitors[0] if competitors[0].get("homeAway") == "home" else competitors[1]
-                    away = competitors[1] if competitors[1].get("homeAway") == "away" else competitors[0]
-                    
-                    event_name = f"{away.get('team', {}).get('displayName')} @ {home.get('team', {}).get('displayName')}"
-                    
-                    if teams in event_name or event_name in teams:
-                        if competition.get("status", {}).get("type", {}).get("completed"):
-                            return {
-                                "home_team": home.get("team", {}).get("displayName"),
-                                "away_team": away.get("team", {}).get("displayName"),
-                                "home_score": int(home.get("score", 0)),
-                                "away_score": int(away.get("score", 0)),
-                                "completed": True
-                            }
-            
-            return None
+        if response.status_code != 200:
+            return []
         
-        except Exception:
-            return None
+        games = []
+        for game in response.json():
+            scores = {score.get("name"): score.get("score") for score in game.get("scores") or []}
+            home_team, away_team = game.get("home_team"), game.get("away_team")
+            if not game.get("completed") or home_team not in scores or away_team not in scores:
+                continue
+            games.append(({
+                "home_team": home_team,
+                "away_team": away_team,
+                "home_score": float(scores[home_team]),
+                "away_score": float(scores[away_team]),
+                "completed": True
+            }, game.get("commence_time")))
+        return games
+    
+    def _fetch_espn_scoreboard(self, sport: str, date: str) -> List[Tuple[Dict, Optional[str]]]:
+        """Fallback: completed games of one date (YYYYMMDD) from ESPN API (free)"""
+        response = self.session.get(
+            f"https://site.api.espn.com/apis/site/v2/sports/{ESPN_MAP[sport]}/scoreboard",
+            params={"dates": date},
+            timeout=10
+        )
+        
+        if response.status_code != 200:
+            return []
+        
+        games = []
+        for event in response.json().get("events", []):
+            competition = event.get("competitions", [{}])[0]
+            competitors = competition.get("competitors", [])
+            if len(competitors) < 2 or not competition.get("status", {}).get("type", {}).get("completed"):
+                continue
+            
+            home = competitors[0] if competitors[0].get("homeAway") == "home" else competitors[1]
+            away = competitors[1] if competitors[1].get("homeAway") == "away" else competitors[0]
+            games.append(({
+                "home_team": home.get("team", {}).get("displayName"),
+                "away_team": away.get("team", {}).get("displayName"),
+                "home_score": int(home.get("score", 0)),
+                "away_score": int(away.get("score", 0)),
+                "completed": True
+            }, event.get("date") or competition.get("date")))
+        return games
     
     def _evaluate_prop_result(
         self, 
@@ -440,42 +536,48 @@ class BetResultChecker:
         
         return False
     
-    def _update_bet_result(self, prediction_id: str, status: str, result_data):
-        """Update prediction with result"""
-        try:
-            # Prepare update data
-            update_data = {
-                "status": status,
-                "updated_at": datetime.utcnow().isoformat()
-            }
-            
-            # Add result data to metadata
-            if isinstance(result_data, dict):
-                # Team bet result
-                update_data["metadata"] = {
-                    **self._get_existing_metadata(prediction_id),
-                    "result": result_data
-                }
-            else:
-                # Player prop result
-                update_data["metadata"] = {
-                    **self._get_existing_metadata(prediction_id),
-                    "actual_value": result_data
-                }
-            
-            # Update in Supabase
-            supabase.table("ai_predictions").update(update_data).eq("id", prediction_id).execute()
+    def _queue_result(self, prediction: Dict, status: str, result_data):
+        """Record a settled prediction; written in bulk by _flush_results"""
+        # Only the keys settlement adds; merged into the stored metadata on write
+        if isinstance(result_data, dict):
+            # Team bet result
+            result_metadata = {"result": result_data}
+        else:
+            # Player prop result
+            result_metadata = {"actual_value": result_data}
         
-        except Exception as e:
-            print(f"    ⚠️  Error updating database: {str(e)}")
+        self._pending_updates.append({
+            "id": prediction["id"],
+            "status": status,
+            "metadata": result_metadata,
+            "updated_at": datetime.utcnow().isoformat(),
+            # Only used by the row-by-row fallback, which has to send the whole blob
+            "_full_metadata": {**(prediction.get("metadata") or {}), **result_metadata},
+        })
     
-    def _get_existing_metadata(self, prediction_id: str) -> Dict:
-        """Get existing metadata to preserve it"""
-        try:
-            response = supabase.table("ai_predictions").select("metadata").eq("id", prediction_id).single().execute()
-            return response.data.get("metadata", {})
-        except:
-            return {}
+    def _flush_results(self):
+        """Write all settled predictions: one settle_ai_predictions RPC (status, metadata
+        merge, updated_at by id) per chunk, row-by-row updates if the RPC is unavailable"""
+        updates, self._pending_updates = self._pending_updates, []
+        for start in range(0, len(updates), RESULT_WRITE_BATCH_SIZE):
+            chunk = updates[start:start + RESULT_WRITE_BATCH_SIZE]
+            try:
+                supabase.rpc("settle_ai_predictions", {
+                    "updates": [{k: v for k, v in row.items() if k != "_full_metadata"} for row in chunk]
+                }).execute()
+            except Exception as e:
+                print(f"    ⚠️  Bulk update failed ({str(e)}), updating {len(chunk)} rows individually")
+                for row in chunk:
+                    try:
+                        supabase.table("ai_predictions").update({
+                            "status": row["status"],
+                            "metadata": row["_full_metadata"],
+                            "updated_at": row["updated_at"]
+                        }).eq("id", row["id"]).execute()
+                    except Exception as e:
+                        print(f"    ⚠️  Error updating database: {str(e)}")
+        if updates:
+            print(f"\n💾 Saved {len(updates)} settled bets")
     
     def _print_summary(self):
         """Print results summary"""
@@ -486,6 +588,9 @@ class BetResultChecker:
         print(f"❌ Lost:        {self.lost_count}")
         print(f"📈 Total:       {self.checked_count}")
         print(f"⏭️  Skipped:     {self.skipped_count} (games not finished yet)")
+        print(f"📡 Scoreboards: {self.request_count} HTTP requests")
+        if self.source_counts:
+            print("📚 Prop sources: " + ", ".join(f"{source} {count}" for source, count in self.source_counts.most_common()))
         
         if self.error_count > 0:
             print(f"⚠️  Errors:      {self.error_count}")
@@ -16,6 +16,7 @@ import httpx
 import re
 from supabase import create_client, Client
 from collections import defaultdict
+from research_memo import STATMUSE as STATMUSE_MEMO, get_memo_store, statmuse_ok
 
 # Load environment variables
 load_dotenv()
@@ -113,8 +114,17 @@ class StatMuseClient:
     async def health(self) -> Dict[str, Any]:
         return await self.get("/health")
 
-    async def query(self, q: str) -> Dict[str, Any]:
-        return await self.post("/query", {"query": q})
+    async def query(self, q: str, sport: str) -> Dict[str, Any]:
+        # Shared research memo first: the pick agents memo StatMuse answers per sport
+        sport = sport.upper()
+        store = get_memo_store()
+        memo = store.get(STATMUSE_MEMO, q, sport=sport, pipeline="daily_ai_report") if store else None
+        if memo is not None:
+            return memo.answer
+        result = await self.post("/query", {"query": q, "sport": sport})
+        if store and statmuse_ok(result):
+            store.put(STATMUSE_MEMO, q, sport, result, source="statmuse")
+        return result
 
     async def head_to_head(self, team_a: str, team_b: str, sport: Optional[str] = None) -> Dict[str, Any]:
         payload = {"team_a": team_a, "team_b": team_b}
@@ -13,6 +13,8 @@ from datetime import datetime, date, time, timedelta, timezone
 from supabase import create_client, Client
 import logging
 from dotenv import load_dotenv
+from odds_snapshot import OddsSnapshot, TEAM_MARKETS
+from research_memo import STATMUSE as STATMUSE_MEMO, memoized, statmuse_ok
 
 # Load environment variables
 load_dotenv()
@@ -76,7 +78,7 @@ class EnhancedInsightsGenerator:
             logger.info("📊 Fetching upcoming games with odds...")
             
             query = self.supabase.table('sports_events').select(
-                'id, home_team, away_team, start_time, sport, league, sport_key, metadata, status'
+                'id, home_team, away_team, start_time, sport, league, sport_key, status'
             )
 
             if target_date_obj:
@@ -96,39 +98,36 @@ class EnhancedInsightsGenerator:
                 logger.warning("No upcoming games found")
                 return []
             
+            # Moneyline/spread/total rows from sports_event_odds instead of every game's metadata blob
+            odds = OddsSnapshot.load(self.supabase, [game['id'] for game in result.data], TEAM_MARKETS)
+            
             games_with_odds = []
             self.active_sports = set()
             for game in result.data:
-                # Check if game has odds data from TheOdds API
-                bookmakers = []
+                game_id = game['id']
+                bookmakers = odds.bookmakers(game_id)
                 sample_odds = {}
-                if (game.get('metadata') and 
-                    isinstance(game.get('metadata'), dict) and
-                    game['metadata'].get('full_data') and 
-                    isinstance(game['metadata']['full_data'], dict) and
-                    game['metadata']['full_data'].get('bookmakers')):
-                    bookmakers = game['metadata']['full_data']['bookmakers'] or []
-                    if bookmakers:
-                        primary_book = bookmakers[0] or {}
-                        markets = primary_book.get('markets') or []
-                        for market in markets:
-                            key = market.get('key')
-                            outcomes = market.get('outcomes') or []
-                            if key == 'h2h':
-                                sample_odds['moneyline'] = {
-                                    'home': next((o.get('price') for o in outcomes if o.get('name') == game.get('home_team')), None),
-                                    'away': next((o.get('price') for o in outcomes if o.get('name') == game.get('away_team')), None)
-                                }
-                            elif key == 'spreads':
-                                sample_odds['spread'] = {
-                                    'home': next((f"{o.get('point')}" for o in outcomes if o.get('name') == game.get('home_team')), None),
-                                    'away': next((f"{o.get('point')}" for o in outcomes if o.get('name') == game.get('away_team')), None)
-                                }
-                            elif key == 'totals':
-                                sample_odds['total'] = {
-                                    'over': next((f"O{o.get('point')}" for o in outcomes if o.get('name') == 'Over'), None),
-                                    'under': next((f"U{o.get('point')}" for o in outcomes if o.get('name') == 'Under'), None)
-                                }
+                primary_book = odds.pick_bookmaker(game_id)
+                if primary_book:
+                    if odds.rows(game_id, 'h2h', primary_book):
+                        sample_odds['moneyline'] = {
+                            'home': odds.price_of(game_id, 'h2h', 'home', primary_book),
+                            'away': odds.price_of(game_id, 'h2h', 'away', primary_book)
+                        }
+                    if odds.rows(game_id, 'spreads', primary_book):
+                        home_point = odds.point_of(game_id, 'spreads', 'home', primary_book)
+                        away_point = odds.point_of(game_id, 'spreads', 'away', primary_book)
+                        sample_odds['spread'] = {
+                            'home': f"{home_point:g}" if home_point is not None else None,
+                            'away': f"{away_point:g}" if away_point is not None else None
+                        }
+                    if odds.rows(game_id, 'totals', primary_book):
+                        over_point = odds.point_of(game_id, 'totals', 'over', primary_book)
+                        under_point = odds.point_of(game_id, 'totals', 'under', primary_book)
+                        sample_odds['total'] = {
+                            'over': f"O{over_point:g}" if over_point is not None else None,
+                            'under': f"U{under_point:g}" if under_point is not None else None
+                        }
 
                 sport_name = game.get('sport') or 'Unknown'
                 self.active_sports.add(sport_name)
@@ -247,22 +246,27 @@ Do NOT produce betting picks. This is a research plan only."""
             logger.error(f"Error calling Professor Lock: {e}")
             return None
 
-    def query_statmuse(self, query):
-        """Query StatMuse API for specific baseball statistics"""
+    def query_statmuse(self, query, sport):
+        """Query StatMuse API for specific statistics of one sport (MLB, WNBA, NFL, CFB, ...)"""
         try:
-            logger.info(f"📊 Querying StatMuse: {query[:50]}...")
+            logger.info(f"📊 Querying StatMuse ({sport}): {query[:50]}...")
             
             url = f"{self.statmuse_url}/query"
-            payload = {"query": query}
-            
-            response = requests.post(url, json=payload, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get('response', 'No data found')
-            else:
-                logger.warning(f"StatMuse query failed: {response.status_code}")
+            payload = {"query": query, "sport": sport}
+            
+            def fetch():
+                response = requests.post(url, json=payload, timeout=30)
+                if response.status_code != 200:
+                    logger.warning(f"StatMuse query failed: {response.status_code}")
+                    return None
+                return response.json()
+            
+            # Shared research memo first: the pick agents may have asked this today
+            result = memoized(STATMUSE_MEMO, query, fetch, sport=sport, pipeline="enhanced_insights",
+                              source="statmuse", accept=statmuse_ok)
+            if result is None:
                 return None
+            return result.get('response', 'No data found')
                 
         except Exception as e:
             logger.error(f"StatMuse query error: {e}")
@@ -565,7 +569,8 @@ Make these insights shine with proper presentation!"""
                 "You are generating StatMuse-style queries to support a research plan across these sports: "
                 f"{', '.join(active_short)}.\n"
                 "Given the plan below, output a pure JSON array of up to "
-                f"{max_queries} queries (strings only). Focus on quantitative, directly queryable facts.\n\n"
+                f"{max_queries} objects like {{\"query\": \"...\", \"sport\": \"MLB\"}}, "
+                "with sport one of the sports above. Focus on quantitative, directly queryable facts.\n\n"
                 f"PLAN:\n{research_plan}\n\nJSON only:"
             )
 
@@ -589,11 +594,17 @@ Make these insights shine with proper presentation!"""
             except Exception as der_e:
                 logger.warning(f"Query derivation error: {der_e}")
 
+            # StatMuse answers per sport; a bare string query is only usable with a single active sport
+            only_sport = active_short[0] if len(active_short) == 1 else None
             statmuse_results = []
-            for query in (queries or [])[:max_queries]:
-                if not isinstance(query, str):
+            for item in (queries or [])[:max_queries]:
+                if isinstance(item, dict):
+                    query, sport = item.get('query'), item.get('sport')
+                else:
+                    query, sport = item, only_sport
+                if not isinstance(query, str) or not query or not sport:
                     continue
-                result = self.query_statmuse(query)
+                result = self.query_statmuse(query, str(sport).upper())
                 if result:
                     statmuse_results.append(f"Q: {query}\nA: {result}\n")
 
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Game Slate
+Single-query fetch of a day's sports_events across several sports.
+
+Shared by the DatabaseClient of props_enhanced.py and teams_enhanced.py. All requested
+sports are fetched with one `.in_("sport", sports)` select, filtered on the precomputed
+`local_game_date` column (US Eastern date, see
+apps/backend/src/scripts/migrations/add_local_game_date.sql). Rows that predate the
+column (local_game_date NULL) are matched by a padded UTC start_time window and then
+assigned a local date with zoneinfo, so DST is handled correctly.
+
+Results are cached per process for a short TTL keyed by (date, sport set), so the
+several DatabaseClient lookups of one agent run cost a single round trip.
+
+SlateIndex is built once per run over those games and resolves a prop's sport by
+event_id / team id (team_registry) / team alias in O(1), counting which fallback tier
+resolved each prop.
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from collections import Counter
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from team_registry import TeamRegistry, get_team_registry
+
+logger = logging.getLogger(__name__)
+
+GAME_COLUMNS = "id, home_team, away_team, start_time, sport, metadata, local_game_date"
+LOCAL_TIMEZONE = ZoneInfo(os.getenv("GAMES_LOCAL_TIMEZONE", "America/New_York"))
+SLATE_CACHE_TTL = float(os.getenv("GAMES_CACHE_TTL_SECONDS", "120"))
+
+_cache: Dict[Tuple[date, FrozenSet[str]], Tuple[float, List[Dict[str, Any]]]] = {}
+_cache_lock = threading.Lock()
+
+
+def local_game_date(start_time: str) -> date:
+    """Local (LOCAL_TIMEZONE) calendar date of a UTC start_time string"""
+    game_utc = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+    if game_utc.tzinfo is None:
+        game_utc = game_utc.replace(tzinfo=timezone.utc)
+    return game_utc.astimezone(LOCAL_TIMEZONE).date()
+
+
+def utc_window(target_date: date) -> Tuple[str, str]:
+    """UTC [start, end] ISO bounds of target_date's local day"""
+    start_local = datetime.combine(target_date, dt_time.min, tzinfo=LOCAL_TIMEZONE)
+    end_local = datetime.combine(target_date + timedelta(days=1), dt_time.min, tzinfo=LOCAL_TIMEZONE)
+    return (
+        start_local.astimezone(timezone.utc).isoformat(),
+        (end_local - timedelta(seconds=1)).astimezone(timezone.utc).isoformat(),
+    )
+
+
+def _query_games(supabase, target_date: date, sports: List[str]) -> List[Dict[str, Any]]:
+    start_iso, end_iso = utc_window(target_date)
+    response = supabase.table("sports_events").select(GAME_COLUMNS).in_("sport", sports).or_(
+        f"local_game_date.eq.{target_date.isoformat()},"
+        f"and(local_game_date.is.null,start_time.gte.{start_iso},start_time.lte.{end_iso})"
+    ).order("start_time").execute()
+
+    games = []
+    for game in response.data or []:
+        if game.get('local_game_date') is None and local_game_date(game['start_time']) != target_date:
+            continue
+        games.append(game)
+    return games
+
+
+def get_games_for_local_date(supabase, target_date: date, sports: List[str],
+                             use_cache: bool = True) -> List[Dict[str, Any]]:
+    """All games of `sports` on target_date's local day, ordered by start_time"""
+    key = (target_date, frozenset(sports))
+    if use_cache and SLATE_CACHE_TTL > 0:
+        with _cache_lock:
+            cached = _cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            logger.info(f"📦 Slate cache hit: {len(cached[1])} games for {target_date}")
+            return [dict(game) for game in cached[1]]
+
+    games = _query_games(supabase, target_date, sports)
+
+    counts: Dict[str, int] = {}
+    for game in games:
+        counts[game['sport']] = counts.get(game['sport'], 0) + 1
+    for sport in sports:
+        logger.info(f"Found {counts.get(sport, 0)} {sport} games for local date {target_date}")
+
+    if SLATE_CACHE_TTL > 0:
+        with _cache_lock:
+            _cache[key] = (time.monotonic() + SLATE_CACHE_TTL, games)
+    return [dict(game) for game in games]
+
+
+def clear_slate_cache(target_date: Optional[date] = None):
+    """Drop cached slates (all, or only those for target_date)"""
+    with _cache_lock:
+        if target_date is None:
+            _cache.clear()
+        else:
+            for key in [key for key in _cache if key[0] == target_date]:
+                del _cache[key]
+
+
+# sports_events.sport -> prop sport key
+SPORT_KEYS = {
+    "Women's National Basketball Association": "WNBA",
+    "Major League Baseball": "MLB",
+    "National Football League": "NFL",
+    "College Football": "CFB",
+    "Ultimate Fighting Championship": "MMA",
+}
+
+# Last-resort sport inference from a bare team abbreviation/nickname (first list wins)
+TEAM_ABBREVIATIONS = [
+    ("NFL", ['cin', 'buf', 'tb', 'mia', 'ind', 'hou', 'jax', 'ari', 'car', 'gb', 'ne',
+             'det', 'no', 'sea', 'bal', 'den', 'cle', 'ten', 'lar', 'nyj', 'atl', 'sf',
+             'lac', 'lv', 'dal', 'kc', 'nyg', 'phi', 'pit', 'was', 'chi', 'min']),
+    ("CFB", ['duke', 'illinois', 'indiana', 'kennesaw', 'iowa', 'penn', 'pitt', 'smu',
+             'baylor', 'syracuse', 'uconn', 'texas', 'clemson', 'oregon', 'alabama']),
+    ("MLB", ['hou', 'mia', 'bos', 'nyy', 'nym', 'lad', 'sf', 'phi', 'atl', 'det', 'min',
+             'pit', 'cle', 'bal', 'wsh', 'oak', 'kc', 'tex', 'tb', 'tor', 'cws',
+             'chc', 'mil', 'stl', 'cin', 'col', 'ari', 'sd', 'sea', 'laa']),
+    ("WNBA", ['liberty', 'wings', 'storm', 'aces', 'mystics', 'sun', 'fever',
+              'sky', 'dream', 'lynx', 'mercury', 'sparks']),
+]
+ABBREVIATION_SPORTS: Dict[str, str] = {}
+for _sport, _teams in TEAM_ABBREVIATIONS:
+    for _team in _teams:
+        ABBREVIATION_SPORTS.setdefault(_team, _sport)
+
+# Resolution tiers counted by SlateIndex.tier_counts
+TIER_EVENT_ID = "event_id"
+TIER_TEAM_ID = "team_id"
+TIER_TEAM_ALIAS = "team_alias"
+TIER_TEAM_SUBSTRING = "team_substring"
+TIER_ABBREVIATION = "abbreviation"
+TIER_UNRESOLVED = "unresolved"
+
+
+def _significant_words(name: str) -> List[str]:
+    return [word for word in name.split() if len(word) > 3]
+
+
+class SlateIndex:
+    """
+    Hash index over one run's games for resolving a prop's sport.
+
+    Resolution order (the agents' original linear scans, plus a registry tier that only
+    applies where those scans find nothing, so every prop they resolved resolves the same):
+    1. event_id -> game
+    2. first game whose home/away team matches the prop's team: exact name or shared
+       significant word (alias index), or substring either way
+    3. team abbreviation/nickname tables
+    4. first game whose home/away team id (team_registry) is one the prop's team name,
+       nickname or abbreviation resolves to
+    Team results are memoized per distinct team string, so each is resolved once per run.
+    """
+
+    def __init__(self, games: List[Dict[str, Any]], registry: Optional[TeamRegistry] = None):
+        self.games = games
+        self.registry = registry or get_team_registry()
+        self.events: Dict[str, Dict[str, Any]] = {}
+        # registry team id -> position of its first game
+        self.team_ids: Dict[str, int] = {}
+        # normalized team name / significant word -> positions of candidate games
+        self.aliases: Dict[str, List[int]] = {}
+        self._teams: List[Tuple[str, str]] = []
+        for position, game in enumerate(games):
+            self.events.setdefault(str(game.get('id')), game)
+            home_team = (game.get('home_team') or '').lower()
+            away_team = (game.get('away_team') or '').lower()
+            self._teams.append((home_team, away_team))
+            sport = SPORT_KEYS.get(game.get('sport'))
+            for team in (game.get('home_team'), game.get('away_team')):
+                team_id = self.registry.resolve(team, sport) if sport else None
+                if team_id:
+                    self.team_ids.setdefault(team_id, position)
+            for alias in {home_team, away_team, *_significant_words(home_team), *_significant_words(away_team)}:
+                positions = self.aliases.setdefault(alias, [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+        self._team_games: Dict[str, Tuple[Optional[int], str]] = {}
+        self._team_id_games: Dict[str, Optional[int]] = {}
+        self.tier_counts: Counter = Counter()
+
+    def game_for_event(self, event_id: Any) -> Optional[Dict[str, Any]]:
+        return self.events.get(str(event_id))
+
+    def _game_for_team(self, prop_team: str) -> Tuple[Optional[int], str]:
+        cached = self._team_games.get(prop_team)
+        if cached is not None:
+            return cached
+
+        # Earliest game reachable through the alias index (exact name or shared word)
+        best = len(self.games)
+        for alias in {prop_team, *_significant_words(prop_team)}:
+            positions = self.aliases.get(alias)
+            if positions and positions[0] < best:
+                best = positions[0]
+        result: Tuple[Optional[int], str] = (best, TIER_TEAM_ALIAS) if best < len(self.games) else (None, TIER_UNRESOLVED)
+
+        # An earlier game may still match by substring; only games before `best` need checking
+        for position in range(best):
+            home_team, away_team = self._teams[position]
+            if prop_team in home_team or home_team in prop_team or prop_team in away_team or away_team in prop_team:
+                result = (position, TIER_TEAM_SUBSTRING)
+                break
+
+        self._team_games[prop_team] = result
+        return result
+
+    def _game_for_team_id(self, prop_team: str) -> Optional[int]:
+        if prop_team not in self._team_id_games:
+            positions = [self.team_ids[team_id] for team_id in self.registry.candidates(prop_team)
+                         if team_id in self.team_ids]
+            self._team_id_games[prop_team] = min(positions) if positions else None
+        return self._team_id_games[prop_team]
+
+    def resolve_sport(self, event_id: Any, team: Optional[str]) -> Tuple[str, str]:
+        """(sport key, tier) for a prop"""
+        game = self.events.get(str(event_id))
+        if game is not None:
+            return SPORT_KEYS.get(game.get('sport', 'Unknown'), "Unknown"), TIER_EVENT_ID
+
+        prop_team = (team or "").lower()
+        position, tier = self._game_for_team(prop_team)
+        if position is not None:
+            # Team-matched games of an unmapped sport have always defaulted to MLB
+            return SPORT_KEYS.get(self.games[position].get('sport', 'Unknown'), "MLB"), tier
+
+        sport = ABBREVIATION_SPORTS.get(prop_team)
+        if sport:
+            return sport, TIER_ABBREVIATION
+
+        # Only names every legacy tier misses go through the registry
+        position = self._game_for_team_id(prop_team)
+        if position is not None:
+            return SPORT_KEYS.get(self.games[position].get('sport', 'Unknown'), "MLB"), TIER_TEAM_ID
+        return "Unknown", TIER_UNRESOLVED
+
+    def prop_sport(self, event_id: Any, team: Optional[str]) -> str:
+        sport, tier = self.resolve_sport(event_id, team)
+        self.tier_counts[tier] += 1
+        return sport
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+HTTP Fetch
+Host-aware async HTTP layer for the ingestion and backfill scripts.
+
+One background asyncio loop per process owns a pooled keep-alive httpx client. Every
+request goes through its host's budget from config/http_hosts.json: a token bucket
+(rate / burst), a concurrency limit and a retry policy. 429 and 5xx responses are
+retried after Retry-After (or exponential backoff), and a 429 pauses the whole host,
+so concurrent requests back off together instead of each hitting the limit. Per-host
+counters (requests, retries, throttles, bytes, latency, req/s) are logged by
+log_stats().
+
+Scripts migrate one function at a time through the synchronous adapters:
+
+- get(url, params, headers) is a drop-in for requests.get (returns an httpx.Response)
+- get_json(url, ...) returns the decoded body, or None after logging the failure
+- get_json_many([url | (url, params), ...]) fetches a batch concurrently, each host
+  at its configured rate, replacing a `for url: requests.get(url); time.sleep(x)` loop
+- request(method, ...) / request_many(method, [...]) for other verbs (e.g. HEAD probes)
+
+Async code can await HttpFetcher.get / get_json / gather_json directly on the fetch
+loop (get_fetcher().run(coro)).
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from research_executor import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOSTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'http_hosts.json')
+MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '50'))
+MAX_RETRY_AFTER = float(os.getenv('HTTP_MAX_RETRY_AFTER', '120'))
+MAX_BACKOFF = 30.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+Request = Union[str, Tuple[str, Optional[Dict[str, Any]]]]
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    rate: float = 4.0  # requests per second
+    burst: float = 4
+    concurrency: int = 4
+    timeout: float = 15.0
+    retries: int = 3
+
+
+def load_host_policies(path: str = DEFAULT_HOSTS_PATH) -> Tuple[HostPolicy, Dict[str, HostPolicy]]:
+    """(default policy, host suffix -> policy); host entries inherit unset fields from default"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Could not load HTTP host budgets from {path}: {e}")
+        return HostPolicy(), {}
+    default = HostPolicy(**data.get('default', {}))
+    hosts = {
+        host.lower().lstrip('.'): HostPolicy(**{**data.get('default', {}), **settings})
+        for host, settings in data.get('hosts', {}).items()
+    }
+    return default, hosts
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP date), capped at MAX_RETRY_AFTER"""
+    value = response.headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(MAX_RETRY_AFTER, max(0.0, seconds))
+
+
+class HostStats:
+    """Counters for one host (only touched on the fetch loop)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.ok = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttled = 0
+        self.bytes = 0
+        self.latencies: List[float] = []
+        self.first_started: Optional[float] = None
+        self.last_finished: Optional[float] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        elapsed = (self.last_finished - self.first_started) if self.first_started and self.last_finished else 0.0
+        return {
+            'requests': self.requests,
+            'ok': self.ok,
+            'errors': self.errors,
+            'retries': self.retries,
+            'throttled': self.throttled,
+            'bytes': self.bytes,
+            'requests_per_second': round(self.requests / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000) if latencies else 0,
+            'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000) if latencies else 0,
+        }
+
+
+class _HostLimit:
+    """Concurrency limit + token bucket + shared 429 pause for one host"""
+
+    def __init__(self, policy: HostPolicy):
+        self.policy = policy
+        self.semaphore = asyncio.Semaphore(policy.concurrency)
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.resume_at = 0.0
+
+    async def acquire(self):
+        await self.semaphore.acquire()
+        pause = self.resume_at - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+        await self.bucket.acquire()
+
+    def release(self):
+        self.semaphore.release()
+
+
+class HttpFetcher:
+    """Background event loop + pooled async HTTP client with per-host budgets"""
+
+    def __init__(self, config_path: str = DEFAULT_HOSTS_PATH, headers: Optional[Dict[str, str]] = None,
+                 max_connections: Optional[int] = None):
+        self.default_policy, self.policies = load_host_policies(config_path)
+        self.headers = headers or {}
+        self.max_connections = max_connections or MAX_CONNECTIONS
+        self.stats: Dict[str, HostStats] = {}
+        self._limits: Dict[str, _HostLimit] = {}
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name='http-fetch-loop', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=60,
+            ),
+        )
+        self._ready.set()
+        self._loop.run_forever()
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the fetch loop from synchronous code"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def policy_for(self, host: str) -> Tuple[str, HostPolicy]:
+        """(budget key, policy): the longest configured suffix of host, else the host itself
+        with the default policy. Subdomains of one configured suffix share its budget."""
+        host = host.lower()
+        best_key, best = host, self.default_policy
+        for suffix, policy in self.policies.items():
+            if (host == suffix or host.endswith('.' + suffix)) and (best_key == host or len(suffix) > len(best_key)):
+                best_key, best = suffix, policy
+        return best_key, best
+
+    def _host(self, host: str) -> Tuple[str, _HostLimit, HostStats]:
+        key, policy = self.policy_for(host)
+        if key not in self._limits:
+            self._limits[key] = _HostLimit(policy)
+            self.stats[key] = HostStats()
+        return key, self._limits[key], self.stats[key]
+
+    async def request(self, method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                      headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                      **kwargs) -> httpx.Response:
+        """Send a request within its host's budget, retrying 429/5xx and network errors.
+
+        Returns the last response (check status_code as with requests); raises the last
+        httpx error if every attempt failed without a response.
+        """
+        host, limit, stats = self._host(urlsplit(url).hostname or '')
+        policy = limit.policy
+        for attempt in range(policy.retries + 1):
+            await limit.acquire()
+            started = time.monotonic()
+            stats.first_started = stats.first_started or started
+            stats.requests += 1
+            try:
+                response = await self._client.request(method, url, params=params, headers=headers,
+                                                       timeout=timeout or policy.timeout, **kwargs)
+            except httpx.HTTPError as e:
+                stats.errors += 1
+                if attempt == policy.retries:
+                    logger.error(f"❌ {method} {url} failed after {attempt + 1} attempts: {e}")
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"⚠️ {host} request failed ({e}), retrying in {delay:.1f}s")
+            else:
+                stats.latencies.append(time.monotonic() - started)
+                stats.bytes += len(response.content)
+                if response.status_code not in RETRY_STATUSES or attempt == policy.retries:
+                    if response.status_code < 400:
+                        stats.ok += 1
+                    else:
+                        stats.errors += 1
+                    return response
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                if response.status_code == 429:
+                    stats.throttled += 1
+                    limit.resume_at = max(limit.resume_at, time.monotonic() + delay)
+                logger.warning(f"⏳ {host} returned {response.status_code}, retrying in {delay:.1f}s")
+            finally:
+                stats.last_finished = time.monotonic()
+                limit.release()
+            stats.retries += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        return min(MAX_BACKOFF, 0.5 * 2 ** attempt) + random.uniform(0, 0.25)
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+        return await self.request('GET', url, params=params, headers=headers, timeout=timeout)
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None,
+                       headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> Optional[Any]:
+        """Decoded JSON body of a 2xx response, else None (logged)"""
+        try:
+            response = await self.get(url, params=params, headers=headers, timeout=timeout)
+        except httpx.HTTPError:
+            return None
+        if response.status_code >= 400:
+            logger.error(f"❌ GET {url} returned {response.status_code}: {response.text[:200]}")
+            return None
+        try:
+            return response.json()
+        except ValueError as e:
+            logger.error(f"❌ GET {url} returned invalid JSON: {e}")
+            return None
+
+    async def gather(self, method: str, requests: Sequence[Request], headers: Optional[Dict[str, str]] = None,
+                     timeout: Optional[float] = None) -> List[Optional[httpx.Response]]:
+        """request() for every url or (url, params), concurrently; None where every attempt failed"""
+        async def send(item: Request) -> Optional[httpx.Response]:
+            url, params = (item, None) if isinstance(item, str) else item
+            try:
+                return await self.request(method, url, params=params, headers=headers, timeout=timeout)
+            except httpx.HTTPError:
+                return None
+        return await asyncio.gather(*(send(item) for item in requests))
+
+    async def gather_json(self, requests: Sequence[Request], headers: Optional[Dict[str, str]] = None,
+                          timeout: Optional[float] = None) -> List[Optional[Any]]:
+        """get_json for every url or (url, params), concurrently; results in input order"""
+        calls = []
+        for item in requests:
+            url, params = (item, None) if isinstance(item, str) else item
+            calls.append(self.get_json(url, params=params, headers=headers, timeout=timeout))
+        return await asyncio.gather(*calls)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {host: stats.snapshot() for host, stats in self.stats.items()}
+
+    def log_stats(self):
+        for host, snapshot in sorted(self.get_stats().items()):
+            logger.info(
+                f"🌐 {host}: {snapshot['requests']} requests ({snapshot['requests_per_second']}/s), "
+                f"{snapshot['ok']} ok, {snapshot['errors']} errors, {snapshot['retries']} retries, "
+                f"{snapshot['throttled']} throttled, p50 {snapshot['p50_ms']}ms, p95 {snapshot['p95_ms']}ms, "
+                f"{snapshot['bytes'] / 1_000_000:.1f}MB"
+            )
+
+
+_fetcher: Optional[HttpFetcher] = None
+_fetcher_pid: Optional[int] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> HttpFetcher:
+    """Process-wide fetcher (config from HTTP_HOSTS_CONFIG or config/http_hosts.json)"""
+    global _fetcher, _fetcher_pid
+    with _fetcher_lock:
+        # A forked worker (job_runner) has no fetch-loop thread, so it gets its own fetcher
+        if _fetcher is None or _fetcher_pid != os.getpid():
+            _fetcher = HttpFetcher(os.getenv('HTTP_HOSTS_CONFIG', DEFAULT_HOSTS_PATH))
+            _fetcher_pid = os.getpid()
+        return _fetcher
+
+
+def get(url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None) -> httpx.Response:
+    """Synchronous GET within the host's budget (drop-in for requests.get)"""
+    fetcher = get_fetcher()
+    return fetcher.run(fetcher.get(url, params=params, headers=headers, timeout=timeout))
+
+
+def request(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> httpx.Response:
+    fetcher = get_fetcher()
+    return fetcher.run(fetcher.request(method, url, params=params, headers=headers, timeout=timeout))
+
+
+def request_many(method: str, requests: Sequence[Request], headers: Optional[Dict[str, str]] = None,
+                 timeout: Optional[float] = None) -> List[Optional[httpx.Response]]:
+    """Concurrent request() for a batch; None where every attempt failed"""
+    if not requests:
+        return []
+    fetcher = get_fetcher()
+    return fetcher.run(fetcher.gather(method, requests, headers=headers, timeout=timeout))
+
+
+def get_json(url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+             timeout: Optional[float] = None) -> Optional[Any]:
+    fetcher = get_fetcher()
+    return fetcher.run(fetcher.get_json(url, params=params, headers=headers, timeout=timeout))
+
+
+def get_json_many(requests: Sequence[Request], headers: Optional[Dict[str, str]] = None,
+                  timeout: Optional[float] = None) -> List[Optional[Any]]:
+    """Concurrent get_json for a batch of urls or (url, params); results in input order"""
+    if not requests:
+        return []
+    fetcher = get_fetcher()
+    return fetcher.run(fetcher.gather_json(requests, headers=headers, timeout=timeout))
+
+
+def log_stats():
+    if _fetcher is not None:
+        _fetcher.log_stats()
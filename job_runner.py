@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Job Runner
+Checkpointed, resumable and shardable execution of a long script's work units.
+
+A script declares its work units (players, weeks, games) and a handler for one unit;
+JobRunner does the rest:
+
+- every unit id and its status (pending / done / failed, attempts, last error, the
+  handler's result) is kept in a local SQLite file (JOB_STATE_DB), so a rerun after a
+  crash or redeploy skips the units already done. A container's temp dir is wiped on
+  redeploy, so on Railway point JOB_STATE_DB at a mounted volume (e.g.
+  /data/parleyapp_jobs.sqlite); the default temp-dir file only survives a crash
+- a failing unit is retried with exponential backoff; units that still fail are
+  recorded and retried on the next run
+- `commit` (e.g. GameStatsWriter.checkpoint) is called every `checkpoint_every` units
+  and units are only marked done after it succeeds, so buffered writes and progress
+  never disagree
+- `shard=(i, N)` runs only the units whose stable id hash falls in shard i (e.g. one
+  container of N); `workers=N` forks N processes that split this run's units, and
+  `collect` (e.g. the stats writer's report) is called at the end of each worker and
+  returned to the parent in JobReport.worker_results
+- progress (done / total, units/s, ETA) is logged every PROGRESS_INTERVAL seconds
+
+Scripts also get cursors (get_cursor / set_cursor) for offset-style progress, and
+add_job_arguments() adds --workers / --shard / --reset-job to an argparse parser.
+"""
+
+import os
+import json
+import time
+import zlib
+import uuid
+import sqlite3
+import logging
+import tempfile
+import multiprocessing
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), 'parleyapp_jobs.sqlite')
+PROGRESS_INTERVAL = float(os.getenv('JOB_PROGRESS_INTERVAL', '30'))
+
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_units (
+    job TEXT NOT NULL,
+    unit_id TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    result TEXT,
+    run_id TEXT,
+    updated_at REAL,
+    PRIMARY KEY (job, unit_id)
+);
+CREATE TABLE IF NOT EXISTS job_cursors (
+    job TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT,
+    updated_at REAL,
+    PRIMARY KEY (job, name)
+);
+"""
+
+
+_warned_paths: set = set()  # temp-dir state files already warned about
+
+
+def shard_of(unit_id: str, count: int) -> int:
+    """Stable shard of a unit id (the same in every process and run)"""
+    return zlib.crc32(unit_id.encode('utf-8')) % count if count > 1 else 0
+
+
+class JobStore:
+    """SQLite file holding unit statuses and cursors; one connection per process"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('JOB_STATE_DB', DEFAULT_DB_PATH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        if (os.path.abspath(self.path).startswith(os.path.abspath(tempfile.gettempdir()) + os.sep)
+                and self.path not in _warned_paths):
+            _warned_paths.add(self.path)
+            logger.warning(f"⚠️ Job state is in a temp dir ({self.path}) and will not survive a redeploy; "
+                           f"set JOB_STATE_DB to a file on a persistent volume to resume after one")
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        # A forked worker must not reuse its parent's connection
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(_SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def register(self, job: str, unit_ids: Sequence[str]):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO job_units (job, unit_id, updated_at) VALUES (?, ?, ?)',
+                [(job, unit_id, now) for unit_id in unit_ids],
+            )
+
+    def unit_ids(self, job: str, status: str) -> set:
+        rows = self.conn.execute('SELECT unit_id FROM job_units WHERE job = ? AND status = ?', (job, status))
+        return {unit_id for (unit_id,) in rows}
+
+    def mark_done(self, job: str, results: Sequence[Tuple[str, Any]], run_id: str):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'UPDATE job_units SET status = ?, result = ?, last_error = NULL, run_id = ?, updated_at = ? '
+                'WHERE job = ? AND unit_id = ?',
+                [(DONE, json.dumps(result, default=str), run_id, now, job, unit_id) for unit_id, result in results],
+            )
+
+    def mark_failed(self, job: str, unit_ids: Sequence[str], error: str, run_id: str):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'UPDATE job_units SET status = ?, attempts = attempts + 1, last_error = ?, run_id = ?, updated_at = ? '
+                'WHERE job = ? AND unit_id = ?',
+                [(FAILED, error[:1000], run_id, now, job, unit_id) for unit_id in unit_ids],
+            )
+
+    def counts(self, job: str) -> Dict[str, int]:
+        rows = self.conn.execute('SELECT status, COUNT(*) FROM job_units WHERE job = ? GROUP BY status', (job,))
+        return dict(rows.fetchall())
+
+    def run_totals(self, job: str, run_id: str) -> Tuple[int, int, float]:
+        """(done, failed, sum of numeric results) of one run"""
+        done, failed, total = 0, 0, 0.0
+        rows = self.conn.execute('SELECT status, result FROM job_units WHERE job = ? AND run_id = ?', (job, run_id))
+        for status, result in rows:
+            if status == FAILED:
+                failed += 1
+                continue
+            done += 1
+            value = json.loads(result) if result else None
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                total += value
+        return done, failed, total
+
+    def get_cursor(self, job: str, name: str, default: Any = None) -> Any:
+        row = self.conn.execute('SELECT value FROM job_cursors WHERE job = ? AND name = ?', (job, name)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_cursor(self, job: str, name: str, value: Any):
+        with self.conn:
+            self.conn.execute(
+                'INSERT INTO job_cursors (job, name, value, updated_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (job, name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at',
+                (job, name, json.dumps(value, default=str), time.time()),
+            )
+
+    def take_cursor(self, job: str, name: str, default: Any = None) -> Any:
+        """Cursor value, deleted once read"""
+        value = self.get_cursor(job, name, default)
+        with self.conn:
+            self.conn.execute('DELETE FROM job_cursors WHERE job = ? AND name = ?', (job, name))
+        return value
+
+    def reset(self, job: str):
+        with self.conn:
+            self.conn.execute('DELETE FROM job_units WHERE job = ?', (job,))
+            self.conn.execute('DELETE FROM job_cursors WHERE job = ?', (job,))
+
+
+@dataclass
+class JobReport:
+    job: str
+    total: int = 0  # units declared
+    skipped: int = 0  # already done in an earlier run
+    done: int = 0
+    failed: int = 0
+    result_total: float = 0  # sum of the handler's numeric return values
+    seconds: float = 0.0
+    worker_results: List[Any] = field(default_factory=list)  # `collect` of each forked worker
+
+    def summary(self) -> str:
+        return (f"{self.job}: {self.done} units done, {self.failed} failed, {self.skipped} already done "
+                f"of {self.total} in {self.seconds:.0f}s (results: {self.result_total:g})")
+
+
+class JobRunner:
+    """Run a handler over work units with checkpoints, retries, sharding and progress"""
+
+    def __init__(self, job: str, handler: Callable[[Any], Any], key: Callable[[Any], Any] = str,
+                 workers: int = 1, shard: Optional[Tuple[int, int]] = None, retries: int = 2,
+                 backoff: float = 2.0, commit: Optional[Callable[[], Any]] = None, checkpoint_every: int = 1,
+                 store: Optional[JobStore] = None, reset: bool = False, collect: Optional[Callable[[], Any]] = None):
+        self.job = job
+        self.handler = handler
+        self.key = key
+        self.workers = max(1, workers)
+        self.shard = shard
+        self.retries = retries
+        self.backoff = backoff
+        self.commit = commit
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.store = store or JobStore()
+        self.reset = reset
+        self.collect = collect  # JSON-serializable result of a forked worker's own state
+
+    def get_cursor(self, name: str, default: Any = None) -> Any:
+        return self.store.get_cursor(self.job, name, default)
+
+    def set_cursor(self, name: str, value: Any):
+        self.store.set_cursor(self.job, name, value)
+
+    def progress(self) -> Dict[str, int]:
+        """Unit counts by status across every shard"""
+        return self.store.counts(self.job)
+
+    def run(self, units: Iterable[Any]) -> JobReport:
+        """Process every unit not already done; returns this run's totals"""
+        started = time.monotonic()
+        if self.reset:
+            self.store.reset(self.job)
+        keyed = {str(self.key(unit)): unit for unit in units}
+        self.store.register(self.job, list(keyed))
+        finished = self.store.unit_ids(self.job, DONE)
+        todo = [(unit_id, unit) for unit_id, unit in keyed.items() if unit_id not in finished]
+
+        report = JobReport(job=self.job, total=len(keyed))
+        run_id = uuid.uuid4().hex
+        if self.shard:
+            index, count = self.shard
+            mine = {unit_id for unit_id in keyed if shard_of(unit_id, count) == index}
+            report.total = len(mine)
+            todo = [(unit_id, unit) for unit_id, unit in todo if unit_id in mine]
+        report.skipped = report.total - len(todo)
+        logger.info(f"🗂️ Job {self.job}: {report.total} units, {report.skipped} already done, {len(todo)} to run"
+                    + (f" (shard {self.shard[0]}/{self.shard[1]})" if self.shard else ""))
+
+        if self.workers > 1 and len(todo) > 1:
+            report.worker_results = self._run_workers(todo, run_id)
+        else:
+            self._run_units(todo, run_id, label=self.job)
+
+        report.done, report.failed, report.result_total = self.store.run_totals(self.job, run_id)
+        report.seconds = time.monotonic() - started
+        logger.info(f"🏁 {report.summary()}")
+        return report
+
+    def _run_workers(self, todo: List[Tuple[str, Any]], run_id: str) -> List[Any]:
+        """Fork the workers; returns the `collect` results of those that finished"""
+        if self.commit is not None:
+            self.commit()  # workers inherit this process's buffers, so hand them empty ones
+        context = multiprocessing.get_context('fork')
+        processes = []
+        for index in range(self.workers):
+            shard = todo[index::self.workers]
+            if not shard:
+                continue
+            process = context.Process(target=self._run_worker, args=(shard, run_id, index),
+                                      name=f"{self.job}-worker-{index}")
+            process.start()
+            processes.append((index, process))
+        results = []
+        for index, process in processes:
+            process.join()
+            if process.exitcode:
+                logger.error(f"❌ {process.name} exited with code {process.exitcode}")
+            if self.collect is not None:
+                result = self.store.take_cursor(self.job, f"worker_result:{run_id}:{index}")
+                if result is not None:
+                    results.append(result)
+        return results
+
+    def _run_worker(self, todo: List[Tuple[str, Any]], run_id: str, index: int):
+        self._run_units(todo, run_id, label=f"{self.job}[{index}]")
+        if self.collect is not None:
+            self.store.set_cursor(self.job, f"worker_result:{run_id}:{index}", self.collect())
+
+    def _run_units(self, todo: List[Tuple[str, Any]], run_id: str, label: str):
+        pending: List[Tuple[str, Any]] = []
+        started = last_report = time.monotonic()
+        for position, (unit_id, unit) in enumerate(todo, 1):
+            for attempt in range(self.retries + 1):
+                try:
+                    pending.append((unit_id, self.handler(unit)))
+                    break
+                except Exception as e:
+                    if attempt == self.retries:
+                        logger.error(f"❌ {label}: unit {unit_id} failed after {attempt + 1} attempts: {e}")
+                        self.store.mark_failed(self.job, [unit_id], str(e), run_id)
+                        break
+                    delay = self.backoff * 2 ** attempt
+                    logger.warning(f"⚠️ {label}: unit {unit_id} failed ({e}), retrying in {delay:.0f}s")
+                    time.sleep(delay)
+
+            if len(pending) >= self.checkpoint_every:
+                self._checkpoint(pending, run_id)
+                pending = []
+            now = time.monotonic()
+            if now - last_report >= PROGRESS_INTERVAL or position == len(todo):
+                last_report = now
+                rate = position / (now - started) if now > started else 0.0
+                eta = (len(todo) - position) / rate if rate else 0.0
+                logger.info(f"📈 {label}: {position}/{len(todo)} units ({rate:.2f}/s, ETA {eta / 60:.1f} min)")
+        self._checkpoint(pending, run_id)
+
+    def _checkpoint(self, pending: List[Tuple[str, Any]], run_id: str):
+        """Commit buffered work, then record its units as done (or failed if the commit fails)"""
+        try:
+            if self.commit is not None:
+                self.commit()
+        except Exception as e:
+            logger.error(f"❌ Checkpoint of {len(pending)} units failed: {e}")
+            self.store.mark_failed(self.job, [unit_id for unit_id, _ in pending], f"commit failed: {e}", run_id)
+            return
+        if pending:
+            self.store.mark_done(self.job, pending, run_id)
+
+
+def add_job_arguments(parser):
+    """--workers, --shard i/N and --reset-job for scripts that run through JobRunner"""
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (units are sharded across them)')
+    parser.add_argument('--shard', default=None, help='Run only shard i of N, as "i/N" (e.g. one per container)')
+    parser.add_argument('--reset-job', action='store_true', help='Forget saved progress and start from scratch')
+    return parser
+
+
+def job_options(args) -> Dict[str, Any]:
+    """JobRunner keyword arguments from add_job_arguments() options"""
+    shard = None
+    if getattr(args, 'shard', None):
+        index, count = (int(part) for part in args.shard.split('/'))
+        shard = (index, count)
+    return {'workers': getattr(args, 'workers', 1), 'shard': shard, 'reset': getattr(args, 'reset_job', False)}
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+LLM Gateway
+Shared Grok (xAI, OpenAI-compatible) call layer for the pick agents.
+
+- one AsyncOpenAI client and one concurrency budget (LLM_MAX_CONCURRENCY) per process
+- retries with exponential backoff + jitter on 408/409/429/5xx and connection errors
+  (LLM_MAX_RETRIES); the SDK's own retries are disabled so there is one policy
+- prompt/completion tokens, latency, retries and cache hits tracked per stage
+- stream_chat() yields completion text as it is generated (pick generation parses
+  picks from the stream, see pick_stream.py)
+- content-hashed response cache (SQLite, LLM_CACHE_DB) for deterministic stages
+  (research planning, pick distribution): the hash covers model, messages and
+  sampling parameters, so a rerun of the same slate skips calls already answered
+- LLM_BASE_URL points the gateway at another endpoint, e.g. scripts/llm_stub_server.py
+  for offline benchmarking
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.x.ai/v1"
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "llm_cache.sqlite3")
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    cache_hits: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_seconds: float = 0.0
+    retries: int = 0
+    errors: int = 0
+    first_token_seconds: float = 0.0
+
+
+class ResponseCache:
+    """SQLite store of completion text by prompt hash (WAL, one connection per thread)"""
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, stage TEXT, model TEXT, "
+            "response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            row = self._conn().execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ LLM cache read failed: {e}")
+            return None
+        if row is None or row[1] + self.ttl < time.time():
+            return None
+        return row[0]
+
+    def set(self, key: str, stage: str, model: str, response: str):
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO llm_cache (key, stage, model, response, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, stage, model, response, time.time()),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ LLM cache write failed: {e}")
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS or error.status_code >= 500
+    return False
+
+
+def prompt_hash(model: str, messages: List[Dict[str, Any]], params: Dict[str, Any]) -> str:
+    payload = json.dumps({"model": model, "messages": messages, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMGateway:
+    """chat() = cache lookup -> bounded, retried completion -> token/latency accounting"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_concurrency: Optional[int] = None, max_retries: Optional[int] = None,
+                 cache_path: Optional[str] = None, timeout: Optional[float] = None):
+        self.base_url = base_url or os.getenv("LLM_BASE_URL", DEFAULT_BASE_URL)
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv("XAI_API_KEY") or "stub",
+            base_url=self.base_url,
+            max_retries=0,
+            timeout=timeout or float(os.getenv("LLM_TIMEOUT_SECONDS", "600")),
+        )
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", "3"))
+        self.backoff_base = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1.0"))
+        self.backoff_max = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+        self.cache = ResponseCache(cache_path or os.getenv("LLM_CACHE_DB", DEFAULT_CACHE_PATH),
+                                   ttl=float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")))
+        self.stats: Dict[str, StageStats] = {}
+        self._semaphore_loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        if self.base_url != DEFAULT_BASE_URL:
+            logger.info(f"🔌 LLM gateway pointed at {self.base_url}")
+
+    def _limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore_loop is not loop:
+            self._semaphore_loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def chat(self, prompt: str, *, stage: str, model: str, temperature: float,
+                   max_tokens: Optional[int] = None, cache: bool = False, **params: Any) -> str:
+        """Completion text for a single user prompt.
+
+        cache=True serves an identical earlier call (same model, prompt and parameters)
+        from the response cache; use it only for stages whose output may be reused.
+        """
+        messages = [{"role": "user", "content": prompt}]
+        params = {"temperature": temperature, **params}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        stats = self.stats.setdefault(stage, StageStats())
+
+        key = prompt_hash(model, messages, params) if cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                stats.cache_hits += 1
+                logger.info(f"🧠 LLM cache hit for {stage} ({model})")
+                return cached
+
+        async with self._limit():
+            started = time.monotonic()
+            response = await self._create(stage, stats, model=model, messages=messages, **params)
+
+        latency = time.monotonic() - started
+        stats.calls += 1
+        stats.latency_seconds += latency
+        self._record_usage(stage, stats, getattr(response, "usage", None), latency)
+
+        text = response.choices[0].message.content or ""
+        if key and text:
+            self.cache.set(key, stage, model, text)
+        return text
+
+    async def stream_chat(self, prompt: str, *, stage: str, model: str, temperature: float,
+                          max_tokens: Optional[int] = None, **params: Any) -> AsyncIterator[str]:
+        """Completion text for a single user prompt, yielded as it is generated.
+
+        Retries only cover opening the stream; a failure mid-stream propagates.
+        """
+        messages = [{"role": "user", "content": prompt}]
+        params = {"temperature": temperature, **params}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        stats = self.stats.setdefault(stage, StageStats())
+
+        async with self._limit():
+            started = time.monotonic()
+            stream = await self._create(stage, stats, model=model, messages=messages, stream=True,
+                                        stream_options={"include_usage": True}, **params)
+            first_token = None
+            usage = None
+            async for chunk in stream:
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if first_token is None:
+                        first_token = time.monotonic() - started
+                        stats.first_token_seconds += first_token
+                        logger.info(f"⚡ LLM {stage}: first token after {first_token:.1f}s")
+                    yield delta
+
+        latency = time.monotonic() - started
+        stats.calls += 1
+        stats.latency_seconds += latency
+        self._record_usage(stage, stats, usage, latency)
+
+    async def _create(self, stage: str, stats: StageStats, **request: Any):
+        """chat.completions.create with backoff + jitter on retryable errors"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self.client.chat.completions.create(**request)
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    stats.errors += 1
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+                stats.retries += 1
+                logger.warning(f"⚠️ LLM {stage} call failed ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _record_usage(stage: str, stats: StageStats, usage: Any, latency: float):
+        if usage is None:
+            return
+        stats.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+        stats.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+        logger.info(f"🤖 LLM {stage}: {latency:.1f}s, {usage.prompt_tokens} prompt + {usage.completion_tokens} completion tokens")
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {stage: asdict(stats) for stage, stats in self.stats.items()}
+
+    def log_summary(self):
+        for stage, stats in self.stats.items():
+            logger.info(
+                f"📈 LLM {stage}: {stats.calls} calls, {stats.cache_hits} cache hits, "
+                f"{stats.prompt_tokens}+{stats.completion_tokens} tokens, {stats.latency_seconds:.1f}s, "
+                f"{stats.retries} retries, {stats.errors} errors"
+            )
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide gateway, so every agent shares one client, budget and cache"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -11,6 +11,7 @@ import json
 import logging
 import asyncio
 import argparse
+import time
 from datetime import datetime
 from typing import List, Dict, Any
 from dotenv import load_dotenv
@@ -18,14 +19,18 @@ from dotenv import load_dotenv
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import our AI agents
+# Import our AI agents (props.py/teams.py, else the enhanced agents)
 try:
     from props import IntelligentPlayerPropsAgent
     from teams import IntelligentTeamBettingAgent
-except ImportError as e:
-    print(f"❌ Failed to import agents: {e}")
-    print("Make sure props.py and teams.py are in the same directory")
-    sys.exit(1)
+except ImportError:
+    try:
+        from props_enhanced import IntelligentPlayerPropsAgent
+        from teams_enhanced import IntelligentTeamsAgent as IntelligentTeamBettingAgent
+    except ImportError as e:
+        print(f"❌ Failed to import agents: {e}")
+        print("Make sure props.py and teams.py (or props_enhanced.py and teams_enhanced.py) are in the same directory")
+        sys.exit(1)
 
 # Load environment variables
 load_dotenv('backend/.env')
@@ -57,14 +62,54 @@ class UnifiedSportsBettingOrchestrator:
             logger.info("✅ Team Betting Agent initialized")
         except Exception as e:
             logger.error(f"❌ Failed to initialize Team Betting Agent: {e}")
+        
+        self._share_clients()
+    
+    def _share_clients(self):
+        """Put both agents under one StatMuse/web-search concurrency + rate budget and one
+        Supabase client. Each agent keeps its own executor, session and LLM client, so
+        research memo rows and per-agent stats stay labelled by pipeline"""
+        if not (self.props_agent and self.teams_agent):
+            return
+        shared = []
+        props_executor = getattr(self.props_agent, 'research_executor', None)
+        teams_executor = getattr(self.teams_agent, 'research_executor', None)
+        if props_executor is not None and teams_executor is not None:
+            teams_executor.share_limits(props_executor)
+            shared.append('research limits')
+        props_db = getattr(self.props_agent, 'db', None)
+        teams_db = getattr(self.teams_agent, 'db', None)
+        if hasattr(props_db, 'supabase') and hasattr(teams_db, 'supabase'):
+            teams_db.supabase = props_db.supabase
+            if hasattr(teams_db, 'prediction_writer'):
+                teams_db.prediction_writer.supabase = props_db.supabase
+            shared.append('supabase')
+        if shared:
+            logger.info(f"🔗 Agents share: {', '.join(shared)}")
+    
+    async def _run_stage(self, label: str, agent, count: int) -> Dict[str, Any]:
+        """Run one agent; failures are captured so the other agent's picks still count"""
+        started = time.monotonic()
+        stage = {"picks": [], "error": None, "seconds": 0.0}
+        try:
+            logger.info(f"▶️ {label}: generating {count} picks")
+            stage["picks"] = await agent.generate_daily_picks(target_picks=count) or []
+            logger.info(f"✅ Generated {len(stage['picks'])} {label.lower()} picks")
+        except Exception as e:
+            stage["error"] = f"Failed to generate {label.lower()} picks: {e}"
+            logger.error(f"❌ {stage['error']}")
+        stage["seconds"] = round(time.monotonic() - started, 1)
+        logger.info(f"⏱️ {label} finished in {stage['seconds']}s")
+        return stage
     
     async def generate_daily_picks(
         self, 
         props_count: int = 10, 
         teams_count: int = 10,
-        test_mode: bool = False
+        test_mode: bool = False,
+        concurrent: bool = True
     ) -> Dict[str, Any]:
-        """Generate comprehensive daily picks from both agents"""
+        """Generate comprehensive daily picks from both agents (run concurrently by default)"""
         
         logger.info("=" * 80)
         logger.info("🎯 UNIFIED DAILY PICKS GENERATION")
@@ -84,42 +129,39 @@ class UnifiedSportsBettingOrchestrator:
             "errors": []
         }
         
-        # STAGE 1: Generate Player Props Picks
+        # STAGES 1 + 2: Player props and team picks (concurrently unless disabled)
+        stages = []
         if self.props_agent:
-            try:
-                logger.info("🎲 STAGE 1: Generating Player Props Picks")
-                logger.info("-" * 50)
-                props_picks = await self.props_agent.generate_daily_picks(target_picks=props_count)
-                results["props_picks"] = props_picks
-                logger.info(f"✅ Generated {len(props_picks)} player props picks")
-                logger.info("")
-            except Exception as e:
-                error_msg = f"Failed to generate player props picks: {e}"
-                logger.error(f"❌ {error_msg}")
-                results["errors"].append(error_msg)
+            stages.append(("props_picks", "Player Props", self.props_agent, props_count))
         else:
             error_msg = "Player Props Agent not available"
             logger.warning(f"⚠️ {error_msg}")
             results["errors"].append(error_msg)
-        
-        # STAGE 2: Generate Team Betting Picks
         if self.teams_agent:
-            try:
-                logger.info("🏈 STAGE 2: Generating Team Betting Picks")
-                logger.info("-" * 50)
-                team_picks = await self.teams_agent.generate_daily_picks(target_picks=teams_count)
-                results["team_picks"] = team_picks
-                logger.info(f"✅ Generated {len(team_picks)} team betting picks")
-                logger.info("")
-            except Exception as e:
-                error_msg = f"Failed to generate team betting picks: {e}"
-                logger.error(f"❌ {error_msg}")
-                results["errors"].append(error_msg)
+            stages.append(("team_picks", "Team Betting", self.teams_agent, teams_count))
         else:
             error_msg = "Team Betting Agent not available"
             logger.warning(f"⚠️ {error_msg}")
             results["errors"].append(error_msg)
         
+        started = time.monotonic()
+        if concurrent:
+            logger.info(f"⚡ Running {len(stages)} agents concurrently")
+            outcomes = await asyncio.gather(*(self._run_stage(label, agent, count) for _, label, agent, count in stages))
+        else:
+            outcomes = [await self._run_stage(label, agent, count) for _, label, agent, count in stages]
+        
+        results["timings"] = {"concurrent": concurrent}
+        for (key, _, _, _), outcome in zip(stages, outcomes):
+            results[key] = outcome["picks"]
+            results["timings"][key.replace("_picks", "_seconds")] = outcome["seconds"]
+            if outcome["error"]:
+                results["errors"].append(outcome["error"])
+        results["timings"]["total_seconds"] = round(time.monotonic() - started, 1)
+        llm = getattr(self.props_agent, 'llm', None) or getattr(self.teams_agent, 'llm', None)
+        if hasattr(llm, 'get_stats'):
+            results["llm_usage"] = llm.get_stats()
+        
         # STAGE 3: Summary and Results
         total_picks = len(results["props_picks"]) + len(results["team_picks"])
         results["total_picks"] = total_picks
@@ -131,6 +173,7 @@ class UnifiedSportsBettingOrchestrator:
         logger.info(f"🎯 Player Props: {len(results['props_picks'])}/{props_count}")
         logger.info(f"🏈 Team Bets: {len(results['team_picks'])}/{teams_count}")
         logger.info(f"📈 Total Generated: {total_picks}/{props_count + teams_count}")
+        logger.info(f"⏱️ Timings: {results['timings']}")
         
         if results["errors"]:
             logger.info(f"⚠️ Errors: {len(results['errors'])}")
@@ -233,6 +276,8 @@ async def main():
                        help='Run in test mode (may not save to database)')
     parser.add_argument('--summary', action='store_true',
                        help='Display detailed picks summary')
+    parser.add_argument('--sequential', action='store_true',
+                       help='In both mode, run the props agent to completion before the teams agent')
     
     args = parser.parse_args()
     
@@ -251,7 +296,8 @@ async def main():
             results = await orchestrator.generate_daily_picks(
                 props_count=args.props_count,
                 teams_count=args.teams_count,
-                test_mode=args.test
+                test_mode=args.test,
+                concurrent=not args.sequential
             )
             
             if args.summary:
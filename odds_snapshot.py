@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Odds Snapshot
+Columnar, indexed odds for a set of games, loaded from the normalized odds table.
+
+sports_events.metadata.full_data.bookmakers holds the raw TheOdds JSON of every game.
+apps/backend/src/scripts/migrations/add_sports_event_odds.sql explodes it once, on
+write, into sports_event_odds (event, bookmaker, market, side, point, price,
+fetched_at). OddsSnapshot.load selects only the markets a caller needs from that
+table and keeps them like PropColumns: typed `array` columns plus an interned string
+pool, with a dict index so a (event, market, side, bookmaker) lookup is O(1).
+
+Until the migration is applied, load falls back to selecting the metadata and
+exploding it in Python with the same rules as the SQL trigger.
+"""
+
+import os
+import math
+import logging
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+ODDS_TABLE = "sports_event_odds"
+ODDS_COLUMNS = "event_id, bookmaker, market, side, point, price, fetched_at"
+TEAM_MARKETS = ("h2h", "spreads", "totals")
+PREFERRED_BOOKMAKERS = tuple(
+    book.strip() for book in os.getenv("ODDS_PREFERRED_BOOKMAKERS", "fanduel,draftkings,bovada,betmgm").split(",")
+    if book.strip()
+)
+LOAD_CHUNK_SIZE = int(os.getenv("ODDS_LOAD_CHUNK_SIZE", "200"))  # event ids per select
+# Rows per request; PostgREST caps a response at max-rows (1000 by default)
+LOAD_PAGE_SIZE = int(os.getenv("ODDS_LOAD_PAGE_SIZE", "1000"))
+ODDS_KEY = ("event_id", "market", "bookmaker", "side")
+
+
+def outcome_side(name: str, home_team: Optional[str], away_team: Optional[str]) -> str:
+    """'home' / 'away' for an outcome naming one of the teams, else the lower-cased name"""
+    if name == home_team:
+        return "home"
+    if name == away_team:
+        return "away"
+    return name.lower()
+
+
+def explode_bookmakers(event_id: str, home_team: Optional[str], away_team: Optional[str],
+                       metadata: Any, markets: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """sports_event_odds rows of one game's metadata (Python twin of explode_event_odds)"""
+    bookmakers = ((metadata or {}).get("full_data") or {}).get("bookmakers") if isinstance(metadata, dict) else None
+    if not isinstance(bookmakers, list):
+        return []
+    rows: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    for bookmaker in bookmakers:
+        book = (bookmaker or {}).get("key")
+        if not book:
+            continue
+        for market in bookmaker.get("markets") or []:
+            market_key = market.get("key")
+            if not market_key or (markets and market_key not in markets):
+                continue
+            for outcome in market.get("outcomes") or []:
+                name, price = outcome.get("name"), outcome.get("price")
+                if not name or price is None:
+                    continue
+                side = outcome_side(name, home_team, away_team)
+                # First outcome per (book, market, side) in document order wins, like the
+                # trigger's DISTINCT ON ordered by ordinality
+                rows.setdefault((book, market_key, side), {
+                    "event_id": str(event_id),
+                    "bookmaker": book,
+                    "market": market_key,
+                    "side": side,
+                    "point": outcome.get("point"),
+                    "price": int(round(float(price))),
+                    "fetched_at": market.get("last_update") or bookmaker.get("last_update"),
+                })
+    return list(rows.values())
+
+
+class OddsSnapshot:
+    """Column arrays of odds rows, indexed by (event, market, side, bookmaker)"""
+
+    def __init__(self):
+        self._strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+        self._rows: Dict[Tuple[int, int, int, int], int] = {}
+        self._market_rows: Dict[Tuple[int, int], List[int]] = {}
+        self._event_books: Dict[int, Dict[int, None]] = {}
+
+        self.event = array('I')
+        self.bookmaker = array('I')
+        self.market = array('I')
+        self.side = array('I')
+        self.point = array('d')  # NaN when the market has no point
+        self.price = array('i')
+        self.fetched_at = array('I')
+
+    @classmethod
+    def load(cls, supabase, event_ids: Iterable[str], markets: Sequence[str] = TEAM_MARKETS) -> "OddsSnapshot":
+        """Odds of `markets` for the given sports_events ids"""
+        event_ids = list(dict.fromkeys(str(event_id) for event_id in event_ids))
+        snapshot = cls()
+        try:
+            for start in range(0, len(event_ids), LOAD_CHUNK_SIZE):
+                snapshot.extend(cls._select_chunk(supabase, event_ids[start:start + LOAD_CHUNK_SIZE], markets))
+        except Exception as e:
+            if ODDS_TABLE not in str(e):
+                raise
+            logger.warning(f"⚠️ {ODDS_TABLE} not available, exploding sports_events.metadata instead: {e}")
+            return cls.from_events(supabase, event_ids, markets)
+        logger.info(f"📈 Loaded {len(snapshot)} odds rows ({', '.join(markets) or 'all markets'}) "
+                    f"for {len(event_ids)} games")
+        return snapshot
+
+    @staticmethod
+    def _select_chunk(supabase, event_ids: List[str], markets: Sequence[str]) -> List[Dict[str, Any]]:
+        """Every odds row of a chunk of events, fetched in primary-key ordered pages"""
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            query = supabase.table(ODDS_TABLE).select(ODDS_COLUMNS).in_("event_id", event_ids)
+            if markets:
+                query = query.in_("market", list(markets))
+            for column in ODDS_KEY:
+                query = query.order(column)
+            page = query.range(start, start + LOAD_PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < LOAD_PAGE_SIZE:
+                break
+            start += LOAD_PAGE_SIZE
+        return rows
+
+    @classmethod
+    def from_events(cls, supabase, event_ids: List[str], markets: Sequence[str] = TEAM_MARKETS) -> "OddsSnapshot":
+        """Pre-migration path: select the metadata blobs and explode them here"""
+        snapshot = cls()
+        for start in range(0, len(event_ids), LOAD_CHUNK_SIZE):
+            response = supabase.table("sports_events").select("id, home_team, away_team, metadata").in_(
+                "id", event_ids[start:start + LOAD_CHUNK_SIZE]).execute()
+            for game in response.data or []:
+                snapshot.extend(explode_bookmakers(game["id"], game.get("home_team"), game.get("away_team"),
+                                                   game.get("metadata"), markets))
+        return snapshot
+
+    def _intern(self, value: str) -> int:
+        index = self._string_index.get(value)
+        if index is None:
+            index = len(self._strings)
+            self._strings.append(value)
+            self._string_index[value] = index
+        return index
+
+    def string_id(self, value: Optional[str]) -> Optional[int]:
+        """Pool index of a string, or None if no loaded row uses it"""
+        return None if value is None else self._string_index.get(str(value))
+
+    def append(self, event_id: str, bookmaker: str, market: str, side: str, point: Optional[float],
+               price: int, fetched_at: Optional[str] = None):
+        event = self._intern(str(event_id))
+        book = self._intern(bookmaker)
+        market_index = self._intern(market)
+        side_index = self._intern(side)
+        key = (event, market_index, side_index, book)
+        if key in self._rows:
+            return
+        row = len(self.price)
+        self._rows[key] = row
+        self._market_rows.setdefault((event, market_index), []).append(row)
+        self._event_books.setdefault(event, {})[book] = None
+
+        self.event.append(event)
+        self.bookmaker.append(book)
+        self.market.append(market_index)
+        self.side.append(side_index)
+        self.point.append(math.nan if point is None else float(point))
+        self.price.append(int(price))
+        self.fetched_at.append(self._intern(fetched_at or ""))
+
+    def extend(self, rows: Iterable[Dict[str, Any]]):
+        for row in rows:
+            self.append(row["event_id"], row["bookmaker"], row["market"], row["side"], row.get("point"),
+                        row["price"], row.get("fetched_at"))
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def string(self, index: int) -> str:
+        return self._strings[index]
+
+    def pool_size(self) -> int:
+        return len(self._strings)
+
+    def find(self, event_id: str, market: str, side: str, bookmaker: str) -> Optional[int]:
+        """Row of one quote, or None"""
+        key = (self.string_id(event_id), self.string_id(market), self.string_id(side), self.string_id(bookmaker))
+        return None if None in key else self._rows.get(key)
+
+    def price_of(self, event_id: str, market: str, side: str, bookmaker: str) -> Optional[int]:
+        row = self.find(event_id, market, side, bookmaker)
+        return None if row is None else self.price[row]
+
+    def point_of(self, event_id: str, market: str, side: str, bookmaker: str) -> Optional[float]:
+        row = self.find(event_id, market, side, bookmaker)
+        return None if row is None else self.point_value(row)
+
+    def point_value(self, row: int) -> Optional[float]:
+        point = self.point[row]
+        return None if math.isnan(point) else point
+
+    def rows(self, event_id: str, market: str, bookmaker: Optional[str] = None) -> List[int]:
+        """Rows of one market of a game, optionally for a single bookmaker"""
+        event, market_index = self.string_id(event_id), self.string_id(market)
+        rows = self._market_rows.get((event, market_index), [])
+        if bookmaker is None:
+            return list(rows)
+        book = self.string_id(bookmaker)
+        return [row for row in rows if self.bookmaker[row] == book]
+
+    def bookmakers(self, event_id: str) -> List[str]:
+        """Bookmakers quoting a game, in load order"""
+        return [self._strings[book] for book in self._event_books.get(self.string_id(event_id), {})]
+
+    def pick_bookmaker(self, event_id: str, preferred: Sequence[str] = PREFERRED_BOOKMAKERS) -> Optional[str]:
+        """First preferred bookmaker quoting the game, else the first one loaded"""
+        books = self.bookmakers(event_id)
+        for book in preferred:
+            if book in books:
+                return book
+        return books[0] if books else None
+
+    def record(self, row: int) -> Dict[str, Any]:
+        return {
+            "event_id": self._strings[self.event[row]],
+            "bookmaker": self._strings[self.bookmaker[row]],
+            "market": self._strings[self.market[row]],
+            "side": self._strings[self.side[row]],
+            "point": self.point_value(row),
+            "price": self.price[row],
+            "fetched_at": self._strings[self.fetched_at[row]] or None,
+        }
+
+    def nbytes(self) -> int:
+        """Approximate size of the column arrays (excluding the string pool)"""
+        columns = (self.event, self.bookmaker, self.market, self.side, self.point, self.price, self.fetched_at)
+        return sum(column.itemsize * len(column) for column in columns)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Pick Stream
+Incremental, tolerant parser for the JSON pick arrays the agents ask Grok for.
+
+PickStreamParser is fed the completion as it streams (llm_gateway.stream_chat) and
+returns each pick object as soon as its closing brace arrives, so matching and
+validation run while the model is still writing the rest of the array. It tracks
+string/escape state and bracket depth character by character, so markdown fences and
+prose around the array are skipped and a brace inside a string never ends a pick.
+
+Objects that are not valid JSON go through one linear repair pass (loads_tolerant):
+trailing commas, missing commas, Python literals, bare keys/values, single quotes,
+"+110" odds and raw newlines inside strings. A pick cut off by max_tokens is closed at
+its last complete field by finish(). This replaces the regex-and-retry repair chains,
+whose cost grew with every failed json.loads attempt.
+"""
+
+import os
+import re
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Stream pick completions (llm_gateway.stream_chat); false waits for the full response
+PICKS_STREAMING = os.getenv("PICKS_STREAMING", "true").lower() == "true"
+
+_NUMBER = re.compile(r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?%?')
+_BARE_VALUE_END = set(',}]:"\n')
+_LITERALS = {"None": "null", "True": "true", "False": "false", "null": "null", "true": "true", "false": "false"}
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _repair(text: str) -> str:
+    """Single pass over text that rewrites the JSON mistakes LLMs commonly make"""
+    out: List[str] = []
+    i, n = 0, len(text)
+    value_ended = False  # last token was a complete value -> next value needs a comma
+
+    def next_significant(j: int) -> str:
+        while j < n and text[j].isspace():
+            j += 1
+        return text[j] if j < n else ""
+
+    while i < n:
+        c = text[i]
+        if c.isspace():
+            i += 1
+            continue
+        if c in '"\'':
+            if value_ended:
+                out.append(",")
+            quote, i = c, i + 1
+            chars = ['"']
+            while i < n and text[i] != quote:
+                ch = text[i]
+                if ch == "\\" and i + 1 < n:
+                    chars.append(text[i:i + 2] if text[i + 1] != "'" else "'")
+                    i += 2
+                    continue
+                chars.append(_STRING_ESCAPES.get(ch, '\\"' if ch == '"' else ch))
+                i += 1
+            chars.append('"')
+            out.append("".join(chars))
+            i += 1
+            value_ended = True
+        elif c in "{[":
+            if value_ended:
+                out.append(",")
+            out.append(c)
+            i += 1
+            value_ended = False
+        elif c in "}]":
+            if out and out[-1] == ",":
+                out.pop()  # trailing comma
+            out.append(c)
+            i += 1
+            value_ended = True
+        elif c == ",":
+            if out and out[-1] not in ",[{":
+                out.append(",")
+            i += 1
+            value_ended = False
+        elif c == ":":
+            out.append(":")
+            i += 1
+            value_ended = False
+        else:
+            if value_ended:
+                out.append(",")
+            match = _NUMBER.match(text, i)
+            if match and not match.group().endswith("%") and not next_significant(match.end()).isalpha():
+                out.append(match.group().lstrip("+"))
+                i = match.end()
+            else:
+                j = i
+                while j < n and text[j] not in _BARE_VALUE_END:
+                    j += 1
+                word = text[i:j].strip()
+                if j < n and text[j] == ":":
+                    out.append(json.dumps(word))  # bare key
+                else:
+                    out.append(_LITERALS.get(word) or json.dumps(word))
+                i = j
+            value_ended = True
+    return "".join(out)
+
+
+def loads_tolerant(text: str) -> Any:
+    """json.loads, falling back to one repair pass; raises ValueError if both fail"""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return json.loads(_repair(text))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"unrepairable JSON: {e}") from e
+
+
+class PickStreamParser:
+    """Feed completion text in chunks; get back each complete pick object once"""
+
+    def __init__(self, required_fields: Sequence[str] = ()):
+        self.required_fields = tuple(required_fields)
+        self._chunks: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._buffer: Optional[List[str]] = None
+        self._capture_depth = 0
+        self._cut_points: List[int] = []  # buffer lengths at the object's own top-level commas
+        self.parsed = 0
+        self.repaired = 0
+        self.rejected = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._chunks.append(chunk)
+        picks: List[Dict[str, Any]] = []
+        for c in chunk:
+            buffer = self._buffer
+            if buffer is not None:
+                buffer.append(c)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                continue
+            if c == '"':
+                # Quotes in prose around the JSON don't open strings
+                self._in_string = bool(self._stack)
+            elif c == "{":
+                if buffer is None and (not self._stack or self._stack == ["["]):
+                    self._buffer = ["{"]
+                    self._capture_depth = len(self._stack)
+                    self._cut_points = []
+                self._stack.append(c)
+            elif c == "[":
+                self._stack.append(c)
+            elif c in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if buffer is not None and c == "}" and len(self._stack) == self._capture_depth:
+                    picks.extend(self._emit("".join(buffer)))
+                    self._buffer = None
+            elif c == "," and buffer is not None and len(self._stack) == self._capture_depth + 1:
+                self._cut_points.append(len(buffer) - 1)
+        return picks
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Recover the pick that was still open when the stream ended (e.g. max_tokens)"""
+        if self._buffer is None:
+            return []
+        partial = "".join(self._buffer)
+        closers = "".join(_CLOSERS[opener] for opener in reversed(self._stack[self._capture_depth:]))
+        candidates = [partial + ('"' if self._in_string else "") + closers]
+        if self._cut_points:
+            candidates.append(partial[:self._cut_points[-1]] + "}")
+        self._buffer = None
+        for candidate in candidates:
+            picks = self._emit(candidate, quiet=True)
+            if picks:
+                logger.info("🔧 Recovered truncated pick at end of stream")
+                return picks
+        self.rejected += 1
+        return []
+
+    def _emit(self, text: str, quiet: bool = False) -> List[Dict[str, Any]]:
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                value = json.loads(_repair(text))
+            except json.JSONDecodeError as e:
+                if not quiet:
+                    self.rejected += 1
+                    logger.warning(f"⚠️ Skipping unparseable pick object ({e}): {text[:120]}...")
+                return []
+            self.repaired += 1
+
+        # {"picks": [...]} style wrappers arrive as one object
+        if isinstance(value, dict) and not self._valid(value):
+            nested = next((v for v in value.values() if isinstance(v, list) and v and isinstance(v[0], dict)), None)
+            if nested is not None:
+                value = nested
+        values = value if isinstance(value, list) else [value]
+
+        picks = []
+        for pick in values:
+            if isinstance(pick, dict) and self._valid(pick):
+                picks.append(pick)
+            elif not quiet:
+                self.rejected += 1
+                missing = [f for f in self.required_fields if not isinstance(pick, dict) or f not in pick]
+                logger.warning(f"⚠️ Pick missing required fields {missing}, skipping")
+        self.parsed += len(picks)
+        return picks
+
+    def _valid(self, pick: Dict[str, Any]) -> bool:
+        return all(field in pick for field in self.required_fields)
+
+    def summary(self) -> str:
+        return f"{self.parsed} picks parsed ({self.repaired} repaired, {self.rejected} rejected)"
+
+
+def parse_picks(text: str, required_fields: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    """Every pick object in a complete response"""
+    parser = PickStreamParser(required_fields)
+    picks = parser.feed(text)
+    picks.extend(parser.finish())
+    return picks
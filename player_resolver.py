@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Player Resolver
+In-memory player identity resolution for ingestion scripts and headshot matching.
+
+All `players` rows of a sport are loaded once (paged) and indexed by external id,
+normalized name and a blocking key of (last-name prefix, team id). A name is resolved by
+external id, then exact normalized name, then fuzzy matching inside its block only:
+Jaro-Winkler on the full name, confirmed by trigram overlap so prefix-heavy near
+misses ("Mike Trout" / "Mike Trost") are not merged. Team names go through
+team_registry, so "NYY", "Yankees" and "New York Yankees" share a block.
+
+Unknown players are created in bulk: resolve_many() upserts every new player of a
+batch (e.g. one box score or one day of stats) in a single request on player_key and
+indexes the returned rows, so a season of box scores costs one paged load plus one
+write per batch that introduces new players, instead of one or two selects per row.
+"""
+
+import re
+import logging
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from team_registry import TeamRegistry, get_team_registry, normalize_team
+
+logger = logging.getLogger(__name__)
+
+PLAYER_COLUMNS = "id, name, team, sport, position, external_player_id"
+PLAYERS_PAGE_SIZE = 1000
+CREATE_CHUNK_SIZE = 500
+JARO_WINKLER_MIN = 0.92
+TRIGRAM_MIN = 0.5
+BLOCK_PREFIX = 4  # last-name characters in the blocking key; tolerates typos past them
+
+_DROPPED = re.compile(r"['’.`]")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+
+# Resolution tiers counted by PlayerResolver.tier_counts
+TIER_EXTERNAL_ID = "external_id"
+TIER_EXACT = "exact_name"
+TIER_FUZZY = "fuzzy_block"
+TIER_CREATED = "created"
+TIER_UNRESOLVED = "unresolved"
+
+
+def normalize_player(name: Optional[str]) -> str:
+    """ASCII lowercase name without punctuation or suffixes ("A.J. Brown Jr." -> "aj brown")"""
+    text = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode("ascii").lower()
+    words = [word for word in _NON_ALNUM.sub(" ", _DROPPED.sub("", text)).split() if word not in _SUFFIXES]
+    # Spaced initials read as one word: "a j brown" -> "aj brown"
+    merged: List[str] = []
+    initials = ""
+    for word in words:
+        if len(word) == 1:
+            initials += word
+            continue
+        if initials:
+            merged.append(initials)
+            initials = ""
+        merged.append(word)
+    if initials:
+        merged.append(initials)
+    return " ".join(merged)
+
+
+def jaro_winkler(first: str, second: str, prefix_scale: float = 0.1) -> float:
+    if first == second:
+        return 1.0
+    len1, len2 = len(first), len(second)
+    if not len1 or not len2:
+        return 0.0
+    window = max(len1, len2) // 2 - 1
+    matched1 = [False] * len1
+    matched2 = [False] * len2
+    matches = 0
+    for i, char in enumerate(first):
+        for j in range(max(0, i - window), min(len2, i + window + 1)):
+            if not matched2[j] and second[j] == char:
+                matched1[i] = matched2[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+    transpositions, j = 0, 0
+    for i in range(len1):
+        if matched1[i]:
+            while not matched2[j]:
+                j += 1
+            if first[i] != second[j]:
+                transpositions += 1
+            j += 1
+    jaro = (matches / len1 + matches / len2 + (matches - transpositions / 2) / matches) / 3
+    prefix = 0
+    for char1, char2 in zip(first[:4], second[:4]):
+        if char1 != char2:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def trigrams(text: str) -> frozenset:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def trigram_similarity(first: str, second: str) -> float:
+    a, b = trigrams(first), trigrams(second)
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def default_player_key(name: str, team: str, sport: str) -> str:
+    return f"{sport.lower()}_{name.lower().replace(' ', '_')}_{(team or '').lower().replace(' ', '_')}"
+
+
+class PlayerResolver:
+    """players rows of one sport, indexed for O(1) lookups with block-local fuzzy matching"""
+
+    def __init__(self, sport: str, rows: Iterable[Dict[str, Any]] = (), supabase=None,
+                 registry: Optional[TeamRegistry] = None):
+        self.sport = sport
+        self.supabase = supabase
+        self.registry = registry or get_team_registry(supabase)
+        self.tier_counts: Counter = Counter()
+        self.created = 0
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._by_external: Dict[str, str] = {}
+        self._by_name: Dict[str, List[str]] = {}
+        self._blocks: Dict[Tuple[str, str], List[str]] = {}
+        self._by_last: Dict[str, List[str]] = {}
+        self._normalized: Dict[str, str] = {}
+        for row in rows:
+            self.add(row)
+
+    @classmethod
+    def load(cls, supabase, sport: str, active_only: bool = False, columns: str = PLAYER_COLUMNS,
+             registry: Optional[TeamRegistry] = None) -> "PlayerResolver":
+        """Every players row of sport, fetched in pages"""
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            query = supabase.table("players").select(columns).eq("sport", sport)
+            if active_only:
+                query = query.eq("active", True)
+            page = query.range(start, start + PLAYERS_PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < PLAYERS_PAGE_SIZE:
+                break
+            start += PLAYERS_PAGE_SIZE
+        resolver = cls(sport, rows, supabase=supabase, registry=registry)
+        logger.info(f"👥 Loaded {len(rows)} {sport} players into the resolver")
+        return resolver
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _team_key(self, team: Optional[str]) -> str:
+        return self.registry.resolve(team, self.sport) or normalize_team(team) if team else ""
+
+    def add(self, row: Dict[str, Any], external_ids: Sequence[Any] = ()):
+        player_id = str(row["id"])
+        name = normalize_player(row.get("name") or row.get("player_name"))
+        self._rows[player_id] = row
+        self._normalized[player_id] = name
+        for external_id in (row.get("external_player_id"), row.get("espn_player_id"), *external_ids):
+            if external_id not in (None, ""):
+                self._by_external[str(external_id)] = player_id
+        if not name:
+            return
+        self._by_name.setdefault(name, []).append(player_id)
+        last = name.split()[-1][:BLOCK_PREFIX]
+        self._by_last.setdefault(last, []).append(player_id)
+        self._blocks.setdefault((last, self._team_key(row.get("team"))), []).append(player_id)
+
+    def discard(self, player_id: str):
+        """Stop matching a player (e.g. once an external id has been assigned to it)"""
+        name = self._normalized.pop(player_id, None)
+        row = self._rows.pop(player_id, None)
+        if not name or row is None:
+            return
+        last = name.split()[-1][:BLOCK_PREFIX]
+        for index, key in ((self._by_name, name), (self._by_last, last),
+                           (self._blocks, (last, self._team_key(row.get("team"))))):
+            ids = index.get(key)
+            if ids and player_id in ids:
+                ids.remove(player_id)
+
+    def match(self, name: Optional[str], team: Optional[str] = None, external_id: Any = None,
+              position: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """players row for a name (and team / external id), or None; position, if given,
+        must equal the row's"""
+        player_id, tier = self._match(name, team, external_id, position)
+        self.tier_counts[tier] += 1
+        return self._rows.get(player_id) if player_id else None
+
+    def resolve(self, name: Optional[str], team: Optional[str] = None, external_id: Any = None) -> Optional[str]:
+        row = self.match(name, team, external_id)
+        return str(row["id"]) if row else None
+
+    def _match(self, name: Optional[str], team: Optional[str], external_id: Any,
+               position: Optional[str]) -> Tuple[Optional[str], str]:
+        def allowed(player_id: str) -> bool:
+            return position is None or self._rows[player_id].get("position") == position
+
+        if external_id not in (None, ""):
+            player_id = self._by_external.get(str(external_id))
+            if player_id and allowed(player_id):
+                return player_id, TIER_EXTERNAL_ID
+
+        key = normalize_player(name)
+        if not key:
+            return None, TIER_UNRESOLVED
+        team_key = self._team_key(team)
+
+        same_name = [player_id for player_id in self._by_name.get(key, []) if allowed(player_id)]
+        if len(same_name) == 1:
+            return same_name[0], TIER_EXACT
+        if same_name:
+            same_team = [player_id for player_id in same_name
+                         if self._team_key(self._rows[player_id].get("team")) == team_key]
+            return (same_team[0], TIER_EXACT) if same_team else (None, TIER_UNRESOLVED)
+
+        last = key.split()[-1][:BLOCK_PREFIX]
+        block = self._blocks.get((last, team_key), []) if team_key else self._by_last.get(last, [])
+        best_id, best, runner_up = None, 0.0, 0.0
+        for player_id in block:
+            if not allowed(player_id):
+                continue
+            candidate = self._normalized[player_id]
+            score = jaro_winkler(key, candidate)
+            if score < JARO_WINKLER_MIN or trigram_similarity(key, candidate) < TRIGRAM_MIN:
+                continue
+            if score > best:
+                best_id, best, runner_up = player_id, score, best
+            elif score > runner_up:
+                runner_up = score
+        if best_id and best > runner_up:
+            return best_id, TIER_FUZZY
+        return None, TIER_UNRESOLVED
+
+    def get_or_create(self, name: str, team: str, position: Optional[str] = None,
+                      external_id: Any = None) -> Optional[str]:
+        return self.resolve_many([{"name": name, "team": team, "position": position, "external_id": external_id}])[0]
+
+    def resolve_many(self, players: Sequence[Dict[str, Any]]) -> List[Optional[str]]:
+        """players.id for each {name, team, position?, external_id?}; every unknown player of
+        the batch is created with one upsert (on player_key)"""
+        ids: List[Optional[str]] = []
+        pending: Dict[str, Dict[str, Any]] = {}
+        pending_keys: List[Optional[str]] = []
+        for player in players:
+            name, team = player.get("name") or "", player.get("team") or ""
+            player_id = self.resolve(name, team, player.get("external_id")) if name else None
+            ids.append(player_id)
+            player_key = None
+            if player_id is None and name and self.supabase is not None:
+                player_key = default_player_key(name, team, self.sport)
+                pending.setdefault(player_key, {
+                    "name": name,
+                    "player_name": name,
+                    "team": team,
+                    "sport": self.sport,
+                    "position": player.get("position"),
+                    "active": True,
+                    "external_player_id": str(player["external_id"]) if player.get("external_id")
+                    else f"{self.sport.lower()}_{name.lower().replace(' ', '_')}",
+                    "player_key": player_key,
+                })
+            pending_keys.append(player_key)
+
+        if pending:
+            created = self._create(list(pending.values()))
+            ids = [player_id or created.get(player_key) for player_id, player_key in zip(ids, pending_keys)]
+        return ids
+
+    def _create(self, records: List[Dict[str, Any]]) -> Dict[str, str]:
+        """player_key -> id of the upserted rows (existing keys keep their id)"""
+        created: Dict[str, str] = {}
+        for start in range(0, len(records), CREATE_CHUNK_SIZE):
+            chunk = records[start:start + CREATE_CHUNK_SIZE]
+            try:
+                rows = self.supabase.table("players").upsert(chunk, on_conflict="player_key").execute().data or []
+            except Exception as e:
+                logger.error(f"Error creating {len(chunk)} {self.sport} players: {e}")
+                continue
+            for row in rows:
+                self.add(row)
+                created[row["player_key"]] = str(row["id"])
+            self.created += len(rows)
+            self.tier_counts[TIER_CREATED] += len(rows)
+            logger.info(f"Created {len(rows)} new {self.sport} players")
+        return created
+
+    def summary(self) -> str:
+        return f"{len(self._rows)} {self.sport} players; resolution tiers {dict(self.tier_counts)}"
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Prediction Writer
+Batched, idempotent writes of AI picks to the ai_predictions table.
+
+Shared by the pick generators (props_enhanced.py, teams_enhanced.py,
+props_intelligent_v3.py, props_enhanced_v2.py). Each generator maps its picks to
+ai_predictions rows; the writer then:
+
+- normalizes every row in one pass: percent strings ("12.5%") to floats, Kelly stake,
+  expected value and risk level filled in when the generator left them out, None
+  values dropped
+- stamps a deterministic `pick_fingerprint` (game date, game, bet type, market, pick
+  text) and upserts in chunks with ignore-duplicates, so re-running a generator never
+  duplicates or overwrites (e.g. an already graded) pick
+- records the save order in `display_order` and staggers `created_at` by the same
+  order, so UI lists sorted by created_at keep the intended order even though a
+  chunk is inserted in one statement
+
+Schema: apps/backend/src/scripts/migrations/add_ai_predictions_fingerprint.sql. Until
+it is applied the writer falls back to plain chunked inserts.
+"""
+
+import os
+import re
+import time
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+AI_USER_ID = "c19a5e12-4297-4b0f-8d21-39d2bb1a2c08"  # Global AI user
+PREDICTIONS_TABLE = "ai_predictions"
+WRITE_BATCH_SIZE = int(os.getenv("AI_PREDICTIONS_BATCH_SIZE", "50"))
+
+# Save order (oldest -> newest); the UI shows newest first, so NFL is saved last and displays first
+SPORT_SAVE_ORDER = ("WNBA", "MLB", "NHL", "CFB", "NFL")
+SPORT_ALIASES = {"College Football": "CFB", "National Football League": "NFL"}
+
+PERCENT_FIELDS = {"roi_estimate": 0.0, "value_percentage": 0.0, "implied_probability": 50.0}
+FINGERPRINT_FIELDS = ("game_id", "bet_type", "prop_market_type", "pick")
+SCHEMA_COLUMNS = ("pick_fingerprint", "display_order")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def parse_percent(value: Any, default: float) -> float:
+    """12.5, "12.5" or "12.5%" -> 12.5; anything unparseable -> default"""
+    if value is None or value == "":
+        return default
+    try:
+        return float(str(value).replace("%", "").strip())
+    except ValueError:
+        return default
+
+
+def kelly_stake(confidence: float) -> float:
+    """Simplified Kelly: (confidence/100 - 0.5) * 10, capped to [0, 10]"""
+    return max(0, min(10, (confidence / 100 - 0.5) * 10))
+
+
+def expected_value(confidence: float) -> float:
+    return (confidence - 50) * 0.2
+
+
+def risk_level_for(confidence: float, odds: Any) -> str:
+    """Fallback risk from confidence AND odds alignment (used when the pick has none)"""
+    try:
+        odds = int(float(str(odds).replace("+", "")))
+    except (TypeError, ValueError):
+        odds = 0
+    if confidence >= 70 and odds <= -110:
+        return "Low"  # Conservative: high confidence + favorite odds
+    if confidence >= 60 and -150 <= odds <= 150:
+        return "Medium"  # Balanced: good confidence + reasonable odds
+    return "High"  # Aggressive: lower confidence or underdog odds
+
+
+def risk_level_from_confidence(confidence: float) -> str:
+    if confidence >= 80:
+        return "Low"
+    if confidence >= 65:
+        return "Medium"
+    return "High"
+
+
+def pick_fingerprint(row: Dict[str, Any], generated_on: Optional[str] = None) -> str:
+    """Stable id of a pick: same game date, game, bet type, market and (whitespace/case-normalized) pick text
+
+    The date is the event's (event_time), else `generated_on` (default: today, UTC), so a
+    pick without a game id only collides with the same pick text of the same day.
+    """
+    game_date = str(row.get("event_time") or "")[:10] or generated_on or datetime.now(timezone.utc).date().isoformat()
+    parts = [game_date] + [_WHITESPACE.sub(" ", str(row.get(name) or "")).strip().lower() for name in FINGERPRINT_FIELDS]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def sport_save_rank(sport: Optional[str], order: Sequence[str] = SPORT_SAVE_ORDER) -> int:
+    sport = SPORT_ALIASES.get(sport, sport)
+    return order.index(sport) if sport in order else len(order)
+
+
+def normalize_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate and fill derived fields for every row in one pass; drops rows without a pick"""
+    normalized = []
+    generated_on = datetime.now(timezone.utc).date().isoformat()
+    for row in rows:
+        if not row.get("pick"):
+            logger.warning(f"⚠️ Skipping prediction without pick text: {row.get('game_id')}")
+            continue
+        row = dict(row)
+        row.setdefault("user_id", AI_USER_ID)
+        row.setdefault("status", "pending")
+        try:
+            confidence = float(row.get("confidence", 75) or 0)
+        except (TypeError, ValueError):
+            confidence = 75.0
+        for name, default in PERCENT_FIELDS.items():
+            row[name] = parse_percent(row.get(name), default)
+        if row.get("kelly_stake") is None:
+            row["kelly_stake"] = kelly_stake(confidence)
+        if row.get("expected_value") is None:
+            row["expected_value"] = expected_value(confidence)
+        if not row.get("risk_level"):
+            row["risk_level"] = risk_level_for(confidence, row.get("odds", 0))
+        row["odds"] = str(row.get("odds", 0))
+        row["pick_fingerprint"] = pick_fingerprint(row, generated_on)
+        normalized.append({k: v for k, v in row.items() if v is not None})
+    return normalized
+
+
+@dataclass
+class WriteReport:
+    attempted: int = 0
+    stored: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    batch_latencies_ms: List[float] = field(default_factory=list)
+
+
+class PredictionWriter:
+    """Chunked upsert of ai_predictions rows keyed on pick_fingerprint"""
+
+    def __init__(self, supabase, batch_size: Optional[int] = None, table: str = PREDICTIONS_TABLE):
+        self.supabase = supabase
+        self.batch_size = batch_size or WRITE_BATCH_SIZE
+        self.table = table
+        self._legacy_schema = False
+
+    def write(self, rows: List[Dict[str, Any]], sport_order: Optional[Sequence[str]] = SPORT_SAVE_ORDER) -> WriteReport:
+        """Normalize, order and store rows. sport_order=None keeps the given order."""
+        rows = normalize_rows(rows)
+        if sport_order is not None:
+            rows.sort(key=lambda row: sport_save_rank(row.get("sport"), sport_order))
+
+        # Explicit save order: display_order plus created_at staggered by 1ms per row
+        saved_at = datetime.now(timezone.utc)
+        for position, row in enumerate(rows):
+            row["display_order"] = position
+            row["created_at"] = (saved_at + timedelta(milliseconds=position)).isoformat()
+
+        report = WriteReport(attempted=len(rows))
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start:start + self.batch_size]
+            started = time.perf_counter()
+            try:
+                stored = self._write_chunk(chunk)
+            except Exception as e:
+                logger.error(f"❌ Failed to store predictions {start + 1}-{start + len(chunk)}: {e}")
+                report.failed += len(chunk)
+                continue
+            latency_ms = (time.perf_counter() - started) * 1000
+            report.batch_latencies_ms.append(latency_ms)
+            report.stored += stored
+            report.duplicates += len(chunk) - stored
+            logger.info(f"💾 Stored batch {start // self.batch_size + 1}: {stored}/{len(chunk)} new predictions in {latency_ms:.0f}ms")
+
+        logger.info(
+            f"Successfully stored {report.stored}/{report.attempted} AI predictions "
+            f"({report.duplicates} already saved, {report.failed} failed)"
+        )
+        return report
+
+    def _write_chunk(self, chunk: List[Dict[str, Any]]) -> int:
+        # A bulk request sends one column list, so rows that dropped different None fields
+        # go in separate requests rather than having the missing columns written as NULL
+        groups: Dict[frozenset, List[Dict[str, Any]]] = {}
+        for row in chunk:
+            groups.setdefault(frozenset(row), []).append(row)
+        return sum(self._write_rows(rows) for rows in groups.values())
+
+    def _write_rows(self, chunk: List[Dict[str, Any]]) -> int:
+        if not self._legacy_schema:
+            try:
+                response = self.supabase.table(self.table).upsert(
+                    chunk, on_conflict="pick_fingerprint", ignore_duplicates=True
+                ).execute()
+                return len(response.data or [])
+            except Exception as e:
+                if not any(column in str(e) for column in SCHEMA_COLUMNS):
+                    raise
+                logger.warning(f"⚠️ ai_predictions has no fingerprint columns yet, using plain inserts: {e}")
+                self._legacy_schema = True
+
+        legacy_chunk = [{k: v for k, v in row.items() if k not in SCHEMA_COLUMNS} for row in chunk]
+        response = self.supabase.table(self.table).insert(legacy_chunk).execute()
+        return len(response.data or [])
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Prop Columns
+Compact columnar storage for a slate of player props (main + alt lines).
+
+A full NFL Sunday / CFB Saturday is tens of thousands of prop lines. Instead of one
+dict and one dataclass per line, PropColumns keeps each field in a typed `array`
+(lines, odds, flags) and stores strings (player, stat, sport, bookmaker, event id) once
+in a shared pool, referenced by index. Filtering and counting run over the columns;
+a dict is only built for the rows that actually go into a prompt or a pick.
+"""
+
+from array import array
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Odds columns are int32; this marks "no price"
+NO_ODDS = -(2 ** 31)
+
+
+def _odds_value(odds: Optional[int]) -> int:
+    return NO_ODDS if odds is None else int(odds)
+
+
+class PropColumns:
+    """Column arrays of prop lines plus an interned string pool"""
+
+    def __init__(self, label_for: Callable[[str], str] = str):
+        self._label_for = label_for
+        self._strings: List[str] = []
+        self._string_index: Dict[str, int] = {}
+        self._labels: Dict[int, str] = {}
+        self._headshots: Dict[int, Optional[str]] = {}
+
+        self.event = array('I')
+        self.sport = array('I')
+        self.player = array('I')
+        self.stat = array('I')
+        self.bookmaker = array('I')
+        self.line = array('d')
+        self.over_odds = array('i')
+        self.under_odds = array('i')
+        self.is_alt = array('b')
+
+    def _intern(self, value: str) -> int:
+        index = self._string_index.get(value)
+        if index is None:
+            index = len(self._strings)
+            self._strings.append(value)
+            self._string_index[value] = index
+        return index
+
+    def append(self, event_id: str, sport: str, player_name: str, headshot_url: Optional[str], stat_key: str,
+               line: float, bookmaker: str, over_odds: Optional[int], under_odds: Optional[int], is_alt: bool):
+        player = self._intern(player_name)
+        if headshot_url or player not in self._headshots:
+            self._headshots[player] = headshot_url
+        self.event.append(self._intern(str(event_id)))
+        self.sport.append(self._intern(sport))
+        self.player.append(player)
+        self.stat.append(self._intern(stat_key))
+        self.bookmaker.append(self._intern(bookmaker))
+        self.line.append(line)
+        self.over_odds.append(_odds_value(over_odds))
+        self.under_odds.append(_odds_value(under_odds))
+        self.is_alt.append(1 if is_alt else 0)
+
+    def __len__(self) -> int:
+        return len(self.line)
+
+    def string(self, index: int) -> str:
+        return self._strings[index]
+
+    def prop_label(self, row: int) -> str:
+        stat = self.stat[row]
+        label = self._labels.get(stat)
+        if label is None:
+            label = self._labels[stat] = self._label_for(self._strings[stat])
+        return label
+
+    def odds(self, row: int, side: str) -> Optional[int]:
+        value = (self.over_odds if side == 'over' else self.under_odds)[row]
+        return None if value == NO_ODDS else value
+
+    def alt_count(self) -> int:
+        return sum(self.is_alt)
+
+    def player_names(self) -> List[str]:
+        """Distinct player names in first-seen order"""
+        seen = dict.fromkeys(self.player)
+        return [self._strings[index] for index in seen]
+
+    def has_odds(self, row: int) -> bool:
+        return self.over_odds[row] != NO_ODDS or self.under_odds[row] != NO_ODDS
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """One prop line as a plain dict (the shape used in prompts and pick matching)"""
+        return {
+            'event_id': self._strings[self.event[row]],
+            'sport': self._strings[self.sport[row]],
+            'player': self._strings[self.player[row]],
+            'prop_type': self.prop_label(row),
+            'stat_key': self._strings[self.stat[row]],
+            'line': self.line[row],
+            'bookmaker': self._strings[self.bookmaker[row]],
+            'over_odds': self.odds(row, 'over'),
+            'under_odds': self.odds(row, 'under'),
+            'is_alt': bool(self.is_alt[row]),
+            'player_headshot_url': self._headshots.get(self.player[row]),
+        }
+
+    def records(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self) if limit is None else min(limit, len(self))):
+            yield self.record(row)
+
+    def nbytes(self) -> int:
+        """Approximate size of the column arrays (excluding the string pool)"""
+        columns = (self.event, self.sport, self.player, self.stat, self.bookmaker,
+                   self.line, self.over_odds, self.under_odds, self.is_alt)
+        return sum(column.itemsize * len(column) for column in columns)
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Prop Settlement
+Set-based lookup of player prop results in the ingested stats tables.
+
+Used by check_bet_results.py. Pending player props are keyed by
+(player_id, game date, stat key) and resolved with a handful of chunked queries:
+
+1. players: one `.in_("name", ...)` lookup for every distinct player name
+2. player_game_stats: rows of those players whose stats->>game_date is one of the
+   props' game dates (raw per-game JSON; a stat missing from the JSON is a miss)
+3. player_recent_stats: same key for whatever is still unresolved
+
+MARKET_STATS maps every prop_market_type label the generators write (display labels,
+odds-API market keys, StatMuse-style labels) to a stat key; STAT_SOURCES says where
+that stat lives in each table. Props with no mapping or no row are returned as misses
+for the caller's StatMuse fallback.
+"""
+
+import re
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from game_slate import local_game_date
+
+logger = logging.getLogger(__name__)
+
+SOURCE_GAME_STATS = "player_game_stats"
+SOURCE_RECENT_STATS = "player_recent_stats"
+QUERY_CHUNK_SIZE = 100
+
+
+@dataclass(frozen=True)
+class StatSource:
+    recent_column: Optional[str]  # player_recent_stats column
+    game_keys: Tuple[str, ...]  # player_game_stats.stats keys, first present wins
+    pitching: bool = False  # MLB game rows carry stats.type = batting | pitching
+    pitching_row_keys: Tuple[str, ...] = ()  # generic keys only trusted on stats.type = pitching rows
+
+
+STAT_SOURCES: Dict[str, StatSource] = {
+    # MLB batters
+    "hits": StatSource("hits", ("hits",)),
+    "home_runs": StatSource("home_runs", ("home_runs",)),
+    "total_bases": StatSource("total_bases", ("total_bases",)),
+    "rbis": StatSource("rbis", ("rbis", "rbi")),
+    "runs": StatSource("runs_scored", ("runs", "runs_scored")),
+    "stolen_bases": StatSource("stolen_bases", ("stolen_bases",)),
+    "batter_strikeouts": StatSource("strikeouts", ("strikeouts",)),
+    "batter_walks": StatSource("walks", ("walks",)),
+    # MLB pitchers
+    "pitcher_strikeouts": StatSource("strikeouts_pitcher", ("strikeouts_pitcher", "pitcher_strikeouts"), True, ("strikeouts",)),
+    "hits_allowed": StatSource("hits_allowed", ("hits_allowed",), True, ("hits",)),
+    "walks_allowed": StatSource("walks_allowed", ("walks_allowed",), True, ("walks",)),
+    "earned_runs": StatSource("earned_runs", ("earned_runs",), True),
+    "outs_recorded": StatSource(None, ("outs_recorded",), True, ("outs",)),
+    # Basketball
+    "points": StatSource("points", ("points",)),
+    "rebounds": StatSource("rebounds", ("rebounds", "total_rebounds")),
+    "assists": StatSource("assists", ("assists",)),
+    "steals": StatSource("steals", ("steals",)),
+    "blocks": StatSource("blocks", ("blocks",)),
+    "threes": StatSource("three_pointers", ("three_pointers_made", "three_pointers")),
+    # Football
+    "passing_yards": StatSource("passing_yards", ("passing_yards",)),
+    "passing_tds": StatSource("passing_tds", ("passing_touchdowns", "passing_tds")),
+    "passing_attempts": StatSource(None, ("passing_attempts", "pass_attempts")),
+    "completions": StatSource(None, ("completions", "passing_completions")),
+    "interceptions": StatSource(None, ("passing_interceptions", "interceptions")),
+    "rushing_yards": StatSource("rushing_yards", ("rushing_yards",)),
+    "rushing_attempts": StatSource(None, ("rushing_attempts",)),
+    "rushing_tds": StatSource("rushing_tds", ("rushing_touchdowns", "rushing_tds")),
+    "receiving_yards": StatSource("receiving_yards", ("receiving_yards",)),
+    "receptions": StatSource("receptions", ("receptions",)),
+    "receiving_tds": StatSource("receiving_tds", ("receiving_touchdowns", "receiving_tds")),
+}
+
+# prop_market_type (normalized: lowercase, alphanumerics, "o/u" dropped) -> stat key
+MARKET_STATS: Dict[str, str] = {}
+for _stat, _aliases in {
+    "hits": ["hits", "batter hits", "batter_hits"],
+    "home_runs": ["home runs", "batter home runs", "batter_home_runs"],
+    "total_bases": ["total bases", "batter total bases", "batter_total_bases"],
+    "rbis": ["rbis", "rbi", "batter rbis", "batter_rbis"],
+    "runs": ["runs", "runs scored", "batter runs scored", "batter_runs_scored"],
+    "stolen_bases": ["stolen bases", "batter stolen bases", "batter_stolen_bases"],
+    "batter_strikeouts": ["batter strikeouts", "batter_strikeouts"],
+    "batter_walks": ["batter walks", "batter_walks"],
+    "pitcher_strikeouts": ["strikeouts", "pitcher strikeouts", "pitcher_strikeouts"],
+    "hits_allowed": ["hits allowed", "pitcher hits allowed", "pitcher_hits_allowed"],
+    "walks_allowed": ["walks allowed", "pitcher walks", "pitcher walks allowed", "pitcher_walks"],
+    "earned_runs": ["earned runs", "pitcher earned runs", "pitcher_earned_runs"],
+    "outs_recorded": ["pitcher outs", "outs recorded", "pitcher_outs"],
+    "points": ["points", "player points", "player_points"],
+    "rebounds": ["rebounds", "player rebounds", "player_rebounds"],
+    "assists": ["assists", "player assists", "player_assists"],
+    "steals": ["steals", "player steals", "player_steals"],
+    "blocks": ["blocks", "player blocks", "player_blocks"],
+    "threes": ["threes", "3 pointers made", "three pointers made", "player threes", "player_threes"],
+    "passing_yards": ["pass yards", "passing yards", "player pass yds", "player_pass_yds"],
+    "passing_tds": ["pass tds", "passing tds", "passing touchdowns", "player pass tds", "player_pass_tds"],
+    "passing_attempts": ["pass attempts", "passing attempts", "player_pass_attempts"],
+    "completions": ["pass completions", "completions", "player_pass_completions"],
+    "interceptions": ["interceptions", "pass interceptions", "player_pass_interceptions"],
+    "rushing_yards": ["rush yards", "rushing yards", "player rush yds", "player_rush_yds"],
+    "rushing_attempts": ["rush attempts", "rushing attempts", "player_rush_attempts"],
+    "rushing_tds": ["rush tds", "rushing tds", "rushing touchdowns", "player_rush_tds"],
+    "receiving_yards": ["reception yards", "receiving yards", "rec yards", "player_reception_yds"],
+    "receptions": ["receptions", "player receptions", "player_receptions"],
+    "receiving_tds": ["receiving tds", "receiving touchdowns", "player_reception_tds"],
+}.items():
+    for _alias in _aliases:
+        MARKET_STATS[re.sub(r"[^a-z0-9]+", " ", _alias).strip()] = _stat
+
+_OU_SUFFIX = re.compile(r"\s*(o/u|over/under)\s*$", re.IGNORECASE)
+
+
+def stat_key_for_market(market: Optional[str]) -> Optional[str]:
+    """Stat key for a prop_market_type label, or None if it isn't mapped"""
+    if not market:
+        return None
+    label = re.sub(r"[^a-z0-9]+", " ", _OU_SUFFIX.sub("", market).lower()).strip()
+    return MARKET_STATS.get(label)
+
+
+def prop_game_dates(event_time: Optional[str]) -> List[str]:
+    """Candidate game dates of a prop: US Eastern date first, then the UTC date"""
+    if not event_time:
+        return []
+    dates = [local_game_date(event_time).isoformat()]
+    utc_date = datetime.fromisoformat(event_time.replace("Z", "+00:00")).astimezone(timezone.utc).date().isoformat()
+    if utc_date not in dates:
+        dates.append(utc_date)
+    return dates
+
+
+def _normalize_name(name: Optional[str]) -> str:
+    return " ".join((name or "").lower().replace(".", "").split())
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _chunks(values: List[Any], size: int = QUERY_CHUNK_SIZE) -> Iterable[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class PropStatsLookup:
+    """Resolve actual stat values for a batch of player-prop predictions"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def lookup(self, predictions: List[Dict[str, Any]]) -> Dict[Any, Tuple[float, str]]:
+        """prediction id -> (actual value, source table) for every prop found locally"""
+        wanted = []  # (prediction id, player name, sport, stat key, candidate dates)
+        for prediction in predictions:
+            metadata = prediction.get("metadata") or {}
+            stat = stat_key_for_market(prediction.get("prop_market_type") or metadata.get("prop_type"))
+            name = metadata.get("player_name")
+            dates = prop_game_dates(prediction.get("event_time"))
+            if stat and name and dates:
+                wanted.append((prediction["id"], name, prediction.get("sport"), stat, dates))
+        if not wanted:
+            return {}
+
+        player_ids = self._player_ids({(name, sport) for _, name, sport, _, _ in wanted})
+        keyed = [
+            (prediction_id, player_ids[(_normalize_name(name), sport)], stat, dates)
+            for prediction_id, name, sport, stat, dates in wanted
+            if (_normalize_name(name), sport) in player_ids
+        ]
+        if not keyed:
+            return {}
+        ids = sorted({player_id for _, player_id, _, _ in keyed})
+        all_dates = sorted({date for _, _, _, dates in keyed for date in dates})
+
+        found: Dict[Any, Tuple[float, str]] = {}
+        game_rows = self._game_stats(ids, all_dates)
+        for prediction_id, player_id, stat, dates in keyed:
+            value = self._from_game_stats(game_rows, player_id, stat, dates)
+            if value is not None:
+                found[prediction_id] = (value, SOURCE_GAME_STATS)
+
+        remaining = [key for key in keyed if key[0] not in found and STAT_SOURCES[key[2]].recent_column]
+        if remaining:
+            recent_rows = self._recent_stats(sorted({player_id for _, player_id, _, _ in remaining}), all_dates)
+            for prediction_id, player_id, stat, dates in remaining:
+                for date in dates:
+                    row = recent_rows.get((player_id, date))
+                    value = _number(row.get(STAT_SOURCES[stat].recent_column)) if row else None
+                    if value is not None:
+                        found[prediction_id] = (value, SOURCE_RECENT_STATS)
+                        break
+
+        logger.info(f"📚 Local stats settled {len(found)}/{len(predictions)} props "
+                    f"({len(wanted)} mapped, {len(keyed)} with a known player)")
+        return found
+
+    def _player_ids(self, players: Iterable[Tuple[str, Optional[str]]]) -> Dict[Tuple[str, Optional[str]], str]:
+        """(normalized name, sport) -> players.id; a name unique across sports matches any sport"""
+        players = list(players)
+        names = sorted({name for name, _ in players})
+        rows = []
+        for chunk in _chunks(names):
+            rows.extend(self.supabase.table("players").select("id, name, sport").in_("name", chunk).execute().data or [])
+
+        by_name: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_name.setdefault(_normalize_name(row.get("name")), []).append(row)
+
+        resolved = {}
+        for name, sport in players:
+            key = _normalize_name(name)
+            candidates = by_name.get(key, [])
+            same_sport = [row for row in candidates if row.get("sport") == sport]
+            match = same_sport[0] if same_sport else (candidates[0] if len(candidates) == 1 else None)
+            if match:
+                resolved[(key, sport)] = match["id"]
+        return resolved
+
+    def _game_stats(self, player_ids: List[str], dates: List[str]) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        rows: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for chunk in _chunks(player_ids):
+            response = self.supabase.table("player_game_stats").select("player_id, stats").in_(
+                "player_id", chunk
+            ).in_("stats->>game_date", dates).execute()
+            for row in response.data or []:
+                stats = row.get("stats") or {}
+                rows.setdefault((row["player_id"], str(stats.get("game_date", ""))[:10]), []).append(stats)
+        return rows
+
+    def _recent_stats(self, player_ids: List[str], dates: List[str]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for chunk in _chunks(player_ids):
+            response = self.supabase.table("player_recent_stats").select("*").in_(
+                "player_id", chunk
+            ).in_("game_date", dates).execute()
+            for row in response.data or []:
+                rows.setdefault((row["player_id"], str(row.get("game_date", ""))[:10]), row)
+        return rows
+
+    @staticmethod
+    def _from_game_stats(rows: Dict[Tuple[str, str], List[Dict[str, Any]]], player_id: str,
+                         stat: str, dates: List[str]) -> Optional[float]:
+        source = STAT_SOURCES[stat]
+        for date in dates:
+            for stats in rows.get((player_id, date), []):
+                row_type = stats.get("type")
+                if row_type in ("batting", "pitching") and (row_type == "pitching") != source.pitching:
+                    continue
+                keys = source.game_keys + (source.pitching_row_keys if row_type == "pitching" else ())
+                for key in keys:
+                    value = _number(stats.get(key))
+                    if value is not None:
+                        return value
+        return None
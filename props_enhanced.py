@@ -6,13 +6,18 @@ import requests
 import argparse
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
 import httpx
 from datetime import datetime, timedelta, timezone
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import time
-import re # Added for JSON fixing
+from game_slate import SlateIndex, get_games_for_local_date
+from llm_gateway import get_llm_gateway
+from pick_stream import PICKS_STREAMING, PickStreamParser
+from prediction_writer import AI_USER_ID, PredictionWriter
+from research_memo import STATMUSE as STATMUSE_MEMO, WEB as WEB_MEMO, memoized, statmuse_ok, web_ok
+from research_executor import ResearchExecutor, ResearchItem, ResearchResult, STATMUSE, WEB
+from team_registry import get_team_registry
 
 # Load environment variables
 load_dotenv("backend/.env")
@@ -24,6 +29,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fields a streamed pick object needs before it is matched to a prop
+PROP_PICK_FIELDS = ("player_name", "prop_type", "recommendation", "line")
+
 @dataclass
 class PlayerProp:
     player_name: str
@@ -48,11 +56,20 @@ class StatMuseClient:
         self.base_url = base_url
         self.session = requests.Session()
         
-    def query(self, question: str) -> Dict[str, Any]:
+    def query(self, question: str, sport: Optional[str] = None, confidence: Optional[float] = None) -> Dict[str, Any]:
+        # Shared research memo first: other agents may already have asked this today
+        return memoized(STATMUSE_MEMO, question, lambda: self._query_upstream(question, sport), sport=sport,
+                        pipeline="props_enhanced", source="statmuse", accept=statmuse_ok, confidence=confidence)
+    
+    def _query_upstream(self, question: str, sport: Optional[str] = None) -> Dict[str, Any]:
         try:
+            payload = {"query": question}
+            if sport:
+                payload["sport"] = str(sport).upper()
+            
             response = self.session.post(
                 f"{self.base_url}/query",
-                json={"query": question},
+                json=payload,
                 timeout=30
             )
             response.raise_for_status()
@@ -83,7 +100,11 @@ class WebSearchClient:
         if not self.google_api_key or not self.search_engine_id:
             logger.warning("Google Search API credentials not found. Web search will use fallback.")
     
-    def search(self, query: str) -> Dict[str, Any]:
+    def search(self, query: str, confidence: Optional[float] = None) -> Dict[str, Any]:
+        return memoized(WEB_MEMO, query, lambda: self._search_upstream(query),
+                        pipeline="props_enhanced", source="google_search", accept=web_ok, confidence=confidence)
+    
+    def _search_upstream(self, query: str) -> Dict[str, Any]:
         logger.info(f"🌐 Web search: {query}")
         
         try:
@@ -167,40 +188,10 @@ class DatabaseClient:
             raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables are required")
             
         self.supabase: Client = create_client(supabase_url, supabase_key)
+        self.prediction_writer = PredictionWriter(self.supabase)
     
     def get_games_for_date(self, target_date: datetime.date) -> List[Dict[str, Any]]:
         try:
-            # IMPORTANT: Use the same approach as setupOddsIntegration.ts and teams_enhanced.py
-            # For current day: use current time to end of day
-            # For tomorrow: use start of tomorrow to end of tomorrow
-            
-            now = datetime.now()
-            current_date = now.date()
-            
-            if target_date == current_date:
-                # Today - get ALL games for today (including games that already happened)
-                start_time_local = datetime.combine(current_date, datetime.min.time())
-                start_time = start_time_local - timedelta(hours=8)  # Pad for timezone differences
-                # End of day in EST, converted to UTC (EST games can run until ~3 AM UTC next day)
-                end_time_local = datetime.combine(current_date, datetime.min.time().replace(hour=23, minute=59, second=59))
-                end_time = end_time_local + timedelta(hours=8)  # EST to UTC conversion (worst case)
-            else:
-                # Tomorrow or specified date - use full day with timezone padding
-                # Start of day in EST converted to UTC (EST midnight = 5 AM UTC typically)
-                start_time_local = datetime.combine(target_date, datetime.min.time())
-                start_time = start_time_local - timedelta(hours=8)  # Pad for timezone differences
-                
-                # End of day in EST converted to UTC (EST 11:59 PM can be up to 8 AM UTC next day)
-                end_time_local = datetime.combine(target_date, datetime.min.time().replace(hour=23, minute=59, second=59))
-                end_time = end_time_local + timedelta(hours=8)  # Pad for timezone differences
-            
-            start_iso = start_time.isoformat()
-            end_iso = end_time.isoformat()
-            
-            logger.info(f"Fetching games from UTC range ({start_iso}) to ({end_iso}) and filtering for local date {target_date}")
-            
-            # Fetch games from selected sports with player props support
-            all_games = []
             # Determine sport filter if provided
             if hasattr(self, 'sport_filter') and getattr(self, 'sport_filter'):
                 sports = list(getattr(self, 'sport_filter'))
@@ -216,27 +207,8 @@ class DatabaseClient:
                     "College Football"
                 ]
             
-            for sport in sports:
-                response = self.supabase.table("sports_events").select(
-                    "id, home_team, away_team, start_time, sport, metadata"
-                ).gte("start_time", start_iso).lte("start_time", end_iso).eq("sport", sport).order("start_time").execute()
-                
-                if response.data:
-                    # Filter games to only include those that happen on the target local date
-                    filtered_games = []
-                    for game in response.data:
-                        # Parse the UTC timestamp and convert to EST to check local date
-                        game_utc = datetime.fromisoformat(game['start_time'].replace('Z', '+00:00'))
-                        # Convert to EST (UTC-5, but we'll use a simple approximation)
-                        game_est = game_utc - timedelta(hours=5)  # EST offset
-                        game_local_date = game_est.date()
-                        
-                        # Only include if it falls on our target date in local time
-                        if game_local_date == target_date:
-                            filtered_games.append(game)
-                    
-                    logger.info(f"Found {len(filtered_games)} {sport} games for local date {target_date}")
-                    all_games.extend(filtered_games)
+            # One sports_events query for every sport, filtered on the local (ET) game date
+            all_games = get_games_for_local_date(self.supabase, target_date, sports)
             
             # Sort all games by start time
             all_games.sort(key=lambda x: x['start_time'])
@@ -304,105 +276,42 @@ class DatabaseClient:
     
     def store_ai_predictions(self, predictions: List[Dict[str, Any]]):
         try:
-            # Sort predictions to control UI display order (UI shows newest first):
-            # Save order (oldest -> newest): WNBA -> MLB -> CFB -> NFL
-            # This makes NFL saved last, so it appears FIRST in UI lists.
-            def sport_priority(pred):
-                sport = pred.get("sport", "MLB")
-                if sport == "WNBA":
-                    return 1  # earliest
-                if sport == "MLB":
-                    return 2
-                if sport in ("CFB", "College Football"):
-                    return 3
-                if sport == "NFL" or sport == "National Football League":
-                    return 4  # latest (top in UI)
-                return 5
-            
-            sorted_predictions = sorted(predictions, key=sport_priority)
+            # Saved in UI order (oldest -> newest): WNBA -> MLB -> CFB -> NFL, so NFL displays first
             logger.info(f"📊 Saving predictions in UI order: WNBA → MLB → CFB → NFL (NFL will display first)")
             
-            for pred in sorted_predictions:
+            rows = []
+            for pred in predictions:
                 reasoning = pred.get("reasoning", "")
                 if not reasoning and pred.get("metadata"):
                     reasoning = pred["metadata"].get("reasoning", "")
                 
                 metadata = pred.get("metadata", {})
-                roi_estimate_str = metadata.get("roi_estimate", "0%")
-                value_percentage_str = metadata.get("value_percentage", "0%")
-                implied_probability_str = metadata.get("implied_probability", "50%")
-                
-                try:
-                    roi_estimate = float(roi_estimate_str.replace("%", "")) if roi_estimate_str else 0.0
-                    value_percentage = float(value_percentage_str.replace("%", "")) if value_percentage_str else 0.0
-                    implied_probability = float(implied_probability_str.replace("%", "")) if implied_probability_str else 50.0
-                except (ValueError, AttributeError):
-                    roi_estimate = 0.0
-                    value_percentage = 0.0
-                    implied_probability = 50.0
-                
-                # Calculate Kelly stake for props
-                try:
-                    odds_value = float(str(pred.get("odds", 100)).replace("+", "").replace("-", ""))
-                    confidence = pred.get("confidence", 75)
-                    kelly_stake = max(0, min(10, (confidence/100 - 0.5) * 10))
-                except:
-                    kelly_stake = 2.5
-                
-                # Calculate expected value
-                try:
-                    confidence = pred.get("confidence", 75)
-                    expected_value = (confidence - 50) * 0.2
-                except:
-                    expected_value = 5.0
-                
-                # Get risk level from AI (preferred) or determine from confidence as fallback
-                risk_level = pred.get("risk_level")
-                if not risk_level:
-                    # Fallback logic if AI didn't provide risk_level
-                    confidence = pred.get("confidence", 75)
-                    odds = pred.get("odds", 0)
-                    
-                    # Determine risk based on confidence AND odds alignment
-                    if confidence >= 70 and odds <= -110:
-                        risk_level = "Low"  # Conservative: high confidence + favorite odds
-                    elif confidence >= 60 and -150 <= odds <= 150:
-                        risk_level = "Medium"  # Balanced: good confidence + reasonable odds
-                    else:
-                        risk_level = "High"  # Aggressive: lower confidence or underdog odds
-                
-                prediction_data = {
-                    "user_id": "c19a5e12-4297-4b0f-8d21-39d2bb1a2c08",
+                # Percentages, Kelly stake, EV and the fallback risk level are derived by PredictionWriter
+                rows.append({
+                    "user_id": AI_USER_ID,
                     "confidence": pred.get("confidence", 0),
                     "pick": pred.get("pick", ""),
-                    "odds": str(pred.get("odds", 0)),
+                    "odds": pred.get("odds", 0),
                     "sport": pred.get("sport", "MLB"),
                     "event_time": pred.get("event_time"),
                     "bet_type": pred.get("bet_type", "player_prop"),
-                    "game_id": str(pred.get("event_id", "")),
+                    "game_id": str(pred["event_id"]) if pred.get("event_id") else None,
                     "match_teams": pred.get("match_teams", ""),
                     "reasoning": reasoning,
                     "line_value": pred.get("line_value") or pred.get("line", 0),
                     "prediction_value": pred.get("prediction_value"),
                     "prop_market_type": pred.get("prop_market_type") or pred.get("prop_type", ""),
-                    "roi_estimate": roi_estimate,
-                    "value_percentage": value_percentage,
-                    "kelly_stake": kelly_stake,
-                    "expected_value": expected_value,
-                    "risk_level": risk_level,
-                    "implied_probability": implied_probability,
+                    "roi_estimate": metadata.get("roi_estimate", "0%"),
+                    "value_percentage": metadata.get("value_percentage", "0%"),
+                    "risk_level": pred.get("risk_level"),
+                    "implied_probability": metadata.get("implied_probability", "50%"),
                     "fair_odds": metadata.get("fair_odds", pred.get("odds", 0)),
                     "key_factors": metadata.get("key_factors", []),
                     "status": "pending",
                     "metadata": metadata
-                }
-                
-                # Remove None values to avoid database errors
-                prediction_data = {k: v for k, v in prediction_data.items() if v is not None}
-                
-                self.supabase.table("ai_predictions").insert(prediction_data).execute()
-                
-            logger.info(f"Successfully stored {len(predictions)} AI predictions")
+                })
+            
+            self.prediction_writer.write(rows)
             
         except Exception as e:
             logger.error(f"Failed to store AI predictions: {e}")
@@ -412,10 +321,11 @@ class IntelligentPlayerPropsAgent:
         self.db = DatabaseClient()
         self.statmuse = StatMuseClient()
         self.web_search = WebSearchClient()
-        self.grok_client = AsyncOpenAI(
-            api_key=os.getenv("XAI_API_KEY"),
-            base_url="https://api.x.ai/v1"
-        )
+        # Runs each research stage's StatMuse/web items concurrently under rate limits
+        self.research_executor = ResearchExecutor(self.statmuse.query, self.web_search.search)
+        # Shared Grok gateway: retries, response cache and per-stage token accounting
+        self.llm = get_llm_gateway()
+        self.grok_client = self.llm.client
         # Add session for StatMuse context scraping
         self.session = requests.Session()
         self.statmuse_base_url = "http://localhost:5001"
@@ -647,6 +557,8 @@ class IntelligentPlayerPropsAgent:
         
         picks = await self.generate_picks_with_reasoning(insights, available_props, games, target_picks, sport_distribution)
         logger.info(f"🎲 Generated {len(picks)} intelligent picks")
+        logger.info(f"🗂️ Prop sport resolution tiers: {dict(self._slate_index_for(games).tier_counts)}")
+        self.llm.log_summary()
         
         if picks:
             self.db.store_ai_predictions(picks)
@@ -682,11 +594,14 @@ class IntelligentPlayerPropsAgent:
         statmuse_context = self.scrape_statmuse_context()
         
         # STEP 2: Separate props by detected sport using enhanced detection  
-        mlb_props = [p for p in props if self._get_prop_sport(p, games) == 'MLB']
-        wnba_props = [p for p in props if self._get_prop_sport(p, games) == 'WNBA']
-        nfl_props = [p for p in props if self._get_prop_sport(p, games) == 'NFL']
-        cfb_props = [p for p in props if self._get_prop_sport(p, games) == 'CFB']
-        unknown_props = [p for p in props if self._get_prop_sport(p, games) == 'Unknown']
+        props_by_detected_sport = {'MLB': [], 'WNBA': [], 'NFL': [], 'CFB': [], 'Unknown': []}
+        for p in props:
+            props_by_detected_sport.setdefault(self._get_prop_sport(p, games), []).append(p)
+        mlb_props = props_by_detected_sport['MLB']
+        wnba_props = props_by_detected_sport['WNBA']
+        nfl_props = props_by_detected_sport['NFL']
+        cfb_props = props_by_detected_sport['CFB']
+        unknown_props = props_by_detected_sport['Unknown']
         
         logger.info(f"🔍 Enhanced prop detection results:")
         logger.info(f"  MLB: {len(mlb_props)} props")
@@ -880,13 +795,10 @@ Generate intelligent research plan as JSON:
 **BE INTELLIGENT**: Look at the ACTUAL props data and create research that will help evaluate those SPECIFIC props!"""
         
         try:
-            response = await self.grok_client.chat.completions.create(
-                model="grok-3-latest",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+            plan_text = await self.llm.chat(
+                prompt, stage="research_plan", model="grok-3-latest", temperature=0.3, cache=True
             )
             
-            plan_text = response.choices[0].message.content
             start_idx = plan_text.find("{")
             end_idx = plan_text.rfind("}") + 1
             plan_json = json.loads(plan_text[start_idx:end_idx])
@@ -942,13 +854,9 @@ Return ONLY compact JSON like:
 {{"NFL":10, "MLB":3, "WNBA":2}}
 """
 
-            response = await self.grok_client.chat.completions.create(
-                model="grok-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2,
-                max_tokens=400
-            )
-            text = response.choices[0].message.content.strip()
+            text = (await self.llm.chat(
+                prompt, stage="distribution", model="grok-4", temperature=0.2, max_tokens=400, cache=True
+            )).strip()
             # Extract JSON braces
             start = text.find("{")
             end = text.rfind("}") + 1
@@ -998,56 +906,6 @@ Return ONLY compact JSON like:
         players_by_sport = {}
         prop_types_by_sport = {}
         
-        # Create MLB team abbreviation mapping
-        mlb_team_mapping = {
-            'ari': ['arizona diamondbacks', 'diamondbacks'],
-            'atl': ['atlanta braves', 'braves'], 
-            'bal': ['baltimore orioles', 'orioles'],
-            'bos': ['boston red sox', 'red sox'],
-            'chc': ['chicago cubs', 'cubs'],
-            'cws': ['chicago white sox', 'white sox'],
-            'cin': ['cincinnati reds', 'reds'],
-            'cle': ['cleveland guardians', 'guardians'],
-            'col': ['colorado rockies', 'rockies'],
-            'det': ['detroit tigers', 'tigers'], 
-            'hou': ['houston astros', 'astros'],
-            'kc': ['kansas city royals', 'royals'],
-            'laa': ['los angeles angels', 'angels'],
-            'lad': ['los angeles dodgers', 'dodgers'],
-            'mia': ['miami marlins', 'marlins'],
-            'mil': ['milwaukee brewers', 'brewers'],
-            'min': ['minnesota twins', 'twins'],
-            'nym': ['new york mets', 'mets'],
-            'nyy': ['new york yankees', 'yankees'],
-            'oak': ['oakland athletics', 'athletics'],
-            'phi': ['philadelphia phillies', 'phillies'],
-            'pit': ['pittsburgh pirates', 'pirates'],
-            'sd': ['san diego padres', 'padres'],
-            'sf': ['san francisco giants', 'giants'],
-            'sea': ['seattle mariners', 'mariners'],
-            'stl': ['st. louis cardinals', 'cardinals'],
-            'tb': ['tampa bay rays', 'rays'],
-            'tex': ['texas rangers', 'rangers'],
-            'tor': ['toronto blue jays', 'blue jays'],
-            'wsh': ['washington nationals', 'nationals']
-        }
-        
-        # WNBA team mapping
-        wnba_team_mapping = {
-            'liberty': ['new york liberty'],
-            'wings': ['dallas wings'],
-            'storm': ['seattle storm'],
-            'aces': ['las vegas aces'],
-            'mystics': ['washington mystics'],
-            'sun': ['connecticut sun'],
-            'fever': ['indiana fever'],
-            'sky': ['chicago sky'],
-            'dream': ['atlanta dream'],
-            'lynx': ['minnesota lynx'],
-            'mercury': ['phoenix mercury'],
-            'sparks': ['los angeles sparks']
-        }
-        
         # Debug: Log all game teams for reference
         logger.info(f"🔍 Available games and teams:")
         for game in games:
@@ -1101,109 +959,16 @@ Return ONLY compact JSON like:
         
         return analysis
     
+    def _slate_index_for(self, games: List[Dict]) -> SlateIndex:
+        """Slate index over this run's games, built once and shared by all prop grouping helpers"""
+        index = getattr(self, '_slate_index', None)
+        if index is None or index.games is not games:
+            index = self._slate_index = SlateIndex(games, get_team_registry(self.db.supabase))
+        return index
+
     def _get_prop_sport(self, prop: PlayerProp, games: List[Dict]) -> str:
         """Determine sport for a prop using reliable event_id mapping, with fallbacks."""
-        # 1) Most reliable: map by event_id to the game's sport
-        for game in games:
-            if str(prop.event_id) == str(game.get('id')):
-                sport_full = game.get('sport', 'Unknown')
-                if sport_full == "Women's National Basketball Association":
-                    return "WNBA"
-                elif sport_full == "Major League Baseball":
-                    return "MLB"
-                elif sport_full == "National Football League":
-                    return "NFL"
-                elif sport_full == "College Football":
-                    return "CFB"
-                elif sport_full == "Ultimate Fighting Championship":
-                    return "MMA"
-                else:
-                    return "Unknown"
-
-        # 2) Fallback: try team name matching against game teams
-        for game in games:
-            home_team = game.get('home_team', '').lower()
-            away_team = game.get('away_team', '').lower()
-            prop_team = (prop.team or "").lower()
-
-            if self._teams_match_enhanced(prop_team, home_team, away_team):
-                sport_full = game.get('sport', 'Unknown')
-                if sport_full == "Women's National Basketball Association":
-                    return "WNBA"
-                elif sport_full == "Major League Baseball":
-                    return "MLB"
-                elif sport_full == "National Football League":
-                    return "NFL"
-                elif sport_full == "College Football":
-                    return "CFB"
-                elif sport_full == "Ultimate Fighting Championship":
-                    return "MMA"
-                else:
-                    return "MLB"  # Default to MLB
-        
-        # If no match found, try to infer from team name patterns
-        prop_team_lower = (prop.team or "").lower()
-        
-        # Common NFL abbreviations (from database analysis)
-        nfl_teams = ['cin', 'buf', 'tb', 'mia', 'ind', 'hou', 'jax', 'ari', 'car', 'gb', 'ne', 
-                     'det', 'no', 'sea', 'bal', 'den', 'cle', 'ten', 'lar', 'nyj', 'atl', 'sf',
-                     'lac', 'lv', 'dal', 'kc', 'nyg', 'phi', 'pit', 'was', 'chi', 'min']
-        
-        # Common CFB abbreviations (basic set)
-        cfb_teams = ['duke', 'illinois', 'indiana', 'kennesaw', 'iowa', 'penn', 'pitt', 'smu',
-                     'baylor', 'syracuse', 'uconn', 'texas', 'clemson', 'oregon', 'alabama']
-        
-        # Common MLB abbreviations
-        mlb_teams = ['hou', 'mia', 'bos', 'nyy', 'nym', 'lad', 'sf', 'phi', 'atl', 'det', 'min',
-                     'pit', 'cle', 'bal', 'wsh', 'oak', 'kc', 'tex', 'tb', 'tor', 'cws',
-                     'chc', 'mil', 'stl', 'cin', 'col', 'ari', 'sd', 'sea', 'laa']
-        
-        # Common WNBA teams  
-        wnba_teams = ['liberty', 'wings', 'storm', 'aces', 'mystics', 'sun', 'fever', 
-                     'sky', 'dream', 'lynx', 'mercury', 'sparks']
-        
-        if prop_team_lower in nfl_teams:
-            return "NFL"
-        elif prop_team_lower in cfb_teams:
-            return "CFB"
-        elif prop_team_lower in mlb_teams:
-            return "MLB"
-        elif prop_team_lower in wnba_teams:
-            return "WNBA"
-        elif prop_team_lower in nfl_teams:
-            return "NFL"
-        elif prop_team_lower in cfb_teams:
-            return "CFB"
-
-        return "Unknown"
-    
-    def _teams_match_enhanced(self, prop_team: str, home_team: str, away_team: str) -> bool:
-        """Enhanced team matching using multiple strategies"""
-        # Direct matches
-        if prop_team == home_team or prop_team == away_team:
-            return True
-            
-        # Partial matches
-        if prop_team in home_team or home_team in prop_team:
-            return True
-        if prop_team in away_team or away_team in prop_team:
-            return True
-            
-        # Word matching for significant words
-        prop_words = prop_team.split()
-        home_words = home_team.split()
-        away_words = away_team.split()
-        
-        for prop_word in prop_words:
-            if len(prop_word) > 3:
-                for home_word in home_words:
-                    if len(home_word) > 3 and prop_word == home_word:
-                        return True
-                for away_word in away_words:
-                    if len(away_word) > 3 and prop_word == away_word:
-                        return True
-        
-        return False
+        return self._slate_index_for(games).prop_sport(prop.event_id, prop.team)
     
     def _create_fallback_research_plan(self, props: List[PlayerProp]) -> Dict[str, Any]:
         """Create a basic research plan if AI planning fails"""
@@ -1243,65 +1008,31 @@ Return ONLY compact JSON like:
         return all_insights
     
     async def _execute_initial_research(self, plan: Dict[str, Any]) -> List[ResearchInsight]:
-        insights = []
-        
         statmuse_queries = plan.get("statmuse_queries", [])[:8]
         web_searches = plan.get("web_searches", [])[:3]
         
         # BALANCED LIMITS: More MLB research since 7 picks needed vs 3 WNBA picks
         max_statmuse = min(18, len(statmuse_queries))  # Reasonable limit for both sports
-        max_web = min(12, len(web_searches))  # Focused web searches
-        
-        for query_obj in statmuse_queries[:max_statmuse]:
-            try:
-                query_text = query_obj.get("query", query_obj) if isinstance(query_obj, dict) else query_obj
-                priority = query_obj.get("priority", "medium") if isinstance(query_obj, dict) else "medium"
-                
-                logger.info(f"🔍 StatMuse query ({priority}): {query_text}")
-                result = self.statmuse.query(query_text)
-                
-                if result and "error" not in result:
-                    result_preview = str(result)[:200] + "..." if len(str(result)) > 200 else str(result)
-                    logger.info(f"📊 StatMuse result: {result_preview}")
-                    
-                    confidence = 0.9 if priority == "high" else 0.7 if priority == "medium" else 0.5
-                    insights.append(ResearchInsight(
-                        source="statmuse",
-                        query=query_text,
-                        data=result,
-                        confidence=confidence,
-                        timestamp=datetime.now()
-                    ))
-                else:
-                    logger.warning(f"❌ StatMuse query failed: {result}")
-                
-                await asyncio.sleep(1.5)
-                
-            except Exception as e:
-                logger.error(f"❌ StatMuse query failed for \'{query_text}\': {e}")
         
-        web_searches = plan.get("web_searches", [])[:3]
-        for search_obj in web_searches:
-            try:
-                search_query = search_obj.get("query", search_obj) if isinstance(search_obj, dict) else search_obj
-                priority = search_obj.get("priority", "medium") if isinstance(search_obj, dict) else "medium"
-                
-                logger.info(f"🌐 Web search ({priority}): {search_query}")
-                result = self.web_search.search(search_query)
-                
-                confidence = 0.8 if priority == "high" else 0.6 if priority == "medium" else 0.4
-                insights.append(ResearchInsight(
-                    source="web_search",
-                    query=search_query,
-                    data=result,
-                    confidence=confidence,
-                    timestamp=datetime.now()
-                ))
-                
-            except Exception as e:
-                logger.error(f"❌ Initial web search failed for \'{search_query}\': {e}")
+        items = [
+            ResearchItem.from_plan(query_obj, STATMUSE, "statmuse", {"high": 0.9, "medium": 0.7}, 0.5)
+            for query_obj in statmuse_queries[:max_statmuse]
+        ] + [
+            ResearchItem.from_plan(search_obj, WEB, "web_search", {"high": 0.8, "medium": 0.6}, 0.4)
+            for search_obj in web_searches
+        ]
         
-        return insights
+        results = await self.research_executor.run(items)
+        return [self._insight_from_result(result) for result in results]
+    
+    def _insight_from_result(self, result: ResearchResult) -> ResearchInsight:
+        return ResearchInsight(
+            source=result.item.source,
+            query=result.item.query,
+            data=result.data,
+            confidence=result.item.confidence,
+            timestamp=result.timestamp
+        )
     
     async def _execute_adaptive_followup(self, initial_insights: List[ResearchInsight], props: List[PlayerProp]) -> List[ResearchInsight]:
         insights_summary = []
@@ -1360,67 +1091,25 @@ Generate 3-6 high-value follow-up queries that will maximize our edge.
 """
         
         try:
-            response = await self.grok_client.chat.completions.create(
-                model="grok-4",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.4
+            followup_text = await self.llm.chat(
+                prompt, stage="followup", model="grok-4", temperature=0.4
             )
             
-            followup_text = response.choices[0].message.content
             start_idx = followup_text.find("{")
             end_idx = followup_text.rfind("}") + 1
             followup_plan = json.loads(followup_text[start_idx:end_idx])
             
-            # Execute the follow-up queries
-            followup_insights = []
+            # Execute the follow-up queries concurrently
+            items = [
+                ResearchItem.from_plan(query_obj, STATMUSE, "statmuse_followup", {"high": 0.9, "medium": 0.7}, 0.5)
+                for query_obj in followup_plan.get("followup_statmuse_queries", [])[:5]
+            ] + [
+                ResearchItem.from_plan(search_obj, WEB, "web_followup", {"high": 0.8, "medium": 0.6}, 0.4)
+                for search_obj in followup_plan.get("followup_web_searches", [])[:3]
+            ]
             
-            # Execute StatMuse follow-up queries
-            for query_obj in followup_plan.get("followup_statmuse_queries", [])[:5]:
-                try:
-                    query_text = query_obj.get("query", query_obj) if isinstance(query_obj, dict) else query_obj
-                    priority = query_obj.get("priority", "medium") if isinstance(query_obj, dict) else "medium"
-                    
-                    logger.info(f"🔍 Follow-up StatMuse ({priority}): {query_text}")
-                    result = self.statmuse.query(query_text)
-                    
-                    if result and "error" not in result:
-                        confidence = 0.9 if priority == "high" else 0.7 if priority == "medium" else 0.5
-                        followup_insights.append(ResearchInsight(
-                            source="statmuse_followup",
-                            query=query_text,
-                            data=result,
-                            confidence=confidence,
-                            timestamp=datetime.now()
-                        ))
-                    
-                    await asyncio.sleep(1.5)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Follow-up StatMuse query failed: {e}")
-            
-            # Execute web follow-up searches
-            for search_obj in followup_plan.get("followup_web_searches", [])[:3]:
-                try:
-                    search_query = search_obj.get("query", search_obj) if isinstance(search_obj, dict) else search_obj
-                    priority = search_obj.get("priority", "medium") if isinstance(search_obj, dict) else "medium"
-                    
-                    logger.info(f"🌐 Follow-up web search ({priority}): {search_query}")
-                    result = self.web_search.search(search_query)
-                    
-                    if result:
-                        confidence = 0.8 if priority == "high" else 0.6 if priority == "medium" else 0.4
-                        followup_insights.append(ResearchInsight(
-                            source="web_followup",
-                            query=search_query,
-                            data=result,
-                            confidence=confidence,
-                            timestamp=datetime.now()
-                        ))
-                    
-                    await asyncio.sleep(0.5)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Follow-up web search failed: {e}")
+            results = await self.research_executor.run(items)
+            followup_insights = [self._insight_from_result(result) for result in results]
             
             return followup_insights
             
@@ -1456,9 +1145,10 @@ Generate 3-6 high-value follow-up queries that will maximize our edge.
         
         # Get game info for each game with props
         game_info = {}
-        for game in games:
-            game_id = game.get('id', '')
-            if game_id in props_by_game:
+        slate_index = self._slate_index_for(games)
+        for game_id in props_by_game:
+            game = slate_index.game_for_event(game_id)
+            if game is not None:
                 game_info[game_id] = {
                     'home_team': game.get('home_team', ''),
                     'away_team': game.get('away_team', ''),
@@ -1875,200 +1565,49 @@ REMEMBER:
 - **Stolen Bases 0.5**: Only bet OVER (under is impossible)
 """
             
+            # Picks are matched to props as each object closes in the stream
+            parser = PickStreamParser(PROP_PICK_FIELDS)
+            formatted_picks = []
+
+            def add_picks(ai_picks: List[Dict]):
+                for pick in ai_picks:
+                    # One bad pick must not end the stream and drop the picks still coming
+                    try:
+                        formatted = self._format_ai_pick(pick, props, games, insights)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Skipping malformed pick for {pick.get('player_name')}: {e}")
+                        continue
+                    if formatted:
+                        formatted_picks.append(formatted)
+
             try:
-                response = await self.grok_client.chat.completions.create(
-                    model="grok-4",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.1,
-                    max_tokens=4000
-                )
-                
-                picks_text = response.choices[0].message.content.strip()
-                logger.info(f"🧠 Grok raw response: {picks_text[:500]}...")
-                
-                # DEBUG: Log the full response to understand the format
-                logger.info(f"🔍 FULL Grok response for debugging:\n{picks_text}")
-                
-                # Try to remove markdown code blocks if present
-                if "```json" in picks_text.lower():
-                    logger.info("Detected markdown JSON code block, extracting...")
-                    start_marker = picks_text.lower().find("```json") + 7
-                    end_marker = picks_text.find("```", start_marker)
-                    if end_marker != -1:
-                        picks_text = picks_text[start_marker:end_marker].strip()
-                        logger.info(f"Extracted JSON from markdown: {picks_text[:200]}...")
-                elif "```" in picks_text:
-                    logger.info("Detected markdown code block, extracting...")
-                    start_marker = picks_text.find("```") + 3
-                    end_marker = picks_text.find("```", start_marker)
-                    if end_marker != -1:
-                        picks_text = picks_text[start_marker:end_marker].strip()
-                        logger.info(f"Extracted content from markdown: {picks_text[:200]}...")
-                
-                # Find and extract the JSON array
-                start_idx = picks_text.find("[")
-                end_idx = picks_text.rfind("]") + 1
-                
-                logger.info(f"🔍 JSON search results: start_idx={start_idx}, end_idx={end_idx}")
-                
-                if start_idx == -1 or end_idx == 0:
-                    logger.error("No JSON array found in Grok response")
-                    logger.error(f"Response length: {len(picks_text)}")
-                    logger.error(f"First 1000 chars: {picks_text[:1000]}")
-                    logger.error(f"Last 500 chars: {picks_text[-500:]}")
-                    
-                    # Try to find if there's JSON object without array brackets
-                    if "{" in picks_text and "}" in picks_text:
-                        logger.info("Found JSON object syntax, attempting to wrap in array...")
-                        # Try to extract objects and wrap them in an array
-                        objects = []
-                        # Find all JSON objects
-                        pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-                        matches = re.findall(pattern, picks_text, re.DOTALL)
-                        for match in matches:
-                            try:
-                                obj = json.loads(match)
-                                objects.append(obj)
-                            except:
-                                continue
-                        if objects:
-                            logger.info(f"Extracted {len(objects)} JSON objects, proceeding...")
-                            ai_picks = objects
-                        else:
-                            return []
-                    else:
-                        return []
+                if PICKS_STREAMING:
+                    async for delta in self.llm.stream_chat(
+                        prompt, stage="picks", model="grok-4", temperature=0.1, max_tokens=4000
+                    ):
+                        add_picks(parser.feed(delta))
                 else:
-                    json_str = picks_text[start_idx:end_idx]
-                    
-                    # Enhanced error handling for JSON parsing
-                    try:
-                        ai_picks = json.loads(json_str)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON parsing error: {e}")
-                        
-                        # Attempt to fix common JSON issues
-                        fixed_json_str = self._fix_json_string(json_str)
-                        logger.info("Attempting to parse with fixed JSON")
-                        
-                        try:
-                            ai_picks = json.loads(fixed_json_str)
-                            logger.info("Successfully parsed JSON after fixes")
-                        except json.JSONDecodeError as e2:
-                            logger.error(f"Still failed to parse JSON after fixes: {e2}")
-                            
-                            # Last resort: manual object extraction
-                            ai_picks = self._manual_json_parser(json_str)
-                            if not ai_picks:
-                                logger.error("Manual parsing failed, no valid picks found")
-                                return []
-            
+                    add_picks(parser.feed(await self.llm.chat(
+                        prompt, stage="picks", model="grok-4", temperature=0.1, max_tokens=4000
+                    )))
+                add_picks(parser.finish())
             except Exception as e:
                 logger.error(f"Failed to process AI response: {e}")
+                if not formatted_picks:
+                    return []
+                logger.warning(f"⚠️ Keeping {len(formatted_picks)} picks parsed before the failure")
+
+            picks_text = parser.text
+            logger.info(f"🧠 Grok raw response: {picks_text[:500]}...")
+            # DEBUG: Log the full response to understand the format
+            logger.info(f"🔍 FULL Grok response for debugging:\n{picks_text}")
+            logger.info(f"🧩 {parser.summary()}; {len(formatted_picks)} matched to props")
+
+            if not parser.parsed:
+                logger.error("No JSON picks found in Grok response")
+                logger.error(f"Response length: {len(picks_text)}")
                 return []
-                
-            formatted_picks = []
-            for pick in ai_picks:
-                matching_prop = self._find_matching_prop(pick, props)
-                
-                if matching_prop:
-                    # CRITICAL: Validate that the pick has valid odds for the recommendation
-                    recommendation = pick.get("recommendation", "").lower()
-                    prop_type = pick.get("prop_type", "").lower()
-                    line = float(pick.get("line", 0))
-                    
-                    # Check for impossible props that should be skipped
-                    is_impossible = False
-                    
-                    # Home runs under 0.5 is impossible (can't get negative home runs)
-                    if "home run" in prop_type and recommendation == "under" and line <= 0.5:
-                        logger.warning(f"🚫 Skipping impossible prop: {pick['player_name']} {prop_type} UNDER {line} (impossible)")
-                        is_impossible = True
-                    
-                    # Stolen bases under 0.5 is impossible
-                    if "stolen base" in prop_type and recommendation == "under" and line <= 0.5:
-                        logger.warning(f"🚫 Skipping impossible prop: {pick['player_name']} {prop_type} UNDER {line} (impossible)")
-                        is_impossible = True
-                    
-                    # Check if the recommendation has valid odds
-                    if not is_impossible:
-                        if recommendation == "over" and matching_prop.over_odds is None:
-                            logger.warning(f"🚫 Skipping pick with missing over odds: {pick['player_name']} {prop_type} OVER {line}")
-                            is_impossible = True
-                        elif recommendation == "under" and matching_prop.under_odds is None:
-                            logger.warning(f"🚫 Skipping pick with missing under odds: {pick['player_name']} {prop_type} UNDER {line}")
-                            is_impossible = True
-                    
-                    if is_impossible:
-                        continue
-                    
-                    game = next((g for g in games if str(g.get("id")) == str(matching_prop.event_id)), None)
-                    
-                    # Determine sport from game data, not hardcoded
-                    sport = "MLB"  # default
-                    if game:
-                        game_sport = game.get('sport', 'MLB')
-                        if game_sport == "Women's National Basketball Association":
-                            sport = "WNBA"
-                        elif game_sport == "Major League Baseball":
-                            sport = "MLB"
-                        elif game_sport == "Ultimate Fighting Championship":
-                            sport = "UFC"
-                        elif game_sport == "National Football League":
-                            sport = "NFL"
-                        elif game_sport == "College Football":
-                            sport = "CFB"
-                        
-                        # Create proper game info with team matchup
-                        home_team = game.get('home_team', 'Unknown')
-                        away_team = game.get('away_team', 'Unknown')
-                        game_info = f"{away_team} @ {home_team}"
-                    else:
-                        # Fallback: try to determine sport from player name patterns
-                        player_name = pick.get('player_name', '').lower()
-                        wnba_players = ['paige bueckers', 'arike ogunbowale', 'skylar diggins-smith', 
-                                       'nneka ogwumike', 'gabby williams', 'li yueru', 'erica wheeler']
-                        if any(wnba_player in player_name for wnba_player in wnba_players):
-                            sport = "WNBA"
-                        game_info = f"{matching_prop.team} game"
-                    
-                    formatted_picks.append({
-                        "match_teams": game_info,
-                        "pick": self._format_pick_string(pick, matching_prop),
-                        "odds": pick.get("odds") or (
-                            matching_prop.over_odds if pick["recommendation"] == "over" and matching_prop.over_odds is not None
-                            else matching_prop.under_odds if pick["recommendation"] == "under" and matching_prop.under_odds is not None
-                            else None  # Don't use wrong odds as fallback
-                        ),
-                        "confidence": pick.get("confidence", 75),
-                        "sport": sport,
-                        "event_time": game.get("start_time") if game else None,
-                        "bet_type": "player_prop",
-                        "bookmaker": matching_prop.bookmaker,
-                        "event_id": matching_prop.event_id,
-                        "team": matching_prop.team,
-                        "metadata": {
-                            "player_name": pick["player_name"],
-                            "prop_type": pick["prop_type"],
-                            "line": pick["line"],
-                            "recommendation": pick["recommendation"],
-                            "reasoning": pick.get("reasoning", "AI-generated pick"),
-                            "roi_estimate": pick.get("roi_estimate", "0%"),
-                            "value_percentage": pick.get("value_percentage", "0%"),
-                            "implied_probability": pick.get("implied_probability", "50%"),
-                            "fair_odds": pick.get("fair_odds", pick.get("odds", 0)),
-                            "key_factors": pick.get("key_factors", []),
-                            "risk_level": pick.get("risk_level", "medium"),
-                            "expected_value": pick.get("expected_value", "Positive EV expected"),
-                            "research_support": pick.get("research_support", "Based on comprehensive analysis"),
-                            "ai_generated": True,
-                            "research_insights_count": len(insights),
-                            "model_used": "grok-4"
-                        }
-                    })
-                else:
-                    logger.warning(f"No matching prop found for {pick.get('player_name')} {pick.get('prop_type')}")
-            
+
             # Sort all picks by confidence for best-first presentation
             formatted_picks.sort(key=lambda x: x["confidence"], reverse=True)
             
@@ -2232,112 +1771,109 @@ REMEMBER:
             traceback.print_exc()
             return []
     
-    def _fix_json_string(self, json_str: str) -> str:
-        """Attempt to fix common JSON format issues"""
-        try:
-            # First, try direct parsing
-            json.loads(json_str)
-            return json_str
-        except json.JSONDecodeError as e:
-            logger.info(f"Fixing JSON error: {str(e)}")
-            
-            # Get error details
-            error_msg = str(e)
-            
-            # Handle specific error: Missing comma
-            if "Expecting ',' delimiter" in error_msg:
-                # Extract line and column information
-                match = re.search(r"line (\d+) column (\d+)", error_msg)
-                if match:
-                    line_num = int(match.group(1))
-                    col_num = int(match.group(2))
-                    
-                    # Split JSON by lines
-                    lines = json_str.split('\n')
-                    
-                    # If the line exists
-                    if 0 <= line_num - 1 < len(lines):
-                        # Insert comma at the right position
-                        problematic_line = lines[line_num - 1]
-                        if col_num <= len(problematic_line):
-                            fixed_line = problematic_line[:col_num] + ',' + problematic_line[col_num:]
-                            lines[line_num - 1] = fixed_line
-                            json_str = '\n'.join(lines)
-                            logger.info(f"Added missing comma at line {line_num}, column {col_num}")
-            
-            # Apply all other fixes
-            
-            # Remove trailing commas before closing braces/brackets
-            json_str = re.sub(r',\s*}', '}', json_str)
-            json_str = re.sub(r',\s*]', ']', json_str)
-            
-            # Add missing commas between objects in arrays
-            json_str = re.sub(r'}\s*{', '}, {', json_str)
-            
-            # Replace Python quotes with JSON quotes
-            json_str = re.sub(r'None', 'null', json_str)
-            json_str = re.sub(r'True', 'true', json_str)
-            json_str = re.sub(r'False', 'false', json_str)
-            
-            # Add missing quotes around keys
-            json_str = re.sub(r'([{,])\s*([a-zA-Z0-9_]+)\s*:', r'\1 "\2":', json_str)
-            
-            # Try to handle missing quotes around strings
-            json_str = re.sub(r':\s*([^"{}\[\],\d][^,}\]]*?)([,}\]])', r': "\1"\2', json_str)
-            
-            # Remove any illegal control characters
-            json_str = re.sub(r'[\x00-\x09\x0B\x0C\x0E-\x1F\x7F]', '', json_str)
-            
-            # Try to balance brackets/braces
-            open_brackets = json_str.count('[')
-            close_brackets = json_str.count(']')
-            open_braces = json_str.count('{')
-            close_braces = json_str.count('}')
-            
-            # Add missing closing brackets/braces
-            json_str = json_str.rstrip()
-            if open_brackets > close_brackets:
-                json_str += ']' * (open_brackets - close_brackets)
-            if open_braces > close_braces:
-                json_str += '}' * (open_braces - close_braces)
-            
-            # Last resort: use regex to extract what looks like a valid JSON array
-            if '[' in json_str and ']' in json_str:
-                match = re.search(r'\[.*?\]', json_str, re.DOTALL)
-                if match:
-                    extracted = match.group(0)
-                    logger.info(f"Extracted JSON array: {extracted[:100]}...")
-                    return extracted
-                
-            return json_str
-    
-    def _manual_json_parser(self, json_str: str) -> List[Dict]:
-        """Manual fallback parser for when automatic JSON fixing fails"""
-        logger.info("Attempting manual JSON array parsing")
-        picks = []
-        
-        # Extract JSON objects within the array
-        object_pattern = re.compile(r'{(.*?)}', re.DOTALL)
-        matches = object_pattern.finditer(json_str)
-        
-        for match in matches:
-            obj_str = '{' + match.group(1) + '}'
-            try:
-                # Try to parse each object individually
-                fixed_obj = self._fix_json_string(obj_str)
-                pick_obj = json.loads(fixed_obj)
-                
-                # Validate required fields
-                required_fields = ["player_name", "prop_type", "recommendation", "line"]
-                if all(field in pick_obj for field in required_fields):
-                    picks.append(pick_obj)
-                    logger.info(f"Successfully parsed pick for {pick_obj.get('player_name')}")
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse individual JSON object")
-                continue
-        
-        logger.info(f"Manually extracted {len(picks)} valid picks")
-        return picks
+    def _format_ai_pick(self, pick: Dict, props: List[PlayerProp], games: List[Dict],
+                        insights: List[ResearchInsight]) -> Optional[Dict[str, Any]]:
+        """Match one AI pick to its prop and build the stored pick; None if it can't be used"""
+        matching_prop = self._find_matching_prop(pick, props)
+        if not matching_prop:
+            logger.warning(f"No matching prop found for {pick.get('player_name')} {pick.get('prop_type')}")
+            return None
+
+        # CRITICAL: Validate that the pick has valid odds for the recommendation
+        # Streamed picks carry every required field, but a value may be null
+        recommendation = (pick.get("recommendation") or "").lower()
+        prop_type = (pick.get("prop_type") or "").lower()
+        line = float(pick.get("line", 0))
+
+        # Check for impossible props that should be skipped
+        is_impossible = False
+
+        # Home runs under 0.5 is impossible (can't get negative home runs)
+        if "home run" in prop_type and recommendation == "under" and line <= 0.5:
+            logger.warning(f"🚫 Skipping impossible prop: {pick['player_name']} {prop_type} UNDER {line} (impossible)")
+            is_impossible = True
+
+        # Stolen bases under 0.5 is impossible
+        if "stolen base" in prop_type and recommendation == "under" and line <= 0.5:
+            logger.warning(f"🚫 Skipping impossible prop: {pick['player_name']} {prop_type} UNDER {line} (impossible)")
+            is_impossible = True
+
+        # Check if the recommendation has valid odds
+        if not is_impossible:
+            if recommendation == "over" and matching_prop.over_odds is None:
+                logger.warning(f"🚫 Skipping pick with missing over odds: {pick['player_name']} {prop_type} OVER {line}")
+                is_impossible = True
+            elif recommendation == "under" and matching_prop.under_odds is None:
+                logger.warning(f"🚫 Skipping pick with missing under odds: {pick['player_name']} {prop_type} UNDER {line}")
+                is_impossible = True
+
+        if is_impossible:
+            return None
+
+        game = next((g for g in games if str(g.get("id")) == str(matching_prop.event_id)), None)
+
+        # Determine sport from game data, not hardcoded
+        sport = "MLB"  # default
+        if game:
+            game_sport = game.get('sport', 'MLB')
+            if game_sport == "Women's National Basketball Association":
+                sport = "WNBA"
+            elif game_sport == "Major League Baseball":
+                sport = "MLB"
+            elif game_sport == "Ultimate Fighting Championship":
+                sport = "UFC"
+            elif game_sport == "National Football League":
+                sport = "NFL"
+            elif game_sport == "College Football":
+                sport = "CFB"
+
+            # Create proper game info with team matchup
+            home_team = game.get('home_team', 'Unknown')
+            away_team = game.get('away_team', 'Unknown')
+            game_info = f"{away_team} @ {home_team}"
+        else:
+            # Fallback: try to determine sport from player name patterns
+            player_name = pick.get('player_name', '').lower()
+            wnba_players = ['paige bueckers', 'arike ogunbowale', 'skylar diggins-smith', 
+                           'nneka ogwumike', 'gabby williams', 'li yueru', 'erica wheeler']
+            if any(wnba_player in player_name for wnba_player in wnba_players):
+                sport = "WNBA"
+            game_info = f"{matching_prop.team} game"
+
+        return {
+            "match_teams": game_info,
+            "pick": self._format_pick_string(pick, matching_prop),
+            "odds": pick.get("odds") or (
+                matching_prop.over_odds if pick["recommendation"] == "over" and matching_prop.over_odds is not None
+                else matching_prop.under_odds if pick["recommendation"] == "under" and matching_prop.under_odds is not None
+                else None  # Don't use wrong odds as fallback
+            ),
+            "confidence": pick.get("confidence", 75),
+            "sport": sport,
+            "event_time": game.get("start_time") if game else None,
+            "bet_type": "player_prop",
+            "bookmaker": matching_prop.bookmaker,
+            "event_id": matching_prop.event_id,
+            "team": matching_prop.team,
+            "metadata": {
+                "player_name": pick["player_name"],
+                "prop_type": pick["prop_type"],
+                "line": pick["line"],
+                "recommendation": pick["recommendation"],
+                "reasoning": pick.get("reasoning", "AI-generated pick"),
+                "roi_estimate": pick.get("roi_estimate", "0%"),
+                "value_percentage": pick.get("value_percentage", "0%"),
+                "implied_probability": pick.get("implied_probability", "50%"),
+                "fair_odds": pick.get("fair_odds", pick.get("odds", 0)),
+                "key_factors": pick.get("key_factors", []),
+                "risk_level": pick.get("risk_level", "medium"),
+                "expected_value": pick.get("expected_value", "Positive EV expected"),
+                "research_support": pick.get("research_support", "Based on comprehensive analysis"),
+                "ai_generated": True,
+                "research_insights_count": len(insights),
+                "model_used": "grok-4"
+            }
+        }
 
     def _format_statmuse_insights(self, insights_summary: List[Dict]) -> str:
         statmuse_insights = [i for i in insights_summary if i.get("source") == "statmuse"]
@@ -2377,8 +1913,8 @@ REMEMBER:
         return "\n\n".join(formatted)
     
     def _find_matching_prop(self, pick: Dict, props: List[PlayerProp]) -> PlayerProp:
-        player_name = pick.get("player_name", "")
-        prop_type = pick.get("prop_type", "")
+        player_name = pick.get("player_name") or ""
+        prop_type = pick.get("prop_type") or ""
         
         exact_match = next(
             (p for p in props 
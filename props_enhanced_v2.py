@@ -10,6 +10,8 @@ from dotenv import load_dotenv
 from supabase import create_client, Client
 from openai import AsyncOpenAI
 import asyncio
+from research_memo import STATMUSE as STATMUSE_MEMO, WEB as WEB_MEMO, memoized, statmuse_ok, web_ok
+from prediction_writer import AI_USER_ID, PredictionWriter
 import requests
 
 # Load env from backend/.env to reuse existing settings
@@ -41,6 +43,11 @@ class StatMuseClient:
         self.timeout = 20
 
     def query(self, query: str, sport: Optional[str] = None) -> Dict[str, Any]:
+        # Shared research memo first: other agents may already have asked this today
+        return memoized(STATMUSE_MEMO, query, lambda: self._query_upstream(query, sport), sport=sport,
+                        pipeline="props_enhanced_v2", source="statmuse", accept=statmuse_ok)
+    
+    def _query_upstream(self, query: str, sport: Optional[str] = None) -> Dict[str, Any]:
         try:
             payload = {"query": query}
             if sport:
@@ -59,9 +66,14 @@ class WebSearchClient:
         self.google_search_url = "https://www.googleapis.com/customsearch/v1"
 
     def search(self, query: str) -> Dict[str, Any]:
+        return memoized(WEB_MEMO, query, lambda: self._search_upstream(query),
+                        pipeline="props_enhanced_v2", source="google_search", accept=web_ok)
+    
+    def _search_upstream(self, query: str) -> Dict[str, Any]:
+        """Google results in the shared memo shape: {"query", "results": [{title, snippet, url, source}]}"""
         try:
             if not self.google_api_key or not self.search_engine_id:
-                return {"items": []}
+                return {"query": query, "results": []}
             params = {
                 "q": query,
                 "key": self.google_api_key,
@@ -71,10 +83,15 @@ class WebSearchClient:
             }
             r = requests.get(self.google_search_url, params=params, timeout=15)
             r.raise_for_status()
-            return r.json()
+            results = [
+                {"title": item.get("title", ""), "snippet": item.get("snippet", ""),
+                 "url": item.get("link", ""), "source": "Google Search"}
+                for item in r.json().get("items", [])
+            ]
+            return {"query": query, "results": results}
         except Exception as e:
             logging.warning(f"Web search failed: {e}")
-            return {"items": []}
+            return {"query": query, "results": []}
 
 
 def display_name_for_stat(stat_key: str) -> str:
@@ -147,6 +164,7 @@ class DB:
         if not url or not key:
             raise RuntimeError('SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY are required')
         self.client: Client = create_client(url, key)
+        self.prediction_writer = PredictionWriter(self.client)
 
     @staticmethod
     def _normalize_sport_input(s: str) -> str:
@@ -258,7 +276,7 @@ class DB:
         return logos
 
     def store_predictions(self, picks: List[Dict[str, Any]], event_map: Dict[str, Dict[str, Any]]) -> None:
-        stored_count = 0
+        rows = []
         for p in picks:
             event = event_map.get(str(p.get('event_id')))
             game_info = None
@@ -287,14 +305,14 @@ class DB:
                 }
             
             row = {
-                'user_id': 'c19a5e12-4297-4b0f-8d21-39d2bb1a2c08',
+                'user_id': AI_USER_ID,
                 'confidence': p.get('confidence', 0),
                 'pick': p.get('pick', ''),
                 'odds': str(p.get('odds', 0)),
                 'sport': sport,
                 'event_time': event.get('start_time') if event else None,
                 'bet_type': 'player_prop',
-                'game_id': str(p.get('event_id', '')),
+                'game_id': str(p['event_id']) if p.get('event_id') else None,
                 'match_teams': game_info,
                 'reasoning': p.get('reasoning', ''),
                 'line_value': p.get('line', 0),
@@ -311,15 +329,10 @@ class DB:
                 'status': 'pending',
                 'metadata': metadata,
             }
-            # Remove None values
-            row = {k: v for k, v in row.items() if v is not None}
-            try:
-                self.client.table('ai_predictions').insert(row).execute()
-                stored_count += 1
-                logger.info(f"Stored pick {stored_count}/{len(picks)}: {row.get('pick', 'Unknown')}")
-            except Exception as e:
-                logger.error(f"Failed to store pick: {e}")
-        logger.info(f"Successfully stored {stored_count}/{len(picks)} predictions to ai_predictions")
+            rows.append(row)
+        
+        # Keep the generator's pick order; None values are dropped by the writer
+        self.prediction_writer.write(rows, sport_order=None)
 
     def _get_team_abbreviation(self, team_name: str) -> str:
         """Get team abbreviation from teams table."""
@@ -424,9 +437,9 @@ class Agent:
                 for q in google_qs[:3]:
                     try:
                         res = self.web.search(q)
-                        items = (res or {}).get('items', [])[:3]
+                        items = (res or {}).get('results', [])[:3]
                         for it2 in items:
-                            web_hits.append({'title': it2.get('title'), 'snippet': it2.get('snippet'), 'link': it2.get('link')})
+                            web_hits.append({'title': it2.get('title'), 'snippet': it2.get('snippet'), 'link': it2.get('url')})
                     except Exception:
                         continue
                 research_map[key] = {'statmuse': sm_answers, 'web': web_hits}
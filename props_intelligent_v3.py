@@ -3,14 +3,17 @@ import json
 import logging
 import argparse
 import requests
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 from supabase import create_client, Client
-from openai import AsyncOpenAI
 import asyncio
+from research_memo import STATMUSE as STATMUSE_MEMO, WEB as WEB_MEMO, memoized, statmuse_ok, web_ok
+from llm_gateway import get_llm_gateway
+from prediction_writer import AI_USER_ID, PredictionWriter
+from prop_columns import PropColumns
 
 # Load env from root .env
 load_dotenv(".env")
@@ -18,20 +21,9 @@ load_dotenv(".env")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("props_intelligent_v3")
 APP_TIMEZONE = os.getenv("APP_TIMEZONE", "America/New_York")
-
-@dataclass
-class FlatProp:
-    event_id: str
-    sport: str
-    player_name: str
-    stat_key: str
-    prop_label: str
-    line: float
-    bookmaker: str
-    over_odds: Optional[int]
-    under_odds: Optional[int]
-    is_alt: bool
-    player_headshot_url: Optional[str]
+PROPS_PAGE_SIZE = int(os.getenv("PROPS_PAGE_SIZE", "1000"))
+PROP_COLUMNS = ('id, event_id, sport, stat_type, main_line, best_over_odds, best_under_odds, '
+                'best_over_book, best_under_book, alt_lines, players!player_id(name, headshot_url)')
 
 @dataclass
 class ResearchInsight:
@@ -48,6 +40,11 @@ class StatMuseClient:
         self.session = requests.Session()
     
     def query(self, question: str, sport: str = "NFL") -> Dict[str, Any]:
+        # Shared research memo first: other agents may already have asked this today
+        return memoized(STATMUSE_MEMO, question, lambda: self._query_upstream(question, sport), sport=sport,
+                        pipeline="props_intelligent_v3", source="statmuse", accept=statmuse_ok)
+    
+    def _query_upstream(self, question: str, sport: str = "NFL") -> Dict[str, Any]:
         try:
             response = self.session.post(
                 f"{self.base_url}/query",
@@ -71,6 +68,10 @@ class WebSearchClient:
             logger.warning("Google Search API credentials not found. Web search will be limited.")
     
     def search(self, query: str) -> Dict[str, Any]:
+        return memoized(WEB_MEMO, query, lambda: self._search_upstream(query),
+                        pipeline="props_intelligent_v3", source="google_search", accept=web_ok)
+    
+    def _search_upstream(self, query: str) -> Dict[str, Any]:
         logger.info(f"🌐 Web search: {query}")
         
         try:
@@ -143,6 +144,7 @@ class DB:
         if not url or not key:
             raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY")
         self.client: Client = create_client(url, key)
+        self.prediction_writer = PredictionWriter(self.client)
     
     def get_games_for_date(self, target_date: datetime.date, sport_filter: Optional[str]) -> List[Dict[str, Any]]:
         # Sport filter mapping (abbreviated to full name)
@@ -194,108 +196,108 @@ class DB:
         all_games.sort(key=lambda g: g['start_time'])
         return all_games
     
-    def get_flat_props_for_games(self, target_date: datetime.date, sport_filter: Optional[str]) -> tuple[List[FlatProp], Dict[str, Dict[str, Any]]]:
+    def iter_prop_batches(self, target_date: datetime.date, sport_filter: Optional[str],
+                          page_size: int = PROPS_PAGE_SIZE) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield player_props_v2 rows for local_game_date in batches of page_size.
+        Keyset-paginated on id and limited to the columns the loader uses, so no single
+        response carries the whole slate.
+        """
+        date_str = target_date.strftime('%Y-%m-%d')
+        last_id = None
+        while True:
+            query = self.client.table('player_props_v2').select(PROP_COLUMNS).eq('local_game_date', date_str)
+            if sport_filter:
+                query = query.eq('sport', sport_filter.upper())
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            rows = query.order('id').limit(page_size).execute().data or []
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]['id']
+    
+    def _get_events(self, event_ids: List[str]) -> List[Dict[str, Any]]:
+        if not event_ids:
+            return []
+        resp = self.client.table('sports_events').select(
+            'id, home_team, away_team, start_time, sport'
+        ).in_('id', event_ids).execute()
+        return resp.data or []
+    
+    def get_flat_props_for_games(self, target_date: datetime.date, sport_filter: Optional[str]) -> tuple[PropColumns, Dict[str, Dict[str, Any]]]:
         """
         Fetch props from the fast player_props_v2 table directly by local_game_date.
         This includes main lines with alt lines from the alt_lines column.
-        Returns tuple of (props, event_map) where event_map has game metadata.
+        Returns tuple of (props, event_map) where props is columnar (PropColumns) and
+        event_map has game metadata.
         """
-        # Format date as YYYY-MM-DD string for local_game_date field
         date_str = target_date.strftime('%Y-%m-%d')
         logger.info(f"📦 Fetching props for local_game_date={date_str}")
+        if sport_filter:
+            logger.info(f"🎯 Sport filter: {sport_filter.upper()} only")
         
-        # Query player_props_v2 table directly with joins to get player and game data
-        sel = '*, players!player_id(name, headshot_url, team, position), sports_events!event_id(id, home_team, away_team, start_time, sport)'
-        
+        props = PropColumns(label_for=display_name_for_stat)
+        event_map: Dict[str, Dict[str, Any]] = {}
+        total_rows = 0
         try:
-            query = self.client.table('player_props_v2').select(sel).eq('local_game_date', date_str)
-            
-            # Apply sport filter if provided
-            if sport_filter:
-                query = query.eq('sport', sport_filter.upper())
-                logger.info(f"🎯 Sport filter: {sport_filter.upper()} only")
-            
-            resp = query.execute()
-            rows = resp.data or []
-            logger.info(f"✅ Retrieved {len(rows)} props for {date_str}")
+            for rows in self.iter_prop_batches(target_date, sport_filter):
+                total_rows += len(rows)
+                
+                # Game metadata for events first seen in this batch (one small query per batch)
+                new_event_ids = list({str(r['event_id']) for r in rows if r.get('event_id')} - event_map.keys())
+                for event in self._get_events(new_event_ids):
+                    event_map[str(event['id'])] = event
+                
+                for r in rows:
+                    try:
+                        self._append_prop_row(props, r)
+                    except Exception as e:
+                        logger.warning(f"Failed to parse prop: {e}")
+            logger.info(f"✅ Retrieved {total_rows} props for {date_str}")
         except Exception as e:
             logger.error(f"❌ Error fetching props: {e}")
-            rows = []
         
-        logger.info(f"🎯 Total props retrieved: {len(rows)}")
-        props: List[FlatProp] = []
-        event_map: Dict[str, Dict[str, Any]] = {}
-        for r in rows:
-            try:
-                # Extract joined data
-                player_data = r.get('players') or {}
-                player_name = player_data.get('name') or 'Unknown'
-                headshot_url = player_data.get('headshot_url')
-                
-                # Build event map from joined sports_events data
-                event_data = r.get('sports_events')
-                if event_data and r.get('event_id'):
-                    event_id = str(r['event_id'])
-                    if event_id not in event_map:
-                        event_map[event_id] = {
-                            'id': event_data.get('id'),
-                            'home_team': event_data.get('home_team'),
-                            'away_team': event_data.get('away_team'),
-                            'start_time': event_data.get('start_time'),
-                            'sport': event_data.get('sport')
-                        }
-                
-                # Add main line
-                if r.get('best_over_odds') or r.get('best_under_odds'):
-                    # Filter odds between -300 and +300
-                    over_odds = r.get('best_over_odds')
-                    under_odds = r.get('best_under_odds')
-                    if (over_odds and -300 <= over_odds <= 300) or (under_odds and -300 <= under_odds <= 300):
+        logger.info(f"🎯 Total props retrieved: {total_rows} ({len(props)} lines, {props.nbytes() / 1024:.0f} KB columnar)")
+        return props, event_map
+    
+    @staticmethod
+    def _append_prop_row(props: PropColumns, r: Dict[str, Any]) -> None:
+        player_data = r.get('players') or {}
+        player_name = player_data.get('name') or 'Unknown'
+        headshot_url = player_data.get('headshot_url')
+        sport = (r.get('sport') or '').upper()
+        stat_key = r.get('stat_type') or ''
+        
+        # Add main line
+        if r.get('best_over_odds') or r.get('best_under_odds'):
+            # Filter odds between -300 and +300
+            over_odds = r.get('best_over_odds')
+            under_odds = r.get('best_under_odds')
+            if (over_odds and -300 <= over_odds <= 300) or (under_odds and -300 <= under_odds <= 300):
+                props.append(
+                    r['event_id'], sport, player_name, headshot_url, stat_key,
+                    float(r.get('main_line', 0)),
+                    (r.get('best_over_book') or r.get('best_under_book') or 'fanduel').lower(),
+                    over_odds, under_odds, is_alt=False,
+                )
+        
+        # Add alt lines if available
+        alt_lines = r.get('alt_lines')
+        if alt_lines and isinstance(alt_lines, list):
+            for alt in alt_lines[:3]:  # Limit alt lines per player/prop
+                if isinstance(alt, dict):
+                    alt_over_odds = alt.get('over_odds')
+                    alt_under_odds = alt.get('under_odds')
+                    # Filter alt line odds
+                    if (alt_over_odds and -250 <= alt_over_odds <= 250) or (alt_under_odds and -250 <= alt_under_odds <= 250):
                         props.append(
-                            FlatProp(
-                                event_id=r['event_id'],
-                                sport=(r.get('sport') or '').upper(),
-                                player_name=player_name,
-                                stat_key=r.get('stat_type') or '',
-                                prop_label=display_name_for_stat(r.get('stat_type') or ''),
-                                line=float(r.get('main_line', 0)),
-                                bookmaker=(r.get('best_over_book') or r.get('best_under_book') or 'fanduel').lower(),
-                                over_odds=int(over_odds) if over_odds is not None else None,
-                                under_odds=int(under_odds) if under_odds is not None else None,
-                                is_alt=False,
-                                player_headshot_url=headshot_url
-                            )
+                            r['event_id'], sport, player_name, headshot_url, stat_key,
+                            float(alt.get('line', 0)),
+                            (alt.get('bookmaker') or 'fanduel').lower(),
+                            alt_over_odds, alt_under_odds, is_alt=True,
                         )
-                
-                # Add alt lines if available
-                if r.get('alt_lines'):
-                    alt_lines = r['alt_lines']
-                    if isinstance(alt_lines, list):
-                        for alt in alt_lines[:3]:  # Limit alt lines per player/prop
-                            if isinstance(alt, dict):
-                                alt_over_odds = alt.get('over_odds')
-                                alt_under_odds = alt.get('under_odds')
-                                # Filter alt line odds
-                                if (alt_over_odds and -250 <= alt_over_odds <= 250) or (alt_under_odds and -250 <= alt_under_odds <= 250):
-                                    props.append(
-                                        FlatProp(
-                                            event_id=r['event_id'],
-                                            sport=(r.get('sport') or '').upper(),
-                                            player_name=player_name,
-                                            stat_key=r.get('stat_type') or '',
-                                            prop_label=display_name_for_stat(r.get('stat_type') or ''),
-                                            line=float(alt.get('line', 0)),
-                                            bookmaker=(alt.get('bookmaker') or 'fanduel').lower(),
-                                            over_odds=int(alt_over_odds) if alt_over_odds is not None else None,
-                                            under_odds=int(alt_under_odds) if alt_under_odds is not None else None,
-                                            is_alt=True,
-                                            player_headshot_url=headshot_url
-                                        )
-                                    )
-            except Exception as e:
-                logger.warning(f"Failed to parse prop: {e}")
-                continue
-        return props, event_map
     
     def get_bookmaker_logos(self) -> Dict[str, Dict[str, str]]:
         resp = self.client.table('bookmaker_logos').select('*').execute()
@@ -318,7 +320,7 @@ class DB:
         return logos
     
     def store_predictions(self, picks: List[Dict[str, Any]], event_map: Dict[str, Dict[str, Any]]) -> None:
-        stored_count = 0
+        rows = []
         for p in picks:
             event = event_map.get(str(p.get('event_id')))
             game_info = None
@@ -329,14 +331,14 @@ class DB:
             
             metadata = p.pop('metadata', {})
             row = {
-                'user_id': 'c19a5e12-4297-4b0f-8d21-39d2bb1a2c08',
+                'user_id': AI_USER_ID,
                 'confidence': p.get('confidence', 0),
                 'pick': p.get('pick', ''),
                 'odds': str(p.get('odds', 0)),
                 'sport': sport,
                 'event_time': event.get('start_time') if event else None,
                 'bet_type': 'player_prop',
-                'game_id': str(p.get('event_id', '')),
+                'game_id': str(p['event_id']) if p.get('event_id') else None,
                 'match_teams': game_info,
                 'reasoning': p.get('reasoning', ''),
                 'line_value': p.get('line', 0),
@@ -353,14 +355,10 @@ class DB:
                 'status': 'pending',
                 'metadata': metadata,
             }
-            row = {k: v for k, v in row.items() if v is not None}
-            try:
-                self.client.table('ai_predictions').insert(row).execute()
-                stored_count += 1
-                logger.info(f"Stored pick {stored_count}/{len(picks)}: {row.get('pick', 'Unknown')}")
-            except Exception as e:
-                logger.error(f"Failed to store pick: {e}")
-        logger.info(f"Successfully stored {stored_count}/{len(picks)} predictions")
+            rows.append(row)
+        
+        # Keep the generator's pick order; None values are dropped by the writer
+        self.prediction_writer.write(rows, sport_order=None)
     
     @staticmethod
     def _abbr_sport(full: str) -> str:
@@ -403,7 +401,7 @@ class Agent:
         self.db = DB()
         self.statmuse = StatMuseClient()
         self.web_search = WebSearchClient()
-        self.llm = AsyncOpenAI(api_key=os.getenv('XAI_API_KEY'), base_url='https://api.x.ai/v1')
+        self.llm = get_llm_gateway()
     
     async def run(self, target_date: datetime.date, picks_target: int, sport_filter: Optional[str]) -> None:
         logger.info(f"🚀 Starting intelligent props generation for {target_date}")
@@ -422,8 +420,8 @@ class Agent:
         logger.info(f"Found {len(games)} games with props for {target_date}")
         
         # Count main vs alt
-        main_count = sum(1 for p in props if not p.is_alt)
-        alt_count = sum(1 for p in props if p.is_alt)
+        alt_count = props.alt_count()
+        main_count = len(props) - alt_count
         logger.info(f"  Main lines: {main_count}, Alt lines: {alt_count}")
         
         # INTELLIGENT PROP SELECTION
@@ -440,12 +438,13 @@ class Agent:
         
         picks = await self.generate_picks_with_research(props, games, insights, picks_target, logos, league_logos, event_map)
         logger.info(f"Generated {len(picks)} picks")
+        self.llm.log_summary()
         
         if picks:
             self.db.store_predictions(picks, event_map)
             logger.info(f"✅ Successfully stored {len(picks)} player prop predictions")
     
-    async def create_intelligent_research_plan(self, props: List[FlatProp], games: List[Dict], picks_target: int) -> Dict[str, Any]:
+    async def create_intelligent_research_plan(self, props: PropColumns, games: List[Dict], picks_target: int) -> Dict[str, Any]:
         """
         Use AI to intelligently select which props/players to research.
         CRITICAL: Focuses on props with REAL VALUE and research opportunities.
@@ -457,24 +456,27 @@ class Agent:
         seen_players = set()
         sport_distribution = {}
         
-        for prop in props[:300]:  # Analyze more props for better diversity
-            sport = prop.sport
+        for row in range(min(300, len(props))):  # Analyze more props for better diversity
+            sport = props.string(props.sport[row])
             sport_distribution[sport] = sport_distribution.get(sport, 0) + 1
             
-            if prop.player_name not in seen_players and len(prop_sample) < 80:
+            player = props.player[row]
+            if player not in seen_players and len(prop_sample) < 80:
                 # Only include props with reasonable odds
-                if prop.over_odds and -250 <= prop.over_odds <= 250:
+                over_odds = props.odds(row, 'over')
+                if over_odds and -250 <= over_odds <= 250:
+                    prop = props.record(row)
                     prop_sample.append({
-                        "player": prop.player_name,
-                        "sport": prop.sport,
-                        "prop_type": prop.prop_label,
-                        "line": prop.line,
-                        "is_alt": prop.is_alt,
-                        "over_odds": prop.over_odds,
-                        "under_odds": prop.under_odds,
-                        "bookmaker": prop.bookmaker
+                        "player": prop['player'],
+                        "sport": prop['sport'],
+                        "prop_type": prop['prop_type'],
+                        "line": prop['line'],
+                        "is_alt": prop['is_alt'],
+                        "over_odds": prop['over_odds'],
+                        "under_odds": prop['under_odds'],
+                        "bookmaker": prop['bookmaker']
                     })
-                    seen_players.add(prop.player_name)
+                    seen_players.add(player)
         
         logger.info(f"📊 Sport distribution in props: {sport_distribution}")
         
@@ -537,14 +539,9 @@ Return JSON:
 }}"""
         
         try:
-            response = await self.llm.chat.completions.create(
-                model='grok-4-0709',
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=3000
-            )
-            
-            text = response.choices[0].message.content.strip()
+            text = (await self.llm.chat(
+                prompt, stage='research_plan', model='grok-4-0709', temperature=0.3, max_tokens=3000, cache=True
+            )).strip()
             start = text.find('{')
             end = text.rfind('}') + 1
             plan = json.loads(text[start:end])
@@ -554,9 +551,9 @@ Return JSON:
             logger.error(f"Failed to create intelligent research plan: {e}")
             return self._fallback_research_plan(props)
     
-    def _fallback_research_plan(self, props: List[FlatProp]) -> Dict[str, Any]:
+    def _fallback_research_plan(self, props: PropColumns) -> Dict[str, Any]:
         """Fallback if AI planning fails"""
-        players = list(set(p.player_name for p in props))[:10]
+        players = props.player_names()[:10]
         return {
             "analysis": "Fallback research plan",
             "statmuse_queries": [
@@ -627,7 +624,7 @@ Return JSON:
     
     async def generate_picks_with_research(
         self,
-        props: List[FlatProp],
+        props: PropColumns,
         games: List[Dict],
         insights: List[ResearchInsight],
         picks_target: int,
@@ -648,24 +645,25 @@ Return JSON:
             })
         
         props_payload = []
-        for pr in props[:500]:  # Cap for prompt size
+        for row in range(min(500, len(props))):  # Cap for prompt size
             # Skip props with null odds - AI can't pick them anyway
-            if pr.over_odds is None and pr.under_odds is None:
+            if not props.has_odds(row):
                 continue
             
+            pr = props.record(row)
             props_payload.append({
-                'event_id': pr.event_id,
-                'sport': pr.sport,
-                'player': pr.player_name,
-                'prop_type': pr.prop_label,
-                'stat_key': pr.stat_key,
-                'line': pr.line,
-                'bookmaker': pr.bookmaker,
-                'bookmaker_logo_url': logos.get(pr.bookmaker.lower(), {}).get('logo_url'),
-                'over_odds': pr.over_odds,
-                'under_odds': pr.under_odds,
-                'is_alt': pr.is_alt,
-                'player_headshot_url': pr.player_headshot_url,
+                'event_id': pr['event_id'],
+                'sport': pr['sport'],
+                'player': pr['player'],
+                'prop_type': pr['prop_type'],
+                'stat_key': pr['stat_key'],
+                'line': pr['line'],
+                'bookmaker': pr['bookmaker'],
+                'bookmaker_logo_url': logos.get(pr['bookmaker'].lower(), {}).get('logo_url'),
+                'over_odds': pr['over_odds'],
+                'under_odds': pr['under_odds'],
+                'is_alt': pr['is_alt'],
+                'player_headshot_url': pr['player_headshot_url'],
             })
         
         logger.info(f"📊 Prepared {len(props_payload)} props for AI (filtered from {len(props)} total)")
@@ -859,13 +857,10 @@ RESPOND WITH ONLY JSON ARRAY (no other text):
     
     async def _call_llm(self, prompt: str) -> List[Dict[str, Any]]:
         try:
-            resp = await self.llm.chat.completions.create(
-                model='grok-4-0709',
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
+            text = (await self.llm.chat(
+                prompt, stage='picks', model='grok-4-0709', temperature=0.1,
                 max_tokens=12000  # Larger for detailed reasoning
-            )
-            text = resp.choices[0].message.content.strip()
+            )).strip()
             logger.info(f"AI response length: {len(text)} chars")
             
             start = text.find('[')
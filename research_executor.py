@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Research Executor
+Concurrent StatMuse + web-search execution for the agents' research stages.
+
+Shared by IntelligentPlayerPropsAgent (props_enhanced.py) and IntelligentTeamsAgent
+(teams_enhanced.py). Items run concurrently under a semaphore and per-source token
+buckets, each with its own timeout, and a whole stage can be given a deadline after
+which unfinished items are cancelled and dropped.
+
+The semaphore and token buckets belong to the executor (one set per event loop), not
+to a run, so agents that share an executor (main.py runs the props and teams agents
+concurrently) share one concurrency/rate budget per upstream.
+
+The StatMuse/web clients are synchronous (requests), so calls run in worker threads
+via asyncio.to_thread and never block the event loop. A cancelled item stops being
+awaited immediately; its worker thread finishes in the background.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATMUSE = "statmuse"
+WEB = "web"
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class ResearchItem:
+    kind: str  # STATMUSE or WEB
+    query: str
+    source: str
+    confidence: float
+    priority: str = "medium"
+    sport: Optional[str] = None
+    reasoning: str = ""
+
+    @classmethod
+    def from_plan(cls, obj: Any, kind: str, source: str, confidence_by_priority: Dict[str, float],
+                  default_confidence: float = 0.5) -> "ResearchItem":
+        """Build an item from a plan entry, which is either a dict or a bare query string"""
+        if isinstance(obj, dict):
+            query = obj.get("query", "")
+            priority = obj.get("priority", "medium")
+            sport = obj.get("sport") if kind == STATMUSE else None
+            reasoning = obj.get("reasoning", "")
+        else:
+            query, priority, sport, reasoning = obj, "medium", None, ""
+        return cls(
+            kind=kind,
+            query=query,
+            source=source,
+            confidence=confidence_by_priority.get(priority, default_confidence),
+            priority=priority,
+            sport=sport,
+            reasoning=reasoning,
+        )
+
+
+@dataclass
+class ResearchResult:
+    item: ResearchItem
+    data: Dict[str, Any]
+    latency: float
+    timestamp: datetime
+
+
+class ResearchExecutor:
+    """Run a stage's research items concurrently with rate limits, timeouts and a deadline"""
+
+    def __init__(self, statmuse_query: Callable[..., Dict[str, Any]], web_search: Callable[..., Dict[str, Any]],
+                 max_concurrency: Optional[int] = None, statmuse_rate: Optional[float] = None,
+                 web_rate: Optional[float] = None, item_timeout: Optional[float] = None,
+                 stage_timeout: Optional[float] = None):
+        self.statmuse_query = statmuse_query
+        self.web_search = web_search
+        self.max_concurrency = max_concurrency or int(os.getenv("RESEARCH_MAX_CONCURRENCY", "6"))
+        self.item_timeout = item_timeout or float(os.getenv("RESEARCH_ITEM_TIMEOUT", "35"))
+        self.stage_timeout = stage_timeout or float(os.getenv("RESEARCH_STAGE_TIMEOUT", "120"))
+        self._rates = {
+            STATMUSE: statmuse_rate if statmuse_rate is not None else float(os.getenv("RESEARCH_STATMUSE_RPS", "4")),
+            WEB: web_rate if web_rate is not None else float(os.getenv("RESEARCH_WEB_RPS", "2")),
+        }
+        self._limits_loop = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._limits_owner: Optional["ResearchExecutor"] = None
+
+    def share_limits(self, owner: "ResearchExecutor"):
+        """Run under owner's concurrency and rate limits (one budget for several agents)"""
+        self._limits_owner = owner
+        self.max_concurrency = owner.max_concurrency
+
+    def _limits(self):
+        """Semaphore + per-source buckets, created once per event loop they are used on"""
+        if self._limits_owner is not None:
+            return self._limits_owner._limits()
+        loop = asyncio.get_running_loop()
+        if self._limits_loop is not loop:
+            self._limits_loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._buckets = {kind: TokenBucket(rate) for kind, rate in self._rates.items()}
+        return self._semaphore, self._buckets
+
+    async def run(self, items: List[ResearchItem], deadline: Optional[float] = None) -> List[ResearchResult]:
+        """Execute items concurrently; returns accepted results in input order.
+
+        `deadline` is the stage budget in seconds (defaults to stage_timeout). Items still
+        running when it expires are cancelled and left out of the results.
+        """
+        items = [item for item in items if item.query]
+        if not items:
+            return []
+
+        semaphore, buckets = self._limits()
+        budget = deadline if deadline is not None else self.stage_timeout
+        started = time.monotonic()
+
+        tasks = [asyncio.create_task(self._run_item(item, semaphore, buckets)) for item in items]
+        done, pending = await asyncio.wait(tasks, timeout=budget)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            logger.warning(f"⏱️ Research stage deadline ({budget:g}s) hit - cancelled {len(pending)} of {len(items)} items")
+
+        results = [task.result() for task in tasks if task in done and task.result() is not None]
+        logger.info(
+            f"⚡ Research stage finished: {len(results)}/{len(items)} items in {time.monotonic() - started:.1f}s "
+            f"(concurrency {self.max_concurrency})"
+        )
+        return results
+
+    async def _run_item(self, item: ResearchItem, semaphore: asyncio.Semaphore,
+                        buckets: Dict[str, TokenBucket]) -> Optional[ResearchResult]:
+        async with semaphore:
+            await buckets[item.kind].acquire()
+
+            if item.kind == STATMUSE:
+                logger.info(f"🔍 StatMuse query ({item.priority}): {item.query} [sport: {item.sport}]")
+                call = lambda: self.statmuse_query(item.query, sport=item.sport, confidence=item.confidence)
+            else:
+                logger.info(f"🌐 Web search ({item.priority}): {item.query}")
+                call = lambda: self.web_search(item.query, confidence=item.confidence)
+            if item.reasoning:
+                logger.info(f"   Reasoning: {item.reasoning}")
+
+            started = time.monotonic()
+            try:
+                data = await asyncio.wait_for(asyncio.to_thread(call), self.item_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⏱️ {item.source} timed out after {self.item_timeout:g}s: {item.query}")
+                return None
+            except Exception as e:
+                logger.error(f"❌ {item.source} failed for '{item.query}': {e}")
+                return None
+            latency = time.monotonic() - started
+
+        # Only missing or error payloads are dropped; an empty-but-successful search is kept
+        # so the agent still sees that the query found nothing
+        if data is None or (isinstance(data, dict) and "error" in data):
+            logger.warning(f"❌ StatMuse query failed: {data}" if item.kind == STATMUSE else f"❌ Web search failed: {item.query}")
+            return None
+
+        if item.kind == STATMUSE:
+            result_preview = str(data)[:200] + "..." if len(str(data)) > 200 else str(data)
+            logger.info(f"📊 StatMuse result ({latency:.1f}s): {result_preview}")
+
+        return ResearchResult(item=item, data=data, latency=latency, timestamp=datetime.now())
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Research Memo
+Cross-agent memo of StatMuse answers and web searches, with provenance and freshness.
+
+The props agent, teams agent, enhanced_insights.py and daily_ai_report.py research the
+same players and teams on the same day. Every StatMuseClient / WebSearchClient consults
+this store before going upstream:
+
+- key: kind (statmuse/web) + normalized query + sport + as-of date (US Eastern), so a
+  memo never outlives the day it was researched for
+- value: the answer as returned upstream, plus source, fetch time and confidence
+- freshness: entries older than RESEARCH_MEMO_MAX_AGE_STATMUSE / _WEB seconds are
+  refetched (web results go stale faster than season stats)
+- tiers: local SQLite (WAL, shared by every process on the host) and, when
+  RESEARCH_MEMO_REDIS_URL is set, a Redis tier shared across hosts
+- hit/miss counters per pipeline and day, for the CLI
+
+CLI:
+    python research_memo.py stats [--date YYYY-MM-DD] [--days N]
+    python research_memo.py show "query" [--sport NFL] [--kind statmuse]
+    python research_memo.py purge [--older-than-days N]
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import tempfile
+import argparse
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+STATMUSE = "statmuse"
+WEB = "web"
+
+AS_OF_TIMEZONE = ZoneInfo(os.getenv("RESEARCH_MEMO_TIMEZONE", "America/New_York"))
+MAX_AGE_SECONDS = {
+    STATMUSE: float(os.getenv("RESEARCH_MEMO_MAX_AGE_STATMUSE", str(12 * 3600))),
+    WEB: float(os.getenv("RESEARCH_MEMO_MAX_AGE_WEB", str(2 * 3600))),
+}
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), "research_memo.sqlite3")
+
+_NON_WORD = re.compile(r"[^\w\s'.-]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case, punctuation and whitespace-insensitive form of a research query"""
+    return _WHITESPACE.sub(" ", _NON_WORD.sub(" ", (query or "").lower())).strip()
+
+
+def today_as_of() -> str:
+    return datetime.now(AS_OF_TIMEZONE).date().isoformat()
+
+
+def memo_key(kind: str, query: str, sport: Optional[str], as_of: str) -> str:
+    raw = "|".join((kind, normalize_query(query), (sport or "").upper(), as_of))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Memo:
+    kind: str
+    query: str
+    sport: Optional[str]
+    as_of: str
+    answer: Dict[str, Any]
+    source: str
+    fetched_at: float
+    confidence: Optional[float]
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.fetched_at
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__, default=str)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Memo":
+        return cls(**json.loads(raw))
+
+
+class _RedisTier:
+    def __init__(self, url: str):
+        import redis
+        self.client = redis.from_url(url, decode_responses=True, socket_timeout=1)
+        self.client.ping()
+
+    def get(self, key: str) -> Optional[Memo]:
+        raw = self.client.get(f"research_memo:{key}")
+        return Memo.from_json(raw) if raw else None
+
+    def set(self, key: str, memo: Memo, ttl: float):
+        self.client.set(f"research_memo:{key}", memo.to_json(), ex=max(1, int(ttl)))
+
+
+class ResearchMemoStore:
+    """SQLite memo (+ optional Redis) consulted by every research client"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, redis_url: Optional[str] = None):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS research_memo (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                query TEXT NOT NULL,
+                sport TEXT,
+                as_of TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                source TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                confidence REAL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_research_memo_as_of ON research_memo(as_of)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS research_memo_stats (
+                as_of TEXT NOT NULL,
+                pipeline TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (as_of, pipeline, kind)
+            )
+            """
+        )
+
+        self.redis: Optional[_RedisTier] = None
+        if redis_url:
+            try:
+                self.redis = _RedisTier(redis_url)
+                logger.info("✅ Research memo Redis tier connected")
+            except Exception as e:
+                logger.warning(f"⚠️ Research memo Redis tier unavailable, using SQLite only: {e}")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _record(self, as_of: str, pipeline: str, kind: str, hit: bool):
+        column = "hits" if hit else "misses"
+        try:
+            self._conn().execute(
+                f"INSERT INTO research_memo_stats (as_of, pipeline, kind, {column}) VALUES (?, ?, ?, 1) "
+                f"ON CONFLICT(as_of, pipeline, kind) DO UPDATE SET {column} = {column} + 1",
+                (as_of, pipeline, kind),
+            )
+        except sqlite3.Error as e:
+            logger.debug(f"Research memo stats write failed: {e}")
+
+    def get(self, kind: str, query: str, sport: Optional[str] = None, pipeline: str = "unknown",
+            as_of: Optional[str] = None) -> Optional[Memo]:
+        """Fresh memo for the query, or None (counted as a miss for `pipeline`)"""
+        as_of = as_of or today_as_of()
+        key = memo_key(kind, query, sport, as_of)
+        memo = None
+        try:
+            row = self._conn().execute(
+                "SELECT kind, query, sport, as_of, answer, source, fetched_at, confidence FROM research_memo WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row:
+                memo = Memo(row[0], row[1], row[2], row[3], json.loads(row[4]), row[5], row[6], row[7])
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Research memo read failed: {e}")
+
+        if memo is None and self.redis:
+            try:
+                memo = self.redis.get(key)
+            except Exception as e:
+                logger.debug(f"Research memo Redis read failed: {e}")
+
+        if memo is not None and memo.age_seconds > MAX_AGE_SECONDS.get(kind, 0):
+            memo = None
+        self._record(as_of, pipeline, kind, memo is not None)
+        return memo
+
+    def put(self, kind: str, query: str, sport: Optional[str], answer: Dict[str, Any], source: str,
+            confidence: Optional[float] = None, as_of: Optional[str] = None) -> Memo:
+        as_of = as_of or today_as_of()
+        memo = Memo(kind, query, (sport or "").upper() or None, as_of, answer, source, time.time(), confidence)
+        key = memo_key(kind, query, sport, as_of)
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO research_memo (key, kind, query, sport, as_of, answer, source, fetched_at, confidence) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, kind, query, memo.sport, as_of, json.dumps(answer, default=str), source, memo.fetched_at, confidence),
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Research memo write failed: {e}")
+        if self.redis:
+            try:
+                self.redis.set(key, memo, MAX_AGE_SECONDS.get(kind, 3600))
+            except Exception as e:
+                logger.debug(f"Research memo Redis write failed: {e}")
+        return memo
+
+    def fetch(self, kind: str, query: str, fetch: Callable[[], Any], sport: Optional[str] = None,
+              pipeline: str = "unknown", source: str = "", confidence: Optional[float] = None,
+              accept: Callable[[Any], bool] = bool) -> Any:
+        """Memoized answer if fresh, else fetch() upstream and memo the result when accept(result)"""
+        memo = self.get(kind, query, sport, pipeline)
+        if memo is not None:
+            logger.info(f"🧠 Research memo hit ({kind}, {memo.age_seconds / 60:.0f}m old, via {memo.source}): {query}")
+            return memo.answer
+        result = fetch()
+        if accept(result):
+            self.put(kind, query, sport, result, source or kind, confidence)
+        return result
+
+    # --- inspection (CLI) ---
+
+    def stats(self, since: str, until: str) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT pipeline, kind, SUM(hits), SUM(misses) FROM research_memo_stats "
+            "WHERE as_of BETWEEN ? AND ? GROUP BY pipeline, kind ORDER BY pipeline, kind",
+            (since, until),
+        ).fetchall()
+        return [{"pipeline": r[0], "kind": r[1], "hits": r[2], "misses": r[3]} for r in rows]
+
+    def find(self, query: str, sport: Optional[str] = None, kind: Optional[str] = None) -> List[Memo]:
+        normalized = normalize_query(query)
+        sql = "SELECT kind, query, sport, as_of, answer, source, fetched_at, confidence FROM research_memo WHERE 1=1"
+        params: List[Any] = []
+        if sport:
+            sql += " AND sport = ?"
+            params.append(sport.upper())
+        if kind:
+            sql += " AND kind = ?"
+            params.append(kind)
+        rows = self._conn().execute(sql + " ORDER BY fetched_at DESC", params).fetchall()
+        return [Memo(r[0], r[1], r[2], r[3], json.loads(r[4]), r[5], r[6], r[7])
+                for r in rows if normalize_query(r[1]) == normalized]
+
+    def purge(self, before: str) -> int:
+        conn = self._conn()
+        deleted = conn.execute("DELETE FROM research_memo WHERE as_of < ?", (before,)).rowcount
+        conn.execute("DELETE FROM research_memo_stats WHERE as_of < ?", (before,))
+        return deleted
+
+
+def statmuse_ok(result: Any) -> bool:
+    """Worth memoizing: a StatMuse answer, not an error payload"""
+    return isinstance(result, dict) and bool(result) and "error" not in result and result.get("success", True) is not False
+
+
+def web_ok(result: Any) -> bool:
+    """Worth memoizing: real search results, not the 'search unavailable' fallback"""
+    if not isinstance(result, dict) or not result.get("results"):
+        return False
+    return all(item.get("source") != "Fallback" for item in result["results"] if isinstance(item, dict))
+
+
+_store: Optional[ResearchMemoStore] = None
+_store_lock = threading.Lock()
+
+
+def get_memo_store() -> Optional[ResearchMemoStore]:
+    """Process-wide store from env (None when RESEARCH_MEMO_ENABLED=false or unusable)"""
+    global _store
+    if os.getenv("RESEARCH_MEMO_ENABLED", "true").lower() != "true":
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = ResearchMemoStore(
+                    os.getenv("RESEARCH_MEMO_DB", DEFAULT_DB_PATH),
+                    redis_url=os.getenv("RESEARCH_MEMO_REDIS_URL"),
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Research memo unavailable, querying upstream directly: {e}")
+                return None
+        return _store
+
+
+def memoized(kind: str, query: str, fetch: Callable[[], Any], sport: Optional[str] = None,
+             pipeline: str = "unknown", source: str = "", accept: Callable[[Any], bool] = bool,
+             confidence: Optional[float] = None) -> Any:
+    """Route a research call through the memo store when it is available"""
+    store = get_memo_store()
+    if store is None:
+        return fetch()
+    return store.fetch(kind, query, fetch, sport=sport, pipeline=pipeline, source=source,
+                       confidence=confidence, accept=accept)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the cross-agent research memo")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    stats_parser = sub.add_parser("stats", help="Hit rates per pipeline")
+    stats_parser.add_argument("--date", help="Last as-of date to include (default: today, US Eastern)")
+    stats_parser.add_argument("--days", type=int, default=1, help="Number of days to include")
+
+    show_parser = sub.add_parser("show", help="Memos stored for a query")
+    show_parser.add_argument("query")
+    show_parser.add_argument("--sport")
+    show_parser.add_argument("--kind", choices=[STATMUSE, WEB])
+
+    purge_parser = sub.add_parser("purge", help="Delete old memos and stats")
+    purge_parser.add_argument("--older-than-days", type=int, default=7)
+
+    args = parser.parse_args()
+    store = ResearchMemoStore(os.getenv("RESEARCH_MEMO_DB", DEFAULT_DB_PATH))
+
+    if args.command == "stats":
+        until = date.fromisoformat(args.date) if args.date else date.fromisoformat(today_as_of())
+        since = until - timedelta(days=args.days - 1)
+        rows = store.stats(since.isoformat(), until.isoformat())
+        print(f"📊 Research memo hit rates {since} .. {until}")
+        if not rows:
+            print("  (no lookups recorded)")
+        total_hits = total_lookups = 0
+        for row in rows:
+            lookups = row["hits"] + row["misses"]
+            total_hits += row["hits"]
+            total_lookups += lookups
+            print(f"  {row['pipeline']:<22} {row['kind']:<9} {row['hits']:>6} hits / {lookups:>6} lookups "
+                  f"({row['hits'] / lookups:.0%})")
+        if total_lookups:
+            print(f"  {'TOTAL':<32} {total_hits:>6} hits / {total_lookups:>6} lookups "
+                  f"({total_hits / total_lookups:.0%}) - {total_hits} upstream calls saved")
+    elif args.command == "show":
+        memos = store.find(args.query, args.sport, args.kind)
+        if not memos:
+            print("No memos for that query")
+        for memo in memos:
+            fetched = datetime.fromtimestamp(memo.fetched_at).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"🧠 [{memo.kind}] {memo.query} (sport={memo.sport}, as_of={memo.as_of}, "
+                  f"source={memo.source}, fetched={fetched}, confidence={memo.confidence})")
+            print(f"   {json.dumps(memo.answer, default=str)[:500]}")
+    elif args.command == "purge":
+        before = (date.fromisoformat(today_as_of()) - timedelta(days=args.older_than_days)).isoformat()
+        print(f"🗑️ Deleted {store.purge(before)} memos with as_of before {before}")
+
+
+if __name__ == "__main__":
+    main()
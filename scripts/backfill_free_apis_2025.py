@@ -20,7 +20,12 @@ from dotenv import load_dotenv
 import time
 import unicodedata
 import re
-import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from player_resolver import PlayerResolver
+from stat_writer import GameStatsWriter
+from job_runner import JobRunner, add_job_arguments, job_options
+import http_fetch
 
 # Load environment variables
 load_dotenv()
@@ -76,12 +81,12 @@ TEAM_ABBRS = [
 def build_nhl_roster_index(season: str) -> Dict[str, Dict[str, str]]:
     """Fetch all team rosters and build name-> {id, team} index using api-web.nhle.com."""
     index: Dict[str, Dict[str, str]] = {}
-    for abbr in TEAM_ABBRS:
-        url = f"https://api-web.nhle.com/v1/roster/{abbr}/{season}"
+    rosters = http_fetch.get_json_many([f"https://api-web.nhle.com/v1/roster/{abbr}/{season}" for abbr in TEAM_ABBRS])
+    for abbr, data in zip(TEAM_ABBRS, rosters):
+        if data is None:
+            logger.warning(f"Failed roster fetch for {abbr}")
+            continue
         try:
-            resp = requests.get(url, timeout=15)
-            resp.raise_for_status()
-            data = resp.json() or {}
             for group in ['forwards', 'defensemen', 'goalies']:
                 for p in data.get(group, []) or []:
                     first = (p.get('firstName', {}) or {}).get('default', '')
@@ -96,98 +101,52 @@ def build_nhl_roster_index(season: str) -> Dict[str, Dict[str, str]]:
     logger.info(f"Built NHL roster index: {len(index)} players")
     return index
 
+_resolvers: Dict[str, PlayerResolver] = {}
+
+def player_resolver(sport: str) -> PlayerResolver:
+    """All players of a sport, loaded once per run (see player_resolver.py)"""
+    if sport not in _resolvers:
+        _resolvers[sport] = PlayerResolver.load(supabase, sport)
+    return _resolvers[sport]
+
 def get_or_create_player(name: str, team: str, sport: str, position: str = None, external_id: str = None) -> Optional[str]:
     """Get existing player or create new one"""
     try:
-        # Try to find existing player
-        query = supabase.table('players').select('id').eq('name', name).eq('sport', sport)
-        if team:
-            query = query.eq('team', team)
-        
-        existing = query.execute()
-        
-        if existing.data:
-            return existing.data[0]['id']
+        resolver = player_resolver(sport)
+        existing = resolver.match(name, team, external_id)
+        if existing is None:
+            return resolver.get_or_create(name, team, position, external_id)
 
-        # If we have an external_id, prefer linking to the existing record by external_player_id
-        if external_id:
-            by_ext = supabase.table('players').select('id').eq('external_player_id', external_id).execute()
-            if by_ext.data:
-                pid = by_ext.data[0]['id']
-                try:
-                    # Keep canonical record up to date
-                    supabase.table('players').update({
-                        'name': name,
-                        'player_name': name,
-                        'team': team,
-                        'position': position,
-                        'active': True
-                    }).eq('id', pid).execute()
-                except Exception:
-                    pass
-                return pid
-        
-        # Create new player
-        player_key = f"{sport.lower()}_{name.lower().replace(' ', '_')}_{team.lower().replace(' ', '_')}"
-        external_player_id = external_id if external_id else f"{sport.lower()}_{name.lower().replace(' ', '_')}"
-        
-        player_data = {
-            'name': name,
-            'player_name': name,  # Required field - same as name
-            'team': team,
-            'sport': sport,
-            'position': position,
-            'active': True,
-            'external_player_id': external_player_id,
-            'player_key': player_key
-        }
-        
-        result = supabase.table('players').insert(player_data).execute()
-        if result.data:
-            logger.info(f"Created new {sport} player: {name} ({team})")
-            return result.data[0]['id']
-        
-        return None
+        pid = existing['id']
+        # Matched by external id under another name/team: keep canonical record up to date
+        if external_id and (existing.get('name') != name or existing.get('team') != team):
+            try:
+                supabase.table('players').update({
+                    'name': name,
+                    'player_name': name,
+                    'team': team,
+                    'position': position,
+                    'active': True
+                }).eq('id', pid).execute()
+                existing.update({'name': name, 'team': team, 'position': position})
+            except Exception:
+                pass
+        return pid
     except Exception as e:
         logger.error(f"Error getting/creating player {name}: {str(e)}")
         return None
 
+# Rows are buffered and upserted in chunks on (player_id, game, stat source) (see stat_writer.py)
+stats_writer = GameStatsWriter(supabase)
+CHECKPOINT_EVERY = int(os.getenv("BACKFILL_CHECKPOINT_EVERY", "10"))  # players per stats flush + job checkpoint
+
+STAT_SOURCES = {'NBA': 'nba_api', 'NFL': 'espn', 'NHL': 'nhl_api'}
+
 def store_game_stats(player_id: str, stats: Dict, sport: str) -> bool:
-    """Store player game stats"""
-    try:
-        game_stat_record = {
-            'player_id': player_id,
-            'event_id': stats.get('event_id'),
-            'stats': stats,
-            'fantasy_points': str(stats.get('fantasy_points', 0)),
-            'minutes_played': stats.get('minutes_played'),
-            'betting_results': {}
-        }
-        
-        # Check if this game stat already exists
-        game_date = stats.get('game_date', '')
-        if game_date:
-            existing = supabase.table('player_game_stats')\
-                .select('id')\
-                .eq('player_id', player_id)\
-                .filter('stats->>game_date', 'eq', game_date)\
-                .execute()
-            
-            if existing.data:
-                result = supabase.table('player_game_stats').update(game_stat_record).eq('id', existing.data[0]['id']).execute()
-                logger.debug(f"Updated {sport} game stats for player {player_id} on {game_date}")
-            else:
-                result = supabase.table('player_game_stats').insert(game_stat_record).execute()
-                logger.debug(f"Inserted new {sport} game stats for player {player_id} on {game_date}")
-            
-            return True
-        
-        return False
-    except Exception as e:
-        logger.error(f"Error storing game stats: {str(e)}")
-        return False
+    """Queue player game stats for the next bulk write"""
+    return stats_writer.add(player_id, stats, source=STAT_SOURCES.get(sport, sport.lower()))
 
-def backfill_nba_stats(days_back: int = 60, nba_max: int = 300, nba_offset: int = 0):
+def backfill_nba_stats(days_back: int = 60, nba_max: int = 300, nba_offset: int = 0, **job_kwargs):
     """Backfill NBA stats using nba_api"""
     logger.info(f"Starting NBA stats backfill for last {days_back} days")
     
@@ -198,7 +157,6 @@ def backfill_nba_stats(days_back: int = 60, nba_max: int = 300, nba_offset: int
         logger.error("nba_api not installed. Run: pip install nba_api")
         return 0
     
-    total_processed = 0
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=days_back)
     
@@ -220,95 +178,107 @@ def backfill_nba_stats(days_back: int = 60, nba_max: int = 300, nba_offset: int
     total_batch = len(batch)
     logger.info(f"Found {total_active} active NBA players | Processing batch {start}-{end} ({total_batch})")
     
-    # Process in batches to avoid rate limits
-    for idx, player in enumerate(batch):
-        try:
-            player_name = player['full_name']
-            player_nba_id = str(player['id'])
-            
-            logger.info(f"[{idx+1}/{total_batch}] Fetching {player_name}")
-            
-            # Get game log for this player
-            gamelog = playergamelog.PlayerGameLog(
-                player_id=player_nba_id,
-                season=season,
-                timeout=30
-            )
-            
-            time.sleep(0.6)  # Rate limiting
-            
-            games_df = gamelog.get_data_frames()[0]
-            
-            if games_df.empty:
-                continue
-            
-            # Get player's team from most recent game
-            team = games_df.iloc[0]['MATCHUP'].split()[0] if not games_df.empty else 'UNK'
-            
-            # Get or create player in our DB
-            player_id = get_or_create_player(
-                player_name,
-                team,
-                'NBA',
-                position=None,
-                external_id=player_nba_id
-            )
+    def backfill_player(player: Dict) -> int:
+        """Fetch one player's game log and queue its games; returns the games queued"""
+        processed = 0
+        player_name = player['full_name']
+        player_nba_id = str(player['id'])
+        
+        logger.info(f"Fetching {player_name}")
+        
+        # Get game log for this player
+        gamelog = playergamelog.PlayerGameLog(
+            player_id=player_nba_id,
+            season=season,
+            timeout=30
+        )
+        
+        time.sleep(0.6)  # Rate limiting
+        
+        games_df = gamelog.get_data_frames()[0]
+        
+        if games_df.empty:
+            return 0
+        
+        # Get player's team from most recent game
+        team = games_df.iloc[0]['MATCHUP'].split()[0] if not games_df.empty else 'UNK'
+        
+        # Get or create player in our DB
+        player_id = get_or_create_player(
+            player_name,
+            team,
+            'NBA',
+            position=None,
+            external_id=player_nba_id
+        )
+        
+        if not player_id:
+            return 0
+        
+        # Process each game
+        for _, game in games_df.iterrows():
+            game_date = datetime.strptime(str(game['GAME_DATE']), '%b %d, %Y').date()
             
-            if not player_id:
+            if game_date < start_date or game_date > end_date:
                 continue
             
-            # Process each game
-            for _, game in games_df.iterrows():
-                game_date = datetime.strptime(str(game['GAME_DATE']), '%b %d, %Y').date()
+            # Map NBA stats to our format
+            mapped_stats = {
+                'game_date': game_date.isoformat(),
+                'team': team,
+                'opponent_team': game['MATCHUP'].split()[-1] if 'MATCHUP' in game else '',
+                'is_home': '@' not in str(game.get('MATCHUP', '')),
+                'minutes_played': str(game.get('MIN', '0')),
                 
-                if game_date < start_date or game_date > end_date:
-                    continue
+                # Core stats
+                'points': int(game.get('PTS', 0)),
+                'rebounds': int(game.get('REB', 0)),
+                'assists': int(game.get('AST', 0)),
+                'steals': int(game.get('STL', 0)),
+                'blocks': int(game.get('BLK', 0)),
+                'turnovers': int(game.get('TOV', 0)),
                 
-                # Map NBA stats to our format
-                mapped_stats = {
-                    'game_date': game_date.isoformat(),
-                    'team': team,
-                    'opponent_team': game['MATCHUP'].split()[-1] if 'MATCHUP' in game else '',
-                    'is_home': '@' not in str(game.get('MATCHUP', '')),
-                    'minutes_played': str(game.get('MIN', '0')),
-                    
-                    # Core stats
-                    'points': int(game.get('PTS', 0)),
-                    'rebounds': int(game.get('REB', 0)),
-                    'assists': int(game.get('AST', 0)),
-                    'steals': int(game.get('STL', 0)),
-                    'blocks': int(game.get('BLK', 0)),
-                    'turnovers': int(game.get('TOV', 0)),
-                    
-                    # Shooting
-                    'field_goals_made': int(game.get('FGM', 0)),
-                    'field_goals_attempted': int(game.get('FGA', 0)),
-                    'field_goal_pct': float(game.get('FG_PCT', 0)),
-                    'three_pointers_made': int(game.get('FG3M', 0)),
-                    'three_pointers_attempted': int(game.get('FG3A', 0)),
-                    'three_point_pct': float(game.get('FG3_PCT', 0)),
-                    'free_throws_made': int(game.get('FTM', 0)),
-                    'free_throws_attempted': int(game.get('FTA', 0)),
-                    'free_throw_pct': float(game.get('FT_PCT', 0)),
-                    
-                    # Additional
-                    'personal_fouls': int(game.get('PF', 0)),
-                    'plus_minus': int(game.get('PLUS_MINUS', 0)),
-                    
-                    # Fantasy
-                    'fantasy_points': float(game.get('PTS', 0)) + float(game.get('REB', 0)) * 1.2 + float(game.get('AST', 0)) * 1.5,
-                    
-                    'sport': 'NBA',
-                    'external_game_id': str(game.get('Game_ID', ''))
-                }
+                # Shooting
+                'field_goals_made': int(game.get('FGM', 0)),
+                'field_goals_attempted': int(game.get('FGA', 0)),
+                'field_goal_pct': float(game.get('FG_PCT', 0)),
+                'three_pointers_made': int(game.get('FG3M', 0)),
+                'three_pointers_attempted': int(game.get('FG3A', 0)),
+                'three_point_pct': float(game.get('FG3_PCT', 0)),
+                'free_throws_made': int(game.get('FTM', 0)),
+                'free_throws_attempted': int(game.get('FTA', 0)),
+                'free_throw_pct': float(game.get('FT_PCT', 0)),
                 
-                if store_game_stats(player_id, mapped_stats, 'NBA'):
-                    total_processed += 1
-        
-        except Exception as e:
-            logger.error(f"Error processing NBA player {player.get('full_name', 'Unknown')}: {str(e)}")
-            continue
+                # Additional
+                'personal_fouls': int(game.get('PF', 0)),
+                'plus_minus': int(game.get('PLUS_MINUS', 0)),
+                
+                # Fantasy
+                'fantasy_points': float(game.get('PTS', 0)) + float(game.get('REB', 0)) * 1.2 + float(game.get('AST', 0)) * 1.5,
+                
+                'sport': 'NBA',
+                'external_game_id': str(game.get('Game_ID', ''))
+            }
+            
+            if store_game_stats(player_id, mapped_stats, 'NBA'):
+                processed += 1
+        return processed
     
+    # Players already backfilled by an earlier run over the same window are skipped
+    runner = JobRunner(
+        f"free_apis:nba:{season}:{start_date}:{end_date}",
+        backfill_player,
+        key=lambda player: str(player['id']),
+        commit=stats_writer.checkpoint,
+        checkpoint_every=CHECKPOINT_EVERY,
+        collect=stats_writer.worker_report,
+        **job_kwargs,
+    )
+    report = runner.run(batch)
+    stats_writer.merge_reports(report.worker_results)  # rows written by --workers processes
+    total_processed = int(report.result_total)
+    
+    stats_writer.flush()
     logger.info(f"NBA backfill completed. Total processed: {total_processed}")
     return total_processed
 
@@ -319,67 +289,46 @@ def build_espn_nfl_player_mapping():
     try:
         # Get all NFL teams from ESPN
         teams_url = "https://sports.core.api.espn.com/v2/sports/football/leagues/nfl/teams"
-        teams_response = requests.get(teams_url, timeout=15)
+        teams_data = http_fetch.get_json(teams_url)
         
-        if teams_response.status_code != 200:
-            logger.error(f"Failed to get NFL teams: {teams_response.status_code}")
+        if not teams_data:
+            logger.error("Failed to get NFL teams")
             return {}
         
-        teams_data = teams_response.json()
         espn_mapping = {}
         
-        # Process each team
-        for team_ref in teams_data.get('items', []):
-            try:
-                team_response = requests.get(team_ref['$ref'], timeout=10)
-                if team_response.status_code != 200:
+        # Teams, then rosters, then players: each level fetched concurrently at ESPN's rate
+        teams = [team for team in http_fetch.get_json_many([ref['$ref'] for ref in teams_data.get('items', [])]) if team]
+        teams = [team for team in teams if 'athletes' in team]
+        rosters = http_fetch.get_json_many([team['athletes']['$ref'] for team in teams])
+        
+        for team_data, roster_data in zip(teams, rosters):
+            team_abbr = team_data.get('abbreviation', '')
+            team_name = team_data.get('displayName', '')
+            if not roster_data:
+                continue
+            
+            logger.info(f"  Processing {team_name} ({team_abbr}) roster...")
+            
+            player_refs = [player_ref['$ref'] for player_ref in roster_data.get('items', [])]
+            for player_ref, player_data in zip(player_refs, http_fetch.get_json_many(player_refs)):
+                if not player_data:
                     continue
-                    
-                team_data = team_response.json()
-                team_abbr = team_data.get('abbreviation', '')
-                team_name = team_data.get('displayName', '')
                 
-                logger.info(f"  Processing {team_name} ({team_abbr}) roster...")
+                espn_name = player_data.get('displayName', '')
+                espn_id = player_ref.split('/')[-1].split('?')[0]
+                position = player_data.get('position', {}).get('abbreviation', '')
                 
-                # Get team roster
-                if 'athletes' in team_data:
-                    roster_response = requests.get(team_data['athletes']['$ref'], timeout=10)
-                    if roster_response.status_code == 200:
-                        roster_data = roster_response.json()
-                        
-                        # Process each player on roster
-                        for player_ref in roster_data.get('items', []):
-                            try:
-                                player_response = requests.get(player_ref['$ref'], timeout=10)
-                                if player_response.status_code == 200:
-                                    player_data = player_response.json()
-                                    
-                                    espn_name = player_data.get('displayName', '')
-                                    espn_id = player_ref['$ref'].split('/')[-1].split('?')[0]
-                                    position = player_data.get('position', {}).get('abbreviation', '')
-                                    
-                                    # Create mapping key (normalized name + team)
-                                    normalized_name = _normalize_name(espn_name)
-                                    mapping_key = f"{normalized_name}_{team_abbr}"
-                                    
-                                    espn_mapping[mapping_key] = {
-                                        'espn_id': espn_id,
-                                        'espn_name': espn_name,
-                                        'team': team_abbr,
-                                        'position': position
-                                    }
-                                
-                                time.sleep(0.1)  # Rate limiting
-                                
-                            except Exception as e:
-                                logger.warning(f"Error processing roster player: {str(e)}")
-                                continue
-                
-                time.sleep(0.3)  # Rate limiting between teams
+                # Create mapping key (normalized name + team)
+                normalized_name = _normalize_name(espn_name)
+                mapping_key = f"{normalized_name}_{team_abbr}"
                 
-            except Exception as e:
-                logger.warning(f"Error processing team: {str(e)}")
-                continue
+                espn_mapping[mapping_key] = {
+                    'espn_id': espn_id,
+                    'espn_name': espn_name,
+                    'team': team_abbr,
+                    'position': position
+                }
         
         logger.info(f"Built ESPN mapping for {len(espn_mapping)} players")
         return espn_mapping
@@ -393,7 +342,7 @@ def fetch_espn_player_stats(espn_id: str, player_name: str, target_weeks: List[i
     try:
         # Get player game log
         gamelog_url = f"https://site.web.api.espn.com/apis/common/v3/sports/football/nfl/athletes/{espn_id}/gamelog"
-        response = requests.get(gamelog_url, timeout=15)
+        response = http_fetch.get(gamelog_url)
         
         if response.status_code != 200:
             logger.warning(f"No gamelog for {player_name} (ESPN ID: {espn_id}): {response.status_code}")
@@ -578,7 +527,6 @@ def backfill_nfl_stats(weeks: int = 4):
                         logger.debug(f"  Stored week {game_stats['week']} for {player_name}")
                 
                 mapped_players += 1
-                time.sleep(0.2)  # Rate limiting
                 
             except Exception as e:
                 logger.error(f"Error processing NFL player {player.get('name', 'Unknown')}: {str(e)}")
@@ -589,6 +537,7 @@ def backfill_nfl_stats(weeks: int = 4):
     except Exception as e:
         logger.error(f"Error in NFL ESPN backfill: {str(e)}")
     
+    stats_writer.flush()
     logger.info(f"NFL backfill completed. Total processed: {total_processed}")
     return total_processed
 
@@ -761,6 +710,7 @@ def backfill_nhl_stats(days_back: int = 60):
         import traceback
         logger.error(traceback.format_exc())
     
+    stats_writer.flush()
     logger.info(f"NHL backfill completed. Total processed: {total_processed}")
     return total_processed
 
@@ -774,6 +724,7 @@ def main():
     parser.add_argument("--weeks", type=int, default=4, help="Number of weeks back to fetch (NFL)")
     parser.add_argument("--nba_max", type=int, default=300, help="Max active NBA players to process")
     parser.add_argument("--nba_offset", type=int, default=0, help="Offset into active NBA players list for batching")
+    add_job_arguments(parser)
     
     args = parser.parse_args()
     
@@ -788,7 +739,7 @@ def main():
         logger.info("=" * 60)
         logger.info("STARTING NBA BACKFILL (nba_api)")
         logger.info("=" * 60)
-        total += backfill_nba_stats(args.days, nba_max=args.nba_max, nba_offset=args.nba_offset)
+        total += backfill_nba_stats(args.days, nba_max=args.nba_max, nba_offset=args.nba_offset, **job_options(args))
     
     if args.sport in ['NFL', 'ALL']:
         logger.info("=" * 60)
@@ -802,8 +753,12 @@ def main():
         logger.info("=" * 60)
         total += backfill_nhl_stats(args.days)
     
+    report = stats_writer.close()
+    http_fetch.log_stats()
+    
     logger.info("=" * 60)
     logger.info(f"BACKFILL COMPLETED! Total stats processed: {total}")
+    logger.info(f"Writes: {report.summary()}")
     logger.info("=" * 60)
     
     logger.info("\nNext steps:")
@@ -11,13 +11,16 @@ FREE TIER: No API key required for basic endpoints!
 import os
 import sys
 import logging
-import requests
-import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from player_resolver import PlayerResolver
+from stat_writer import GameStatsWriter
+import http_fetch
+
 # Load environment variables
 load_dotenv()
 
@@ -36,9 +39,7 @@ supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
 BALLDONTLIE_API_KEY = os.getenv("BALLDONTLIE_API_KEY", "")  # Free tier works without key
 BALLDONTLIE_BASE_URL = "https://api.balldontlie.io/v1"
 
-# Rate limiting
-RATE_LIMIT_DELAY = 0.6  # 100 requests per minute = 0.6s delay
-
+# Rate limits (100 requests per minute for BALLDONTLIE) live in config/http_hosts.json
 # Logging setup
 logging.basicConfig(
     level=logging.INFO,
@@ -51,98 +52,30 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 def make_api_request(endpoint: str, params: Dict = None) -> Optional[Dict]:
-    """Make rate-limited API request to BALLDONTLIE"""
+    """Make rate-limited API request to BALLDONTLIE (429s are retried after Retry-After)"""
     url = f"{BALLDONTLIE_BASE_URL}/{endpoint}"
     headers = {}
     if BALLDONTLIE_API_KEY:
         headers["Authorization"] = BALLDONTLIE_API_KEY
     
-    try:
-        response = requests.get(url, params=params, headers=headers, timeout=30)
-        time.sleep(RATE_LIMIT_DELAY)
-        
-        if response.status_code == 200:
-            return response.json()
-        elif response.status_code == 429:
-            logger.warning("Rate limit hit, waiting 60 seconds...")
-            time.sleep(60)
-            return make_api_request(endpoint, params)
-        else:
-            logger.error(f"API request failed: {response.status_code} - {response.text}")
-            return None
-    except Exception as e:
-        logger.error(f"Request error for {endpoint}: {str(e)}")
-        return None
+    return http_fetch.get_json(url, params=params, headers=headers)
 
-def get_or_create_player(name: str, team: str, sport: str, position: str = None) -> Optional[str]:
-    """Get existing player or create new one"""
-    try:
-        # Try to find existing player
-        query = supabase.table('players').select('id').eq('name', name).eq('sport', sport)
-        if team:
-            query = query.eq('team', team)
-        
-        existing = query.execute()
-        
-        if existing.data:
-            return existing.data[0]['id']
-        
-        # Create new player
-        player_key = f"{sport.lower()}_{name.lower().replace(' ', '_')}_{team.lower()}"
-        player_data = {
-            'name': name,
-            'team': team,
-            'sport': sport,
-            'position': position,
-            'active': True,
-            'external_player_id': f"{sport.lower()}_{name.lower().replace(' ', '_')}",
-            'player_key': player_key
-        }
-        
-        result = supabase.table('players').insert(player_data).execute()
-        if result.data:
-            logger.info(f"Created new {sport} player: {name} ({team})")
-            return result.data[0]['id']
-        
-        return None
-    except Exception as e:
-        logger.error(f"Error getting/creating player {name}: {str(e)}")
-        return None
+_resolvers: Dict[str, PlayerResolver] = {}
+
+def player_resolver(sport: str) -> PlayerResolver:
+    """All players of a sport, loaded once per run (see player_resolver.py)"""
+    if sport not in _resolvers:
+        _resolvers[sport] = PlayerResolver.load(supabase, sport)
+    return _resolvers[sport]
+
+# Rows are buffered and upserted in chunks on (player_id, game, stat source) (see stat_writer.py)
+stats_writer = GameStatsWriter(supabase)
+
+STAT_SOURCES = {'NBA': 'balldontlie', 'MLB': 'mlb_statsapi'}
 
 def store_game_stats(player_id: str, stats: Dict, sport: str) -> bool:
-    """Store player game stats"""
-    try:
-        game_stat_record = {
-            'player_id': player_id,
-            'event_id': stats.get('event_id'),
-            'stats': stats,
-            'fantasy_points': str(stats.get('fantasy_points', 0)),
-            'minutes_played': stats.get('minutes_played'),
-            'betting_results': {}
-        }
-        
-        # Check if this game stat already exists
-        game_date = stats.get('game_date', '')
-        if game_date:
-            existing = supabase.table('player_game_stats')\
-                .select('id')\
-                .eq('player_id', player_id)\
-                .filter('stats->>game_date', 'eq', game_date)\
-                .execute()
-            
-            if existing.data:
-                result = supabase.table('player_game_stats').update(game_stat_record).eq('id', existing.data[0]['id']).execute()
-                logger.debug(f"Updated {sport} game stats for player {player_id} on {game_date}")
-            else:
-                result = supabase.table('player_game_stats').insert(game_stat_record).execute()
-                logger.debug(f"Inserted new {sport} game stats for player {player_id} on {game_date}")
-            
-            return True
-        
-        return False
-    except Exception as e:
-        logger.error(f"Error storing game stats: {str(e)}")
-        return False
+    """Queue player game stats for the next bulk write"""
+    return stats_writer.add(player_id, stats, source=STAT_SOURCES.get(sport, sport.lower()))
 
 def backfill_nba_stats(days_back: int = 30):
     """Backfill NBA stats using BALLDONTLIE"""
@@ -169,18 +102,23 @@ def backfill_nba_stats(days_back: int = 30):
         stats_list = data['data']
         logger.info(f"Found {len(stats_list)} NBA player stats for {date_str}")
         
-        for stat in stats_list:
+        # Resolve every player of the day at once; new players are created in one upsert
+        player_ids = player_resolver('NBA').resolve_many([
+            {
+                'name': f"{stat.get('player', {}).get('first_name', '')} {stat.get('player', {}).get('last_name', '')}".strip(),
+                'team': stat.get('team', {}).get('abbreviation', stat.get('team', {}).get('full_name', '')),
+                'position': stat.get('player', {}).get('position', ''),
+            }
+            for stat in stats_list
+        ])
+        
+        for stat, player_id in zip(stats_list, player_ids):
             try:
-                player_data = stat.get('player', {})
                 team_data = stat.get('team', {})
                 game_data = stat.get('game', {})
                 
-                player_name = f"{player_data.get('first_name', '')} {player_data.get('last_name', '')}".strip()
                 team_name = team_data.get('abbreviation', team_data.get('full_name', ''))
-                position = player_data.get('position', '')
                 
-                # Get or create player
-                player_id = get_or_create_player(player_name, team_name, 'NBA', position)
                 if not player_id:
                     continue
                 
@@ -222,7 +160,8 @@ def backfill_nba_stats(days_back: int = 30):
                     'fantasy_points': stat.get('pts', 0) + stat.get('reb', 0) * 1.2 + stat.get('ast', 0) * 1.5,
                     
                     # Sport
-                    'sport': 'NBA'
+                    'sport': 'NBA',
+                    'external_game_id': str(game_data.get('id', ''))
                 }
                 
                 if store_game_stats(player_id, mapped_stats, 'NBA'):
@@ -234,6 +173,7 @@ def backfill_nba_stats(days_back: int = 30):
         
         current_date += timedelta(days=1)
     
+    stats_writer.flush()
     logger.info(f"NBA backfill completed. Total processed: {total_processed}")
     return total_processed
 
@@ -256,14 +196,12 @@ def backfill_mlb_stats_free(days_back: int = 30):
         try:
             # Get schedule for date
             schedule_url = f"https://statsapi.mlb.com/api/v1/schedule?sportId=1&date={date_str}"
-            response = requests.get(schedule_url, timeout=30)
-            time.sleep(RATE_LIMIT_DELAY)
+            schedule_data = http_fetch.get_json(schedule_url)
             
-            if response.status_code != 200:
+            if not schedule_data:
                 current_date += timedelta(days=1)
                 continue
             
-            schedule_data = response.json()
             dates = schedule_data.get('dates', [])
             
             if not dates:
@@ -273,20 +211,16 @@ def backfill_mlb_stats_free(days_back: int = 30):
             games = dates[0].get('games', [])
             logger.info(f"Found {len(games)} MLB games on {date_str}")
             
-            for game in games:
-                game_pk = game.get('gamePk')
-                if not game_pk:
-                    continue
-                
-                # Get box score
-                boxscore_url = f"https://statsapi.mlb.com/api/v1.1/game/{game_pk}/feed/live"
-                box_response = requests.get(boxscore_url, timeout=30)
-                time.sleep(RATE_LIMIT_DELAY)
-                
-                if box_response.status_code != 200:
+            # Fetch the day's box scores concurrently, at statsapi.mlb.com's configured rate
+            box_scores = http_fetch.get_json_many([
+                f"https://statsapi.mlb.com/api/v1.1/game/{game['gamePk']}/feed/live"
+                for game in games if game.get('gamePk')
+            ])
+            
+            for box_data in box_scores:
+                if not box_data:
                     continue
                 
-                box_data = box_response.json()
                 live_data = box_data.get('liveData', {})
                 boxscore = live_data.get('boxscore', {})
                 teams_data = boxscore.get('teams', {})
@@ -296,7 +230,18 @@ def backfill_mlb_stats_free(days_back: int = 30):
                     players_data = team_data.get('players', {})
                     team_name = box_data.get('gameData', {}).get('teams', {}).get(team_type, {}).get('abbreviation', '')
                     
-                    for player_id, player_info in players_data.items():
+                    # Resolve the whole roster at once; new players are created in one upsert
+                    roster = list(players_data.values())
+                    player_db_ids = player_resolver('MLB').resolve_many([
+                        {
+                            'name': player_info.get('person', {}).get('fullName', ''),
+                            'team': team_name,
+                            'position': player_info.get('position', {}).get('abbreviation', ''),
+                        }
+                        for player_info in roster
+                    ])
+                    
+                    for player_info, player_db_id in zip(roster, player_db_ids):
                         try:
                             person = player_info.get('person', {})
                             player_name = person.get('fullName', '')
@@ -308,8 +253,6 @@ def backfill_mlb_stats_free(days_back: int = 30):
                             if not player_name:
                                 continue
                             
-                            # Get or create player
-                            player_db_id = get_or_create_player(player_name, team_name, 'MLB', position)
                             if not player_db_id:
                                 continue
                             
@@ -341,7 +284,8 @@ def backfill_mlb_stats_free(days_back: int = 30):
                                 'earned_runs': pitching.get('earnedRuns', 0),
                                 'walks_allowed': pitching.get('baseOnBalls', 0),
                                 
-                                'sport': 'MLB'
+                                'sport': 'MLB',
+                                'external_game_id': str(box_data.get('gamePk', ''))
                             }
                             
                             if store_game_stats(player_db_id, mapped_stats, 'MLB'):
@@ -356,6 +300,7 @@ def backfill_mlb_stats_free(days_back: int = 30):
         
         current_date += timedelta(days=1)
     
+    stats_writer.flush()
     logger.info(f"MLB backfill completed. Total processed: {total_processed}")
     return total_processed
 
@@ -382,8 +327,7 @@ def backfill_nfl_stats_espn(days_back: int = 30):
         
         try:
             url = f"http://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard?week={week}&seasontype=2&dates={nfl_season}"
-            response = requests.get(url, timeout=30)
-            time.sleep(RATE_LIMIT_DELAY)
+            response = http_fetch.get(url)
             
             if response.status_code != 200:
                 continue
@@ -420,8 +364,7 @@ def backfill_nhl_stats_espn(days_back: int = 30):
         
         try:
             url = f"http://site.api.espn.com/apis/site/v2/sports/hockey/nhl/scoreboard?dates={date_str}"
-            response = requests.get(url, timeout=30)
-            time.sleep(RATE_LIMIT_DELAY)
+            response = http_fetch.get(url)
             
             if response.status_code != 200:
                 current_date += timedelta(days=1)
@@ -483,8 +426,12 @@ def main():
         logger.warning("NHL detailed player stats require SportsData.io or similar paid API")
         logger.info("Skipping NHL for now - recommend using existing SportsData.io scripts")
     
+    report = stats_writer.close()
+    http_fetch.log_stats()
+    
     logger.info("=" * 50)
     logger.info(f"Backfill completed! Total stats processed: {total}")
+    logger.info(f"Writes: {report.summary()}")
     logger.info("=" * 50)
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: host-aware fetching vs sleep-throttled requests
+
+Starts a local HTTP server that answers after a fixed latency and rate-limits
+itself (429 + Retry-After above --allowed-rps), then fetches N URLs twice: the old
+way (requests.get + time.sleep per call) and through http_fetch.get_json_many with
+the host budget set to the allowed rate. Reports wall time, achieved req/s and
+how many 429s each approach hit.
+
+Usage:
+    python scripts/benchmark_http_fetch.py [--requests N] [--latency-ms N] [--allowed-rps N] [--sleep S]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def start_server(latency: float, allowed_rps: float) -> ThreadingHTTPServer:
+    lock = threading.Lock()
+    state = {"window": 0, "count": 0, "throttled": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with lock:
+                window = int(time.monotonic())
+                if window != state["window"]:
+                    state["window"], state["count"] = window, 0
+                state["count"] += 1
+                limited = state["count"] > allowed_rps
+                state["throttled"] += limited
+            if limited:
+                self.send_response(429)
+                self.send_header("Retry-After", "1")
+                self.end_headers()
+                return
+            time.sleep(latency)
+            body = json.dumps({"path": self.path}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark http_fetch against sleep-throttled requests")
+    parser.add_argument("--requests", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Server response latency")
+    parser.add_argument("--allowed-rps", type=float, default=10.0, help="Server-side rate limit")
+    parser.add_argument("--sleep", type=float, default=0.1, help="Per-request sleep of the old loop")
+    args = parser.parse_args()
+
+    server = start_server(args.latency_ms / 1000, args.allowed_rps)
+    urls = [f"http://127.0.0.1:{server.server_port}/item/{i}" for i in range(args.requests)]
+
+    started = time.perf_counter()
+    ok = 0
+    for url in urls:
+        ok += requests.get(url, timeout=10).status_code == 200
+        time.sleep(args.sleep)
+    sequential = time.perf_counter() - started
+    sequential_throttled = server.state["throttled"]
+    print(f"requests + sleep({args.sleep:g}): {sequential:.2f}s, {args.requests / sequential:.1f} req/s, "
+          f"{ok}/{args.requests} ok, {sequential_throttled} throttled")
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump({"hosts": {"127.0.0.1": {"rate": args.allowed_rps, "burst": 1, "concurrency": 16}}}, f)
+    os.environ["HTTP_HOSTS_CONFIG"] = f.name
+    import http_fetch
+
+    time.sleep(1)  # fresh rate-limit window
+    started = time.perf_counter()
+    results = http_fetch.get_json_many(urls)
+    fetched = time.perf_counter() - started
+    print(f"http_fetch.get_json_many:   {fetched:.2f}s, {args.requests / fetched:.1f} req/s, "
+          f"{sum(r is not None for r in results)}/{args.requests} ok, "
+          f"{server.state['throttled'] - sequential_throttled} throttled")
+    print(f"Host stats: {http_fetch.get_fetcher().get_stats()}")
+    os.unlink(f.name)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streamed pick parsing
+
+Builds a synthetic N-pick Grok response (optionally with the usual LLM JSON mistakes:
+trailing commas, missing commas, bare words, "+110" odds, a truncated last pick) and
+replays it through pick_stream.PickStreamParser in completion-sized chunks. Reports
+the parser's CPU cost and, for a given generation rate, when each pick becomes
+available in the stream compared with waiting for the full completion.
+
+Usage:
+    python scripts/benchmark_pick_stream.py [--picks N] [--malformed] [--chars-per-second N] [--chunk N]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pick_stream import PickStreamParser
+
+FIELDS = ("player_name", "prop_type", "recommendation", "line")
+
+
+def build_response(picks: int, malformed: bool) -> str:
+    rng = random.Random(7)
+    objects = []
+    for i in range(picks):
+        pick = {
+            "player_name": f"Player {i}",
+            "prop_type": rng.choice(["Hits", "RBIs", "Passing Yards", "Points"]),
+            "recommendation": rng.choice(["over", "under"]),
+            "line": rng.choice([0.5, 1.5, 24.5, 249.5]),
+            "odds": rng.choice([-115, 105, 120]),
+            "confidence": rng.randint(55, 70),
+            "reasoning": "Recent form {and} matchup support this line. " * 8,
+            "key_factors": ["form", "matchup", "pace"],
+            "roi_estimate": "6.5%",
+        }
+        text = json.dumps(pick, indent=2)
+        if malformed and i % 3 == 0:
+            text = text.replace('"odds": 105', '"odds": +105').replace('"pace"\n', '"pace",\n')
+        if malformed and i % 5 == 0:
+            text = text.replace('"recommendation": "over"', 'recommendation: over')
+        objects.append(text)
+    body = ",\n".join(objects)
+    if malformed:
+        body = body[:-len(objects[-1]) // 2]  # truncated by max_tokens
+    return f"Here are today's picks:\n```json\n[\n{body}\n]\n```\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed pick parsing")
+    parser.add_argument("--picks", type=int, default=25)
+    parser.add_argument("--malformed", action="store_true", help="Inject common LLM JSON mistakes")
+    parser.add_argument("--chars-per-second", type=float, default=400.0, help="Simulated generation rate")
+    parser.add_argument("--chunk", type=int, default=12, help="Characters per stream chunk")
+    args = parser.parse_args()
+
+    response = build_response(args.picks, args.malformed)
+    chunks = [response[i:i + args.chunk] for i in range(0, len(response), args.chunk)]
+
+    stream = PickStreamParser(FIELDS)
+    arrivals = []
+    started = time.perf_counter()
+    emitted = 0
+    for chunk in chunks:
+        emitted += len(chunk)
+        arrivals.extend([emitted / args.chars_per_second] * len(stream.feed(chunk)))
+    arrivals.extend([emitted / args.chars_per_second] * len(stream.finish()))
+    cpu_ms = (time.perf_counter() - started) * 1000
+
+    full_seconds = len(response) / args.chars_per_second
+    print(f"Response: {len(response):,} chars in {len(chunks):,} chunks; {stream.summary()}")
+    print(f"Parser CPU: {cpu_ms:.2f}ms total, {cpu_ms / max(1, len(response)) * 1000:.2f}us/char")
+    if arrivals:
+        print(f"At {args.chars_per_second:.0f} chars/s: first pick after {arrivals[0]:.1f}s, "
+              f"median {arrivals[len(arrivals) // 2]:.1f}s, full completion {full_seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prop -> sport resolution on a full slate
+
+Compares the linear game scan IntelligentPlayerPropsAgent._get_prop_sport used before
+game_slate.SlateIndex with the index, on a synthetic slate (default 150 games, 20k props)
+where a share of props carry an event_id that is not on the slate and must fall back
+to team matching. Reports time per pass, the tier counters, and any prop whose
+resolved sport differs.
+
+Usage:
+    python scripts/benchmark_slate_index.py [--games N] [--props N] [--orphan-share F]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_slate import SlateIndex, SPORT_KEYS, ABBREVIATION_SPORTS
+
+SPORTS = list(SPORT_KEYS)
+NICKNAMES = ['Tigers', 'Bears', 'Eagles', 'Lions', 'Hawks', 'Wolves', 'Rangers', 'Pirates', 'Giants', 'Storm',
+             'Aces', 'Sky', 'Dolphins', 'Jets', 'Wildcats', 'Bulldogs', 'Cardinals', 'Falcons', 'Ravens', 'Sun']
+CITIES = ['Atlanta', 'Boston', 'Chicago', 'Dallas', 'Denver', 'Detroit', 'Houston', 'Miami', 'Phoenix', 'Seattle',
+          'Oregon', 'Texas', 'Iowa', 'Duke', 'Baylor', 'Tampa Bay', 'Kansas City', 'Las Vegas', 'New York', 'Minnesota']
+
+
+def legacy_teams_match(prop_team: str, home_team: str, away_team: str) -> bool:
+    if prop_team == home_team or prop_team == away_team:
+        return True
+    if prop_team in home_team or home_team in prop_team:
+        return True
+    if prop_team in away_team or away_team in prop_team:
+        return True
+    for prop_word in prop_team.split():
+        if len(prop_word) > 3:
+            for home_word in home_team.split():
+                if len(home_word) > 3 and prop_word == home_word:
+                    return True
+            for away_word in away_team.split():
+                if len(away_word) > 3 and prop_word == away_word:
+                    return True
+    return False
+
+
+def legacy_prop_sport(event_id, team, games) -> str:
+    """The pre-index _get_prop_sport (event_id scan, team scan, abbreviation lists)"""
+    for game in games:
+        if str(event_id) == str(game.get('id')):
+            return SPORT_KEYS.get(game.get('sport', 'Unknown'), "Unknown")
+    prop_team = (team or "").lower()
+    for game in games:
+        if legacy_teams_match(prop_team, game.get('home_team', '').lower(), game.get('away_team', '').lower()):
+            return SPORT_KEYS.get(game.get('sport', 'Unknown'), "MLB")
+    return ABBREVIATION_SPORTS.get(prop_team, "Unknown")
+
+
+def synthetic_slate(n_games: int, n_props: int, orphan_share: float, seed: int = 7):
+    rng = random.Random(seed)
+    games = []
+    for i in range(n_games):
+        home = f"{rng.choice(CITIES)} {rng.choice(NICKNAMES)}"
+        away = f"{rng.choice(CITIES)} {rng.choice(NICKNAMES)}"
+        games.append({'id': f"evt-{i}", 'sport': rng.choice(SPORTS), 'home_team': home, 'away_team': away})
+
+    props = []
+    abbreviations = list(ABBREVIATION_SPORTS)
+    for _ in range(n_props):
+        game = rng.choice(games)
+        team = rng.choice([game['home_team'], game['away_team']])
+        if rng.random() < orphan_share:
+            # Stale/unknown event id: resolved through team name, nickname or abbreviation
+            team = rng.choice([team, team.split()[-1], rng.choice(abbreviations).upper(), 'Free Agents'])
+            props.append((f"stale-{rng.randint(0, 10 ** 6)}", team))
+        else:
+            props.append((game['id'], team))
+    return games, props
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark slate index prop sport resolution')
+    parser.add_argument('--games', type=int, default=150)
+    parser.add_argument('--props', type=int, default=20000)
+    parser.add_argument('--orphan-share', type=float, default=0.1, help='Share of props whose event_id is not on the slate')
+    args = parser.parse_args()
+
+    games, props = synthetic_slate(args.games, args.props, args.orphan_share)
+    print(f"🏟️ Synthetic slate: {len(games)} games, {len(props)} props ({args.orphan_share:.0%} off-slate event ids)")
+
+    started = time.perf_counter()
+    legacy = [legacy_prop_sport(event_id, team, games) for event_id, team in props]
+    legacy_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    index = SlateIndex(games)
+    build_s = time.perf_counter() - started
+    started = time.perf_counter()
+    indexed = [index.prop_sport(event_id, team) for event_id, team in props]
+    index_s = time.perf_counter() - started
+
+    print(f"⏱️ linear scan:  {legacy_s * 1000:9.1f} ms")
+    print(f"⏱️ slate index:  {index_s * 1000:9.1f} ms (+{build_s * 1000:.1f} ms build) - {legacy_s / (index_s + build_s):.0f}x")
+    print(f"🗂️ Tiers: {dict(index.tier_counts)}")
+
+    mismatches = [(prop, old, new) for prop, old, new in zip(props, legacy, indexed) if old != new]
+    print(f"🔁 Mismatches: {len(mismatches)}")
+    for prop, old, new in mismatches[:10]:
+        print(f"  {prop}: legacy={old} index={new}")
+
+
+if __name__ == '__main__':
+    main()
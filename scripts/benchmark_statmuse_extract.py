@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: StatMuse HTML extraction
+
+Compares the BeautifulSoup extraction StatMuseAPI used before statmuse_extract with the
+lxml paths (stop-early answer parse, landing-page text lines) over saved StatMuse pages,
+reporting parse time and peak allocated memory per page, and checking both produce the
+same output.
+
+Usage:
+    python scripts/benchmark_statmuse_extract.py [--fixtures DIR] [--repeat N]
+    python scripts/benchmark_statmuse_extract.py --save DIR "query one" "query two" ...
+
+Without --fixtures a synthetic answer page is used.
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from statmuse_extract import (
+    _extract_answer_bs4, _extract_answer_lxml, _page_lines_bs4, _page_lines_lxml, LXML_AVAILABLE,
+)
+
+
+def synthetic_page() -> bytes:
+    rows = ''.join(
+        f'<tr><td>{day}</td><td>Aaron Judge</td><td>{day % 4}</td><td>{day % 3}</td></tr>\n' for day in range(1, 400)
+    )
+    return (
+        '<html><head><title>StatMuse</title><script>window.__DATA__ = {"a": 1};</script>'
+        '<style>.x { color: red; }</style></head><body>'
+        '<nav><a href="/mlb">MLB</a><a href="/nba">NBA</a></nav>'
+        '<h1><span>Aaron Judge</span> has <b>41 home runs</b> this season.</h1>'
+        f'<table>{rows}</table><!-- footer --><footer>StatMuse Inc.</footer></body></html>'
+    ).encode()
+
+
+def measure(fn, content: bytes, repeat: int):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(content)
+    elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+    tracemalloc.start()
+    fn(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1024
+
+
+def save_fixtures(directory: str, queries):
+    import httpx
+    os.makedirs(directory, exist_ok=True)
+    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+    with httpx.Client(headers=headers, timeout=15, follow_redirects=True) as client:
+        for query in queries:
+            url = f"https://www.statmuse.com/ask/{query.lower().replace(' ', '-')}"
+            response = client.get(url)
+            path = os.path.join(directory, re.sub(r'[^a-z0-9]+', '-', query.lower()).strip('-') + '.html')
+            with open(path, 'wb') as f:
+                f.write(response.content)
+            print(f"💾 {response.status_code} {url} -> {path} ({len(response.content) / 1024:.0f} KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark StatMuse HTML extraction')
+    parser.add_argument('--fixtures', help='Directory of saved StatMuse .html pages')
+    parser.add_argument('--repeat', type=int, default=20, help='Parses per page per measurement')
+    parser.add_argument('--save', metavar='DIR', help='Fetch the given queries from StatMuse into DIR and exit')
+    parser.add_argument('queries', nargs='*')
+    args = parser.parse_args()
+
+    if args.save:
+        save_fixtures(args.save, args.queries)
+        return
+    if not LXML_AVAILABLE:
+        sys.exit('lxml is not installed')
+
+    if args.fixtures:
+        pages = []
+        for name in sorted(os.listdir(args.fixtures)):
+            if name.endswith('.html'):
+                with open(os.path.join(args.fixtures, name), 'rb') as f:
+                    pages.append((name, f.read()))
+    else:
+        pages = [('synthetic.html', synthetic_page())]
+    print(f"📚 {len(pages)} pages")
+
+    paths = [
+        ('answer', _extract_answer_bs4, _extract_answer_lxml),
+        ('page lines', _page_lines_bs4, _page_lines_lxml),
+    ]
+    mismatches = 0
+    for name, content in pages:
+        print(f"\n📄 {name} ({len(content) / 1024:.0f} KB)")
+        for label, legacy, fast in paths:
+            legacy_ms, legacy_kb = measure(legacy, content, args.repeat)
+            fast_ms, fast_kb = measure(fast, content, args.repeat)
+            same = legacy(content) == fast(content)
+            mismatches += not same
+            print(
+                f"  {label:<10} bs4 {legacy_ms:7.2f} ms {legacy_kb:8.0f} KB | "
+                f"lxml {fast_ms:7.2f} ms {fast_kb:8.0f} KB | {legacy_ms / fast_ms:5.1f}x | "
+                f"{'same output' if same else 'OUTPUT DIFFERS'}"
+            )
+
+    print(f"\n🔁 Output mismatches: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
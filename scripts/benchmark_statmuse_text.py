@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: StatMuse answer normalization
+
+Compares the legacy multi-pass re.sub cleaner with statmuse_text.normalize_statmuse_text
+over a corpus of StatMuse headlines (one per line), reporting per-call cost for a cold
+(un-memoized) pass and a warm (memoized) pass, plus every headline whose output changed.
+
+Usage:
+    python scripts/benchmark_statmuse_text.py [--corpus FILE] [--repeat N]
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from statmuse_text import normalize_statmuse_text
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'statmuse_headlines_sample.txt')
+
+
+def legacy_clean(text: str) -> str:
+    """The cleaner StatMuseAPI.clean_statmuse_text used before statmuse_text"""
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
+    text = re.sub(r'([A-Za-z]{3,}s)(have|has|are|were)(?=\s|$)', r'\1 \2', text)
+    text = re.sub(r'([A-Z][a-z]{3,})(is|are|has|have|was|were)(?=\s|$)', r'\1 \2', text)
+    text = re.sub(r'([A-Z][a-z]+)([A-Z][a-z]+)', r'\1 \2', text)
+    text = re.sub(r'\bth is\b', 'this', text)
+    text = re.sub(r'\bthere cord\b', 'record', text)
+    text = re.sub(r'\bsea son\b', 'season', text)
+    text = re.sub(r'Red Sox(have|has|are)', r'Red Sox \1', text)
+    text = re.sub(r'Blue Jays(have|has|are)', r'Blue Jays \1', text)
+    text = re.sub(r'White Sox(have|has|are)', r'White Sox \1', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def time_per_call(fn, corpus, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for line in corpus:
+            fn(line)
+    return (time.perf_counter() - started) / (repeat * len(corpus)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark StatMuse text normalization')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help='File with one captured headline per line')
+    parser.add_argument('--repeat', type=int, default=2000, help='Passes over the corpus per measurement')
+    args = parser.parse_args()
+
+    with open(args.corpus) as f:
+        corpus = [line.rstrip('\n') for line in f if line.strip()]
+    print(f"📚 Corpus: {len(corpus)} headlines from {args.corpus}")
+
+    legacy_us = time_per_call(legacy_clean, corpus, args.repeat)
+    cold_us = time_per_call(normalize_statmuse_text.__wrapped__, corpus, args.repeat)
+    normalize_statmuse_text.cache_clear()
+    warm_us = time_per_call(normalize_statmuse_text, corpus, args.repeat)
+
+    print(f"⏱️ legacy re.sub chain:   {legacy_us:8.2f} µs/headline")
+    print(f"⏱️ normalizer (cold):     {cold_us:8.2f} µs/headline ({legacy_us / cold_us:.1f}x)")
+    print(f"⏱️ normalizer (memoized): {warm_us:8.2f} µs/headline ({legacy_us / warm_us:.1f}x)")
+    print(f"💾 {normalize_statmuse_text.cache_info()}")
+
+    # Determinism: same input, same bytes, regardless of memo state
+    normalize_statmuse_text.cache_clear()
+    fresh = [normalize_statmuse_text(line) for line in corpus]
+    memoized = [normalize_statmuse_text(line) for line in corpus]
+    print(f"🔁 Deterministic: {'yes' if fresh == memoized else 'NO'}")
+
+    changed = [(line, legacy_clean(line), new) for line, new in zip(corpus, fresh) if legacy_clean(line) != new]
+    print(f"\n📝 {len(changed)} headlines differ from the legacy cleaner:")
+    for line, old, new in changed:
+        print(f"  raw:    {line}\n  legacy: {old}\n  new:    {new}\n")
+
+
+if __name__ == '__main__':
+    main()
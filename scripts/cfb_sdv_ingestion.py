@@ -7,7 +7,7 @@ CFB ingestion via SportsDataverse (ESPN)
 - Optionally map/store player game stats when box scores available (graceful fallback)
 
 Usage:
-  python scripts/cfb_sdv_ingestion.py --seasons 2024,2025
+  python scripts/cfb_sdv_ingestion.py --seasons 2024,2025 [--workers N] [--shard i/N] [--reset-job]
 
 Requirements:
   pip install sportsdataverse pandas pyarrow polars supabase
@@ -16,12 +16,15 @@ Notes:
   - team_trends_data is a VIEW derived from team_recent_stats; do not insert into it
   - team_recent_stats unique key: (team_id, game_date, opponent_team_id)
   - sport_key for CFB must be 'americanfootball_ncaaf'
+  - each completed game is a job_runner work unit, so a rerun resumes after the last
+    stored game (progress in JOB_STATE_DB)
 """
 
 import os
 import sys
 import time
 import json
+import logging
 import argparse
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, Tuple
@@ -30,6 +33,10 @@ from pathlib import Path
 import pandas as pd
 from supabase import create_client
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from team_registry import get_team_registry
+from job_runner import JobRunner, add_job_arguments, job_options
+
 # Try to import SportsDataverse CFB module
 try:
     import sportsdataverse as sdv  # noqa: F401
@@ -112,64 +119,24 @@ def get_teams_cache() -> pd.DataFrame:
         print("⚠️ No CFB teams found in teams table. Run your teams setup first.")
         return df
 
-    # Precompute normalized fields for better matching
-    df["_norm_name"] = df["team_name"].fillna("").apply(normalize_team_name)
-    df["_norm_abbr"] = df["team_abbreviation"].fillna("").apply(lambda x: str(x).strip().upper())
+    # teams.id -> row, for registry lookups
+    df.attrs["rows_by_id"] = {row["id"]: row for row in df.to_dict("records")}
     return df
 
 
-def normalize_team_name(s: str) -> str:
-    import unicodedata
-    s = (s or "").lower()
-    # remove diacritics
-    s = unicodedata.normalize("NFKD", s)
-    s = s.encode("ascii", "ignore").decode("ascii")
-    # remove punctuation/apostrophes
-    allowed = set("abcdefghijklmnopqrstuvwxyz 0123456789")
-    s = "".join(ch if ch in allowed else " " for ch in s)
-    # common noise words
-    stop = {"university", "college", "the"}
-    tokens = [t for t in s.split() if t and t not in stop]
-    return " ".join(tokens)
-
-
 def match_team(team_name: str, team_abbr: Optional[str], teams_df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """teams row for an ESPN team name/abbreviation, resolved through the shared team registry
+    (exact names and aliases, school prefixes like "buffalo bulls" -> "buffalo"). Stats are
+    written to the returned team, so the fuzzy tiers are not used."""
     if teams_df.empty:
         return None
-    name_norm = normalize_team_name(team_name)
-    abbr_norm = str(team_abbr).strip().upper() if team_abbr else None
-
-    # 1) Exact normalized name match
-    m = teams_df[teams_df["_norm_name"] == name_norm]
-    if not m.empty:
-        return m.iloc[0].to_dict()
-
-    # 2) Abbreviation strict or contains (handles BUF vs BUFF)
-    if abbr_norm:
-        m2 = teams_df[teams_df["_norm_abbr"] == abbr_norm]
-        if not m2.empty:
-            return m2.iloc[0].to_dict()
-        m2b = teams_df[teams_df["_norm_abbr"].apply(lambda x: x and (x in abbr_norm or abbr_norm in x))]
-        if not m2b.empty:
-            return m2b.iloc[0].to_dict()
-
-    # 3) Loose contains (either direction) on normalized names
-    m3 = teams_df[teams_df["_norm_name"].str.contains(name_norm, na=False)]
-    if not m3.empty:
-        return m3.iloc[0].to_dict()
-    m4 = teams_df[teams_df["_norm_name"].apply(lambda x: x in name_norm)]
-    if not m4.empty:
-        return m4.iloc[0].to_dict()
-
-    # 4) Try dropping final token from ESPN name (e.g., "buffalo bulls" -> "buffalo")
-    parts = name_norm.split()
-    if len(parts) > 1:
-        base = " ".join(parts[:-1])
-        m5 = teams_df[teams_df["_norm_name"] == base]
-        if not m5.empty:
-            return m5.iloc[0].to_dict()
-
-    return None
+    registry = get_team_registry(supabase)
+    team = registry.lookup(team_name, CFB_SPORT_KEY, exact=True)
+    if team is None and team_abbr:
+        team = registry.lookup(team_abbr, CFB_SPORT_KEY, exact=True)
+    if team is None or not team.row_id:
+        return None
+    return teams_df.attrs["rows_by_id"].get(team.row_id)
 
 
 def fetch_schedule_for_season(season: int) -> pd.DataFrame:
@@ -402,16 +369,60 @@ def upsert_team_results_for_game(
 
 # --------------- Main flow ---------------
 
-def ingest_cfb(seasons: list[int]) -> None:
+def game_units(season: int, sched: pd.DataFrame) -> list[Tuple[str, pd.Series]]:
+    """(external_game_id, schedule row) for every completed game of a season"""
+    units = []
+    for _, row in sched.iterrows():
+        if not is_final_game(row):
+            continue
+        home_name, _, away_name, _, _, _, game_date, _ = extract_team_fields(row)
+        game_id = str(row.get("id") or row.get("game_id") or row.get("event_id") or "").strip()
+        if not game_id:
+            # Construct synthetic id
+            game_id = f"{season}-{home_name}-{away_name}-{game_date}"
+        units.append((f"espn:{game_id}", row))
+    return units
+
+
+def ingest_game(teams_df: pd.DataFrame, unit: Tuple[str, pd.Series]) -> int:
+    """Store one completed game; raises so the job runner retries / records the failure"""
+    external_game_id, row = unit
+    home_name, home_abbr, away_name, away_abbr, home_score, away_score, game_date, start_time_iso = extract_team_fields(row)
+
+    home = match_team(home_name, home_abbr, teams_df)
+    away = match_team(away_name, away_abbr, teams_df)
+
+    if not home or not away:
+        print(f"   ⚠️ Unmatched teams: home='{home_name}'/{home_abbr} away='{away_name}'/{away_abbr}")
+
+    # Upsert/anchor sports_event for this game (for props linking)
+    try:
+        _event_id = upsert_sports_event(
+            external_event_id=external_game_id,
+            home_team=home,
+            away_team=away,
+            home_team_name=home_name,
+            away_team_name=away_name,
+            start_time_iso=start_time_iso,
+            final=is_final_game(row),
+            home_score=home_score,
+            away_score=away_score,
+        )
+    except Exception as e:
+        print(f"   ⚠️ sports_events upsert error for {external_game_id}: {e}")
+
+    upsert_team_results_for_game(
+        teams_df, home, away, home_name, away_name, home_score, away_score, game_date, external_game_id
+    )
+    return 1
+
+
+def ingest_cfb(seasons: list[int], **job_kwargs) -> None:
     teams_df = get_teams_cache()
     if teams_df.empty:
         print("❌ Aborting: no teams in 'teams' table for CFB.")
         return
 
-    total_games = 0
-    stored_games = 0
-    unmatched = 0
-
     for season in seasons:
         sched = fetch_schedule_for_season(season)
         if sched.empty:
@@ -427,62 +438,29 @@ def ingest_cfb(seasons: list[int]) -> None:
                 if "event_id" in sched.columns:
                     sched["id"] = sched["event_id"]
 
-        # Iterate completed games only
-        for _, row in sched.iterrows():
-            if not is_final_game(row):
-                continue
-            total_games += 1
-
-            home_name, home_abbr, away_name, away_abbr, home_score, away_score, game_date, start_time_iso = extract_team_fields(row)
-            game_id = str(row.get("id") or row.get("game_id") or row.get("event_id") or "").strip()
-            if not game_id:
-                # Construct synthetic id
-                game_id = f"{season}-{home_name}-{away_name}-{game_date}"
-            external_game_id = f"espn:{game_id}"
-
-            home = match_team(home_name, home_abbr, teams_df)
-            away = match_team(away_name, away_abbr, teams_df)
-
-            if not home or not away:
-                unmatched += 1
-                print(f"   ⚠️ Unmatched teams: home='{home_name}'/{home_abbr} away='{away_name}'/{away_abbr}")
-
-            # Upsert/anchor sports_event for this game (for props linking)
-            try:
-                _event_id = upsert_sports_event(
-                    external_event_id=external_game_id,
-                    home_team=home,
-                    away_team=away,
-                    home_team_name=home_name,
-                    away_team_name=away_name,
-                    start_time_iso=start_time_iso,
-                    final=is_final_game(row),
-                    home_score=home_score,
-                    away_score=away_score,
-                )
-            except Exception as e:
-                print(f"   ⚠️ sports_events upsert error for {external_game_id}: {e}")
-
-            try:
-                upsert_team_results_for_game(
-                    teams_df, home, away, home_name, away_name, home_score, away_score, game_date, external_game_id
-                )
-                stored_games += 1
-            except Exception as e:
-                print(f"   ❌ Failed to store game {external_game_id}: {e}")
-                continue
+        # Completed games only; games stored by an earlier run are skipped
+        runner = JobRunner(
+            f"cfb_sdv:{season}",
+            lambda unit: ingest_game(teams_df, unit),
+            key=lambda unit: unit[0],
+            **job_kwargs,
+        )
+        report = runner.run(game_units(season, sched))
 
-        print(f"📊 Season {season}: stored {stored_games} of {total_games} completed games (unmatched {unmatched}).")
+        print(f"📊 Season {season}: stored {report.done} of {report.total} completed games "
+              f"({report.skipped} already stored, {report.failed} failed).")
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--seasons", type=str, default="2024,2025", help="Comma-separated seasons, e.g., 2024,2025")
+    add_job_arguments(parser)
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")  # job_runner progress lines
 
     seasons = [int(s.strip()) for s in args.seasons.split(",") if s.strip()]
     print("🚀 Starting CFB ingestion via SportsDataverse (ESPN)\n")
-    ingest_cfb(seasons)
+    ingest_cfb(seasons, **job_options(args))
     print("\n🎉 Done.")
 
 
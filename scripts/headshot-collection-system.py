@@ -14,12 +14,14 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 import json
 from supabase import create_client, Client
-from difflib import SequenceMatcher
 from pathlib import Path
 from dotenv import load_dotenv
 
 # Determine project root (repo root is parent of this scripts/ dir)
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+from player_resolver import PlayerResolver
+from team_registry import get_team_registry
 
 # Auto-load .env from project root
 dotenv_path = PROJECT_ROOT / ".env"
@@ -59,7 +61,8 @@ class HeadshotCollectionSystem:
         self.processed_headshots = 0
         self.matched_players = 0
         self.failed_matches = 0
-        self.existing_players = {}
+        self.players: Optional[PlayerResolver] = None
+        self.registry = get_team_registry(supabase)
         
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -98,27 +101,9 @@ class HeadshotCollectionSystem:
         try:
             logger.info("👥 Loading existing MLB players from database...")
             
-            response = supabase.table('players').select(
-                'id, name, team, sport, position, external_player_id'
-            ).eq('sport', 'MLB').eq('active', True).execute()
-            
-            self.existing_players = {}
-            for player in response.data:
-                # Create multiple lookup keys for flexible matching
-                name_key = (player.get('name') or '').lower().strip()
-                team_key = (player.get('team') or '').upper().strip()
-                
-                # Store by name for primary lookup
-                if name_key not in self.existing_players:
-                    self.existing_players[name_key] = []
-                self.existing_players[name_key].append(player)
-                
-                # Also store by external_player_id if available
-                if player.get('external_player_id'):
-                    ext_key = f"ext_{player['external_player_id']}"
-                    self.existing_players[ext_key] = [player]
-            
-            logger.info(f"📝 Loaded {len(response.data)} existing MLB players")
+            # Indexed by external id, name and (last name, team) block, see player_resolver.py
+            self.players = PlayerResolver.load(supabase, 'MLB', active_only=True, registry=self.registry)
+            logger.info(f"📝 Loaded {len(self.players)} existing MLB players")
             
         except Exception as e:
             logger.error(f"Error loading existing players: {e}")
@@ -195,94 +180,14 @@ class HeadshotCollectionSystem:
             self.failed_matches += 1
 
     async def find_matching_player(self, name: str, team: str, sportsdata_id: int) -> Optional[Dict]:
-        """Find matching player using multiple strategies"""
+        """Find matching player: SportsDataIO id, exact name, then fuzzy name within last name + team"""
         try:
-            # Strategy 1: Exact external_player_id match
-            ext_key = f"ext_{sportsdata_id}"
-            if ext_key in self.existing_players:
-                return self.existing_players[ext_key][0]
-            
-            # Strategy 2: Exact name match (case insensitive)
-            name_key = name.lower().strip()
-            if name_key in self.existing_players:
-                candidates = self.existing_players[name_key]
-                
-                # If only one candidate, use it
-                if len(candidates) == 1:
-                    return candidates[0]
-                
-                # Multiple candidates - match by team
-                for candidate in candidates:
-                    if self.teams_match(team, candidate.get('team', '')):
-                        return candidate
-                        
-                # If no team match, return first candidate
-                return candidates[0]
-            
-            # Strategy 3: Fuzzy name matching
-            best_match = None
-            best_score = 0.8  # Minimum similarity threshold
-            
-            for player_name, candidates in self.existing_players.items():
-                if player_name.startswith('ext_'):
-                    continue
-                    
-                similarity = SequenceMatcher(None, name.lower(), player_name).ratio()
-                
-                if similarity > best_score:
-                    # Check if team matches to increase confidence
-                    for candidate in candidates:
-                        if self.teams_match(team, candidate.get('team', '')):
-                            best_match = candidate
-                            best_score = similarity
-                            break
-                    
-                    # If no team match but high name similarity, still consider
-                    if similarity > 0.9 and not best_match:
-                        best_match = candidates[0]
-                        best_score = similarity
-            
-            return best_match
+            return self.players.match(name, team, sportsdata_id)
             
         except Exception as e:
             logger.error(f"Error finding matching player: {e}")
             return None
 
-    def teams_match(self, team1: str, team2: str) -> bool:
-        """Check if two team names/abbreviations match"""
-        if not team1 or not team2:
-            return False
-            
-        team1 = team1.upper().strip()
-        team2 = team2.upper().strip()
-        
-        # Exact match
-        if team1 == team2:
-            return True
-            
-        # Common abbreviation mappings
-        team_mappings = {
-            'WSH': ['WAS', 'WASHINGTON'],
-            'SF': ['SFG', 'SAN FRANCISCO'],
-            'TB': ['TAM', 'TAMPA BAY'],
-            'SD': ['SDP', 'SAN DIEGO'],
-            'KC': ['KCR', 'KANSAS CITY'],
-            'CWS': ['CHW', 'CHICAGO WHITE SOX'],
-            'LAA': ['ANA', 'ANGELS'],
-            'ARI': ['AZ', 'ARIZONA'],
-            'CLE': ['CLEVELAND'],
-            'MIA': ['FLA', 'FLORIDA']
-        }
-        
-        # Check mappings
-        for standard, alternatives in team_mappings.items():
-            if (team1 == standard and team2 in alternatives) or \
-               (team2 == standard and team1 in alternatives) or \
-               (team1 in alternatives and team2 in alternatives):
-                return True
-        
-        return False
-
     async def store_player_headshot(self, player_id: str, headshot_url: str,
                                   sportsdata_id: int, player_name: str, team: str) -> bool:
         """Store headshot for matched player via upsert to player_headshots"""
@@ -4,13 +4,15 @@ Fetches and updates missing player headshots from multiple reliable sources
 """
 import os
 import re
-import requests
+import sys
 from typing import Optional, Dict, List, Tuple
 from supabase import create_client, Client
 from urllib.parse import quote
-import time
 from datetime import datetime
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_fetch
+
 # Load environment variables from .env file if it exists
 try:
     from dotenv import load_dotenv
@@ -81,71 +83,74 @@ def is_valid_numeric_id(player_id: str) -> bool:
     return player_id and player_id.isdigit()
 
 
-def verify_image_url(url: str, timeout: int = 5) -> bool:
-    """Verify that an image URL is accessible and returns a valid image"""
-    try:
-        response = requests.head(url, timeout=timeout, allow_redirects=True)
-        if response.status_code == 200:
-            content_type = response.headers.get('Content-Type', '')
-            return 'image' in content_type
-        return False
-    except requests.RequestException:
-        return False
+def is_image_response(response) -> bool:
+    """A HEAD response for an accessible image"""
+    return response is not None and response.status_code == 200 and 'image' in response.headers.get('Content-Type', '')
 
 
-def find_working_headshot(player_id: str, sport: str, player_name: str = None) -> Optional[Tuple[str, str]]:
-    """
-    Try different headshot URL patterns until one works
-    Returns: (url, source) tuple or None
-    """
+def source_for_url(url: str) -> str:
+    if 'espncdn.com' in url:
+        return 'espn'
+    if 'cdn.nba.com' in url or 'nba.com' in url:
+        return 'nba'
+    if 'mlbstatic.com' in url:
+        return 'mlb'
+    if 'nhl.bamgrid.com' in url or 'nhl.com' in url:
+        return 'nhl'
+    return 'unknown'
+
+
+def headshot_candidates(player_id: str, sport: str, player_name: str = None) -> List[Tuple[str, str]]:
+    """(url, source) for every headshot pattern of a player, in preference order"""
     patterns = HEADSHOT_PATTERNS.get(sport, [])
     
     # Special handling for MLB - extract numeric ID
     if sport == "MLB":
         player_id = extract_mlb_player_id(player_id)
         if not player_id:
-            return None
+            return []
     
     # For NHL, only try if we have a numeric ID
     if sport == "NHL" and not is_valid_numeric_id(player_id):
-        return None
+        return []
+    
+    candidates = []
     
     # For WNBA, we might need to use player name
     if sport == "WNBA" and player_name:
-        for i, pattern in enumerate(patterns):
-            try:
-                url = pattern(player_name)
-                if verify_image_url(url):
-                    source = f"espn_wnba_name"
-                    print(f"✓ Found {sport} headshot: {url}")
-                    return (url, source)
-            except Exception as e:
-                continue
+        candidates.extend((pattern(player_name), "espn_wnba_name") for pattern in patterns)
     
-    # Try each pattern
     for i, pattern in enumerate(patterns):
         try:
             url = pattern(player_id)
-            if verify_image_url(url):
-                # Determine source based on URL
-                if 'espncdn.com' in url:
-                    source = 'espn'
-                elif 'cdn.nba.com' in url or 'nba.com' in url:
-                    source = 'nba'
-                elif 'mlbstatic.com' in url:
-                    source = 'mlb'
-                elif 'nhl.bamgrid.com' in url or 'nhl.com' in url:
-                    source = 'nhl'
-                else:
-                    source = 'unknown'
-                
-                print(f"✓ Found {sport} headshot for player {player_id}: {url}")
-                return (url, source)
         except Exception as e:
             print(f"✗ Error trying pattern {i} for {sport} player {player_id}: {str(e)}")
             continue
-    
-    return None
+        candidates.append((url, source_for_url(url)))
+    return candidates
+
+
+def find_working_headshots(candidate_lists: List[List[Tuple[str, str]]]) -> List[Optional[Tuple[str, str]]]:
+    """
+    Probe every candidate URL of a batch of players concurrently (each CDN at its
+    configured rate); returns the first working (url, source) per player, or None
+    """
+    urls = list(dict.fromkeys(url for candidates in candidate_lists for url, _ in candidates))
+    working = {url for url, response in zip(urls, http_fetch.request_many('HEAD', urls, timeout=5))
+               if is_image_response(response)}
+    return [next(((url, source) for url, source in candidates if url in working), None)
+            for candidates in candidate_lists]
+
+
+def find_working_headshot(player_id: str, sport: str, player_name: str = None) -> Optional[Tuple[str, str]]:
+    """
+    Try different headshot URL patterns until one works
+    Returns: (url, source) tuple or None
+    """
+    result = find_working_headshots([headshot_candidates(player_id, sport, player_name)])[0]
+    if result:
+        print(f"✓ Found {sport} headshot for player {player_id}: {result[0]}")
+    return result
 
 
 def update_player_headshot(player_id: str, headshot_url: str, source: str) -> bool:
@@ -190,39 +195,40 @@ def process_sport(sport: str, limit: Optional[int] = None, batch_size: int = 50)
     success_count = 0
     failed_count = 0
     
-    for i, player in enumerate(players, 1):
-        player_id_internal = player['id']
-        external_id = player.get('external_player_id') or player.get('espn_player_id')
-        player_name = player.get('player_name') or player.get('name')
+    # Probe a batch of players' headshot URLs at once
+    for start in range(0, len(players), batch_size):
+        batch = players[start:start + batch_size]
+        results = find_working_headshots([
+            headshot_candidates(player.get('external_player_id') or player.get('espn_player_id'), sport,
+                                player.get('player_name') or player.get('name'))
+            if player.get('external_player_id') or player.get('espn_player_id') else []
+            for player in batch
+        ])
         
-        print(f"[{i}/{len(players)}] Processing: {player_name} (ID: {external_id})")
-        
-        if not external_id:
-            print(f"  ✗ No external ID available")
-            failed_count += 1
-            continue
-        
-        # Find working headshot
-        result = find_working_headshot(external_id, sport, player_name)
-        
-        if result:
-            headshot_url, source = result
-            if update_player_headshot(player_id_internal, headshot_url, source):
-                print(f"  ✓ Updated successfully!")
-                success_count += 1
+        for i, (player, result) in enumerate(zip(batch, results), start + 1):
+            player_id_internal = player['id']
+            external_id = player.get('external_player_id') or player.get('espn_player_id')
+            player_name = player.get('player_name') or player.get('name')
+            
+            print(f"[{i}/{len(players)}] Processing: {player_name} (ID: {external_id})")
+            
+            if not external_id:
+                print(f"  ✗ No external ID available")
+                failed_count += 1
+                continue
+            
+            if result:
+                headshot_url, source = result
+                print(f"✓ Found {sport} headshot for player {external_id}: {headshot_url}")
+                if update_player_headshot(player_id_internal, headshot_url, source):
+                    print(f"  ✓ Updated successfully!")
+                    success_count += 1
+                else:
+                    print(f"  ✗ Failed to update database")
+                    failed_count += 1
             else:
-                print(f"  ✗ Failed to update database")
+                print(f"  ✗ No working headshot URL found")
                 failed_count += 1
-        else:
-            print(f"  ✗ No working headshot URL found")
-            failed_count += 1
-        
-        # Rate limiting - be nice to the CDNs
-        if i % batch_size == 0:
-            print(f"\n  Pausing for rate limiting... ({i}/{len(players)})")
-            time.sleep(2)
-        else:
-            time.sleep(0.1)
     
     print(f"\n{'='*60}")
     print(f"{sport} Summary:")
@@ -260,6 +266,7 @@ def main():
     print("\n" + "="*60)
     print("Headshot Ingestion Complete!")
     print("="*60 + "\n")
+    http_fetch.log_stats()
     
     # Print final summary
     print("Fetching final coverage statistics...\n")
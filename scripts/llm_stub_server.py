@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+LLM stub server
+OpenAI-compatible /chat/completions endpoint for running the pick agents offline.
+
+Answers every chat completion with a fixed body (default "{}", or the contents of
+--response-file) after --latency seconds, with usage counts estimated from word counts
+(stream=true requests get the body as server-sent chunks spread over --latency),
+and fails every Nth request with a 429 (--fail-every) to exercise llm_gateway retries.
+
+Usage:
+    python scripts/llm_stub_server.py [--port 8089] [--latency 0.5] [--response-file picks.json] [--fail-every N]
+    LLM_BASE_URL=http://127.0.0.1:8089/v1 python props_enhanced.py ...
+"""
+
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    response_text = "{}"
+    latency = 0.0
+    stream_chunk = 16
+    fail_every = 0
+    requests_seen = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.endswith("/chat/completions"):
+            return self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        with self.lock:
+            StubHandler.requests_seen += 1
+            seen = StubHandler.requests_seen
+        if self.fail_every and seen % self.fail_every == 0:
+            return self._send(429, {"error": {"message": "stub rate limit", "type": "rate_limit_error"}})
+
+        prompt_tokens = sum(len(str(message.get("content", "")).split()) for message in body.get("messages", []))
+        completion_tokens = len(self.response_text.split())
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        if body.get("stream"):
+            return self._stream(seen, body.get("model", "stub"), usage)
+
+        time.sleep(self.latency)
+        self._send(200, {
+            "id": f"stub-{seen}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.response_text},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, seen, model, usage):
+        """Server-sent chat.completion.chunk events, spreading --latency over the chunks"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        pieces = [self.response_text[i:i + self.stream_chunk] for i in range(0, len(self.response_text), self.stream_chunk)]
+        base = {"id": f"stub-{seen}", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        for piece in pieces:
+            time.sleep(self.latency / max(1, len(pieces)))
+            self._event({**base, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]})
+        self._event({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        self._event({**base, "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _event(self, payload):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible chat completion stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--response-file", help="File whose contents are returned as the completion")
+    parser.add_argument("--stream-chunk", type=int, default=16, help="Characters per streamed chunk")
+    parser.add_argument("--fail-every", type=int, default=0, help="Return 429 on every Nth request")
+    args = parser.parse_args()
+
+    if args.response_file:
+        with open(args.response_file) as f:
+            StubHandler.response_text = f.read()
+    StubHandler.latency = args.latency
+    StubHandler.stream_chunk = args.stream_chunk
+    StubHandler.fail_every = args.fail_every
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"LLM stub listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@
 """
 NFL 2024 Historical Stats Ingestion Script
 Uses custom StatMuse API server to collect accurate historical player stats
+
+Each (player, week) is a job_runner work unit: a rerun after a crash or redeploy
+resumes where the last one stopped, and --workers / --shard split the players' weeks
+across processes.
 """
 
 import os
@@ -21,6 +25,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
+from job_runner import JobRunner, add_job_arguments, job_options
+
 # Load environment variables
 load_dotenv()
 
@@ -56,11 +62,6 @@ class NFLStatsIngestionManager:
         self.season_weeks = list(range(1, 19))  # Regular season weeks 1-18
         self.playoff_weeks = ["wildcard", "divisional", "conference", "super bowl"]
         
-        # Stats tracking
-        self.stats_collected = 0
-        self.players_processed = 0
-        self.errors_encountered = 0
-        
         logger.info("🏈 NFL Stats Ingestion Manager initialized")
         logger.info(f"📊 Target: Weeks 1-18 + Playoffs for 2024 season")
     
@@ -431,63 +432,27 @@ class NFLStatsIngestionManager:
             logger.error(f"❌ Error storing stats for player {player_id} week {week}: {e}")
             return False
     
-    def process_player_season(self, player: Dict) -> int:
-        """Process entire 2024 season for a single player"""
-        player_id = player['id']
-        player_name = player['name']
-        player_position = player['position']
-        
-        logger.info(f"🏈 Processing {player_name} ({player_position}) - {player['team']}")
-        
-        stats_collected = 0
-        
-        # Process regular season weeks
-        for week in self.season_weeks:
-            try:
-                # Query StatMuse for this week
-                statmuse_result = self.query_statmuse_for_player_week(player_name, week)
-                
-                if statmuse_result and statmuse_result.get('success'):
-                    # Parse the stats
-                    parsed_stats = self.parse_statmuse_stats(statmuse_result, player_position)
-                    
-                    if parsed_stats:
-                        # Store in database
-                        if self.store_player_game_stats(player_id, str(week), parsed_stats):
-                            stats_collected += 1
-                            self.stats_collected += 1
-                
-                # Rate limiting - be nice to StatMuse
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"❌ Error processing {player_name} week {week}: {e}")
-                self.errors_encountered += 1
-        
-        # Process playoff weeks for relevant players
-        # (You might want to be more selective here)
-        for playoff_week in self.playoff_weeks:
-            try:
-                statmuse_result = self.query_statmuse_for_player_week(player_name, playoff_week)
-                
-                if statmuse_result and statmuse_result.get('success'):
-                    parsed_stats = self.parse_statmuse_stats(statmuse_result, player_position)
-                    
-                    if parsed_stats:
-                        if self.store_player_game_stats(player_id, playoff_week, parsed_stats):
-                            stats_collected += 1
-                            self.stats_collected += 1
-                
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"❌ Error processing {player_name} {playoff_week}: {e}")
-                self.errors_encountered += 1
-        
-        logger.info(f"✅ Completed {player_name}: {stats_collected} stat records collected")
-        return stats_collected
+    def process_player_week(self, unit: tuple) -> int:
+        """Query, parse and store one player's week; returns the records stored (0 or 1)"""
+        player, week = unit
+        statmuse_result = self.query_statmuse_for_player_week(player['name'], week)
+        
+        stored = 0
+        if statmuse_result and statmuse_result.get('success'):
+            parsed_stats = self.parse_statmuse_stats(statmuse_result, player['position'])
+            
+            if parsed_stats:
+                # A failed insert raises so the job runner retries the week
+                if not self.store_player_game_stats(player['id'], str(week), parsed_stats):
+                    raise RuntimeError(f"could not store {player['name']} week {week}")
+                stored = 1
+        
+        # Rate limiting - be nice to StatMuse
+        time.sleep(1)
+        return stored
     
-    def run_full_ingestion(self, position_filter: Optional[List[str]] = None, max_players: Optional[int] = None):
+    def run_full_ingestion(self, position_filter: Optional[List[str]] = None, max_players: Optional[int] = None,
+                           **job_kwargs):
         """Run full NFL 2024 historical stats ingestion"""
         logger.info("🚀 Starting NFL 2024 Historical Stats Ingestion")
         
@@ -510,36 +475,23 @@ class NFLStatsIngestionManager:
         
         logger.info(f"📊 Processing {len(players)} NFL players")
         
-        start_time = datetime.now()
-        
-        # Process each player
-        for i, player in enumerate(players, 1):
-            try:
-                logger.info(f"📈 Progress: {i}/{len(players)} players")
-                
-                stats_for_player = self.process_player_season(player)
-                self.players_processed += 1
-                
-                # Progress update every 10 players
-                if i % 10 == 0:
-                    elapsed = datetime.now() - start_time
-                    logger.info(f"⏱️ Progress Update: {i}/{len(players)} players, {self.stats_collected} stats collected, {elapsed}")
-                
-            except Exception as e:
-                logger.error(f"❌ Critical error processing player {player.get('name', 'Unknown')}: {e}")
-                self.errors_encountered += 1
+        # Regular season weeks, then playoff rounds, for every player
+        units = [(player, week) for player in players for week in self.season_weeks + self.playoff_weeks]
+        runner = JobRunner(
+            'nfl_2024_statmuse',
+            self.process_player_week,
+            key=lambda unit: f"{unit[0]['id']}:{unit[1]}",
+            **job_kwargs,
+        )
+        report = runner.run(units)
         
         # Final summary
-        end_time = datetime.now()
-        duration = end_time - start_time
-        
         logger.info("🎉 NFL 2024 Historical Stats Ingestion Complete!")
         logger.info(f"📊 Final Summary:")
-        logger.info(f"   - Players Processed: {self.players_processed}")
-        logger.info(f"   - Stats Records Collected: {self.stats_collected}")
-        logger.info(f"   - Errors Encountered: {self.errors_encountered}")
-        logger.info(f"   - Duration: {duration}")
-        logger.info(f"   - Average Stats per Player: {self.stats_collected / max(self.players_processed, 1):.1f}")
+        logger.info(f"   - Player-weeks Processed: {report.done} ({report.skipped} done in earlier runs)")
+        logger.info(f"   - Stats Records Collected: {report.result_total:g}")
+        logger.info(f"   - Errors Encountered: {report.failed}")
+        logger.info(f"   - Duration: {report.seconds:.0f}s")
 
 def main():
     """Main execution function"""
@@ -549,6 +501,7 @@ def main():
     parser.add_argument('--positions', nargs='+', help='Filter by positions (QB, RB, WR, TE)', default=None)
     parser.add_argument('--max-players', type=int, help='Limit number of players for testing', default=None)
     parser.add_argument('--test-mode', action='store_true', help='Run in test mode with limited players')
+    add_job_arguments(parser)
     
     args = parser.parse_args()
     
@@ -561,7 +514,8 @@ def main():
         ingestion_manager = NFLStatsIngestionManager()
         ingestion_manager.run_full_ingestion(
             position_filter=args.positions,
-            max_players=args.max_players
+            max_players=args.max_players,
+            **job_options(args)
         )
         
     except KeyboardInterrupt:
@@ -5,10 +5,9 @@ Scrapes individual game logs for NFL players from pro-football-reference.com
 """
 import os
 import sys
-import requests
+import httpx
 import pandas as pd
 from bs4 import BeautifulSoup
-import time
 import logging
 import psycopg2
 from psycopg2.extras import RealDictCursor
@@ -16,6 +15,9 @@ import json
 from datetime import datetime
 import re
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_fetch
+
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -67,16 +69,11 @@ def scrape_pfr_player_gamelog(pfr_url: str, player_info: dict, season: str = "20
         'Cache-Control': 'max-age=0'
     }
     
-    session = requests.Session()
-    session.headers.update(headers)
-    
     try:
         logger.info(f"Scraping PFR for {player_info.get('player_name', 'Unknown')}: {pfr_url}")
         
-        # Add delay to avoid rate limiting
-        time.sleep(2)
-        
-        response = session.get(pfr_url, timeout=15)
+        # PFR's request budget (~20/minute) is enforced by http_fetch (config/http_hosts.json)
+        response = http_fetch.get(pfr_url, headers=headers)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -162,7 +159,7 @@ def scrape_pfr_player_gamelog(pfr_url: str, player_info: dict, season: str = "20
         logger.info(f"✅ Scraped {len(games)} games for {player_info.get('player_name')}")
         return games[:max_games]
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"❌ Request failed for {player_info.get('player_name')}: {e}")
         return []
     except Exception as e:
@@ -7,7 +7,6 @@ Resumable ESPN Player ID Discovery Script
 - Optimized for continuous operation
 """
 
-import requests
 import json
 import time
 from datetime import datetime
@@ -22,6 +21,10 @@ load_dotenv('/Users/rreusch2/parleyapp/.env')
 # Add the parent directory to the Python path to import Supabase client
 sys.path.append('/Users/rreusch2/parleyapp/python-services/player-stats')
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from player_resolver import PLAYERS_PAGE_SIZE, PlayerResolver
+import http_fetch
+
 try:
     from supabase_client import SupabasePlayerStatsClient
     print("✅ Successfully imported Supabase client")
@@ -40,6 +43,8 @@ class ResumableESPNDiscovery:
         }
         self.supabase = SupabasePlayerStatsClient()
         self.start_offset = start_offset
+        self.resolver = None  # our players still needing ESPN IDs, loaded once
+        self.team_abbreviations = {}  # ESPN team $ref -> abbreviation
         
         # Stats tracking
         self.processed_count = 0
@@ -55,27 +60,20 @@ class ResumableESPNDiscovery:
         try:
             if 'team' in athlete_data and athlete_data['team']:
                 if isinstance(athlete_data['team'], dict) and '$ref' in athlete_data['team']:
-                    team_response = requests.get(athlete_data['team']['$ref'], headers=self.headers, timeout=5)
-                    team_response.raise_for_status()
-                    team_data = team_response.json()
-                    return team_data.get('abbreviation', '')
+                    # ~32 distinct teams, so each team document is fetched once per run
+                    team_url = athlete_data['team']['$ref']
+                    if team_url not in self.team_abbreviations:
+                        team_data = http_fetch.get_json(team_url, headers=self.headers, timeout=5)
+                        if not team_data:
+                            return ''
+                        self.team_abbreviations[team_url] = team_data.get('abbreviation', '')
+                    return self.team_abbreviations[team_url]
                 elif isinstance(athlete_data['team'], dict):
                     return athlete_data['team'].get('abbreviation', '')
             return ''
         except:
             return ''
 
-    def names_match(self, name1, name2):
-        """Enhanced name matching"""
-        def normalize(name):
-            return (name.lower()
-                   .replace('.', '')
-                   .replace(' jr', '').replace(' sr', '').replace(' ii', '').replace(' iii', '').replace(' iv', '')
-                   .replace('a.j.', 'aj').replace('d.j.', 'dj').replace('j.j.', 'jj').replace('t.j.', 'tj')
-                   .replace(' ', '').strip())
-        
-        return normalize(name1) == normalize(name2)
-
     def store_espn_id_immediately(self, player_id, player_name, espn_id):
         """Store ESPN ID immediately with retry logic"""
         max_retries = 3
@@ -99,15 +97,25 @@ class ResumableESPNDiscovery:
         return False
 
     def get_our_players_without_espn_ids(self):
-        """Get all NFL players without ESPN IDs"""
+        """Get all NFL players without ESPN IDs, in pages past PostgREST's row cap"""
         try:
-            response = self.supabase.client.table('players').select(
-                'id, name, position, team'
-            ).eq('sport', 'NFL').in_(
-                'position', ['QB', 'RB', 'WR', 'TE', 'K', 'FB']
-            ).is_('espn_player_id', 'null').execute()
+            players = []
+            start = 0
+            while True:
+                response = self.supabase.client.table('players').select(
+                    'id, name, position, team'
+                ).eq('sport', 'NFL').in_(
+                    'position', ['QB', 'RB', 'WR', 'TE', 'K', 'FB']
+                ).is_('espn_player_id', 'null').order('id').range(
+                    start, start + PLAYERS_PAGE_SIZE - 1
+                ).execute()
+                page = response.data or []
+                players.extend(page)
+                if len(page) < PLAYERS_PAGE_SIZE:
+                    break
+                start += PLAYERS_PAGE_SIZE
             
-            return response.data
+            return players
         except Exception as e:
             logger.error(f"Error fetching our players: {e}")
             return []
@@ -118,9 +126,9 @@ class ResumableESPNDiscovery:
             # Get active NFL athletes
             url = f"http://sports.core.api.espn.com/v2/sports/football/leagues/nfl/athletes?active=true&limit={batch_size}&offset={start_index}"
             
-            response = requests.get(url, headers=self.headers, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data = http_fetch.get_json(url, headers=self.headers)
+            if data is None:
+                return 0, True
             
             if 'items' not in data or not data['items']:
                 logger.info(f"No more ESPN athletes found at offset {start_index}")
@@ -128,29 +136,29 @@ class ResumableESPNDiscovery:
             
             logger.info(f"📊 Processing ESPN athletes {start_index} to {start_index + len(data['items'])}")
             
-            # Get our players without ESPN IDs
-            our_players = self.get_our_players_without_espn_ids()
-            logger.info(f"📋 Found {len(our_players)} players still needing ESPN IDs")
+            # Our players without ESPN IDs, loaded once and indexed by name / (last name, team)
+            if self.resolver is None:
+                self.resolver = PlayerResolver('NFL', self.get_our_players_without_espn_ids())
+            logger.info(f"📋 Found {len(self.resolver)} players still needing ESPN IDs")
             
-            if not our_players:
+            if not len(self.resolver):
                 logger.info("🎉 All players now have ESPN IDs!")
                 return 0, True
             
             batch_processed = 0
             
+            # Fetch the batch's athletes concurrently at ESPN's configured rate
+            athlete_urls = [
+                athlete_ref['$ref'] if isinstance(athlete_ref, dict) and '$ref' in athlete_ref else athlete_ref
+                for athlete_ref in data['items']
+            ]
+            athletes = http_fetch.get_json_many(athlete_urls, headers=self.headers, timeout=10)
+            
             # Process each ESPN athlete
-            for athlete_ref in data['items']:
+            for athlete_data in athletes:
                 try:
-                    # Extract URL from $ref
-                    if isinstance(athlete_ref, dict) and '$ref' in athlete_ref:
-                        athlete_url = athlete_ref['$ref']
-                    else:
-                        athlete_url = athlete_ref
-                    
-                    # Fetch individual athlete data
-                    athlete_response = requests.get(athlete_url, headers=self.headers, timeout=10)
-                    athlete_response.raise_for_status()
-                    athlete_data = athlete_response.json()
+                    if not athlete_data:
+                        continue
                     
                     # Extract athlete info
                     espn_name = athlete_data.get('displayName', '')
@@ -168,23 +176,15 @@ class ResumableESPNDiscovery:
                     batch_processed += 1
                     self.processed_count += 1
                     
-                    # Try to match with our players
-                    for our_player in our_players[:]:  # Use slice copy to allow removal
-                        our_name = our_player['name'].lower().strip()
-                        our_position = our_player['position']
+                    # Match by name (exact, or fuzzy within last name + team) and position
+                    our_player = self.resolver.match(espn_name, espn_team, position=espn_position)
+                    if our_player:
+                        logger.info(f"🎯 MATCH: {our_player['name']} ({our_player['position']}) -> ESPN ID: {espn_id}")
+                        self.matched_count += 1
                         
-                        # Match by name and position
-                        if (self.names_match(our_name, espn_name) and our_position == espn_position):
-                            logger.info(f"🎯 MATCH: {our_player['name']} ({our_position}) -> ESPN ID: {espn_id}")
-                            self.matched_count += 1
-                            
-                            # Store immediately
-                            if self.store_espn_id_immediately(our_player['id'], our_player['name'], espn_id):
-                                our_players.remove(our_player)
-                            break
-                    
-                    # Brief delay to avoid rate limiting
-                    time.sleep(0.05)  # Even faster - 0.05s delay
+                        # Store immediately
+                        if self.store_espn_id_immediately(our_player['id'], our_player['name'], espn_id):
+                            self.resolver.discard(str(our_player['id']))
                     
                 except Exception as e:
                     logger.error(f"Error processing individual athlete: {e}")
@@ -225,9 +225,6 @@ class ResumableESPNDiscovery:
             elapsed = time.time() - start_time
             rate = self.processed_count / elapsed if elapsed > 0 else 0
             logger.info(f"📊 Progress: {self.processed_count} processed, {self.matched_count} matched, {self.stored_count} stored (Rate: {rate:.1f}/sec)")
-            
-            # Very brief pause between batches
-            time.sleep(0.5)
         
         # Final summary
         elapsed = time.time() - start_time
@@ -238,6 +235,7 @@ class ResumableESPNDiscovery:
         logger.info(f"   • Errors: {self.error_count}")
         logger.info(f"   • Time: {elapsed:.1f} seconds")
         logger.info(f"   • Final offset: {current_offset}")
+        http_fetch.log_stats()
 
 def main():
     # Start from offset 400 since we processed 0-399 already
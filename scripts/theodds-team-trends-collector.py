@@ -13,9 +13,11 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import json
-import re
 from supabase import create_client, Client
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from team_registry import get_team_registry
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -60,57 +62,8 @@ class TeamTrendsCollector:
             'icehockey_nhl': 'NHL'
         }
         
-        # Common MLB team alias -> 3-letter abbreviation map (covers frequent source variations)
-        # This helps when TheOdds uses full city names or nicknames while DB stores 3-letter codes.
-        self.mlb_alias_to_abbrev: Dict[str, str] = {
-            # AL East
-            'new york yankees': 'NYY', 'yankees': 'NYY',
-            'boston red sox': 'BOS', 'red sox': 'BOS',
-            'tampa bay rays': 'TB', 'rays': 'TB',
-            'toronto blue jays': 'TOR', 'blue jays': 'TOR',
-            'baltimore orioles': 'BAL', 'orioles': 'BAL',
-            # AL Central
-            'cleveland guardians': 'CLE', 'guardians': 'CLE',
-            'minnesota twins': 'MIN', 'twins': 'MIN',
-            'detroit tigers': 'DET', 'tigers': 'DET',
-            'kansas city royals': 'KC', 'royals': 'KC', 'kansas city': 'KC',
-            'chicago white sox': 'CWS', 'white sox': 'CWS',
-            # AL West
-            'texas rangers': 'TEX', 'rangers': 'TEX',
-            'houston astros': 'HOU', 'astros': 'HOU',
-            'seattle mariners': 'SEA', 'mariners': 'SEA',
-            'los angeles angels': 'LAA', 'la angels': 'LAA', 'angels': 'LAA', 'los angeles angels of anaheim': 'LAA',
-            'oakland athletics': 'OAK', 'athletics': 'OAK', 'a\'s': 'OAK',
-            # NL East
-            'new york mets': 'NYM', 'mets': 'NYM',
-            'philadelphia phillies': 'PHI', 'phillies': 'PHI',
-            'atlanta braves': 'ATL', 'braves': 'ATL',
-            'washington nationals': 'WSH', 'nationals': 'WSH',
-            'miami marlins': 'MIA', 'marlins': 'MIA',
-            # NL Central
-            'chicago cubs': 'CHC', 'cubs': 'CHC',
-            'st. louis cardinals': 'STL', 'st louis cardinals': 'STL', 'cardinals': 'STL',
-            'cincinnati reds': 'CIN', 'reds': 'CIN',
-            'milwaukee brewers': 'MIL', 'brewers': 'MIL',
-            'pittsburgh pirates': 'PIT', 'pirates': 'PIT',
-            # NL West
-            'los angeles dodgers': 'LAD', 'la dodgers': 'LAD', 'dodgers': 'LAD',
-            'san francisco giants': 'SF', 'giants': 'SF',
-            'san diego padres': 'SD', 'padres': 'SD',
-            'arizona diamondbacks': 'ARI', 'diamondbacks': 'ARI', 'd-backs': 'ARI', 'dbacks': 'ARI',
-            'colorado rockies': 'COL', 'rockies': 'COL',
-        }
-
-    def _normalize(self, s: str) -> str:
-        s = s or ''
-        s = s.lower().strip()
-        s = re.sub(r"[^a-z0-9\s\-']", '', s)
-        s = re.sub(r"\s+", ' ', s)
-        return s
-
-    def _mlb_to_abbrev(self, name: str) -> Optional[str]:
-        n = self._normalize(name)
-        return self.mlb_alias_to_abbrev.get(n)
+        # Team names/nicknames/abbreviations -> teams rows, compiled once (team_registry)
+        self.registry = get_team_registry(supabase)
         
     async def __aenter__(self):
         self.session = aiohttp.ClientSession()
@@ -278,12 +231,12 @@ class TeamTrendsCollector:
             if not sport_key:
                 return None
             
-            name_query = team_name or ''
-            abbrev_hint: Optional[str] = None
-            if sport_key == 'MLB':
-                abbrev_hint = self._mlb_to_abbrev(name_query)
+            team = self.registry.lookup(team_name, sport_key)
+            if team and team.row_id:
+                return team.row_id
 
-            # Try by abbreviation hint first (exact/ilike on team_abbreviation or team_key)
+            # Curated team whose teams row is stored under its abbreviation only
+            abbrev_hint = team.abbreviation if team else None
             if abbrev_hint:
                 resp = supabase.table('teams').select('id') \
                     .eq('sport_key', sport_key) \
@@ -293,6 +246,7 @@ class TeamTrendsCollector:
                     return resp.data[0]['id']
 
             # Fallback: broad ilike search on name and abbreviation
+            name_query = team_name or ''
             resp2 = supabase.table('teams').select('id') \
                 .eq('sport_key', sport_key) \
                 .or_(f"team_name.ilike.%{name_query}%,team_abbreviation.ilike.%{name_query}%") \
@@ -300,18 +254,6 @@ class TeamTrendsCollector:
             if resp2.data:
                 return resp2.data[0]['id']
 
-            # Last attempt: if MLB and name has city + nickname, try only nickname part
-            if sport_key == 'MLB':
-                parts = (name_query or '').split(' ')
-                if len(parts) > 1:
-                    nickname = parts[-1]
-                    resp3 = supabase.table('teams').select('id') \
-                        .eq('sport_key', sport_key) \
-                        .or_(f"team_name.ilike.%{nickname}%,team_abbreviation.ilike.%{nickname}%") \
-                        .execute()
-                    if resp3.data:
-                        return resp3.data[0]['id']
-
             logger.warning(f"Team not found in database: {team_name} ({sport_name})")
             return None
                 
@@ -16,6 +16,10 @@ import time
 from typing import Dict, List, Optional
 import json
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from player_resolver import PlayerResolver
+from stat_writer import GameStatsWriter
+
 # Load environment
 load_dotenv()
 
@@ -245,7 +249,9 @@ class UnifiedSportsDataManager:
         """Store real player stats in database with validation"""
         logger.info(f"💾 Storing {len(stats_data)} REAL {sport} stats")
         
-        stored_count = 0
+        # One paged players load and chunked upserts instead of two selects + an insert per stat
+        players = PlayerResolver.load(self.supabase, sport)
+        writer = GameStatsWriter(self.supabase, source='sportsdata')
         
         for stat in stats_data:
             try:
@@ -275,22 +281,18 @@ class UnifiedSportsDataManager:
                     continue
                 
                 # Find player in database
-                player_result = self.supabase.table('players').select('id').eq('name', player_name).eq('sport', sport).execute()
+                player = players.match(player_name, stat.get('Team'))
                 
-                if not player_result.data:
+                if not player:
                     logger.debug(f"Player not found: {player_name}")
                     continue
                 
-                player_id = player_result.data[0]['id']
-                
-                # Check if this stat already exists
-                existing = self.supabase.table('player_game_stats').select('id').eq('player_id', player_id).execute()
-                
                 # Prepare stat data
                 clean_stat = {
                     'game_date': game_date,
                     'player_name': player_name,
-                    'sport': sport
+                    'sport': sport,
+                    'external_game_id': str(stat.get('GameID') or '')
                 }
                 
                 # Add sport-specific stats
@@ -321,24 +323,15 @@ class UnifiedSportsDataManager:
                         'blocks': stat.get('Blocks', 0)
                     })
                 
-                # Insert real stat
-                self.supabase.table('player_game_stats').insert({
-                    'player_id': player_id,
-                    'stats': clean_stat,
-                    'created_at': datetime.now().isoformat()
-                }).execute()
-                
-                stored_count += 1
+                writer.add(player['id'], clean_stat)
                 
-                if stored_count % 50 == 0:
-                    logger.info(f"  Stored {stored_count} real stats...")
-                    
             except Exception as e:
                 logger.debug(f"Error storing stat: {e}")
                 continue
         
-        logger.info(f"✅ Successfully stored {stored_count} REAL {sport} stats")
-        return stored_count
+        report = writer.close()
+        logger.info(f"✅ Successfully stored {report.stored} REAL {sport} stats")
+        return report.stored
     
     def run_complete_data_refresh(self, clean_fake_data: bool = False) -> Dict:
         """Run complete refresh of all sports data with real APIs"""
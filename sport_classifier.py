@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Sport Classifier
+Precompiled multi-keyword sport detection for StatMuse queries.
+
+All per-sport keywords (config/sport_keywords.json, plus player names from the
+`players` table when Supabase is configured) are compiled once into a single
+trie-shaped regex, so one scan of the query finds every keyword regardless of
+how many thousand names are loaded. Each keyword maps to the sports it belongs
+to with a category weight, and the matches are summed into a score per sport.
+
+Paging the players table takes a while, so servers start from the keyword-only
+classifier and swap in the players-backed one when load_classifier_in_background
+has built it.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'sport_keywords.json')
+
+# players.sport values -> classifier sport keys
+SPORT_ALIASES = {
+    'NCAAF': 'CFB',
+    'COLLEGE FOOTBALL': 'CFB',
+    'AMERICAN FOOTBALL': 'NFL',
+    'BASEBALL': 'MLB',
+}
+
+PLAYER_PAGE_SIZE = 1000
+
+
+def normalize_sport(sport: str) -> str:
+    sport_upper = (sport or '').strip().upper()
+    return SPORT_ALIASES.get(sport_upper, sport_upper)
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    """Build a regex from a character trie so the engine never re-tests shared prefixes"""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: dict) -> str:
+        is_end = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if is_end:
+            # Optional (greedy) so the longest keyword wins, with backtracking to the shorter one
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class SportClassifier:
+    """Scores a query against every sport in a single regex pass"""
+
+    def __init__(self, keywords_by_sport: Dict[str, Dict[str, List[str]]], weights: Dict[str, float]):
+        # keyword -> [(sport, weight)]
+        self._index: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        self.sports: List[str] = []
+        for sport, categories in keywords_by_sport.items():
+            sport_key = normalize_sport(sport)
+            if sport_key not in self.sports:
+                self.sports.append(sport_key)
+            for category, keywords in categories.items():
+                self._add(sport_key, keywords, weights.get(category, 1.0))
+        self._compile()
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_KEYWORDS_PATH) -> "SportClassifier":
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['sports'], data.get('weights', {}))
+
+    def _add(self, sport: str, keywords: Iterable[str], weight: float):
+        for keyword in keywords:
+            keyword = keyword.strip().lower()
+            if not keyword:
+                continue
+            entries = self._index[keyword]
+            if all(existing_sport != sport for existing_sport, _ in entries):
+                entries.append((sport, weight))
+
+    def _compile(self):
+        pattern = _trie_pattern(self._index.keys())
+        # Keywords must sit on word boundaries ("sec" must not match "seconds")
+        self._regex = re.compile(r'(?<![a-z0-9])(' + pattern + r')(?![a-z0-9])') if pattern else None
+
+    def add_players(self, players_by_sport: Dict[str, Iterable[str]], weight: float = 3.0):
+        """Merge player names (e.g. from the players table) and recompile"""
+        for sport, names in players_by_sport.items():
+            sport_key = normalize_sport(sport)
+            if sport_key not in self.sports:
+                self.sports.append(sport_key)
+            self._add(sport_key, names, weight)
+        self._compile()
+
+    def load_players_from_supabase(self, supabase, sports: Optional[List[str]] = None) -> int:
+        """Page through players(name, sport) and merge them in; returns names loaded"""
+        players_by_sport: Dict[str, List[str]] = defaultdict(list)
+        loaded = 0
+        offset = 0
+        while True:
+            query = supabase.table('players').select('name, sport')
+            if sports:
+                query = query.in_('sport', sports)
+            rows = query.range(offset, offset + PLAYER_PAGE_SIZE - 1).execute().data or []
+            for row in rows:
+                if row.get('name') and row.get('sport'):
+                    players_by_sport[row['sport']].append(row['name'])
+                    loaded += 1
+            if len(rows) < PLAYER_PAGE_SIZE:
+                break
+            offset += PLAYER_PAGE_SIZE
+        self.add_players(players_by_sport)
+        return loaded
+
+    @property
+    def keyword_count(self) -> int:
+        return len(self._index)
+
+    def matches(self, query: str) -> List[str]:
+        """All keywords found in the query (non-overlapping, longest first)"""
+        if self._regex is None:
+            return []
+        return [m.group(1) for m in self._regex.finditer(query.lower())]
+
+    def scores(self, query: str) -> Dict[str, float]:
+        """Raw weighted score per sport (only sports with at least one match)"""
+        scores: Dict[str, float] = defaultdict(float)
+        for keyword in self.matches(query):
+            for sport, weight in self._index[keyword]:
+                scores[sport] += weight
+        return dict(scores)
+
+    def classify(self, query: str) -> Dict[str, float]:
+        """Normalized sport distribution, highest first; empty when nothing matched"""
+        scores = self.scores(query)
+        total = sum(scores.values())
+        if not total:
+            return {}
+        return {sport: round(score / total, 4) for sport, score in sorted(scores.items(), key=lambda kv: -kv[1])}
+
+    def best_sport(self, query: str) -> Optional[str]:
+        distribution = self.classify(query)
+        return next(iter(distribution), None)
+
+    def is_sport(self, query: str, sport: str) -> bool:
+        """True if any keyword for `sport` appears in the query"""
+        return normalize_sport(sport) in self.scores(query)
+
+
+def _players_enabled() -> bool:
+    return bool(os.getenv('SUPABASE_URL') and os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+                and os.getenv('SPORT_CLASSIFIER_LOAD_PLAYERS', 'true').lower() == 'true')
+
+
+def build_default_classifier(load_players: bool = True) -> SportClassifier:
+    """Classifier from the bundled keyword file, plus players table names when available"""
+    classifier = SportClassifier.from_file(os.getenv('SPORT_KEYWORDS_PATH', DEFAULT_KEYWORDS_PATH))
+
+    if load_players and _players_enabled():
+        try:
+            from supabase import create_client
+            supabase = create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_SERVICE_ROLE_KEY'))
+            loaded = classifier.load_players_from_supabase(supabase)
+            logger.info(f"🏷️ Sport classifier loaded {loaded} player names from players table")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load player names for sport classifier: {e}")
+
+    logger.info(f"🏷️ Sport classifier compiled with {classifier.keyword_count} keywords across {len(classifier.sports)} sports")
+    return classifier
+
+
+def load_classifier_in_background(on_ready: Callable[[SportClassifier], None]) -> Optional[threading.Thread]:
+    """Build the players-backed classifier on a daemon thread and pass it to on_ready;
+    None when player names are not configured (the keyword-only classifier is final)"""
+    if not _players_enabled():
+        return None
+
+    def load():
+        started = time.perf_counter()
+        on_ready(build_default_classifier())
+        logger.info(f"🏷️ Players-backed sport classifier ready in {time.perf_counter() - started:.1f}s")
+
+    thread = threading.Thread(target=load, name='sport-classifier-load', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Stat Writer
+Buffered, deduplicated bulk writes of per-game player stats to player_game_stats.
+
+Shared by the historical backfills (scripts/backfill_free_apis_2025.py,
+scripts/backfill_player_stats_balldontlie.py, scripts/unified_sports_data_manager.py).
+Instead of a select plus an insert or update per stat row, the writer:
+
+- buffers rows in memory keyed by their natural key (player_id, game_key, stat_source);
+  game_key is the feed's game id (stats.external_game_id), else the event id, else the
+  game date, so both games of a doubleheader are kept. A key added twice before a flush
+  keeps the last row and counts as deduped
+- flushes every PLAYER_STATS_BATCH_SIZE rows (and on flush()/close()) with one
+  `upsert(on_conflict="player_id,game_key,stat_source")` per chunk, or, with
+  PLAYER_STATS_WRITE_MODE=copy and DATABASE_URL set, with COPY into a temp table plus
+  one INSERT ... ON CONFLICT over a pooled psycopg2 connection
+- reports rows/s, rows inserted, rows that already existed (conflicts) and failures;
+  a forked JobRunner worker starts its own report, which the parent merges back
+
+Schema: apps/backend/src/scripts/migrations/add_player_game_stats_natural_key.sql. Until
+it is applied the writer falls back to one select of the existing (player, date, game id)
+rows per chunk, a bulk insert of the new ones and an update per existing one.
+"""
+
+import io
+import os
+import csv
+import json
+import time
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STATS_TABLE = "player_game_stats"
+WRITE_BATCH_SIZE = int(os.getenv("PLAYER_STATS_BATCH_SIZE", "500"))
+WRITE_MODE = os.getenv("PLAYER_STATS_WRITE_MODE", "upsert")  # upsert | copy
+COPY_POOL_SIZE = int(os.getenv("PLAYER_STATS_COPY_POOL_SIZE", "4"))
+
+NATURAL_KEY = ("player_id", "game_key", "stat_source")
+SCHEMA_COLUMNS = ("game_date", "game_key", "stat_source")
+ROW_COLUMNS = ("player_id", "event_id", "game_date", "game_key", "stat_source", "stats",
+               "fantasy_points", "minutes_played", "betting_results")
+
+_pools: Dict[str, Any] = {}
+
+
+@dataclass
+class StatsWriteReport:
+    added: int = 0
+    skipped: int = 0  # rows without a player or game date
+    deduped: int = 0  # same natural key added again before a flush
+    stored: int = 0
+    inserted: int = 0
+    conflicts: int = 0  # rows that already existed and were updated
+    failed: int = 0
+    seconds: float = 0.0
+    batch_latencies_ms: List[float] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.stored / self.seconds if self.seconds else 0.0
+
+    def merge(self, other: Dict[str, Any]):
+        """Add another process's report (as returned by GameStatsWriter.worker_report)
+
+        Workers write concurrently, so the longest write time is kept rather than the sum.
+        """
+        for name, value in other.items():
+            if name == "batch_latencies_ms":
+                self.batch_latencies_ms.extend(value)
+            elif name == "seconds":
+                self.seconds = max(self.seconds, value)
+            elif hasattr(self, name):
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self) -> str:
+        return (f"{self.stored} stat rows stored in {self.seconds:.1f}s ({self.rows_per_second:.0f} rows/s): "
+                f"{self.inserted} new, {self.conflicts} already stored, {self.deduped} deduped in memory, "
+                f"{self.skipped} skipped, {self.failed} failed")
+
+
+def _connection_pool(dsn: str):
+    if dsn not in _pools:
+        from psycopg2.pool import ThreadedConnectionPool
+        _pools[dsn] = ThreadedConnectionPool(1, COPY_POOL_SIZE, dsn)
+    return _pools[dsn]
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _game_id(stats: Dict[str, Any]) -> Optional[str]:
+    game_id = stats.get("external_game_id")
+    return str(game_id) if game_id not in (None, "") else None
+
+
+def game_key_of(stats: Dict[str, Any], event_id: Optional[str], game_date: str) -> str:
+    """Feed game id, else event id, else game date; batting/pitching rows get their type appended
+
+    Same rule as the game_key backfill in add_player_game_stats_natural_key.sql.
+    """
+    game_key = _game_id(stats) or (str(event_id) if event_id else None) or game_date
+    row_type = stats.get("type")
+    return f"{game_key}:{row_type}" if row_type else game_key
+
+
+class GameStatsWriter:
+    """In-memory buffer of player_game_stats rows, flushed in chunks on the natural key"""
+
+    def __init__(self, supabase, source: str = "backfill", batch_size: Optional[int] = None,
+                 mode: Optional[str] = None, table: str = STATS_TABLE):
+        self.supabase = supabase
+        self.source = source
+        self.batch_size = batch_size or WRITE_BATCH_SIZE
+        self.table = table
+        self.report = StatsWriteReport()
+        self._buffer: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        self._legacy_schema = False
+        self._committed_failed = 0  # report.failed at the last checkpoint()
+        self._pid = os.getpid()
+        self._dsn = None
+        if (mode or WRITE_MODE) == "copy":
+            self._dsn = os.getenv("DATABASE_URL") or os.getenv("SUPABASE_DB_URL")
+            if not self._dsn:
+                logger.warning("⚠️ PLAYER_STATS_WRITE_MODE=copy needs DATABASE_URL, using chunked upserts")
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def add(self, player_id: Optional[str], stats: Dict[str, Any], source: Optional[str] = None,
+            event_id: Optional[str] = None) -> bool:
+        """Buffer one game's stats (stats must carry game_date); False if the row was skipped"""
+        self._own_report()
+        game_date = str(stats.get("game_date") or "")[:10]
+        if not player_id or not game_date:
+            self.report.skipped += 1
+            return False
+        source = source or self.source
+        stats = dict(stats, stat_source=source)
+        event_id = event_id or stats.get("event_id")
+        game_key = game_key_of(stats, event_id, game_date)
+        key = (str(player_id), game_key, source)
+        if key in self._buffer:
+            self.report.deduped += 1
+        self._buffer[key] = {
+            "player_id": str(player_id),
+            "event_id": event_id,
+            "game_date": game_date,
+            "game_key": game_key,
+            "stat_source": source,
+            "stats": stats,
+            "fantasy_points": str(stats.get("fantasy_points", 0)),
+            "minutes_played": stats.get("minutes_played"),
+            "betting_results": {},
+        }
+        self.report.added += 1
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        return True
+
+    def flush(self) -> StatsWriteReport:
+        """Write every buffered row"""
+        self._own_report()
+        rows, self._buffer = list(self._buffer.values()), {}
+        started = time.perf_counter()
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start:start + self.batch_size]
+            chunk_started = time.perf_counter()
+            try:
+                inserted, conflicts = self._write_chunk(chunk)
+            except Exception as e:
+                logger.error(f"❌ Failed to store {len(chunk)} player stat rows: {e}")
+                self.report.failed += len(chunk)
+                continue
+            latency_ms = (time.perf_counter() - chunk_started) * 1000
+            self.report.batch_latencies_ms.append(latency_ms)
+            self.report.inserted += inserted
+            self.report.conflicts += conflicts
+            self.report.stored += inserted + conflicts
+            logger.info(f"💾 Stored {inserted + conflicts}/{len(chunk)} player stat rows "
+                        f"({conflicts} already stored) in {latency_ms:.0f}ms")
+        self.report.seconds += time.perf_counter() - started
+        return self.report
+
+    def checkpoint(self):
+        """Flush and raise if any row failed since the last checkpoint (JobRunner commit hook)
+
+        Counts failures of add()'s automatic flushes too, so units whose rows were lost
+        in a mid-handler flush are never recorded as done.
+        """
+        self.flush()
+        failed = self.report.failed - self._committed_failed
+        self._committed_failed = self.report.failed
+        if failed:
+            raise RuntimeError(f"{failed} player stat rows failed to store since the last checkpoint")
+
+    def worker_report(self) -> Dict[str, Any]:
+        """Flush and return this process's report as a dict (JobRunner `collect` hook)"""
+        return asdict(self.flush())
+
+    def merge_reports(self, reports: List[Dict[str, Any]]):
+        """Fold forked workers' reports into this one, so close() reports the whole run"""
+        for report in reports:
+            self.report.merge(report)
+
+    def _own_report(self):
+        # A forked worker inherits the parent's (already flushed) counts; it reports only its own rows
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self.report = StatsWriteReport()
+            self._committed_failed = 0
+
+    def close(self) -> StatsWriteReport:
+        """Flush what is left and log the run's totals"""
+        self.flush()
+        logger.info(f"📊 {self.report.summary()}")
+        return self.report
+
+    def _write_chunk(self, chunk: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """(inserted, conflicts) for one chunk"""
+        if self._dsn:
+            try:
+                return self._copy_rows(chunk)
+            except ImportError:
+                logger.warning("⚠️ psycopg2 not installed, using chunked upserts")
+                self._dsn = None
+        if not self._legacy_schema:
+            try:
+                return self._upsert_rows(chunk)
+            except Exception as e:
+                if not any(marker in str(e) for marker in (*SCHEMA_COLUMNS, "ON CONFLICT")):
+                    raise
+                logger.warning(f"⚠️ player_game_stats has no natural key yet, using select + insert/update: {e}")
+                self._legacy_schema = True
+        return self._write_legacy(chunk)
+
+    def _upsert_rows(self, chunk: List[Dict[str, Any]]) -> Tuple[int, int]:
+        # Upserted rows keep their original created_at, which tells updates from inserts
+        started_at = datetime.now(timezone.utc)
+        response = self.supabase.table(self.table).upsert(chunk, on_conflict=",".join(NATURAL_KEY)).execute()
+        rows = response.data or []
+        conflicts = 0
+        for row in rows:
+            created_at = _parse_timestamp(row.get("created_at"))
+            if created_at and created_at < started_at:
+                conflicts += 1
+        return len(rows) - conflicts, conflicts
+
+    def _copy_rows(self, chunk: List[Dict[str, Any]]) -> Tuple[int, int]:
+        pool = _connection_pool(self._dsn)
+        columns = ", ".join(ROW_COLUMNS)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in ROW_COLUMNS if column not in NATURAL_KEY)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in chunk:
+            writer.writerow([json.dumps(row[column]) if isinstance(row[column], dict) else row[column]
+                             for column in ROW_COLUMNS])
+        buffer.seek(0)
+
+        conn = pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {self.table}_stage "
+                               f"(LIKE {self.table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS")
+                cursor.copy_expert(f"COPY {self.table}_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+                cursor.execute(f"INSERT INTO {self.table} ({columns}) SELECT {columns} FROM {self.table}_stage "
+                               f"ON CONFLICT ({', '.join(NATURAL_KEY)}) DO UPDATE SET {updates} "
+                               f"RETURNING (xmax = 0)")
+                inserted = sum(1 for (is_insert,) in cursor.fetchall() if is_insert)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+        return inserted, len(chunk) - inserted
+
+    def _write_legacy(self, chunk: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Pre-migration path: match existing rows on player_id + stats->>game_date + game id"""
+        player_ids = sorted({row["player_id"] for row in chunk})
+        dates = sorted({str(row["stats"]["game_date"]) for row in chunk})
+        response = self.supabase.table(self.table).select(
+            "id, player_id, game_date:stats->>game_date, external_game_id:stats->>external_game_id"
+        ).in_("player_id", player_ids).in_("stats->>game_date", dates).execute()
+        existing = {(row["player_id"], row.get("game_date"), row.get("external_game_id") or None): row["id"]
+                    for row in response.data or []}
+
+        new_rows, inserted, conflicts = [], 0, 0
+        for row in chunk:
+            legacy_row = {k: v for k, v in row.items() if k not in SCHEMA_COLUMNS}
+            stats = row["stats"]
+            row_id = existing.get((row["player_id"], str(stats["game_date"]), _game_id(stats)))
+            if row_id is None:
+                new_rows.append(legacy_row)
+                continue
+            self.supabase.table(self.table).update(legacy_row).eq("id", row_id).execute()
+            conflicts += 1
+        if new_rows:
+            inserted = len(self.supabase.table(self.table).insert(new_rows).execute().data or [])
+        return inserted, conflicts
@@ -4,14 +4,23 @@ StatMuse API Server
 Simple HTTP API that all AI systems can query for real StatMuse data
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 import logging
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
+import os
 import time
 import re
+import json
+import asyncio
+import threading
+from concurrent.futures import as_completed
+
+from statmuse_cache import TieredCache, ttl_for, DEFAULT_TTL_SECONDS
+from statmuse_fetch import StatMuseFetcher
+from sport_classifier import build_default_classifier, load_classifier_in_background
+from statmuse_text import normalize_statmuse_text
+from statmuse_extract import extract_answer, extract_page_lines
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -20,6 +29,20 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
+VALID_SPORTS = ['MLB', 'NHL', 'NBA', 'NFL', 'CFB', 'NCAAF', 'WNBA']
+MAX_BATCH_SIZE = 50
+BATCH_ITEM_TIMEOUT = 45  # seconds per item, including time waiting for a concurrency slot
+
+# StatMuse sport landing pages used for /scrape-context
+SPORT_PAGES = [
+    ('mlb', 'https://www.statmuse.com/mlb', 'MLB'),
+    ('nhl', 'https://www.statmuse.com/nhl', 'NHL'),
+    ('nba', 'https://www.statmuse.com/nba', 'NBA'),
+    ('nfl', 'https://www.statmuse.com/nfl', 'NFL'),
+    ('wnba', 'https://www.statmuse.com/wnba', 'WNBA'),
+    ('cfb', 'https://www.statmuse.com/cfb', 'CFB')
+]
+
 class StatMuseAPI:
     """Simple StatMuse API - same logic as working insights"""
     
@@ -30,176 +53,110 @@ class StatMuseAPI:
             'Accept-Language': 'en-US,en;q=0.5',
             'Connection': 'keep-alive',
         }
-        # Simple in-memory cache
-        self.cache = {}
-        self.cache_ttl = 3600  # 1 hour
+        # Memory LRU + shared on-disk tier with per-sport TTL policies
+        self.cache = TieredCache.from_env()
+        self.cache_ttl = DEFAULT_TTL_SECONDS  # fallback when no sport policy applies
+        # Pooled async client + concurrency limit + single-flight toward statmuse.com
+        self.fetcher = StatMuseFetcher(self.headers)
+        # One precompiled keyword matcher for sport routing when no sport is passed. Worker boot
+        # only compiles the keyword file; player names are paged in the background on first use
+        # (as with the context refresher) and swapped in when ready
+        self.sport_classifier = build_default_classifier(load_players=False)
+        self._classifier_load_started = False
+        self._classifier_lock = threading.Lock()
+        # Parsed /scrape-context snapshot, refreshed in the background on a schedule
+        self.context_refresh_interval = int(os.getenv('STATMUSE_CONTEXT_REFRESH_SECONDS', '900'))
+        self._context_snapshot = None
+        self._page_state = {}  # sport_key -> validators, parsed insights, fetch metadata (fetch loop only)
+        self._context_refresher_started = False
+        self._context_lock = threading.Lock()
+    
+    def _classifier(self):
+        with self._classifier_lock:
+            if not self._classifier_load_started:
+                self._classifier_load_started = True
+                load_classifier_in_background(self._set_classifier)
+        return self.sport_classifier
+    
+    def _set_classifier(self, classifier):
+        self.sport_classifier = classifier
     
     def clean_statmuse_text(self, text: str) -> str:
-        """Clean up StatMuse text to fix spacing and grammar issues"""
-        
-        # Fix missing spaces between words
-        # "TheNew York Yankees" -> "The New York Yankees"  
-        text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-        
-        # Fix team names followed by verbs (be more specific to avoid breaking "this")
-        # "Yankeeshave" -> "Yankees have", but not "this" -> "th is"
-        text = re.sub(r'([A-Za-z]{3,}s)(have|has|are|were)(?=\s|$)', r'\1 \2', text)
-        
-        # Fix names followed by verbs (be more specific)
-        # "Judgeis" -> "Judge is", but avoid breaking existing words
-        text = re.sub(r'([A-Z][a-z]{3,})(is|are|has|have|was|were)(?=\s|$)', r'\1 \2', text)
-        
-        # Fix specific common patterns
-        text = re.sub(r'([A-Z][a-z]+)([A-Z][a-z]+)', r'\1 \2', text)  # "RedSox" -> "Red Sox"
-        
-        # Fix common word breaks (repair what we might have broken)
-        text = re.sub(r'\bth is\b', 'this', text)
-        text = re.sub(r'\bthere cord\b', 'record', text)
-        text = re.sub(r'\bsea son\b', 'season', text)
-        
-        # Fix specific team name issues
-        text = re.sub(r'Red Sox(have|has|are)', r'Red Sox \1', text)
-        text = re.sub(r'Blue Jays(have|has|are)', r'Blue Jays \1', text)
-        text = re.sub(r'White Sox(have|has|are)', r'White Sox \1', text)
-        
-        # Clean up multiple spaces
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Trim whitespace
-        text = text.strip()
-        
-        return text
+        """Clean up StatMuse text to fix spacing and grammar issues (see statmuse_text)"""
+        return normalize_statmuse_text(text)
+    
+    def classify_sport(self, query: str) -> dict:
+        """Scored sport distribution for a query (single pass over the precompiled matcher)"""
+        return self._classifier().classify(query)
     
     def is_wnba_query(self, query: str) -> bool:
         """Check if query is likely about WNBA"""
-        wnba_keywords = [
-            "a'ja wilson", "aja wilson", "breanna stewart", "sabrina ionescu", 
-            "alyssa thomas", "kelsey plum", "jewell loyd", "candace parker",
-            "diana taurasi", "sue bird", "maya moore", "elena delle donne",
-            "wnba", "las vegas aces", "new york liberty", "seattle storm",
-            "phoenix mercury", "chicago sky", "connecticut sun", "minnesota lynx",
-            "atlanta dream", "dallas wings", "indiana fever", "washington mystics",
-            "kamilla cardoso", "paige bueckers", "caitlin clark", "angel reese"
-        ]
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in wnba_keywords)
+        return self._classifier().is_sport(query, 'WNBA')
     
     def is_nfl_query(self, query: str) -> bool:
         """Check if query is likely about NFL"""
-        nfl_keywords = [
-            # NFL players
-            "joe burrow", "josh allen", "patrick mahomes", "lamar jackson",
-            "aaron rodgers", "tom brady", "dak prescott", "russell wilson",
-            "justin herbert", "tua tagovailoa", "kyler murray", "jalen hurts",
-            "derrick henry", "jonathan taylor", "nick chubb", "dalvin cook",
-            "christian mccaffrey", "alvin kamara", "ezekiel elliott", "saquon barkley",
-            "davante adams", "tyreek hill", "stefon diggs", "deandre hopkins",
-            "calvin ridley", "mike evans", "chris godwin", "keenan allen",
-            "travis kelce", "george kittle", "mark andrews", "darren waller",
-            
-            # NFL league and season terms
-            "nfl", "national football league", "week 1", "week 2", "week 18",
-            "playoff", "super bowl", "rushing yards", "passing yards", "touchdowns",
-            "interceptions", "receptions", "receiving yards", "sacks", "fumbles",
-            
-            # NFL teams with full names to avoid conflicts
-            "arizona cardinals", "atlanta falcons", "baltimore ravens", "buffalo bills",
-            "carolina panthers", "chicago bears", "cincinnati bengals", "cleveland browns",
-            "dallas cowboys", "denver broncos", "detroit lions", "green bay packers",
-            "houston texans", "indianapolis colts", "jacksonville jaguars", "kansas city chiefs",
-            "las vegas raiders", "los angeles chargers", "los angeles rams", "miami dolphins",
-            "minnesota vikings", "new england patriots", "new orleans saints", "new york giants",
-            "new york jets", "philadelphia eagles", "pittsburgh steelers", "san francisco 49ers",
-            "seattle seahawks", "tampa bay buccaneers", "tennessee titans", "washington commanders",
-            
-            # Common NFL team nicknames that don't conflict with MLB
-            "steelers", "patriots", "cowboys", "packers", "49ers", "chiefs", "bills", 
-            "ravens", "bengals", "broncos", "colts", "titans", "texans", "jaguars", 
-            "chargers", "raiders", "dolphins", "jets", "browns", "eagles", "lions",
-            "vikings", "bears", "saints", "falcons", "panthers", "buccaneers", "seahawks"
-        ]
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in nfl_keywords)
+        return self._classifier().is_sport(query, 'NFL')
     
     def is_cfb_query(self, query: str) -> bool:
         """Check if query is likely about College Football (CFB)"""
-        cfb_keywords = [
-            # General identifiers
-            'cfb', 'college football', 'ncaaf', 'ncaa football',
-            # Common CFB stat terms
-            'passing yards', 'rushing yards', 'receiving yards', 'passing tds', 'rushing tds', 'receiving tds',
-            # Conferences
-            'sec', 'big 12', 'big ten', 'acc', 'pac-12', 'pac 12', 'mountain west', 'aac', 'sun belt', 'conference usa', 'cusa',
-            # Team identifiers (expanded)
-            'texas a&m', 'aggies', 'kansas state', 'wildcats', 'arizona wildcats', 'ucla bruins', 'usc trojans',
-            'georgia bulldogs', 'alabama crimson tide', 'ohio state buckeyes', 'michigan wolverines',
-            'florida state seminoles', 'notre dame fighting irish', 'lsu tigers', 'tennessee volunteers',
-            'clemson tigers', 'oklahoma sooners', 'oregon ducks', 'washington huskies', 'iowa hawkeyes',
-            'penn state nittany lions', 'miami hurricanes', 'louisville cardinals', 'north carolina tar heels',
-            'new mexico lobos', 'ucla', 'k-state', 'kansas st', 'houston cougars',
-            # New teams from logs
-            'kennesaw state owls', 'kennesaw state', 'louisiana tech bulldogs', 'louisiana tech',
-            'tulane green wave', 'tulane', 'east carolina pirates', 'east carolina', 'ecu',
-            # More common CFB teams
-            'boise state broncos', 'san diego state aztecs', 'fresno state bulldogs', 'memphis tigers',
-            'south florida bulls', 'usf', 'ucf knights', 'temple owls', 'smu mustangs',
-            'navy midshipmen', 'army black knights', 'air force falcons'
-        ]
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in cfb_keywords)
+        return self._classifier().is_sport(query, 'CFB')
     
     def is_nhl_query(self, query: str) -> bool:
         """Check if query is likely about NHL"""
-        nhl_keywords = [
-            # NHL league terms
-            'nhl', 'national hockey league', 'stanley cup', 'hockey',
-            # NHL stats terms
-            'goals', 'assists', 'points', 'plus minus', 'shots on goal', 'saves', 'save percentage',
-            'goals against average', 'gaa', 'shutout', 'hat trick', 'power play',
-            # NHL teams
-            'anaheim ducks', 'arizona coyotes', 'boston bruins', 'buffalo sabres', 'calgary flames',
-            'carolina hurricanes', 'chicago blackhawks', 'colorado avalanche', 'columbus blue jackets',
-            'dallas stars', 'detroit red wings', 'edmonton oilers', 'florida panthers',
-            'los angeles kings', 'minnesota wild', 'montreal canadiens', 'nashville predators',
-            'new jersey devils', 'new york islanders', 'new york rangers', 'ottawa senators',
-            'philadelphia flyers', 'pittsburgh penguins', 'san jose sharks', 'seattle kraken',
-            'st louis blues', 'tampa bay lightning', 'toronto maple leafs', 'vancouver canucks',
-            'vegas golden knights', 'washington capitals', 'winnipeg jets',
-            # Common NHL player names
-            'connor mcdavid', 'auston matthews', 'nathan mackinnon', 'leon draisaitl',
-            'david pastrnak', 'nikita kucherov', 'cale makar', 'roman josi',
-            'igor shesterkin', 'andrei vasilevskiy', 'sidney crosby', 'alex ovechkin'
-        ]
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in nhl_keywords)
+        return self._classifier().is_sport(query, 'NHL')
     
     def is_nba_query(self, query: str) -> bool:
         """Check if query is likely about NBA"""
-        nba_keywords = [
-            # NBA league terms
-            'nba', 'national basketball association', 'playoffs', 'finals',
-            # NBA stats terms
-            'points', 'rebounds', 'assists', 'blocks', 'steals', 'three pointers', 'threes',
-            'field goal percentage', 'free throw percentage', 'double double', 'triple double',
-            # NBA teams
-            'atlanta hawks', 'boston celtics', 'brooklyn nets', 'charlotte hornets', 'chicago bulls',
-            'cleveland cavaliers', 'dallas mavericks', 'denver nuggets', 'detroit pistons',
-            'golden state warriors', 'houston rockets', 'indiana pacers', 'la clippers',
-            'los angeles lakers', 'memphis grizzlies', 'miami heat', 'milwaukee bucks',
-            'minnesota timberwolves', 'new orleans pelicans', 'new york knicks', 'oklahoma city thunder',
-            'orlando magic', 'philadelphia 76ers', 'phoenix suns', 'portland trail blazers',
-            'sacramento kings', 'san antonio spurs', 'toronto raptors', 'utah jazz', 'washington wizards',
-            # Common NBA player names
-            'lebron james', 'stephen curry', 'kevin durant', 'giannis antetokounmpo',
-            'luka doncic', 'nikola jokic', 'joel embiid', 'jayson tatum', 'damian lillard',
-            'anthony davis', 'kawhi leonard', 'jimmy butler', 'devin booker', 'donovan mitchell'
-        ]
-        query_lower = query.lower()
-        return any(keyword in query_lower for keyword in nba_keywords)
+        return self._classifier().is_sport(query, 'NBA')
     
     def scrape_main_sports_pages(self) -> dict:
         """Scrape main StatMuse sports pages to gather current context and insights"""
+        self.fetcher.run(self.refresh_context_async())
+        return self._context_snapshot['context']
+    
+    def get_context_snapshot(self, force_refresh: bool = False) -> dict:
+        """Return the cached context snapshot, scraping synchronously only when none exists yet"""
+        if force_refresh or self._context_snapshot is None:
+            self.fetcher.run(self.refresh_context_async())
+        self._ensure_context_refresher()
+        
+        snapshot = self._context_snapshot
+        now = time.time()
+        return {
+            'context': snapshot['context'],
+            'refreshed_at': datetime.fromtimestamp(snapshot['refreshed_at']).isoformat(),
+            'snapshot_age_seconds': round(now - snapshot['refreshed_at'], 1),
+            'refresh_interval_seconds': self.context_refresh_interval,
+            'sources': {
+                sport_key: {
+                    **meta,
+                    'staleness_seconds': round(now - meta['content_fetched_at'], 1) if meta.get('content_fetched_at') else None
+                }
+                for sport_key, meta in snapshot['sources'].items()
+            }
+        }
+    
+    def _ensure_context_refresher(self):
+        with self._context_lock:
+            if self._context_refresher_started or self.context_refresh_interval <= 0:
+                return
+            self._context_refresher_started = True
+        asyncio.run_coroutine_threadsafe(self._context_refresh_loop(), self.fetcher.loop)
+        logger.info(f"🔄 Context snapshot refresher started (every {self.context_refresh_interval}s)")
+    
+    async def _context_refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.context_refresh_interval)
+            try:
+                await self.refresh_context_async()
+            except Exception as e:
+                logger.warning(f"⚠️ Background context refresh failed: {e}")
+    
+    async def refresh_context_async(self):
+        """Fetch all sport pages concurrently (conditional GETs) and rebuild the context snapshot"""
         logger.info("🔍 Scraping main StatMuse sports pages for current context...")
+        started = time.perf_counter()
+        await asyncio.gather(*(self._fetch_sport_page(*page) for page in SPORT_PAGES))
         
         context = {
             'mlb': {},
@@ -213,31 +170,57 @@ class StatMuseAPI:
             'league_leaders': {},
             'betting_trends': {}
         }
+        sources = {}
+        for sport_key, _, _ in SPORT_PAGES:
+            state = self._page_state.get(sport_key, {})
+            if 'insights' in state:
+                context[sport_key] = state['insights']
+            sources[sport_key] = {k: v for k, v in state.items() if k not in ('insights', 'etag', 'last_modified')}
+        
+        self._context_snapshot = {'context': context, 'sources': sources, 'refreshed_at': time.time()}
+        logger.info(f"✅ Context snapshot refreshed in {(time.perf_counter() - started) * 1000:.0f}ms")
+    
+    async def _fetch_sport_page(self, sport_key: str, sport_url: str, sport_name: str):
+        """Fetch one sport page, reusing the previous parse when the server answers 304"""
+        state = dict(self._page_state.get(sport_key, {}))
+        headers = {}
+        if 'insights' in state:
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('last_modified'):
+                headers['If-Modified-Since'] = state['last_modified']
+        
+        started = time.perf_counter()
+        try:
+            response = await self.fetcher.get(sport_url, headers=headers)
+            state['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            state['checked_at'] = time.time()
+            
+            if response.status_code == 304 and 'insights' in state:
+                state['status'] = 'not_modified'
+                logger.info(f"♻️ {sport_name} main page not modified")
+            elif response.status_code == 200:
+                state['insights'] = await asyncio.to_thread(self._parse_sports_page, response.content, sport_name)
+                state['etag'] = response.headers.get('ETag')
+                state['last_modified'] = response.headers.get('Last-Modified')
+                state['content_fetched_at'] = state['checked_at']
+                state['status'] = 'fetched'
+                logger.info(f"✅ {sport_name} main page scraped successfully")
+            else:
+                state['status'] = f'http_{response.status_code}'
+                logger.warning(f"⚠️ {sport_name} main page returned {response.status_code}")
+        except Exception as e:
+            state['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+            state['status'] = 'error'
+            state['error'] = str(e)
+            logger.warning(f"⚠️ {sport_name} main page scraping failed: {e}")
         
-        # Define sports to scrape
-        sports_to_scrape = [
-            ('mlb', 'https://www.statmuse.com/mlb', 'MLB'),
-            ('nhl', 'https://www.statmuse.com/nhl', 'NHL'),
-            ('nba', 'https://www.statmuse.com/nba', 'NBA'),
-            ('nfl', 'https://www.statmuse.com/nfl', 'NFL'),
-            ('wnba', 'https://www.statmuse.com/wnba', 'WNBA'),
-            ('cfb', 'https://www.statmuse.com/cfb', 'CFB')
-        ]
-        
-        # Scrape each sport
-        for sport_key, sport_url, sport_name in sports_to_scrape:
-            try:
-                response = requests.get(sport_url, headers=self.headers, timeout=15)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    context[sport_key] = self._extract_sports_page_insights(soup, sport_name)
-                    logger.info(f"✅ {sport_name} main page scraped successfully")
-            except Exception as e:
-                logger.warning(f"⚠️ {sport_name} main page scraping failed: {e}")
-        
-        return context
+        self._page_state[sport_key] = state
+    
+    def _parse_sports_page(self, content: bytes, sport: str) -> dict:
+        return self._extract_sports_page_insights(extract_page_lines(content), sport)
     
-    def _extract_sports_page_insights(self, soup: BeautifulSoup, sport: str) -> dict:
+    def _extract_sports_page_insights(self, lines: list, sport: str) -> dict:
         """Extract key insights from a StatMuse sports main page"""
         insights = {
             'trending_players': [],
@@ -250,10 +233,7 @@ class StatMuseAPI:
         }
         
         try:
-            # Get all text content and parse it intelligently
-            full_text = soup.get_text()
-            lines = [line.strip() for line in full_text.split('\n') if line.strip()]
-            
+            # Text lines of the page (see statmuse_extract.extract_page_lines), parsed intelligently
             # Clean up lines - remove extra whitespace and merge broken lines
             cleaned_lines = []
             i = 0
@@ -403,22 +383,59 @@ class StatMuseAPI:
     
     def query_statmuse(self, query: str, sport: str = None) -> dict:
         """Query StatMuse with explicit sport parameter (NO keyword detection)"""
+        return self.fetcher.run(self.query_statmuse_async(query, sport=sport))
+    
+    async def query_statmuse_async(self, query: str, sport: str = None) -> dict:
+        """Async query on the fetch loop; identical in-flight queries share one upstream fetch"""
         cache_key = f"{sport}:{query.lower()}" if sport else query.lower()
-        current_time = time.time()
         
-        # Check cache
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if current_time - timestamp < self.cache_ttl:
-                logger.info(f"💾 Cache hit for: {query} ({sport})")
-                cached_data['cached'] = True
-                return cached_data
+        # Check cache (memory first, then the shared disk tier)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            cached_data, tier = cached
+            logger.info(f"💾 Cache hit ({tier}) for: {query} ({sport})")
+            return {**cached_data, 'cached': True, 'cache_tier': tier}
         
         # Execute the query using standard approach with explicit sport
-        result = self._try_standard_query(query, current_time, cache_key, sport=sport)
+        result, shared = await self.fetcher.single_flight.do(
+            cache_key, lambda: self._try_standard_query(query, cache_key, sport=sport)
+        )
+        if shared:
+            logger.info(f"🔗 Coalesced with in-flight query: {query} ({sport})")
+            return {**result, 'coalesced': True}
         return result
     
-    def _try_standard_query(self, query: str, current_time: float, cache_key: str, sport: str = None) -> dict:
+    async def timed_query_async(self, index: int, query: str, sport: str) -> dict:
+        """Run one batch item and report its cache status and latency"""
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self.query_statmuse_async(query, sport=sport), BATCH_ITEM_TIMEOUT)
+        except asyncio.TimeoutError:
+            result = {'success': False, 'error': f'Timed out after {BATCH_ITEM_TIMEOUT}s', 'query': query}
+        except asyncio.CancelledError:
+            # One cancelled item must not take the rest of the batch stream with it
+            result = {'success': False, 'error': 'Query was cancelled', 'query': query}
+        except Exception as e:
+            result = {'success': False, 'error': str(e), 'query': query}
+        
+        if result.get('cached'):
+            cache_status = f"hit:{result.get('cache_tier', 'memory')}"
+        elif result.get('coalesced'):
+            cache_status = 'coalesced'
+        else:
+            cache_status = 'miss'
+        
+        return {
+            'type': 'result',
+            'index': index,
+            'query': query,
+            'sport': sport,
+            'cache_status': cache_status,
+            'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+            'result': result
+        }
+    
+    async def _try_standard_query(self, query: str, cache_key: str, sport: str = None) -> dict:
         """Try the standard StatMuse query approach with explicit sport (NO DETECTION)"""
         try:
             logger.info(f"🔍 StatMuse Query: {query} [Sport: {sport}]")
@@ -451,9 +468,13 @@ class StatMuseAPI:
                 base_url = sport_url_map[sport.upper()]
                 candidate_bases = [base_url]  # ONLY try the correct sport URL
             else:
-                # Fallback to all sports if no sport specified (backward compatibility)
-                logger.warning(f"⚠️ No sport specified, falling back to all URLs")
-                candidate_bases = list(sport_url_map.values())
+                # No sport specified: try the classifier's most likely sports first, then the rest
+                distribution = self.classify_sport(query)
+                logger.warning(f"⚠️ No sport specified, classified as {distribution or 'unknown'}")
+                candidate_bases = [sport_url_map[s] for s in distribution if s in sport_url_map]
+                for base in sport_url_map.values():
+                    if base not in candidate_bases:
+                        candidate_bases.append(base)
             
             # Try candidates in order until one returns 200
             response = None
@@ -462,7 +483,7 @@ class StatMuseAPI:
                 url = f"{base}/{formatted_query}"
                 logger.info(f"🎯 Trying endpoint: {url}")
                 try:
-                    resp = requests.get(url, headers=self.headers, timeout=15)
+                    resp = await self.fetcher.get(url)
                     if resp.status_code == 200:
                         response = resp
                         chosen_url = url
@@ -483,13 +504,9 @@ class StatMuseAPI:
                 }
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Look for main answer (same as working insights)
-                main_answer = soup.find('h1') or soup.find('h2')
-                if main_answer:
-                    answer_text = main_answer.get_text(strip=True)
-                    
+                # Look for main answer (first h1, else h2) with a stop-early streaming parse
+                answer_text = extract_answer(response.content)
+                if answer_text is not None:
                     # Fix common spacing issues from StatMuse HTML
                     answer_text = self.clean_statmuse_text(answer_text)
                     
@@ -504,8 +521,8 @@ class StatMuseAPI:
                         'timestamp': datetime.now().isoformat()
                     }
                     
-                    # Cache the result
-                    self.cache[cache_key] = (result.copy(), current_time)
+                    # Cache the result with a TTL based on sport and query type
+                    self.cache.set(cache_key, result.copy(), ttl_for(query, sport))
                     
                     return result
                 else:
@@ -565,11 +582,10 @@ def query_statmuse():
         sport = data['sport'].upper()
         
         # Validate sport
-        valid_sports = ['MLB', 'NHL', 'NBA', 'NFL', 'CFB', 'NCAAF', 'WNBA']
-        if sport not in valid_sports:
+        if sport not in VALID_SPORTS:
             return jsonify({
                 'success': False,
-                'error': f'Invalid sport: {sport}. Must be one of: {", ".join(valid_sports)}'
+                'error': f'Invalid sport: {sport}. Must be one of: {", ".join(VALID_SPORTS)}'
             }), 400
         
         result = statmuse_api.query_statmuse(query, sport=sport)
@@ -583,15 +599,129 @@ def query_statmuse():
             'error': str(e)
         }), 500
 
+@app.route('/query-batch', methods=['POST'])
+def query_statmuse_batch():
+    """Batch StatMuse queries - runs items concurrently and streams NDJSON as each completes
+    
+    Body: {"queries": [{"query": "...", "sport": "NFL"}, ...]}
+    Each line is a result object ({"type": "result", "index": ...}); the last line is
+    {"type": "summary", ...} with totals for the batch.
+    """
+    data = request.get_json(silent=True)
+    items = data.get('queries') if isinstance(data, dict) else None
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({
+            'success': False,
+            'error': 'Missing queries parameter. Expected a non-empty list of {query, sport} objects'
+        }), 400
+    
+    if len(items) > MAX_BATCH_SIZE:
+        return jsonify({
+            'success': False,
+            'error': f'Too many queries: {len(items)}. Maximum batch size is {MAX_BATCH_SIZE}'
+        }), 400
+    
+    # Validate everything up front so a bad item doesn't cut the stream short
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('query'):
+            errors.append(f'Item {index}: missing query')
+        elif not item.get('sport'):
+            errors.append(f'Item {index}: missing sport')
+        elif str(item['sport']).upper() not in VALID_SPORTS:
+            errors.append(f'Item {index}: invalid sport {item["sport"]}')
+    if errors:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid batch',
+            'details': errors
+        }), 400
+    
+    def generate():
+        started = time.perf_counter()
+        futures = {
+            asyncio.run_coroutine_threadsafe(
+                statmuse_api.timed_query_async(index, item['query'], item['sport'].upper()),
+                statmuse_api.fetcher.loop
+            ): index
+            for index, item in enumerate(items)
+        }
+        
+        succeeded = 0
+        cache_counts = {}
+        for future in as_completed(futures):
+            try:
+                line = future.result()
+            except (Exception, asyncio.CancelledError) as e:  # the stream must still end with a summary
+                index = futures[future]
+                item = items[index]
+                line = {
+                    'type': 'result',
+                    'index': index,
+                    'query': item['query'],
+                    'sport': item['sport'].upper(),
+                    'cache_status': 'error',
+                    'latency_ms': round((time.perf_counter() - started) * 1000, 1),
+                    'result': {'success': False, 'error': str(e) or type(e).__name__, 'query': item['query']}
+                }
+            if line['result'].get('success'):
+                succeeded += 1
+            cache_counts[line['cache_status']] = cache_counts.get(line['cache_status'], 0) + 1
+            yield json.dumps(line) + '\n'
+        
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        logger.info(f"📦 Batch of {len(items)} queries finished in {elapsed_ms}ms ({succeeded} succeeded)")
+        yield json.dumps({
+            'type': 'summary',
+            'total': len(items),
+            'succeeded': succeeded,
+            'failed': len(items) - succeeded,
+            'cache_status': cache_counts,
+            'elapsed_ms': elapsed_ms,
+            'timestamp': datetime.now().isoformat()
+        }) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/classify-sport', methods=['POST'])
+def classify_sport():
+    """Sport distribution for one query ({"query": ...}) or many ({"queries": [...]})"""
+    data = request.get_json(silent=True) or {}
+    
+    if isinstance(data.get('queries'), list):
+        return jsonify({
+            'success': True,
+            'results': [
+                {'query': q, 'distribution': statmuse_api.classify_sport(str(q))}
+                for q in data['queries']
+            ]
+        })
+    
+    if not data.get('query'):
+        return jsonify({
+            'success': False,
+            'error': 'Missing query or queries parameter'
+        }), 400
+    
+    distribution = statmuse_api.classify_sport(data['query'])
+    return jsonify({
+        'success': True,
+        'query': data['query'],
+        'sport': next(iter(distribution), None),
+        'distribution': distribution
+    })
+
 @app.route('/scrape-context', methods=['GET'])
 def scrape_sports_context():
-    """Scrape main StatMuse sports pages for current context and insights"""
+    """Current StatMuse sports context from the background-refreshed snapshot (?refresh=true forces a scrape)"""
     try:
-        context = statmuse_api.scrape_main_sports_pages()
+        force_refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        snapshot = statmuse_api.get_context_snapshot(force_refresh=force_refresh)
         
         return jsonify({
             'success': True,
-            'context': context,
+            **snapshot,
             'timestamp': datetime.now().isoformat()
         })
         
@@ -694,10 +824,12 @@ def player_stats():
 
 @app.route('/cache-stats', methods=['GET'])
 def cache_stats():
-    """Get cache statistics"""
+    """Get cache and upstream dedup statistics (counters are per worker process)"""
     return jsonify({
         'cached_queries': len(statmuse_api.cache),
         'cache_ttl_hours': statmuse_api.cache_ttl / 3600,
+        'cache': statmuse_api.cache.get_stats(),
+        'upstream': statmuse_api.fetcher.get_stats(),
         'timestamp': datetime.now().isoformat()
     })
 
@@ -706,6 +838,8 @@ if __name__ == '__main__':
     logger.info("📊 Centralized StatMuse service for all AI systems")
     logger.info("🌐 Available endpoints:")
     logger.info("  POST /query - General StatMuse queries")
+    logger.info("  POST /query-batch - Concurrent batch queries (NDJSON stream)")
+    logger.info("  POST /classify-sport - Sport distribution for queries")
     logger.info("  POST /head-to-head - Team matchup data")
     logger.info("  POST /team-record - Team record queries")
     logger.info("  POST /player-stats - Player statistics")
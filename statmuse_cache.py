@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+StatMuse Cache
+Pluggable, size-bounded cache tiers for the StatMuse API server.
+
+- LRUCacheBackend: in-process LRU bounded by entry count and approximate bytes
+- SQLiteCacheBackend: on-disk tier that survives restarts and is shared by all gunicorn workers
+- TieredCache: L1 (memory) in front of L2 (disk) with hit/miss/eviction counters
+- TTL policies per sport ("this season" answers live for hours, "last game" answers
+  expire at the next slate start for that sport)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+EASTERN = ZoneInfo("America/New_York")
+
+DEFAULT_TTL_SECONDS = 3600  # 1 hour (previous fixed TTL)
+MIN_TTL_SECONDS = 300
+
+# Per-sport TTLs by answer type (seconds). "recent" answers are additionally
+# capped so they expire at the next slate start (see SPORT_SLATE_STARTS).
+SPORT_TTL_POLICIES = {
+    'MLB': {'season': 6 * 3600, 'recent': 6 * 3600, 'default': 2 * 3600},
+    'NBA': {'season': 8 * 3600, 'recent': 12 * 3600, 'default': 3 * 3600},
+    'WNBA': {'season': 8 * 3600, 'recent': 12 * 3600, 'default': 3 * 3600},
+    'NHL': {'season': 8 * 3600, 'recent': 12 * 3600, 'default': 3 * 3600},
+    'NFL': {'season': 12 * 3600, 'recent': 24 * 3600, 'default': 6 * 3600},
+    'CFB': {'season': 12 * 3600, 'recent': 24 * 3600, 'default': 6 * 3600},
+}
+SPORT_TTL_POLICIES['NCAAF'] = SPORT_TTL_POLICIES['CFB']
+
+# Typical first-pitch / puck-drop / kickoff times (weekday, hour, minute) in ET.
+# Monday == 0. Used to expire "last game" answers once new games begin.
+_EVERY_DAY = range(7)
+SPORT_SLATE_STARTS = {
+    'MLB': [(d, 13, 0) for d in _EVERY_DAY],
+    'NBA': [(d, 19, 0) for d in _EVERY_DAY],
+    'WNBA': [(d, 19, 0) for d in _EVERY_DAY],
+    'NHL': [(d, 19, 0) for d in _EVERY_DAY],
+    'NFL': [(3, 20, 15), (6, 13, 0), (0, 20, 15)],
+    'CFB': [(3, 19, 30), (4, 19, 0), (5, 12, 0)],
+}
+SPORT_SLATE_STARTS['NCAAF'] = SPORT_SLATE_STARTS['CFB']
+
+RECENT_MARKERS = (
+    'last game', 'last night', 'yesterday', 'today', 'tonight', 'last week',
+    'last 3', 'last 5', 'last 10', 'last 15', 'last 20', 'most recent', 'this week',
+)
+SEASON_MARKERS = (
+    'this season', 'season', 'career', 'all time', 'all-time', 'record', 'since 20',
+    '2023', '2024', '2025',
+)
+
+
+def classify_query(query: str) -> str:
+    """Classify a query as 'recent', 'season' or 'default' for TTL purposes"""
+    query_lower = query.lower()
+    if any(marker in query_lower for marker in RECENT_MARKERS):
+        return 'recent'
+    if any(marker in query_lower for marker in SEASON_MARKERS):
+        return 'season'
+    return 'default'
+
+
+def seconds_until_next_slate(sport: str, now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds until the next scheduled slate start for a sport, or None if unknown"""
+    starts = SPORT_SLATE_STARTS.get((sport or '').upper())
+    if not starts:
+        return None
+
+    now = now or datetime.now(EASTERN)
+    best = None
+    for weekday, hour, minute in starts:
+        days_ahead = (weekday - now.weekday()) % 7
+        candidate = (now + timedelta(days=days_ahead)).replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if candidate <= now:
+            candidate += timedelta(days=7)
+        if best is None or candidate < best:
+            best = candidate
+    return (best - now).total_seconds()
+
+
+def ttl_for(query: str, sport: Optional[str], now: Optional[datetime] = None) -> float:
+    """Resolve the TTL (seconds) for a query using the per-sport policy"""
+    sport_key = (sport or '').upper()
+    policy = SPORT_TTL_POLICIES.get(sport_key)
+    if not policy:
+        return DEFAULT_TTL_SECONDS
+
+    kind = classify_query(query)
+    ttl = policy[kind]
+    if kind == 'recent':
+        until_slate = seconds_until_next_slate(sport_key, now)
+        if until_slate is not None:
+            ttl = min(ttl, until_slate)
+    return max(ttl, MIN_TTL_SECONDS)
+
+
+def _encode(value: Dict[str, Any]) -> str:
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+class CacheStats:
+    """Thread-safe hit/miss/eviction counters"""
+
+    FIELDS = ('hits', 'misses', 'sets', 'evictions', 'expirations', 'errors')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {field: 0 for field in self.FIELDS}
+
+    def incr(self, field: str, amount: int = 1):
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_rate'] = round(counts['hits'] / lookups, 4) if lookups else 0.0
+        return counts
+
+
+class LRUCacheBackend:
+    """In-process LRU bounded by max entries and approximate max bytes"""
+
+    name = 'memory'
+
+    def __init__(self, max_entries: int = 5000, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        # key -> (value, expires_at, size)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float, int]]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.incr('misses')
+                return None
+            value, expires_at, size = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self._bytes -= size
+                self.stats.incr('expirations')
+                self.stats.incr('misses')
+                return None
+            self._entries.move_to_end(key)
+        self.stats.incr('hits')
+        return value, expires_at
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float, size: Optional[int] = None):
+        size = size if size is not None else len(_encode(value))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            evicted = 0
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                evicted += 1
+        self.stats.incr('sets')
+        if evicted:
+            self.stats.incr('evictions', evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class SQLiteCacheBackend:
+    """On-disk cache tier shared between processes (WAL mode, one connection per thread)"""
+
+    name = 'disk'
+
+    PRUNE_EVERY_SETS = 200
+
+    def __init__(self, path: str, max_entries: int = 50000):
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._local = threading.local()
+        self._sets_since_prune = 0
+        self._prune_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS statmuse_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_statmuse_cache_created ON statmuse_cache(created_at)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self) -> int:
+        try:
+            return self._conn().execute("SELECT COUNT(*) FROM statmuse_cache").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        try:
+            row = self._conn().execute(
+                "SELECT value, expires_at FROM statmuse_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Disk cache read failed: {e}")
+            self.stats.incr('errors')
+            self.stats.incr('misses')
+            return None
+
+        if row is None:
+            self.stats.incr('misses')
+            return None
+        value, expires_at = row
+        if expires_at <= time.time():
+            self.stats.incr('expirations')
+            self.stats.incr('misses')
+            return None
+        self.stats.incr('hits')
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Dict[str, Any], expires_at: float, size: Optional[int] = None):
+        encoded = _encode(value)
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO statmuse_cache (key, value, expires_at, created_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, expires_at, time.time(), len(encoded))
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Disk cache write failed: {e}")
+            self.stats.incr('errors')
+            return
+        self.stats.incr('sets')
+
+        with self._prune_lock:
+            self._sets_since_prune += 1
+            should_prune = self._sets_since_prune >= self.PRUNE_EVERY_SETS
+            if should_prune:
+                self._sets_since_prune = 0
+        if should_prune:
+            self.prune()
+
+    def prune(self):
+        """Drop expired rows, then the oldest rows beyond max_entries"""
+        try:
+            conn = self._conn()
+            expired = conn.execute("DELETE FROM statmuse_cache WHERE expires_at <= ?", (time.time(),)).rowcount
+            overflow = conn.execute(
+                """
+                DELETE FROM statmuse_cache WHERE key IN (
+                    SELECT key FROM statmuse_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,)
+            ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Disk cache prune failed: {e}")
+            self.stats.incr('errors')
+            return
+        if expired:
+            self.stats.incr('expirations', expired)
+        if overflow:
+            self.stats.incr('evictions', overflow)
+
+    def clear(self):
+        self._conn().execute("DELETE FROM statmuse_cache")
+
+
+class TieredCache:
+    """Memory LRU in front of an optional shared disk tier"""
+
+    def __init__(self, memory: LRUCacheBackend, disk: Optional[SQLiteCacheBackend] = None):
+        self.memory = memory
+        self.disk = disk
+        self.stats = CacheStats()
+
+    @classmethod
+    def from_env(cls) -> "TieredCache":
+        """Build the cache from STATMUSE_CACHE_* environment variables"""
+        memory = LRUCacheBackend(
+            max_entries=int(os.getenv('STATMUSE_CACHE_MAX_ENTRIES', '5000')),
+            max_bytes=int(os.getenv('STATMUSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+        )
+
+        disk = None
+        disk_path = os.getenv('STATMUSE_CACHE_DB', os.path.join(tempfile.gettempdir(), 'statmuse_cache.sqlite3'))
+        if disk_path:
+            try:
+                disk = SQLiteCacheBackend(
+                    disk_path,
+                    max_entries=int(os.getenv('STATMUSE_CACHE_DISK_MAX_ENTRIES', '50000')),
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"⚠️ Disk cache unavailable ({disk_path}): {e} - using memory only")
+        return cls(memory, disk)
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Return (value, tier) or None"""
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.stats.incr('hits')
+            return entry[0], self.memory.name
+
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                self.memory.set(key, value, expires_at)
+                self.stats.incr('hits')
+                return value, self.disk.name
+
+        self.stats.incr('misses')
+        return None
+
+    def set(self, key: str, value: Dict[str, Any], ttl: float):
+        expires_at = time.time() + ttl
+        size = len(_encode(value))
+        self.memory.set(key, value, expires_at, size)
+        if self.disk is not None:
+            self.disk.set(key, value, expires_at, size)
+        self.stats.incr('sets')
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            'pid': os.getpid(),
+            'overall': self.stats.snapshot(),
+            'memory': {
+                **self.memory.stats.snapshot(),
+                'entries': len(self.memory),
+                'bytes': self.memory.size_bytes,
+                'max_entries': self.memory.max_entries,
+                'max_bytes': self.memory.max_bytes,
+            },
+            'disk': None,
+        }
+        if self.disk is not None:
+            stats['disk'] = {
+                **self.disk.stats.snapshot(),
+                'entries': len(self.disk),
+                'max_entries': self.disk.max_entries,
+                'path': self.disk.path,
+            }
+        return stats
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+StatMuse Extract
+HTML extraction for StatMuse answer and sport landing pages.
+
+- extract_answer: stop-early streaming parse (lxml HTMLPullParser) that returns the
+  answer headline as soon as the first <h1> closes, without building the rest of the tree
+- extract_page_lines: visible text lines of a landing page via lxml (C parser)
+
+Both produce the same text as the previous BeautifulSoup code
+(`(soup.find('h1') or soup.find('h2')).get_text(strip=True)` and
+`soup.get_text()` split into stripped lines) and fall back to BeautifulSoup when
+lxml is unavailable or fails on a document.
+"""
+
+import logging
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+try:
+    from lxml import etree, html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+    logger.warning("lxml not available - StatMuse extraction will use BeautifulSoup")
+
+STREAM_CHUNK_SIZE = 16 * 1024
+NON_VISIBLE_TAGS = ('script', 'style', 'template', 'noscript')
+
+
+def _strip_join(texts) -> str:
+    """Match BeautifulSoup get_text(strip=True): strip every text node, drop empties, join with ''"""
+    return ''.join(text.strip() for text in texts if text and text.strip())
+
+
+def _extract_answer_lxml(content: bytes) -> Optional[str]:
+    parser = etree.HTMLPullParser(events=('end',), tag=('h1', 'h2'))
+    first_h2 = None
+    try:
+        for offset in range(0, len(content), STREAM_CHUNK_SIZE):
+            parser.feed(content[offset:offset + STREAM_CHUNK_SIZE])
+            for _, element in parser.read_events():
+                if element.tag == 'h1':
+                    # Stop early: nothing after the first h1 can change the answer
+                    return _strip_join(element.itertext())
+                if first_h2 is None:
+                    first_h2 = _strip_join(element.itertext())
+        parser.close()
+        for _, element in parser.read_events():
+            if element.tag == 'h1':
+                return _strip_join(element.itertext())
+            if first_h2 is None:
+                first_h2 = _strip_join(element.itertext())
+    except etree.LxmlError:
+        if first_h2 is None:
+            raise
+    return first_h2
+
+
+def _extract_answer_bs4(content: bytes) -> Optional[str]:
+    soup = BeautifulSoup(content, 'html.parser')
+    main_answer = soup.find('h1') or soup.find('h2')
+    return main_answer.get_text(strip=True) if main_answer else None
+
+
+def extract_answer(content: bytes) -> Optional[str]:
+    """Raw answer headline text (first h1, else first h2), or None if the page has neither"""
+    if LXML_AVAILABLE and content:
+        try:
+            return _extract_answer_lxml(content)
+        except Exception as e:
+            logger.warning(f"⚠️ lxml answer extraction failed, falling back to BeautifulSoup: {e}")
+    return _extract_answer_bs4(content)
+
+
+def _page_lines_lxml(content: bytes) -> List[str]:
+    tree = lxml_html.fromstring(content)
+    etree.strip_elements(tree, *NON_VISIBLE_TAGS, with_tail=False)
+    etree.strip_elements(tree, etree.Comment, with_tail=False)
+    return [line.strip() for line in tree.text_content().split('\n') if line.strip()]
+
+
+def _page_lines_bs4(content: bytes) -> List[str]:
+    soup = BeautifulSoup(content, 'html.parser')
+    return [line.strip() for line in soup.get_text().split('\n') if line.strip()]
+
+
+def extract_page_lines(content: bytes) -> List[str]:
+    """Non-empty, stripped visible text lines of a page"""
+    if LXML_AVAILABLE and content:
+        try:
+            return _page_lines_lxml(content)
+        except Exception as e:
+            logger.warning(f"⚠️ lxml page parse failed, falling back to BeautifulSoup: {e}")
+    return _page_lines_bs4(content)
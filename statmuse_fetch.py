@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+StatMuse Fetch
+Async upstream fetch layer for the StatMuse API server.
+
+Flask request threads hand work to a single background asyncio loop per worker
+process, which owns a pooled keep-alive httpx client, a global concurrency
+limiter toward statmuse.com and single-flight coalescing so identical in-flight
+queries share one upstream fetch.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class FetchStats:
+    """Thread-safe counters for upstream requests and coalescing"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.waiting = 0
+        self.flights = 0
+        self.coalesced = 0
+
+    def request_started(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def request_finished(self, failed: bool = False):
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.errors += 1
+
+    def adjust_waiting(self, delta: int):
+        with self._lock:
+            self.waiting += delta
+
+    def flight_started(self):
+        with self._lock:
+            self.flights += 1
+
+    def flight_joined(self):
+        with self._lock:
+            self.coalesced += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'upstream_requests': self.requests,
+                'upstream_errors': self.errors,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'waiting_for_slot': self.waiting,
+                'flights': self.flights,
+                'coalesced': self.coalesced,
+            }
+
+
+class _FlightAbandoned(Exception):
+    """The flight's owner was cancelled; a joiner runs the call itself"""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution (loop-local)"""
+
+    def __init__(self, stats: FetchStats):
+        self.stats = stats
+        self._flights: Dict[str, asyncio.Future] = {}
+
+    @property
+    def active(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run fn() once per key at a time; returns (result, shared)"""
+        existing = self._flights.get(key)
+        if existing is not None:
+            self.stats.flight_joined()
+            try:
+                return await asyncio.shield(existing), True
+            except _FlightAbandoned:
+                # The owner's caller went away, not ours: the first joiner back takes over
+                return await self.do(key, fn)
+
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        self.stats.flight_started()
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result, False
+        except asyncio.CancelledError:
+            # Joiners did not cancel this fetch, so they must not see CancelledError
+            future.set_exception(_FlightAbandoned(key))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so unjoined failures don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            self._flights.pop(key, None)
+
+
+class StatMuseFetcher:
+    """Background event loop + pooled async HTTP client shared by all request threads"""
+
+    def __init__(self, headers: Dict[str, str], max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None, max_connections: Optional[int] = None):
+        self.headers = headers
+        self.max_concurrency = max_concurrency or int(os.getenv('STATMUSE_MAX_CONCURRENCY', '6'))
+        self.timeout = timeout or float(os.getenv('STATMUSE_HTTP_TIMEOUT', '15'))
+        self.max_connections = max_connections or max(self.max_concurrency * 2, 10)
+        self.stats = FetchStats()
+        self.single_flight = SingleFlight(self.stats)
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name='statmuse-fetch-loop', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_concurrency,
+                keepalive_expiry=60,
+            ),
+        )
+        self._ready.set()
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the fetch loop from a synchronous (Flask) thread"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result(timeout)
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """GET through the pooled client under the global concurrency limit"""
+        self.stats.adjust_waiting(1)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.stats.adjust_waiting(-1)
+
+        self.stats.request_started()
+        failed = True
+        try:
+            response = await self._client.get(url, headers=headers)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self.stats.request_finished(failed=failed)
+            self._semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats.snapshot(),
+            'active_flights': self.single_flight.active,
+            'max_concurrency': self.max_concurrency,
+            'max_connections': self.max_connections,
+        }
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+StatMuse Text
+Deterministic single-pass normalizer for StatMuse answer text.
+
+StatMuse headlines lose spaces when their HTML is flattened ("TheNew York Yankeeshave",
+"Judgeis"). normalize_statmuse_text splits each whitespace token once:
+
+1. camel-cased runs are split at lower->Upper boundaries, except known camel-cased
+   names (LeBron, McDavid, DeAndre ...) which are kept whole
+2. a verb glued to the end of a word ("Yankeeshave", "Soxhave", "Judgeis") is split
+   off, unless the whole token is a known word/name ("Travis", "Memphis", "this")
+
+Every pattern is compiled once, nothing is undone by a later pass, and the output
+depends only on the input string, so results are memoized.
+"""
+
+import os
+import re
+import json
+from functools import lru_cache
+from typing import List, Set
+
+_KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'sport_keywords.json')
+
+# Mixed-case names that must not be split at their internal capital
+CAMEL_CASE_NAMES = [
+    'LeBron', 'LaMelo', 'LiAngelo', 'DeMar', 'DeRozan', 'DeAndre', 'DeAaron', 'DeVonta', 'DeVante',
+    'DeJean', 'DeJon', 'DeForest', 'DaRon', 'JaMarr', 'JaVale', 'JaMychal', 'JuJu', 'CeeDee',
+    'KaVontae', 'TreVeyon', 'LaPorta', 'DiVincenzo', 'VanVleet', 'LeMahieu', 'DeJong', 'MacKinnon',
+    'DeSean', 'DeShon', 'DeWanna', 'NaLyssa', 'TyShawn', 'KeShawn', 'LaDainian', 'RaShawn',
+]
+
+VERB_SUFFIXES = ('have', 'were', 'has', 'had', 'are', 'was', 'is')
+
+# Real words/names that end in a verb suffix and must never be split
+PROTECTED_WORDS = {
+    'this', 'his', 'has', 'is', 'was', 'are', 'were', 'have', 'analysis', 'crisis', 'tennis', 'genesis',
+    'thesis', 'emphasis', 'travis', 'memphis', 'dennis', 'francis', 'curtis', 'harris', 'willis',
+    'morris', 'jarvis', 'mathis', 'alexis', 'hollis', 'compare', 'prepare', 'declare', 'software',
+    'welfare', 'nightmare', 'aftershave',
+}
+
+_CAMEL_BOUNDARY = re.compile(r'(?<=[a-z])(?=[A-Z])')
+_CAMEL_NAME = re.compile('|'.join(sorted(CAMEL_CASE_NAMES, key=len, reverse=True)) + r'|Mc[A-Z][a-z]+')
+# "Yankeeshave" -> "Yankees have"
+_PLURAL_VERB = re.compile(r'^([A-Za-z]{3,}s)(have|has|are|were)$')
+# "Judgeis" -> "Judge is"
+_NAME_VERB = re.compile(r'^([A-Z][a-z]{3,})(is|are|has|have|was|were)$')
+# "Soxhave" -> "Sox have" (stem must be a known team/player word)
+_ANY_VERB = re.compile(r'^([A-Za-z]{3,}?)(' + '|'.join(VERB_SUFFIXES) + r')$')
+
+
+def _load_name_words() -> Set[str]:
+    """Individual words of every team/player name in config/sport_keywords.json"""
+    try:
+        with open(_KEYWORDS_PATH) as f:
+            sports = json.load(f)['sports']
+    except (OSError, ValueError, KeyError):
+        return set()
+    words = set()
+    for categories in sports.values():
+        for category in ('teams', 'players'):
+            for name in categories.get(category, []):
+                words.update(word for word in name.lower().split() if len(word) >= 3)
+    return words
+
+
+NAME_WORDS = _load_name_words()
+
+
+def _split_camel(token: str) -> List[str]:
+    if not _CAMEL_BOUNDARY.search(token):
+        return [token]
+
+    parts = []
+    i = 0
+    while i < len(token):
+        protected = _CAMEL_NAME.match(token, i)
+        if protected:
+            parts.append(protected.group())
+            i = protected.end()
+            continue
+        boundary = _CAMEL_BOUNDARY.search(token, i + 1)
+        end = boundary.start() if boundary else len(token)
+        parts.append(token[i:end])
+        i = end
+    return parts
+
+
+def _split_verb(part: str) -> List[str]:
+    lower = part.lower()
+    if lower in PROTECTED_WORDS or lower in NAME_WORDS:
+        return [part]
+
+    match = _PLURAL_VERB.match(part) or _NAME_VERB.match(part)
+    if match is None:
+        match = _ANY_VERB.match(part)
+        if match is None or match.group(1).lower() not in NAME_WORDS:
+            return [part]
+    return [match.group(1), match.group(2)]
+
+
+@lru_cache(maxsize=8192)
+def normalize_statmuse_text(text: str) -> str:
+    """Fix glued words and whitespace in StatMuse answer text (pure, memoized)"""
+    words = []
+    for token in text.split():
+        for part in _split_camel(token):
+            words.extend(_split_verb(part))
+    return ' '.join(words)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Team Pricing
+Cross-book best line, no-vig consensus, hold and edge for moneylines, spreads and totals.
+
+Built once per slate from an OddsSnapshot. Each market becomes NumPy arrays over
+events x books x sides (american price and point, NaN where a book has no quote),
+and every figure is computed for the whole slate in one vectorized pass:
+
+- hold per book: 1 - 1 / (sum of implied probabilities), for books quoting every side
+- no-vig probabilities per book: implied / sum of implied
+- consensus probability per side: mean of the books' no-vig probabilities
+- best price per side: highest decimal price across books
+- edge: consensus probability x best decimal price - 1 (expected return per unit)
+
+Spreads and totals are compared at the reference book's line only (the book a TeamBet
+is priced at), so a -3.5 price is never averaged with a -2.5 one.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from odds_snapshot import OddsSnapshot
+
+MARKET_SIDES = {
+    "h2h": ("home", "away"),
+    "spreads": ("home", "away"),
+    "totals": ("over", "under"),
+}
+
+
+def american_to_decimal(odds: np.ndarray) -> np.ndarray:
+    """Decimal prices of american odds (NaN stays NaN)"""
+    odds = np.asarray(odds, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odds > 0, 1 + odds / 100, 1 + 100 / np.abs(odds))
+
+
+def probability_to_american(probability: float) -> Optional[int]:
+    """Fair american odds of a win probability"""
+    if not 0 < probability < 1:
+        return None
+    if probability >= 0.5:
+        return int(round(-100 * probability / (1 - probability)))
+    return int(round(100 * (1 - probability) / probability))
+
+
+@dataclass
+class SideQuote:
+    best_odds: Optional[int]
+    best_bookmaker: Optional[str]
+    consensus_probability: Optional[float]
+    fair_odds: Optional[int]
+    hold: Optional[float]  # of the reference book
+    edge: Optional[float]
+    book_count: int  # books in the consensus
+
+
+class MarketPricing:
+    """One market's arrays over events x books x sides and the figures derived from them"""
+
+    def __init__(self, market: str, price: np.ndarray, point: np.ndarray, reference: np.ndarray):
+        self.market = market
+        self.price = price
+        self.point = point
+
+        decimal = american_to_decimal(price)
+        implied = 1 / decimal
+        complete = ~np.isnan(price).any(axis=2)
+        overround = np.where(complete, np.nansum(implied, axis=2), np.nan)
+        self.hold = 1 - 1 / overround  # events x books
+        novig = implied / overround[:, :, None]
+
+        # Books quoting the reference book's line (moneylines have no line)
+        events = np.arange(price.shape[0])
+        has_reference = reference >= 0
+        if market == "h2h":
+            same_line = np.ones(price.shape[:2], dtype=bool)
+        else:
+            reference_line = np.where(has_reference, point[events, np.maximum(reference, 0), 0], np.nan)
+            same_line = np.isclose(point[:, :, 0], reference_line[:, None])
+        same_line &= has_reference[:, None]
+
+        consensus_books = complete & same_line
+        self.book_count = consensus_books.sum(axis=1)
+        quoted = np.where(same_line[:, :, None] & ~np.isnan(decimal), decimal, -np.inf)
+        self.best_book = quoted.argmax(axis=1)  # events x sides
+        self.best_decimal = quoted.max(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.consensus = (np.where(consensus_books[:, :, None], novig, 0).sum(axis=1)
+                              / self.book_count[:, None])
+            self.edge = self.consensus * self.best_decimal - 1
+        self.reference_hold = np.where(has_reference, self.hold[events, np.maximum(reference, 0)], np.nan)
+
+
+class TeamPricing:
+    """Best line / consensus / hold / edge of every team market of a slate"""
+
+    def __init__(self, snapshot: OddsSnapshot, event_ids: Sequence[str], reference_books: Dict[str, str]):
+        self.event_ids = list(dict.fromkeys(str(event_id) for event_id in event_ids))
+        self._event_row = {event_id: row for row, event_id in enumerate(self.event_ids)}
+
+        size = snapshot.pool_size()
+        event_col = np.asarray(snapshot.event, dtype=np.int64)
+        book_col = np.asarray(snapshot.bookmaker, dtype=np.int64)
+        market_col = np.asarray(snapshot.market, dtype=np.int64)
+        side_col = np.asarray(snapshot.side, dtype=np.int64)
+        price_col = np.asarray(snapshot.price, dtype=float)
+        point_col = np.asarray(snapshot.point, dtype=float)
+
+        # Pool index -> dense event / book position
+        event_of = np.full(size, -1, dtype=np.int64)
+        for row, event_id in enumerate(self.event_ids):
+            string_id = snapshot.string_id(event_id)
+            if string_id is not None:
+                event_of[string_id] = row
+        book_ids = np.unique(book_col)
+        self.books: List[str] = [snapshot.string(int(book)) for book in book_ids]
+        book_of = np.full(size, -1, dtype=np.int64)
+        book_of[book_ids] = np.arange(len(book_ids))
+
+        reference = np.full(len(self.event_ids), -1, dtype=np.int64)
+        for row, event_id in enumerate(self.event_ids):
+            string_id = snapshot.string_id(reference_books.get(event_id))
+            if string_id is not None:
+                reference[row] = book_of[string_id]
+
+        self.markets: Dict[str, MarketPricing] = {}
+        for market, sides in MARKET_SIDES.items():
+            side_of = np.full(size, -1, dtype=np.int64)
+            for slot, side in enumerate(sides):
+                string_id = snapshot.string_id(side)
+                if string_id is not None:
+                    side_of[string_id] = slot
+            market_id = snapshot.string_id(market)
+            market_id = -1 if market_id is None else market_id
+            rows = (market_col == market_id) & (event_of[event_col] >= 0) & (side_of[side_col] >= 0)
+            # At least one (empty) book column so an odds-less slate still has valid arrays
+            shape = (len(self.event_ids), max(len(self.books), 1), len(sides))
+            price, point = np.full(shape, np.nan), np.full(shape, np.nan)
+            index = (event_of[event_col[rows]], book_of[book_col[rows]], side_of[side_col[rows]])
+            price[index] = price_col[rows]
+            point[index] = point_col[rows]
+            self.markets[market] = MarketPricing(market, price, point, reference)
+
+    def quote(self, event_id: str, market: str, side: str) -> Optional[SideQuote]:
+        """Pricing of one side of a game's market, or None if no book quotes it"""
+        pricing = self.markets.get(market)
+        row = self._event_row.get(str(event_id))
+        if pricing is None or row is None or side not in MARKET_SIDES[market]:
+            return None
+        slot = MARKET_SIDES[market].index(side)
+        best_decimal = pricing.best_decimal[row, slot]
+        if not np.isfinite(best_decimal):
+            return None
+        best_book = pricing.best_book[row, slot]
+        consensus = pricing.consensus[row, slot]
+        hold = pricing.reference_hold[row]
+        edge = pricing.edge[row, slot]
+        has_consensus = not np.isnan(consensus)
+        return SideQuote(
+            best_odds=int(pricing.price[row, best_book, slot]),
+            best_bookmaker=self.books[best_book],
+            consensus_probability=float(consensus) if has_consensus else None,
+            fair_odds=probability_to_american(float(consensus)) if has_consensus else None,
+            hold=None if np.isnan(hold) else float(hold),
+            edge=float(edge) if has_consensus else None,
+            book_count=int(pricing.book_count[row]),
+        )
+
+    def book_holds(self, market: str) -> Dict[str, float]:
+        """Mean hold per book over the games it quotes in full"""
+        hold = self.markets[market].hold
+        quoted = ~np.isnan(hold)
+        counts = quoted.sum(axis=0)
+        totals = np.where(quoted, hold, 0).sum(axis=0)
+        return {book: float(totals[i] / counts[i]) for i, book in enumerate(self.books) if counts[i]}
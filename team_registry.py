@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Team Registry
+One alias table for turning any team name, nickname or abbreviation into a team id.
+
+Built from the `teams` table plus config/team_aliases.json and compiled into a hash map
+of (sport, normalized alias) -> team id. Every team is reachable by its full name,
+abbreviation, team_key and curated aliases (rank 0), its nickname (name minus city,
+rank 1) and its city or school prefix (rank 2+). When two teams of one sport share an
+alias, the lower rank keeps it ("texas" -> Longhorns, not Texas A&M), and a tie makes
+it ambiguous, so it resolves to nothing rather than to whichever team happened to
+come first ("new york" in MLB).
+
+Names missing from the map go through a small fuzzy index: shared words weighted by
+rarity, then a close-spelling match, accepted only when one team is clearly best. A
+word match needs two shared words, or the team's nickname with no other word of the
+name pointing at another team ("Texas State Bobcats" is not Ohio). Callers that write
+(ingestion, settlement) pass exact=True to skip the fuzzy tiers. Results are memoized
+per (sport, name, exact).
+
+The compiled registry is cached as JSON on disk (TEAM_REGISTRY_CACHE, refreshed after
+TEAM_REGISTRY_TTL_SECONDS or when the alias file changes), so processes after the
+first skip the teams query. get_team_registry() returns the process-wide instance.
+"""
+
+import os
+import re
+import json
+import time
+import difflib
+import logging
+import tempfile
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'team_aliases.json')
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'team_registry.json')
+REGISTRY_TTL = float(os.getenv("TEAM_REGISTRY_TTL_SECONDS", "86400"))
+CACHE_VERSION = 1
+TEAMS_PAGE_SIZE = 1000
+FUZZY_MIN_SCORE = 0.5
+FUZZY_MIN_WORDS = 2
+SPELLING_CUTOFF = 0.88
+
+# teams.sport_key / sports_events.sport / agent sport labels -> registry sport code
+SPORT_CODES = {
+    "baseball_mlb": "MLB",
+    "major league baseball": "MLB",
+    "americanfootball_nfl": "NFL",
+    "national football league": "NFL",
+    "americanfootball_ncaaf": "CFB",
+    "college football": "CFB",
+    "ncaaf": "CFB",
+    "basketball_nba": "NBA",
+    "national basketball association": "NBA",
+    "basketball_wnba": "WNBA",
+    "women's national basketball association": "WNBA",
+    "icehockey_nhl": "NHL",
+    "national hockey league": "NHL",
+}
+
+_APOSTROPHES = re.compile(r"['’`]")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NOISE_WORDS = {"the", "university", "college"}
+
+# Lookup tiers counted by TeamRegistry.tier_counts
+TIER_EXACT = "exact"
+TIER_WORDS = "shared_words"
+TIER_SPELLING = "spelling"
+TIER_UNRESOLVED = "unresolved"
+
+
+def normalize_team(name: Optional[str]) -> str:
+    """Lowercase ASCII words without punctuation or noise words ("The Ohio State University" -> "ohio state")"""
+    text = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode("ascii").lower()
+    text = _NON_ALNUM.sub(" ", _APOSTROPHES.sub("", text))
+    return " ".join(word for word in text.split() if word not in _NOISE_WORDS)
+
+
+def sport_code(sport: Optional[str]) -> str:
+    key = (sport or "").strip()
+    return SPORT_CODES.get(key.lower(), key.upper())
+
+
+@dataclass(frozen=True)
+class Team:
+    id: str
+    sport: str
+    name: str
+    abbreviation: Optional[str] = None
+    row_id: Optional[str] = None  # teams.id, when the team is in the table
+
+
+class TeamRegistry:
+    """Normalized alias -> team id per sport, with a fuzzy fallback for unseen spellings"""
+
+    def __init__(self, teams: Dict[str, Team], keys: Dict[str, Dict[str, Optional[str]]],
+                 has_table: bool = False, built_at: Optional[float] = None):
+        self.teams = teams
+        self.keys = keys  # sport -> normalized alias -> team id (None = ambiguous)
+        self.has_table = has_table
+        self.built_at = built_at or time.time()
+        self.tier_counts: Counter = Counter()
+        self._memo: Dict[Tuple[Optional[str], str, bool], Optional[str]] = {}
+        self._any: Dict[str, FrozenSet[str]] = {}
+        self._words: Dict[str, Dict[str, List[str]]] = {}
+        self._nicknames = {team_id: normalize_team(team.name).split()[-1]
+                           for team_id, team in teams.items() if normalize_team(team.name)}
+        for sport, aliases in keys.items():
+            words = self._words[sport] = {}
+            for alias, team_id in aliases.items():
+                if team_id is None:
+                    continue
+                self._any[alias] = self._any.get(alias, frozenset()) | {team_id}
+                for word in alias.split():
+                    if len(word) > 1:
+                        ids = words.setdefault(word, [])
+                        if team_id not in ids:
+                            ids.append(team_id)
+
+    # ---- building -------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, rows: Iterable[Dict[str, Any]] = (), aliases_path: str = DEFAULT_ALIASES_PATH) -> "TeamRegistry":
+        """Compile curated aliases and `teams` rows (id, sport_key, team_name, ...) into a registry"""
+        teams: Dict[str, Team] = {}
+        ranked: Dict[str, Dict[str, Tuple[int, Optional[str]]]] = {}
+        cities: Dict[str, str] = {}
+
+        def add(sport: str, alias: Optional[str], rank: int, team_id: str):
+            key = normalize_team(alias)
+            if not key:
+                return
+            aliases = ranked.setdefault(sport, {})
+            current = aliases.get(key)
+            if current is None or rank < current[0]:
+                aliases[key] = (rank, team_id)
+            elif rank == current[0] and current[1] != team_id:
+                aliases[key] = (rank, None)
+
+        for sport, entries in _load_aliases(aliases_path).items():
+            sport = sport_code(sport)
+            for entry in entries:
+                team_id = f"{sport}:{entry.get('abbreviation') or normalize_team(entry['name'])}"
+                teams[team_id] = Team(team_id, sport, entry['name'], entry.get('abbreviation'))
+                cities[team_id] = entry.get('city') or ""
+                for alias in [entry['name'], entry.get('abbreviation'), *entry.get('aliases', [])]:
+                    add(sport, alias, 0, team_id)
+
+        table_rows = 0
+        for row in rows:
+            name = row.get('team_name')
+            if not name or not row.get('id'):
+                continue
+            table_rows += 1
+            sport = sport_code(row.get('sport_key'))
+            existing = ranked.get(sport, {}).get(normalize_team(name))
+            team_id = existing[1] if existing and existing[0] == 0 and existing[1] else str(row['id'])
+            team = teams.get(team_id)
+            if team is None:
+                teams[team_id] = Team(team_id, sport, name, row.get('team_abbreviation'), str(row['id']))
+                cities[team_id] = row.get('city') or ""
+            elif team.row_id is None:
+                teams[team_id] = Team(team.id, sport, team.name, team.abbreviation or row.get('team_abbreviation'), str(row['id']))
+            for alias in (name, row.get('team_abbreviation'), row.get('team_key')):
+                add(sport, alias, 0, team_id)
+
+        for team in teams.values():
+            name = normalize_team(team.name)
+            city = normalize_team(cities.get(team.id))
+            words = name.split()
+            if city and name.startswith(city + " "):
+                add(team.sport, name[len(city) + 1:], 1, team.id)  # "red sox"
+                add(team.sport, city, 2, team.id)
+            else:
+                # School names: "texas a m aggies" -> "texas a m" (1), "texas a" (2), "texas" (3)
+                for dropped in range(1, len(words)):
+                    add(team.sport, " ".join(words[:-dropped]), dropped, team.id)
+                if len(words) > 1:
+                    add(team.sport, words[-1], len(words), team.id)
+
+        keys = {sport: {alias: team_id for alias, (_, team_id) in aliases.items()} for sport, aliases in ranked.items()}
+        registry = cls(teams, keys, has_table=table_rows > 0)
+        logger.info(f"🏷️ Team registry built: {len(teams)} teams, {sum(len(k) for k in keys.values())} aliases "
+                    f"({table_rows} teams rows)")
+        return registry
+
+    @classmethod
+    def from_supabase(cls, supabase, aliases_path: str = DEFAULT_ALIASES_PATH) -> "TeamRegistry":
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            response = supabase.table("teams").select(
+                "id, sport_key, team_key, team_name, team_abbreviation, city"
+            ).range(start, start + TEAMS_PAGE_SIZE - 1).execute()
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < TEAMS_PAGE_SIZE:
+                break
+            start += TEAMS_PAGE_SIZE
+        return cls.build(rows, aliases_path)
+
+    def save(self, path: str, aliases_path: str = DEFAULT_ALIASES_PATH):
+        payload = {
+            "version": CACHE_VERSION,
+            "built_at": self.built_at,
+            "has_table": self.has_table,
+            "aliases_mtime": _mtime(aliases_path),
+            "teams": [asdict(team) for team in self.teams.values()],
+            "keys": self.keys,
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write team registry cache {path}: {e}")
+
+    @classmethod
+    def load(cls, path: str, ttl: float = REGISTRY_TTL,
+             aliases_path: str = DEFAULT_ALIASES_PATH) -> Optional["TeamRegistry"]:
+        """Cached registry at path, or None if missing, expired or built from another alias file"""
+        try:
+            with open(path) as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (payload.get("version") != CACHE_VERSION
+                or payload.get("built_at", 0) + ttl < time.time()
+                or payload.get("aliases_mtime") != _mtime(aliases_path)):
+            return None
+        teams = {team["id"]: Team(**team) for team in payload["teams"]}
+        return cls(teams, payload["keys"], has_table=payload.get("has_table", False), built_at=payload["built_at"])
+
+    # ---- lookups --------------------------------------------------------------------
+
+    def resolve(self, name: Optional[str], sport: Optional[str] = None, exact: bool = False) -> Optional[str]:
+        """Team id for a name/nickname/abbreviation, or None if unknown or ambiguous.
+
+        Without a sport, or with exact=True, only exact aliases are accepted.
+        """
+        code = sport_code(sport) if sport else None
+        memo_key = (code, name or "", exact)
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+
+        key = normalize_team(name)
+        team_id, tier = None, TIER_UNRESOLVED
+        if key:
+            if code is None:
+                ids = self._any.get(key, frozenset())
+                if len(ids) == 1:
+                    team_id, tier = next(iter(ids)), TIER_EXACT
+            else:
+                aliases = self.keys.get(code, {})
+                if key in aliases:
+                    team_id, tier = aliases[key], TIER_EXACT
+                elif not exact:
+                    team_id = self._by_words(code, key)
+                    tier = TIER_WORDS
+                    if team_id is None:
+                        team_id, tier = self._by_spelling(code, key), TIER_SPELLING
+                if team_id is None:
+                    tier = TIER_UNRESOLVED
+
+        self.tier_counts[tier] += 1
+        self._memo[memo_key] = team_id
+        return team_id
+
+    def candidates(self, name: Optional[str]) -> FrozenSet[str]:
+        """Every team (any sport) that name is an exact, unambiguous alias of"""
+        return self._any.get(normalize_team(name), frozenset())
+
+    def team(self, team_id: Optional[str]) -> Optional[Team]:
+        return self.teams.get(team_id) if team_id else None
+
+    def lookup(self, name: Optional[str], sport: Optional[str] = None, exact: bool = False) -> Optional[Team]:
+        return self.team(self.resolve(name, sport, exact))
+
+    def abbreviation(self, name: Optional[str], sport: Optional[str] = None) -> Optional[str]:
+        team = self.lookup(name, sport)
+        return team.abbreviation if team else None
+
+    def same_team(self, first: Optional[str], second: Optional[str], sport: Optional[str] = None) -> bool:
+        """Both names resolve to one team; names the registry doesn't know must match exactly"""
+        if not first or not second:
+            return False
+        first_id, second_id = self.resolve(first, sport), self.resolve(second, sport)
+        if first_id and second_id:
+            return first_id == second_id
+        if sport is None and self.candidates(first) & self.candidates(second):
+            return True
+        return normalize_team(first) == normalize_team(second)
+
+    def _by_words(self, sport: str, key: str) -> Optional[str]:
+        """Team sharing the most (rarity-weighted) words with key, if one clearly leads"""
+        words = self._words.get(sport, {})
+        scores: Dict[str, float] = {}
+        shared: Dict[str, List[str]] = {}
+        known = [word for word in set(key.split()) if word in words]
+        for word in known:
+            ids = words[word]
+            for team_id in ids:
+                scores[team_id] = scores.get(team_id, 0.0) + 1.0 / len(ids)
+                shared.setdefault(team_id, []).append(word)
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        best_id, best = ranked[0]
+        if best < FUZZY_MIN_SCORE or (len(ranked) > 1 and ranked[1][1] >= best):
+            return None
+        # One shared word ("north", "miss") is too weak unless it is the nickname and
+        # nothing else in the name belongs to another team
+        if len(shared[best_id]) < FUZZY_MIN_WORDS and (
+                shared[best_id] != [self._nicknames.get(best_id)] or len(known) > 1):
+            return None
+        return best_id
+
+    def _by_spelling(self, sport: str, key: str) -> Optional[str]:
+        aliases = self.keys.get(sport, {})
+        for match in difflib.get_close_matches(key, list(aliases), n=3, cutoff=SPELLING_CUTOFF):
+            if aliases[match]:
+                return aliases[match]
+        return None
+
+
+def _load_aliases(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    try:
+        with open(path) as f:
+            return json.load(f).get("sports", {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Could not load team aliases from {path}: {e}")
+        return {}
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+_registry: Optional[TeamRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_team_registry(supabase=None) -> TeamRegistry:
+    """Process-wide registry: disk cache if fresh, else built (from the teams table when a
+    Supabase client is given, curated aliases only otherwise)"""
+    global _registry
+    with _registry_lock:
+        if _registry is not None and (_registry.has_table or supabase is None):
+            return _registry
+
+        cache_path = os.getenv("TEAM_REGISTRY_CACHE", DEFAULT_CACHE_PATH)
+        cached = TeamRegistry.load(cache_path)
+        if cached is not None and (cached.has_table or supabase is None):
+            logger.info(f"📦 Team registry loaded from {cache_path}: {len(cached.teams)} teams")
+            _registry = cached
+            return _registry
+
+        if supabase is not None:
+            try:
+                _registry = TeamRegistry.from_supabase(supabase)
+                _registry.save(cache_path)
+                return _registry
+            except Exception as e:
+                logger.warning(f"⚠️ Could not load teams table, using curated aliases only: {e}")
+        if _registry is None:
+            _registry = cached or TeamRegistry.build()
+        return _registry
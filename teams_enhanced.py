@@ -6,12 +6,20 @@ import requests
 import argparse
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
 import httpx
 from datetime import datetime, timedelta, timezone
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import time
+from game_slate import get_games_for_local_date
+from llm_gateway import get_llm_gateway
+from odds_snapshot import OddsSnapshot, TEAM_MARKETS
+from pick_stream import PICKS_STREAMING, PickStreamParser
+from prediction_writer import AI_USER_ID, PredictionWriter, risk_level_from_confidence
+from research_memo import STATMUSE as STATMUSE_MEMO, WEB as WEB_MEMO, memoized, statmuse_ok, web_ok
+from research_executor import ResearchExecutor, ResearchItem, ResearchResult, STATMUSE, WEB
+from team_pricing import TeamPricing
+from team_registry import get_team_registry
 
 # Load environment variables
 load_dotenv(".env")
@@ -23,6 +31,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fields a streamed pick object needs before it is formatted
+TEAM_PICK_FIELDS = ("home_team", "away_team", "bet_type", "recommendation")
+
 # Try to import UFC API for fighter data
 try:
     from ufc import get_fighter, get_event
@@ -43,6 +54,17 @@ class TeamBet:
     line: Optional[float]
     event_id: str
     bookmaker: str
+    # Cross-book pricing (team_pricing.py); None when no consensus could be formed
+    best_odds: Optional[int] = None
+    best_bookmaker: Optional[str] = None
+    consensus_probability: Optional[float] = None
+    fair_odds: Optional[int] = None
+    hold: Optional[float] = None
+    edge: Optional[float] = None
+    book_count: int = 0
+
+# TeamBet.bet_type -> sports_event_odds market
+BET_MARKETS = {"moneyline": "h2h", "spread": "spreads", "total": "totals"}
 
 @dataclass
 class ResearchInsight:
@@ -57,7 +79,12 @@ class StatMuseClient:
         self.base_url = base_url
         self.session = requests.Session()
         
-    def query(self, question: str, sport: Optional[str] = None) -> Dict[str, Any]:
+    def query(self, question: str, sport: Optional[str] = None, confidence: Optional[float] = None) -> Dict[str, Any]:
+        # Shared research memo first: other agents may already have asked this today
+        return memoized(STATMUSE_MEMO, question, lambda: self._query_upstream(question, sport), sport=sport,
+                        pipeline="teams_enhanced", source="statmuse", accept=statmuse_ok, confidence=confidence)
+    
+    def _query_upstream(self, question: str, sport: Optional[str] = None) -> Dict[str, Any]:
         try:
             payload = {"query": question}
             if sport:
@@ -83,7 +110,11 @@ class WebSearchClient:
         if not self.google_api_key or not self.search_engine_id:
             logger.warning("Google Search API credentials not found. Web search will use fallback.")
     
-    def search(self, query: str) -> Dict[str, Any]:
+    def search(self, query: str, confidence: Optional[float] = None) -> Dict[str, Any]:
+        return memoized(WEB_MEMO, query, lambda: self._search_upstream(query),
+                        pipeline="teams_enhanced", source="google_search", accept=web_ok, confidence=confidence)
+    
+    def _search_upstream(self, query: str) -> Dict[str, Any]:
         logger.info(f"🌐 Web search: {query}")
         
         try:
@@ -167,40 +198,10 @@ class DatabaseClient:
             raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables are required")
             
         self.supabase: Client = create_client(supabase_url, supabase_key)
+        self.prediction_writer = PredictionWriter(self.supabase)
     
     def get_games_for_date(self, target_date: datetime.date) -> List[Dict[str, Any]]:
         try:
-            # IMPORTANT: Use the same approach as setupOddsIntegration.ts
-            # For current day: use current time to end of day
-            # For tomorrow: use start of tomorrow to end of tomorrow
-            
-            now = datetime.now()
-            current_date = now.date()
-            
-            if target_date == current_date:
-                # Today - start from beginning of day to catch events that already started
-                start_time_local = datetime.combine(current_date, datetime.min.time())
-                start_time = start_time_local - timedelta(hours=8)  # Pad for timezone differences
-                # End of day in EST, converted to UTC (EST games can run until ~3 AM UTC next day)
-                end_time_local = datetime.combine(current_date, datetime.min.time().replace(hour=23, minute=59, second=59))
-                end_time = end_time_local + timedelta(hours=8)  # EST to UTC conversion (worst case)
-            else:
-                # Tomorrow or specified date - use full day with timezone padding
-                # Start of day in EST converted to UTC (EST midnight = 5 AM UTC typically)
-                start_time_local = datetime.combine(target_date, datetime.min.time())
-                start_time = start_time_local - timedelta(hours=8)  # Pad for timezone differences
-                
-                # End of day in EST converted to UTC (EST 11:59 PM can be up to 8 AM UTC next day)
-                end_time_local = datetime.combine(target_date, datetime.min.time().replace(hour=23, minute=59, second=59))
-                end_time = end_time_local + timedelta(hours=8)  # Pad for timezone differences
-            
-            start_iso = start_time.isoformat()
-            end_iso = end_time.isoformat()
-            
-            logger.info(f"Fetching games from UTC range ({start_iso}) to ({end_iso}) and filtering for local date {target_date}")
-            
-            # Fetch games from specified sports - using correct sport names from database
-            all_games = []
             # Allow an explicit sport filter to override default list
             if hasattr(self, 'sport_filter') and getattr(self, 'sport_filter'):
                 sports = list(getattr(self, 'sport_filter'))
@@ -218,27 +219,8 @@ class DatabaseClient:
                     "College Football"
                 ]
             
-            for sport in sports:
-                response = self.supabase.table("sports_events").select(
-                    "id, home_team, away_team, start_time, sport, metadata"
-                ).gte("start_time", start_iso).lte("start_time", end_iso).eq("sport", sport).order("start_time").execute()
-                
-                if response.data:
-                    # Filter games to only include those that happen on the target local date
-                    filtered_games = []
-                    for game in response.data:
-                        # Parse the UTC timestamp and convert to EST to check local date
-                        game_utc = datetime.fromisoformat(game['start_time'].replace('Z', '+00:00'))
-                        # Convert to EST (UTC-5, but we'll use a simple approximation)
-                        game_est = game_utc - timedelta(hours=5)  # EST offset
-                        game_local_date = game_est.date()
-                        
-                        # Only include if it falls on our target date in local time
-                        if game_local_date == target_date:
-                            filtered_games.append(game)
-                    
-                    logger.info(f"Found {len(filtered_games)} {sport} games for local date {target_date}")
-                    all_games.extend(filtered_games)
+            # One sports_events query for every sport, filtered on the local (ET) game date
+            all_games = get_games_for_local_date(self.supabase, target_date, sports)
             
             # Sort all games by start time
             all_games.sort(key=lambda x: x['start_time'])
@@ -260,231 +242,144 @@ class DatabaseClient:
             return []
         
         try:
-            # Get the games with their metadata which contains the odds
             response = self.supabase.table("sports_events").select(
-                "id, home_team, away_team, metadata"
+                "id, home_team, away_team"
             ).in_("id", game_ids).execute()
+            # Only the moneyline/spread/total rows of sports_event_odds, not the metadata blobs
+            odds = OddsSnapshot.load(self.supabase, game_ids, TEAM_MARKETS)
+            
+            # Prioritize FanDuel or DraftKings, otherwise use the first available bookmaker
+            reference_books = {game["id"]: odds.pick_bookmaker(game["id"]) for game in response.data}
             
             bets = []
             for game in response.data:
-                if not game.get("metadata") or not isinstance(game["metadata"], dict):
-                    logger.warning(f"No metadata or invalid metadata for game {game['id']}")
-                    continue
-                
-                # Extract odds from the correct metadata structure
-                metadata = game["metadata"]
-                full_data = metadata.get("full_data", {})
-                bookmakers_data = full_data.get("bookmakers", [])
-                
-                if not bookmakers_data:
+                bookmaker_key = reference_books[game["id"]]
+                if not bookmaker_key:
                     logger.warning(f"No bookmakers found for game {game['id']}")
                     continue
                 
-                # Prioritize FanDuel or DraftKings, otherwise use the first available bookmaker
-                preferred_bookmakers = ["fanduel", "draftkings", "bovada", "betmgm"]
-                selected_bookmaker = None
-                
-                # Try to find a preferred bookmaker
-                for preferred in preferred_bookmakers:
-                    for bookmaker in bookmakers_data:
-                        if bookmaker.get("key") == preferred:
-                            selected_bookmaker = bookmaker
-                            break
-                    if selected_bookmaker:
-                        break
-                
-                # If no preferred bookmaker found, use the first one
-                if not selected_bookmaker and bookmakers_data:
-                    selected_bookmaker = bookmakers_data[0]
-                
-                if not selected_bookmaker:
-                    logger.warning(f"No valid bookmaker data for game {game['id']}")
-                    continue
+                # 1. Moneyline (h2h)
+                for side in ("home", "away"):
+                    price = odds.price_of(game["id"], "h2h", side, bookmaker_key)
+                    if price is not None:
+                        bets.append(TeamBet(
+                            id=f"{game['id']}_ml_{side}",
+                            home_team=game["home_team"],
+                            away_team=game["away_team"],
+                            bet_type="moneyline",
+                            recommendation=game[f"{side}_team"],
+                            odds=price,
+                            line=None,
+                            event_id=game["id"],
+                            bookmaker=bookmaker_key
+                        ))
                 
-                bookmaker_key = selected_bookmaker.get("key", "unknown")
-                markets = selected_bookmaker.get("markets", [])
+                # 2. Spread
+                for side in ("home", "away"):
+                    row = odds.find(game["id"], "spreads", side, bookmaker_key)
+                    if row is not None and odds.point_value(row) is not None:
+                        bets.append(TeamBet(
+                            id=f"{game['id']}_spread_{side}",
+                            home_team=game["home_team"],
+                            away_team=game["away_team"],
+                            bet_type="spread",
+                            recommendation=game[f"{side}_team"],
+                            odds=odds.price[row],
+                            line=odds.point_value(row),
+                            event_id=game["id"],
+                            bookmaker=bookmaker_key
+                        ))
                 
-                # Process different bet types: h2h (moneyline), spreads, totals
-                for market in markets:
-                    market_key = market.get("key")
-                    outcomes = market.get("outcomes", [])
-                    
-                    # 1. Moneyline (h2h)
-                    if market_key == "h2h":
-                        for outcome in outcomes:
-                            team_name = outcome.get("name")
-                            price = outcome.get("price")
-                            
-                            if team_name and price is not None:
-                                is_home = team_name == game["home_team"]
-                                recommendation = game["home_team"] if is_home else game["away_team"]
-                                
-                                bets.append(TeamBet(
-                                    id=f"{game['id']}_ml_{'home' if is_home else 'away'}",
-                                    home_team=game["home_team"],
-                                    away_team=game["away_team"],
-                                    bet_type="moneyline",
-                                    recommendation=recommendation,
-                                    odds=int(price),
-                                    line=None,
-                                    event_id=game["id"],
-                                    bookmaker=bookmaker_key
-                                ))
-                    
-                    # 2. Spread
-                    elif market_key == "spreads":
-                        for outcome in outcomes:
-                            team_name = outcome.get("name")
-                            point = outcome.get("point")
-                            price = outcome.get("price")
-                            
-                            if team_name and point is not None and price is not None:
-                                is_home = team_name == game["home_team"]
-                                recommendation = game["home_team"] if is_home else game["away_team"]
-                                
-                                bets.append(TeamBet(
-                                    id=f"{game['id']}_spread_{'home' if is_home else 'away'}",
-                                    home_team=game["home_team"],
-                                    away_team=game["away_team"],
-                                    bet_type="spread",
-                                    recommendation=recommendation,
-                                    odds=int(price),
-                                    line=float(point),
-                                    event_id=game["id"],
-                                    bookmaker=bookmaker_key
-                                ))
-                    
-                    # 3. Totals
-                    elif market_key == "totals":
-                        for outcome in outcomes:
-                            bet_type = outcome.get("name").lower()
-                            point = outcome.get("point")
-                            price = outcome.get("price")
-                            
-                            if bet_type and point is not None and price is not None:
-                                is_over = "over" in bet_type.lower()
-                                recommendation = "over" if is_over else "under"
-                                
-                                bets.append(TeamBet(
-                                    id=f"{game['id']}_total_{recommendation}",
-                                    home_team=game["home_team"],
-                                    away_team=game["away_team"],
-                                    bet_type="total",
-                                    recommendation=recommendation,
-                                    odds=int(price),
-                                    line=float(point),
-                                    event_id=game["id"],
-                                    bookmaker=bookmaker_key
-                                ))
+                # 3. Totals
+                for side in ("over", "under"):
+                    row = odds.find(game["id"], "totals", side, bookmaker_key)
+                    if row is not None and odds.point_value(row) is not None:
+                        bets.append(TeamBet(
+                            id=f"{game['id']}_total_{side}",
+                            home_team=game["home_team"],
+                            away_team=game["away_team"],
+                            bet_type="total",
+                            recommendation=side,
+                            odds=odds.price[row],
+                            line=odds.point_value(row),
+                            event_id=game["id"],
+                            bookmaker=bookmaker_key
+                        ))
             
+            self._price_team_bets(bets, odds, reference_books)
             logger.info(f"🎯 Found {len(bets)} available team bets")
             return bets
         except Exception as e:
             logger.error(f"Failed to fetch team odds: {e}")
             return []
     
+    def _price_team_bets(self, bets: List[TeamBet], odds: OddsSnapshot, reference_books: Dict[str, Optional[str]]):
+        """Attach best line, no-vig consensus, hold and edge across every book to each bet"""
+        pricing = TeamPricing(odds, list(reference_books), reference_books)
+        for bet in bets:
+            if bet.bet_type == "total":
+                side = bet.recommendation
+            else:
+                side = "home" if bet.recommendation == bet.home_team else "away"
+            quote = pricing.quote(bet.event_id, BET_MARKETS[bet.bet_type], side)
+            if quote:
+                bet.best_odds = quote.best_odds
+                bet.best_bookmaker = quote.best_bookmaker
+                bet.consensus_probability = quote.consensus_probability
+                bet.fair_odds = quote.fair_odds
+                bet.hold = quote.hold
+                bet.edge = quote.edge
+                bet.book_count = quote.book_count
+        
+        holds = pricing.book_holds("h2h")
+        if holds:
+            logger.info("📉 Moneyline hold by book: " + ", ".join(
+                f"{book} {hold:.1%}" for book, hold in sorted(holds.items(), key=lambda item: item[1])))
+        positive = sum(1 for bet in bets if bet.edge is not None and bet.edge > 0)
+        logger.info(f"💹 {positive}/{len(bets)} team bets priced above the no-vig consensus at the best line")
+    
     def store_ai_predictions(self, predictions: List[Dict[str, Any]]):
         try:
-            # Sort predictions: WNBA first, MLB second, NHL third, CFB fourth, NFL last (so NFL shows first in UI)
-            def sport_priority(pred):
-                sport = pred.get("sport", "MLB")
-                if sport == "WNBA":
-                    return 1  # Save first
-                elif sport == "MLB":
-                    return 2  # Save second
-                elif sport == "NHL":
-                    return 3  # Save third
-                elif sport in ("CFB", "College Football"):
-                    return 4  # Save fourth
-                elif sport == "NFL":
-                    return 5  # Save last
-                else:
-                    return 6  # Other sports last
-            
-            sorted_predictions = sorted(predictions, key=sport_priority)
+            # Saved WNBA first, MLB second, NHL third, CFB fourth, NFL last (so NFL shows first in UI)
             logger.info(f"📊 Saving predictions in requested order: WNBA → MLB → CFB → NFL (NFL saved last)")
             
-            for pred in sorted_predictions:
+            rows = []
+            for pred in predictions:
                 # Extract reasoning from metadata if available
                 reasoning = pred.get("reasoning", "")
                 if not reasoning and pred.get("metadata"):
                     reasoning = pred["metadata"].get("reasoning", "")
                 
-                # Extract ROI and value percentages from metadata
                 metadata = pred.get("metadata", {})
-                roi_estimate_str = metadata.get("roi_estimate", "0%")
-                value_percentage_str = metadata.get("value_percentage", "0%")
-                implied_probability_str = metadata.get("implied_probability", "50%")
-                
-                # Convert percentage strings to floats
-                try:
-                    roi_estimate = float(str(roi_estimate_str).replace("%", "")) if roi_estimate_str else 0.0
-                    value_percentage = float(str(value_percentage_str).replace("%", "")) if value_percentage_str else 0.0
-                    implied_probability = float(str(implied_probability_str).replace("%", "")) if implied_probability_str else 50.0
-                except (ValueError, AttributeError):
-                    roi_estimate = 0.0
-                    value_percentage = 0.0
-                    implied_probability = 50.0
-                
-                # Calculate Kelly stake (simplified Kelly criterion)
-                try:
-                    odds_value = float(str(pred.get("odds", 100)).replace("+", "").replace("-", ""))
-                    confidence = pred.get("confidence", 75)
-                    # Simple Kelly approximation: (confidence/100 - 0.5) * 10, capped at 10%
-                    kelly_stake = max(0, min(10, (confidence/100 - 0.5) * 10))
-                except:
-                    kelly_stake = 2.5
-                
-                # Calculate expected value based on confidence and odds
-                try:
-                    confidence = pred.get("confidence", 75)
-                    expected_value = (confidence - 50) * 0.2  # Simple EV calculation
-                except:
-                    expected_value = 5.0
-                
-                # Determine risk level based on confidence
                 confidence = pred.get("confidence", 75)
-                if confidence >= 80:
-                    risk_level = "Low"
-                elif confidence >= 65:
-                    risk_level = "Medium"
-                else:
-                    risk_level = "High"
                 
-                # Map to actual ai_predictions table schema
-                prediction_data = {
-                    "user_id": "c19a5e12-4297-4b0f-8d21-39d2bb1a2c08",  # Global AI user
+                # Map to actual ai_predictions table schema (percentages, Kelly and EV are derived by PredictionWriter)
+                rows.append({
+                    "user_id": AI_USER_ID,  # Global AI user
                     "match_teams": pred.get("match_teams", ""),
                     "pick": pred.get("pick", ""),
-                    "odds": str(pred.get("odds", 0)),
-                    "confidence": pred.get("confidence", 75),
+                    "odds": pred.get("odds", 0),
+                    "confidence": confidence,
                     "sport": pred.get("sport", "MLB"),
                     "event_time": pred.get("event_time"),
                     "reasoning": reasoning,
-                    "value_percentage": value_percentage,
-                    "roi_estimate": roi_estimate,
-                    "kelly_stake": kelly_stake,
-                    "expected_value": expected_value,
-                    "risk_level": risk_level,
-                    "implied_probability": implied_probability,
+                    "value_percentage": metadata.get("value_percentage", "0%"),
+                    "roi_estimate": metadata.get("roi_estimate", "0%"),
+                    # Team picks are risk-rated on confidence alone
+                    "risk_level": risk_level_from_confidence(confidence),
+                    "implied_probability": metadata.get("implied_probability", "50%"),
                     "fair_odds": metadata.get("fair_odds", pred.get("odds", 0)),
                     "key_factors": metadata.get("key_factors", []),
                     "status": "pending",
-                    "game_id": str(pred.get("event_id", "")),
+                    "game_id": str(pred["event_id"]) if pred.get("event_id") else None,
                     "bet_type": pred.get("bet_type", "moneyline"),
                     "prop_market_type": pred.get("prop_market_type"),
                     "line_value": pred.get("line_value") or pred.get("line"),
                     "prediction_value": pred.get("prediction_value"),
                     "metadata": metadata
-                }
-                
-                # Remove None values to avoid database errors
-                prediction_data = {k: v for k, v in prediction_data.items() if v is not None}
-                
-                result = self.supabase.table("ai_predictions").insert(prediction_data).execute()
-                logger.info(f"✅ Stored prediction: {pred.get('pick', 'Unknown')} (ID: {result.data[0]['id'] if result.data else 'Unknown'})")
-                
-            logger.info(f"Successfully stored {len(predictions)} AI predictions")
+                })
+            
+            self.prediction_writer.write(rows)
             
         except Exception as e:
             logger.error(f"Failed to store AI predictions: {e}")
@@ -494,10 +389,11 @@ class IntelligentTeamsAgent:
         self.db = DatabaseClient()
         self.statmuse = StatMuseClient()
         self.web_search = WebSearchClient()
-        self.grok_client = AsyncOpenAI(
-            api_key=os.getenv("XAI_API_KEY"),
-            base_url="https://api.x.ai/v1"
-        )
+        # Runs each research stage's StatMuse/web items concurrently under rate limits
+        self.research_executor = ResearchExecutor(self.statmuse.query, self.web_search.search)
+        # Shared Grok gateway: retries, response cache and per-stage token accounting
+        self.llm = get_llm_gateway()
+        self.grok_client = self.llm.client
         # Add session for StatMuse context scraping
         self.session = requests.Session()
         self.statmuse_base_url = "http://localhost:5001"
@@ -706,13 +602,9 @@ Return JSON like:
 {{"MLB": 7, "NBA": 4, "WNBA": 3, "NFL": 4, "CFB": 1, "MMA": 0}}
 """
 
-            response = await self.grok_client.chat.completions.create(
-                model="grok-4-0709",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-
-            text = response.choices[0].message.content or "{}"
+            text = await self.llm.chat(
+                prompt, stage="distribution", model="grok-4-0709", temperature=0.2, cache=True
+            ) or "{}"
             start = text.find("{")
             end = text.rfind("}") + 1
             ai_dist = json.loads(text[start:end]) if start != -1 and end > start else {}
@@ -827,6 +719,7 @@ Return JSON like:
         
         picks = await self.generate_picks_with_reasoning(insights, available_bets, games, target_picks, sport_distribution)
         logger.info(f"🎲 Generated {len(picks)} intelligent picks for {target_date}")
+        self.llm.log_summary()
         
         if picks:
             self.db.store_ai_predictions(picks)
@@ -1110,13 +1003,10 @@ Return ONLY a valid JSON object with this structure:
 **CRITICAL**: {'Research ONLY NHL teams from the games data - DO NOT research MLB, NFL, CFB, or any other sports!' if (hasattr(self, 'nhl_only_mode') and self.nhl_only_mode) else (f"Use REAL diverse teams from the games data above. {'NO repetitive Cowboys/Chiefs/popular teams pattern!' if self.nfl_week_mode else 'NO repetitive Yankees/Dodgers/popular teams pattern!'}")}"""
         
         try:
-            response = await self.grok_client.chat.completions.create(
-                model="grok-4-0709",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+            plan_text = await self.llm.chat(
+                prompt, stage="research_plan", model="grok-4-0709", temperature=0.3, cache=True
             )
             
-            plan_text = response.choices[0].message.content
             start_idx = plan_text.find("{")
             end_idx = plan_text.rfind("}") + 1
             plan_json = json.loads(plan_text[start_idx:end_idx])
@@ -1158,64 +1048,29 @@ Return ONLY a valid JSON object with this structure:
         return all_insights
     
     async def _execute_initial_research(self, plan: Dict[str, Any]) -> List[ResearchInsight]:
-        insights = []
-        
         # BALANCED RESEARCH LIMITS: More focus on MLB since 7 picks needed vs 3 WNBA picks
         max_statmuse = min(15, len(plan.get("statmuse_queries", [])))
         max_web = min(10, len(plan.get("web_searches", [])))
         
-        statmuse_queries = plan.get("statmuse_queries", [])[:max_statmuse]
-        for query_obj in statmuse_queries:
-            try:
-                query_text = query_obj.get("query", query_obj) if isinstance(query_obj, dict) else query_obj
-                priority = query_obj.get("priority", "medium") if isinstance(query_obj, dict) else "medium"
-                sport = query_obj.get("sport", None) if isinstance(query_obj, dict) else None
-                
-                logger.info(f"🔍 StatMuse query ({priority}): {query_text} [sport: {sport}]")
-                result = self.statmuse.query(query_text, sport=sport)
-                
-                if result and "error" not in result:
-                    result_preview = str(result)[:200] + "..." if len(str(result)) > 200 else str(result)
-                    logger.info(f"📊 StatMuse result: {result_preview}")
-                    
-                    confidence = 0.9 if priority == "high" else 0.7 if priority == "medium" else 0.5
-                    insights.append(ResearchInsight(
-                        source="statmuse",
-                        query=query_text,
-                        data=result,
-                        confidence=confidence,
-                        timestamp=datetime.now()
-                    ))
-                else:
-                    logger.warning(f"❌ StatMuse query failed: {result}")
-                
-                await asyncio.sleep(1.5)
-                
-            except Exception as e:
-                logger.error(f"❌ StatMuse query failed for '{query_text}': {e}")
-        
-        web_searches = plan.get("web_searches", [])[:max_web]
-        for search_obj in web_searches:
-            try:
-                search_query = search_obj.get("query", search_obj) if isinstance(search_obj, dict) else search_obj
-                priority = search_obj.get("priority", "medium") if isinstance(search_obj, dict) else "medium"
-                
-                logger.info(f"🌐 Web search ({priority}): {search_query}")
-                result = self.web_search.search(search_query)
-                
-                confidence = 0.8 if priority == "high" else 0.6 if priority == "medium" else 0.4
-                insights.append(ResearchInsight(
-                    source="web_search",
-                    query=search_query,
-                    data=result,
-                    confidence=confidence,
-                    timestamp=datetime.now()
-                ))
-                
-            except Exception as e:
-                logger.error(f"❌ Initial web search failed for '{search_query}': {e}")
+        items = [
+            ResearchItem.from_plan(query_obj, STATMUSE, "statmuse", {"high": 0.9, "medium": 0.7}, 0.5)
+            for query_obj in plan.get("statmuse_queries", [])[:max_statmuse]
+        ] + [
+            ResearchItem.from_plan(search_obj, WEB, "web_search", {"high": 0.8, "medium": 0.6}, 0.4)
+            for search_obj in plan.get("web_searches", [])[:max_web]
+        ]
         
-        return insights
+        results = await self.research_executor.run(items)
+        return [self._insight_from_result(result) for result in results]
+    
+    def _insight_from_result(self, result: ResearchResult) -> ResearchInsight:
+        return ResearchInsight(
+            source=result.item.source,
+            query=result.item.query,
+            data=result.data,
+            confidence=result.item.confidence,
+            timestamp=result.timestamp
+        )
     
     async def _execute_adaptive_followup(self, initial_insights: List[ResearchInsight], bets: List[TeamBet]) -> List[ResearchInsight]:
         insights_summary = []
@@ -1274,72 +1129,26 @@ Generate 3-6 high-value follow-up queries that will maximize our edge.
 """
         
         try:
-            response = await self.grok_client.chat.completions.create(
-                model="grok-4-0709",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.4
+            followup_text = await self.llm.chat(
+                prompt, stage="followup", model="grok-4-0709", temperature=0.4
             )
             
-            followup_text = response.choices[0].message.content
             start_idx = followup_text.find("{")
             end_idx = followup_text.rfind("}") + 1
             followup_plan = json.loads(followup_text[start_idx:end_idx])
             
             logger.info(f"🧠 Adaptive Analysis: {followup_plan.get('analysis', 'No analysis provided')}")
             
-            insights = []
-            for query_obj in followup_plan.get("followup_statmuse_queries", [])[:5]:
-                try:
-                    query_text = query_obj.get("query", "")
-                    reasoning = query_obj.get("reasoning", "")
-                    priority = query_obj.get("priority", "medium")
-                    sport = query_obj.get("sport", None)  # Get sport if available
-                    
-                    logger.info(f"🔍 Adaptive StatMuse ({priority}): {query_text} [sport: {sport}]")
-                    logger.info(f"   Reasoning: {reasoning}")
-                    
-                    result = self.statmuse.query(query_text, sport=sport)
-                    
-                    if result and "error" not in result:
-                        result_preview = str(result)[:200] + "..." if len(str(result)) > 200 else str(result)
-                        logger.info(f"📊 Adaptive result: {result_preview}")
-                        
-                        confidence = 0.95 if priority == "high" else 0.8 if priority == "medium" else 0.6
-                        insights.append(ResearchInsight(
-                            source="statmuse_adaptive",
-                            query=query_text,
-                            data=result,
-                            confidence=confidence,
-                            timestamp=datetime.now()
-                        ))
-                    
-                    await asyncio.sleep(1.5)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Adaptive StatMuse query failed: {e}")
+            items = [
+                ResearchItem.from_plan(query_obj, STATMUSE, "statmuse_adaptive", {"high": 0.95, "medium": 0.8}, 0.6)
+                for query_obj in followup_plan.get("followup_statmuse_queries", [])[:5]
+            ] + [
+                ResearchItem.from_plan(search_obj, WEB, "web_search_adaptive", {"high": 0.85, "medium": 0.7}, 0.5)
+                for search_obj in followup_plan.get("followup_web_searches", [])[:3]
+            ]
             
-            for search_obj in followup_plan.get("followup_web_searches", [])[:3]:
-                try:
-                    search_query = search_obj.get("query", "")
-                    reasoning = search_obj.get("reasoning", "")
-                    priority = search_obj.get("priority", "medium")
-                    
-                    logger.info(f"🌐 Adaptive Web Search ({priority}): {search_query}")
-                    logger.info(f"   Reasoning: {reasoning}")
-                    
-                    result = self.web_search.search(search_query)
-                    
-                    confidence = 0.85 if priority == "high" else 0.7 if priority == "medium" else 0.5
-                    insights.append(ResearchInsight(
-                        source="web_search_adaptive",
-                        query=search_query,
-                        data=result,
-                        confidence=confidence,
-                        timestamp=datetime.now()
-                    ))
-                    
-                except Exception as e:
-                    logger.error(f"❌ Adaptive web search failed: {e}")
+            results = await self.research_executor.run(items)
+            insights = [self._insight_from_result(result) for result in results]
             
             return insights
             
@@ -1360,26 +1169,13 @@ Generate 3-6 high-value follow-up queries that will maximize our edge.
             
             top_teams = list(set([bet.home_team for bet in bets[:10]] + [bet.away_team for bet in bets[:10]]))
             
-            for team in top_teams[:3]:
-                try:
-                    query = f"{team} recent performance"
-                    logger.info(f"🔍 Final query: {query}")
-                    
-                    # For final queries, we don't have sport info - let StatMuse infer from team name
-                    result = self.statmuse.query(query, sport=None)
-                    if result and "error" not in result:
-                        final_insights.append(ResearchInsight(
-                            source="statmuse_final",
-                            query=query,
-                            data=result,
-                            confidence=0.7,
-                            timestamp=datetime.now()
-                        ))
-                    
-                    await asyncio.sleep(1.5)
-                    
-                except Exception as e:
-                    logger.error(f"❌ Final query failed: {e}")
+            # For final queries, we don't have sport info - let StatMuse infer from team name
+            items = [
+                ResearchItem(kind=STATMUSE, query=f"{team} recent performance", source="statmuse_final", confidence=0.7)
+                for team in top_teams[:3]
+            ]
+            results = await self.research_executor.run(items)
+            final_insights.extend(self._insight_from_result(result) for result in results)
         
         return final_insights
     
@@ -1421,6 +1217,9 @@ Generate 3-6 high-value follow-up queries that will maximize our edge.
                 f"(removed {long_shot_count} long shots outside {MAX_NEGATIVE_ODDS}/+{MAX_POSITIVE_ODDS})"
             )
         
+        # Best edge vs the no-vig consensus first; bets without a consensus go last
+        filtered_bets.sort(key=lambda bet: -bet.edge if bet.edge is not None else float("inf"))
+        
         bets_data = []
         for bet in filtered_bets:
             bets_data.append({
@@ -1431,7 +1230,13 @@ Generate 3-6 high-value follow-up queries that will maximize our edge.
                 "odds": bet.odds,
                 "line": bet.line,
                 "event_id": bet.event_id,
-                "bookmaker": bet.bookmaker
+                "bookmaker": bet.bookmaker,
+                "best_odds": bet.best_odds,
+                "best_bookmaker": bet.best_bookmaker,
+                "consensus_probability": round(bet.consensus_probability, 4) if bet.consensus_probability is not None else None,
+                "fair_odds": bet.fair_odds,
+                "edge_at_best_odds": f"{bet.edge:.1%}" if bet.edge is not None else None,
+                "books": bet.book_count
             })
         
         games_info = json.dumps(games[:10], indent=2, default=str)
@@ -1457,6 +1262,8 @@ TODAY'S DATA:
 🎯 AVAILABLE TEAM BETS ({len(filtered_bets)}) - **ONLY PICK FROM THESE FILTERED BETS**:
 {bets_info}
 
+📈 **MARKET PRICING**: Bets are sorted by edge_at_best_odds, the expected return at the best price across sportsbooks (best_odds at best_bookmaker) measured against the de-vigged consensus of all books. consensus_probability is that consensus win probability, fair_odds its no-vig price and books how many sportsbooks it averages.
+
 💡 **SMART FILTERING**: Long shot bets (odds > +400) have been removed to focus on PROFITABLE opportunities.
 
 ⚠️  **CRITICAL**: You MUST pick from the exact team names and bet types listed above. 
@@ -1565,89 +1372,38 @@ REMEMBER:
 """
         
         try:
-            response = await self.grok_client.chat.completions.create(
-                model="grok-4-0709",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=20000  # Increased for detailed 10-pick responses
-            )
-            
-            picks_text = response.choices[0].message.content.strip()
-            logger.info(f"🧠 Grok raw response: {picks_text[:500]}...")
-            
-            start_idx = picks_text.find("[")
-            end_idx = picks_text.rfind("]") + 1
-            
-            if start_idx == -1 or end_idx == 0:
-                logger.error("No JSON array found in Grok response")
+            # Parse pick objects as they close in the stream; conflicts need the whole set
+            parser = PickStreamParser(TEAM_PICK_FIELDS)
+            ai_picks = []
+            if PICKS_STREAMING:
+                async for delta in self.llm.stream_chat(
+                    prompt, stage="picks", model="grok-4-0709", temperature=0.1,
+                    max_tokens=20000  # Increased for detailed 10-pick responses
+                ):
+                    ai_picks.extend(parser.feed(delta))
+            else:
+                ai_picks.extend(parser.feed(await self.llm.chat(
+                    prompt, stage="picks", model="grok-4-0709", temperature=0.1,
+                    max_tokens=20000  # Increased for detailed 10-pick responses
+                )))
+            ai_picks.extend(parser.finish())
+            logger.info(f"🧠 Grok raw response: {parser.text[:500]}...")
+            logger.info(f"🧩 {parser.summary()}")
+
+            if not ai_picks:
+                logger.error("No JSON picks found in Grok response")
                 return []
             
-            json_str = picks_text[start_idx:end_idx]
-            logger.info(f"🔍 Attempting to parse JSON: {json_str[:200]}...")
-            
-            try:
-                ai_picks = json.loads(json_str)
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON parsing failed: {e}")
-                logger.error(f"Raw JSON string: {json_str[:1000]}...")  # Limit log output
-                
-                # Try multiple cleanup strategies for truncated JSON
-                import re
-                
-                # Strategy 1: Basic cleanup
-                cleaned_json = json_str.replace('\n', ' ').replace('\r', ' ')
-                cleaned_json = re.sub(r',\s*([}\]])', r'\1', cleaned_json)
-                
-                try:
-                    ai_picks = json.loads(cleaned_json)
-                    logger.info("✅ JSON parsing succeeded after basic cleanup")
-                except json.JSONDecodeError:
-                    # Strategy 2: Handle truncated response - try to close incomplete JSON
-                    logger.warning("🔧 Attempting to fix truncated JSON response")
-                    
-                    # Count open/close brackets to see if we need to close the array
-                    open_brackets = json_str.count('{')
-                    close_brackets = json_str.count('}')
-                    
-                    if open_brackets > close_brackets:
-                        # We have unclosed objects, try to close them
-                        missing_closes = open_brackets - close_brackets
-                        fixed_json = json_str.rstrip(', \n\r')
-                        
-                        # Add missing closing braces
-                        for _ in range(missing_closes):
-                            fixed_json += '}'
-                        
-                        # Ensure array is properly closed
-                        if not fixed_json.endswith(']'):
-                            fixed_json += ']'
-                        
-                        try:
-                            ai_picks = json.loads(fixed_json)
-                            logger.info(f"✅ JSON parsing succeeded after fixing truncation ({len(ai_picks)} picks recovered)")
-                        except json.JSONDecodeError as e3:
-                            logger.error(f"JSON parsing failed after all attempts: {e3}")
-                            return []
-                    else:
-                        logger.error("Unable to fix JSON - not a simple truncation issue")
-                        return []
-            
             # Remove conflicting picks (both sides of same game)
             ai_picks = self._remove_conflicting_picks(ai_picks)
             
             formatted_picks = []
             for pick in ai_picks:
                 try:
-                    # Validate required fields are present in the pick
-                    required_fields = ["home_team", "away_team", "bet_type", "recommendation"]
-                    if not all(field in pick for field in required_fields):
-                        missing = [f for f in required_fields if f not in pick]
-                        logger.warning(f"Pick missing required fields: {missing}. Skipping pick: {pick}")
-                        continue
-                    
+                    # Required fields were checked by the parser; values may still be null
                     # Validate recommendation field has correct values
                     valid_recommendations = ["home", "away", "over", "under"]
-                    recommendation = pick.get("recommendation", "").lower()
+                    recommendation = (pick.get("recommendation") or "").lower()
                     
                     if recommendation not in valid_recommendations:
                         logger.warning(f"Invalid recommendation '{pick.get('recommendation')}' - must be one of {valid_recommendations}. Attempting to fix...")
@@ -1656,7 +1412,7 @@ REMEMBER:
                         home_team = pick.get("home_team", "")
                         away_team = pick.get("away_team", "")
                         bet_type = pick.get("bet_type", "")
-                        original_rec = pick.get("recommendation", "")
+                        original_rec = pick.get("recommendation") or ""
                         
                         # If recommendation matches home team name, change to "home"
                         if original_rec == home_team:
@@ -1865,6 +1621,21 @@ REMEMBER:
             logger.error(f"Error in conflict detection: {e}")
             return picks  # Return original picks if error
     
+    def _bet_index_for(self, odds: List[TeamBet]):
+        """(registry, exact (home, away, bet_type) -> bet, (home team id, bet_type) -> bets),
+        built once per odds list"""
+        index = getattr(self, '_bet_index', None)
+        if index is None or index[0] is not odds:
+            registry = get_team_registry(self.db.supabase)
+            exact: Dict[tuple, TeamBet] = {}
+            by_home: Dict[tuple, List[TeamBet]] = {}
+            for bet in odds:
+                exact.setdefault((bet.home_team, bet.away_team, bet.bet_type), bet)
+                for team_id in registry.candidates(bet.home_team):
+                    by_home.setdefault((team_id, bet.bet_type), []).append(bet)
+            index = self._bet_index = (odds, registry, exact, by_home)
+        return index[1:]
+
     def _find_matching_bet(self, pick: Dict, odds: List[TeamBet]) -> Optional[TeamBet]:
         """Find a matching bet from the available odds that corresponds to the AI pick.
         Returns None if no match is found."""
@@ -1878,26 +1649,18 @@ REMEMBER:
                 logger.warning(f"Missing required fields for matching: {pick}")
                 return None
             
-            # Try exact match first
-            exact_match = next(
-                (bet for bet in odds 
-                if bet.home_team == home_team and bet.away_team == away_team and bet.bet_type == bet_type),
-                None
-            )
+            registry, exact, by_home = self._bet_index_for(odds)
+            exact_match = exact.get((home_team, away_team, bet_type))
             if exact_match:
                 return exact_match
             
-            # Try fuzzy match as fallback
-            fuzzy_match = next(
-                (bet for bet in odds 
-                if (home_team.lower() in bet.home_team.lower() or bet.home_team.lower() in home_team.lower()) and
-                   (away_team.lower() in bet.away_team.lower() or bet.away_team.lower() in away_team.lower()) and
-                   bet.bet_type == bet_type),
-                None
-            )
-            if fuzzy_match:
-                logger.info(f"✅ Fuzzy matched '{home_team} vs {away_team}' to '{fuzzy_match.home_team} vs {fuzzy_match.away_team}'")
-                return fuzzy_match
+            # Same teams under another name/nickname/abbreviation (team_registry ids)
+            away_ids = registry.candidates(away_team)
+            for home_id in registry.candidates(home_team):
+                for bet in by_home.get((home_id, bet_type), []):
+                    if registry.candidates(bet.away_team) & away_ids:
+                        logger.info(f"✅ Team-id matched '{home_team} vs {away_team}' to '{bet.home_team} vs {bet.away_team}'")
+                        return bet
             
             logger.warning(f"❌ No match found for {home_team} vs {away_team} {bet_type}")
             return None